@@ -1,8 +1,11 @@
 """Simple FastAPI application for HS Agent."""
 
+import asyncio
+import contextlib
 import logging
 import os
 import warnings
+from contextlib import asynccontextmanager
 from datetime import datetime
 from functools import lru_cache
 from pathlib import Path
@@ -26,7 +29,8 @@ from fastapi.staticfiles import StaticFiles  # noqa: E402
 
 from hs_agent.agent import HSAgent  # noqa: E402
 from hs_agent.config.settings import settings  # noqa: E402
-from hs_agent.data_loader import HSDataLoader  # noqa: E402
+from hs_agent.data_loader import ROOT_CODE, HSDataLoader  # noqa: E402
+from hs_agent.factories import ModelFactory  # noqa: E402
 from hs_agent.models import (  # noqa: E402
     ClassificationLevel,
     ClassificationRequest,
@@ -37,14 +41,36 @@ from hs_agent.models import (  # noqa: E402
     create_no_hs_code_result,
     is_no_hs_code,
 )
+from hs_agent.nomenclature import NomenclatureManager, NomenclatureRelease  # noqa: E402
+from hs_agent.services import ChapterNotesService  # noqa: E402
+from hs_agent.shared_corpus import SharedCorpus, attach_shared_corpus  # noqa: E402
 from hs_agent.utils.logger import get_logger  # noqa: E402
+from hs_agent.utils.metrics import metrics  # noqa: E402
 
 # Get centralized logger with consistent styling
 logger = get_logger("hs_agent.api")
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Start the nomenclature watcher (if enabled) for the lifetime of the app."""
+    watcher = None
+    if settings.nomenclature_reload_interval_seconds > 0:
+        watcher = asyncio.create_task(
+            get_nomenclature().watch(settings.nomenclature_reload_interval_seconds)
+        )
+    yield
+    if watcher is not None:
+        watcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await watcher
+
+
 app = FastAPI(
-    title="HS Agent", description="AI-powered HS code classification service", version="1.0.0"
+    title="HS Agent",
+    description="AI-powered HS code classification service",
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Logfire observability (traces/spans)
@@ -92,18 +118,71 @@ WORKFLOW_CONFIG = {
 
 
 @lru_cache(maxsize=1)
-def get_data_loader() -> HSDataLoader:
-    """Get cached data loader instance (thread-safe singleton)."""
-    logger.init_start("Data Loader")
+def get_shared_corpus() -> SharedCorpus | None:
+    """Attach the shared corpus built by the parent process, if one was exported."""
+    if settings.shared_corpus_path is None:
+        return None
+    try:
+        return attach_shared_corpus(settings.shared_corpus_path)
+    except FileNotFoundError as e:
+        logger.warning(f"⚠️  {e}; loading data in this worker instead")
+        return None
+
+
+def _load_data_loader() -> HSDataLoader:
+    """Load the nomenclature, attaching the shared corpus if it holds the current revision."""
     data_loader = HSDataLoader()
-    data_loader.load_all_data()
-    logger.init_complete("Data Loader", f"📊 Loaded {len(data_loader.codes_6digit)} codes")
+    corpus = get_shared_corpus()
+    if corpus is not None and corpus.version == data_loader.source_version():
+        data_loader.set_table(corpus.table, version=corpus.version)
+    else:
+        data_loader.load_all_data()
     return data_loader
 
 
-@lru_cache(maxsize=3)
+def _warm_agents(release: NomenclatureRelease) -> None:
+    """Build every workflow's agent (and pre-filter indexes) for a release before it becomes active.
+
+    The chapter step's enum-constrained schema is compiled here too; heading and
+    subheading schemas are compiled on first use of each parent.
+    """
+    chapters = release.data_loader.candidate_set(ClassificationLevel.CHAPTER, ROOT_CODE)
+    for workflow_key in WORKFLOW_CONFIG:
+        agent = _get_agent_for_release(workflow_key, release)
+        if chapter_config := agent.configs.get("select_chapter_candidates"):
+            ModelFactory.precompile_schema(chapter_config, chapters.codes)
+    if settings.enable_candidate_prefilter:
+        for level in (2, 4):
+            release.data_loader.lexical_index(level)
+
+
+@lru_cache(maxsize=1)
+def get_nomenclature() -> NomenclatureManager:
+    """Get the nomenclature manager holding the active release (thread-safe singleton)."""
+    return NomenclatureManager(
+        _load_data_loader,
+        source_version=lambda: HSDataLoader().source_version(),
+        warmup=_warm_agents,
+    )
+
+
+def get_data_loader() -> HSDataLoader:
+    """Get the data loader of the active nomenclature release."""
+    return get_nomenclature().current.data_loader
+
+
+@lru_cache(maxsize=1)
+def get_chapter_notes_service() -> ChapterNotesService:
+    """Get the chapter notes service shared by all agents (thread-safe singleton)."""
+    corpus = get_shared_corpus()
+    return ChapterNotesService(notes=corpus.notes if corpus is not None else None)
+
+
 def get_agent_by_workflow(workflow_key: str) -> HSAgent:
-    """Get cached agent instance for a specific workflow (thread-safe singleton).
+    """Get the agent for a workflow on the active nomenclature release.
+
+    Callers keep the returned agent for the whole request, so a hot-swap never
+    changes the nomenclature under an in-flight classification.
 
     Args:
         workflow_key: One of "standard", "wide_net", "multi_choice"
@@ -111,11 +190,23 @@ def get_agent_by_workflow(workflow_key: str) -> HSAgent:
     Returns:
         Configured HSAgent instance
     """
+    return _get_agent_for_release(workflow_key, get_nomenclature().current)
+
+
+# Room for the active and the previous release of every workflow
+@lru_cache(maxsize=2 * len(WORKFLOW_CONFIG))
+def _get_agent_for_release(workflow_key: str, release: NomenclatureRelease) -> HSAgent:
+    """Get cached agent instance for a workflow and release (thread-safe singleton)."""
     config = WORKFLOW_CONFIG[workflow_key]
     workflow_name, agent_name, init_detail, complete_detail = config
 
     logger.init_start(agent_name, init_detail)
-    agent = HSAgent(get_data_loader(), workflow_name=workflow_name)
+    agent = HSAgent(
+        release.data_loader,
+        workflow_name=workflow_name,
+        chapter_notes_service=get_chapter_notes_service(),
+        nomenclature_version=release.version,
+    )
     logger.init_complete(agent_name, complete_detail)
     return agent
 
@@ -224,6 +315,11 @@ async def classify_product(request: ClassificationRequest):
                     paths_explored=multi_result.paths,
                     comparison_reasoning=multi_result.final_reasoning,
                     comparison_summary=multi_result.comparison_summary,
+                    nomenclature_version=multi_result.nomenclature_version,
+                    cached=multi_result.cached,
+                    original_processing_time_ms=multi_result.original_processing_time_ms,
+                    near_duplicate_of=multi_result.near_duplicate_of,
+                    near_duplicate_similarity=multi_result.near_duplicate_similarity,
                 )
 
             # Extract the final selected path for the response (normal case)
@@ -266,6 +362,11 @@ async def classify_product(request: ClassificationRequest):
                 paths_explored=multi_result.paths,
                 comparison_reasoning=multi_result.final_reasoning,
                 comparison_summary=multi_result.comparison_summary,
+                nomenclature_version=multi_result.nomenclature_version,
+                cached=multi_result.cached,
+                original_processing_time_ms=multi_result.original_processing_time_ms,
+                near_duplicate_of=multi_result.near_duplicate_of,
+                near_duplicate_similarity=multi_result.near_duplicate_similarity,
             )
         else:
             # Standard mode: one-shot classification
@@ -322,16 +423,22 @@ async def classify_product_multi(request: MultiChoiceClassificationRequest):
 async def health_check():
     """Health check endpoint."""
     try:
-        agent = get_agent()
+        release = get_nomenclature().current
+        agent = _get_agent_for_release("standard", release)
         return {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "model": settings.default_model_name,
+            "nomenclature": {
+                "version": release.version,
+                "loaded_at": release.loaded_at.isoformat(),
+            },
             "codes_loaded": {
                 "chapters": len(agent.data_loader.codes_2digit),
                 "headings": len(agent.data_loader.codes_4digit),
                 "subheadings": len(agent.data_loader.codes_6digit),
             },
+            "metrics": metrics.snapshot(),
         }
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
@@ -0,0 +1,120 @@
+"""Benchmark cold-load time of the HS codes table.
+
+Compares three ways of getting HSDataLoader ready:
+
+- legacy:   the original ``df.iterrows()`` loop building a validated HSCode per row
+- columnar: vectorized CSV parse (``load_all_data(use_snapshot=False)``)
+- snapshot: memory-mapped binary snapshot (``load_all_data(use_snapshot=True)``)
+
+Each mode runs in a fresh interpreter so imports and first-touch costs are
+included, like a CLI run or a new uvicorn worker.
+
+Usage:
+    uv run python benchmarks/bench_data_loading.py [--runs 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = ("legacy", "columnar", "snapshot")
+
+
+def _legacy_load(loader) -> None:
+    """Reproduce the pre-snapshot per-row loading loop."""
+    import pandas as pd
+
+    from hs_agent.config.settings import settings
+    from hs_agent.models import HSCode
+
+    df = pd.read_csv(loader.data_dir / settings.hs_codes_file)
+    parents = {}
+    for _, row in df.iterrows():
+        code = str(row["hscode"]).strip()
+        level = int(row["level"])
+        hs_code = HSCode(code=code, description=str(row["description"]))
+        if level == 2:
+            loader.codes_2digit[code] = hs_code
+        elif level == 4:
+            loader.codes_4digit[code] = hs_code
+        elif level == 6:
+            loader.codes_6digit[code] = hs_code
+        else:
+            continue
+        parents[code] = str(row["parent"]).strip()
+    loader.build_index(parents)
+
+
+def run_once(mode: str, snapshot_dir: Path) -> None:
+    """Load the table once in this process and print the timing as JSON."""
+    start = time.perf_counter()
+    sys.path.insert(0, str(ROOT))
+    from hs_agent.data_loader import HSDataLoader
+
+    imported = time.perf_counter()
+    loader = HSDataLoader(snapshot_dir=snapshot_dir)
+    if mode == "legacy":
+        _legacy_load(loader)
+    else:
+        loader.load_all_data(use_snapshot=mode == "snapshot")
+    loaded = time.perf_counter()
+
+    print(
+        json.dumps(
+            {
+                "import_ms": (imported - start) * 1000,
+                "load_ms": (loaded - imported) * 1000,
+                "codes": len(loader.codes_6digit),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per mode")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--snapshot-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_once(args.mode, args.snapshot_dir)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_dir = Path(tmp)
+        # Build the snapshot up front so every "snapshot" run is a warm-snapshot boot
+        subprocess.run(
+            [sys.executable, __file__, "--mode", "snapshot", "--snapshot-dir", tmp],
+            check=True,
+            capture_output=True,
+        )
+
+        print(f"{'mode':<10} {'load median':>12} {'load min':>10} {'import':>8}")
+        for mode in MODES:
+            samples = []
+            for _ in range(args.runs):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--mode", mode, "--snapshot-dir", str(snapshot_dir)],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                    cwd=ROOT,
+                )
+                samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+            loads = [s["load_ms"] for s in samples]
+            imports = [s["import_ms"] for s in samples]
+            print(
+                f"{mode:<10} {statistics.median(loads):>10.1f}ms {min(loads):>8.1f}ms "
+                f"{statistics.median(imports):>6.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
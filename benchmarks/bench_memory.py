@@ -0,0 +1,185 @@
+"""Benchmark resident memory of the loaded HS codes table per worker.
+
+Compares three ways of holding the nomenclature:
+
+- pydantic: the original layout, one HSCode object per code in per-level dicts
+  plus a parent -> children dict index
+- table:    the compact HSCodeTable behind HSDataLoader (interned codes, one
+  description array, integer level/parent arrays, views instead of dicts)
+- shared:   a worker attaching the shared corpus built once by the parent
+  (``hs-agent serve --workers N``); arrays, descriptions and chapter notes are
+  memory-mapped, so only the code lookup dict is private to the worker
+
+Each mode runs in a fresh interpreter, like a new uvicorn worker. Reported
+numbers are the worker's RSS before and after loading (imports and the CSV
+parser are warmed up first), the difference (what each additional worker pays
+for the table), and the bytes still held by Python objects per tracemalloc.
+
+Usage:
+    uv run python benchmarks/bench_memory.py [--workers 4]
+"""
+
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = ("pydantic", "table", "shared")
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process (peak RSS where /proc is unavailable)."""
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _pydantic_load(data_dir: Path) -> object:
+    """Reproduce the pre-table layout: HSCode per row, dict index per parent."""
+    from hs_agent.config.settings import settings
+    from hs_agent.data_loader import HSDataLoader
+    from hs_agent.models import HSCode
+
+    codes, levels, parents, descriptions = HSDataLoader._read_csv_columns(
+        data_dir / settings.hs_codes_file
+    )
+    per_level: dict[int, dict[str, HSCode]] = {2: {}, 4: {}, 6: {}}
+    children: dict[str, dict[str, HSCode]] = {}
+    for code, level, parent, description in zip(
+        codes.tolist(), levels.tolist(), parents.tolist(), descriptions.tolist(), strict=True
+    ):
+        hs_code = HSCode(code=code, description=description)
+        per_level[level][code] = hs_code
+        children.setdefault(parent, {})[code] = hs_code
+        children.setdefault(code, {})
+    return per_level, children
+
+
+def _table_load(data_dir: Path) -> object:
+    """Load through HSDataLoader (compact table)."""
+    from hs_agent.data_loader import HSDataLoader
+
+    loader = HSDataLoader(data_dir=data_dir)
+    loader.load_all_data(use_snapshot=False)
+    return loader
+
+
+def _shared_attach(corpus_path: Path) -> object:
+    """Attach the shared corpus and touch every description and note, like a busy worker."""
+    from hs_agent.shared_corpus import attach_shared_corpus
+
+    corpus = attach_shared_corpus(corpus_path)
+    for description in corpus.table.descriptions:
+        len(description)
+    for notes in corpus.notes.values():
+        len(notes)
+    return corpus
+
+
+def run_once(mode: str, trace: bool, corpus_path: Path | None) -> None:
+    """Load the table once in this process and print the memory numbers as JSON.
+
+    tracemalloc inflates RSS, so RSS and traced Python allocations are measured
+    in separate processes (``trace`` selects the latter).
+    """
+    sys.path.insert(0, str(ROOT))
+    from hs_agent.config.settings import settings
+    from hs_agent.data_loader import HSDataLoader
+
+    # Warm up the CSV parser so its one-off allocations are not attributed to the table
+    HSDataLoader._read_csv_columns(settings.data_directory / settings.hs_codes_file)
+
+    gc.collect()
+    rss_before = _rss_bytes()
+    if trace:
+        tracemalloc.start()
+
+    if mode == "shared":
+        loaded = _shared_attach(corpus_path)
+    elif mode == "pydantic":
+        loaded = _pydantic_load(settings.data_directory)
+    else:
+        loaded = _table_load(settings.data_directory)
+
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] if trace else None
+    rss_after = _rss_bytes()
+    del loaded
+
+    print(json.dumps({"rss_before": rss_before, "rss_after": rss_after, "retained": retained}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4, help="Workers to project totals for")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_once(args.mode, args.trace, args.corpus)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _report(args.workers, _build_corpus(Path(tmp)))
+
+
+def _build_corpus(corpus_dir: Path) -> Path:
+    """Build the shared corpus the way the serve command's parent process does."""
+    sys.path.insert(0, str(ROOT))
+    from hs_agent.config.settings import settings
+    from hs_agent.data_loader import HSDataLoader
+    from hs_agent.shared_corpus import build_shared_corpus
+
+    loader = HSDataLoader()
+    loader.load_all_data(use_snapshot=False)
+    return build_shared_corpus(
+        loader.table, settings.data_directory / "chapters_markdown", corpus_dir
+    )
+
+
+def _report(workers: int, corpus_path: Path) -> None:
+    """Measure every mode in fresh interpreters and print the table."""
+
+    mib = 1024 * 1024
+    print(
+        f"{'mode':<9} {'rss before':>11} {'rss loaded':>11} {'table rss':>10} "
+        f"{'py objects':>11} {f'x{workers} workers':>12}"
+    )
+    for mode in MODES:
+        extra = ["--mode", mode, "--corpus", str(corpus_path)]
+        sample, traced = _run_subprocess(extra), _run_subprocess([*extra, "--trace"])
+        delta = sample["rss_after"] - sample["rss_before"]
+        print(
+            f"{mode:<9} {sample['rss_before'] / mib:>9.1f}MB {sample['rss_after'] / mib:>9.1f}MB "
+            f"{delta / mib:>8.1f}MB {traced['retained'] / mib:>9.1f}MB "
+            f"{delta * workers / mib:>10.1f}MB"
+        )
+
+
+def _run_subprocess(extra_args: list[str]) -> dict:
+    """Run one measurement in a fresh interpreter and parse its JSON line."""
+    out = subprocess.run(
+        [sys.executable, __file__, *extra_args],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
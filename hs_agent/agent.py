@@ -1,5 +1,24 @@
 """HS classification agent with LangGraph."""
 
+import asyncio
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from hs_agent.cache import (
+    CacheBackend,
+    NearDuplicateIndex,
+    NearDuplicateMatch,
+    ResultCache,
+    fingerprint,
+    get_shared_backend,
+    near_duplicate_index,
+    result_cache,
+    result_cache_key,
+)
+from hs_agent.cache import selection_cache as default_selection_cache
 from hs_agent.config.settings import settings
 from hs_agent.config_loader import load_workflow_configs
 from hs_agent.data_loader import HSDataLoader
@@ -7,8 +26,9 @@ from hs_agent.graph_models import ClassificationState, MultiChoiceState
 from hs_agent.models import (
     ClassificationResponse,
     MultiChoiceClassificationResponse,
+    is_no_hs_code,
 )
-from hs_agent.policies import RetryPolicy
+from hs_agent.policies import RetryPolicy, SingleFlight, deadline_scope
 from hs_agent.services import ChapterNotesService
 from hs_agent.utils.logger import get_logger
 from hs_agent.workflows import MultiPathWorkflow, SinglePathWorkflow
@@ -16,6 +36,8 @@ from hs_agent.workflows import MultiPathWorkflow, SinglePathWorkflow
 # Get centralized logger
 logger = get_logger("hs_agent.agent")
 
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
 
 class HSAgent:
     """HS classification agent using LangGraph with Logfire tracing.
@@ -24,6 +46,10 @@ class HSAgent:
     classification logic. It manages:
     - Configuration loading
     - Service initialization (retry policy, chapter notes)
+    - Result caching of repeated (and near-duplicate) classifications, and of per-level selections
+      shared by every workflow (in memory, and in the shared cache backend
+      selected in settings)
+    - Coalescing of concurrent identical classifications into one graph run
     - Logfire observability integration
     - Public API (classify, classify_multi methods)
     """
@@ -33,6 +59,12 @@ class HSAgent:
         data_loader: HSDataLoader,
         model_name: str | None = None,
         workflow_name: str = "wide_net_classification",
+        chapter_notes_service: ChapterNotesService | None = None,
+        nomenclature_version: str | None = None,
+        cache: ResultCache | None = None,
+        shared_cache: CacheBackend | None = None,
+        selection_cache: ResultCache | None = None,
+        near_duplicates: NearDuplicateIndex | None = None,
     ):
         """Initialize the HS classification agent.
 
@@ -40,8 +72,21 @@ class HSAgent:
             data_loader: Data loader with HS codes
             model_name: Name of the LLM model to use (defaults to settings.default_model_name)
             workflow_name: Name of the workflow configuration to use
+            chapter_notes_service: Chapter notes service to share between agents
+                (defaults to a new file-based ChapterNotesService)
+            nomenclature_version: Nomenclature revision of data_loader, reported in responses
+            cache: Result cache used when settings.enable_caching (defaults to the
+                process-wide cache)
+            shared_cache: Shared cache backend read through on cache misses (defaults to
+                the process-wide backend selected by settings.cache_backend)
+            selection_cache: Cache of per-level selections used when
+                settings.enable_selection_cache (defaults to the process-wide
+                cache shared by every agent's workflows)
+            near_duplicates: Index of classified descriptions used when
+                settings.enable_near_duplicate_cache (defaults to the process-wide index)
         """
         self.data_loader = data_loader
+        self.nomenclature_version = nomenclature_version
         self.model_name = model_name or settings.default_model_name
         self.workflow_name = workflow_name
 
@@ -51,12 +96,29 @@ class HSAgent:
 
         workflow_path = Path(f"configs/{workflow_name}")
         self.configs = load_workflow_configs(workflow_path)
+        # Cached results are only reused under the same step configs
+        self.config_hash = fingerprint(self.configs)
+        self.result_cache = result_cache if cache is None else cache
+        self.shared_cache = get_shared_backend() if shared_cache is None else shared_cache
+        self.selection_cache = (
+            default_selection_cache if selection_cache is None else selection_cache
+        )
+        self.near_duplicates = near_duplicate_index if near_duplicates is None else near_duplicates
 
         # Initialize retry policy for LLM invocations
-        self.retry_policy = RetryPolicy(max_retries=3, initial_delay=1.0, prompt_variation=True)
+        self.retry_policy = RetryPolicy(
+            max_retries=3,
+            initial_delay=1.0,
+            prompt_variation=True,
+            jitter=settings.enable_retry_jitter,
+            hedging=settings.enable_hedged_requests,
+            coalescing=settings.enable_request_coalescing,
+        )
+        # In-flight classifications, by result cache key
+        self._flights = SingleFlight("request_coalescing")
 
         # Initialize chapter notes service
-        self.chapter_notes_service = ChapterNotesService()
+        self.chapter_notes_service = chapter_notes_service or ChapterNotesService()
 
         # Initialize workflows
         self.single_path_workflow = SinglePathWorkflow(
@@ -64,6 +126,8 @@ class HSAgent:
             model_name=self.model_name,
             configs=self.configs,
             retry_policy=self.retry_policy,
+            selection_cache=self.selection_cache,
+            shared_cache=self.shared_cache,
         )
 
         self.multi_path_workflow = MultiPathWorkflow(
@@ -72,6 +136,8 @@ class HSAgent:
             configs=self.configs,
             retry_policy=self.retry_policy,
             chapter_notes_service=self.chapter_notes_service,
+            selection_cache=self.selection_cache,
+            shared_cache=self.shared_cache,
         )
 
         # Build LangGraphs using workflows
@@ -85,42 +151,77 @@ class HSAgent:
         1. Select best chapter (2-digit)
         2. Select best heading within chapter (4-digit)
         3. Select best subheading within heading (6-digit)
-        4. Calculate final confidence score
+        4. If national levels are loaded and the subheading has HTS subdivisions,
+           descend to the 8-digit tariff line and 10-digit statistical suffix
+        5. Calculate final confidence score
 
         Args:
             product_description: Product description to classify
 
         Returns:
-            ClassificationResponse with final code and confidence scores
+            ClassificationResponse with final code and confidence scores (and,
+            after a national descent, tariff_line, statistical_suffix and
+            national_code)
         """
         import time
 
         start = time.time()
 
+        scope = self._cache_scope("single")
+        cache_key = self._cache_key("single", product_description)
+        if cache_key and (cached := await self._lookup(cache_key, scope, product_description)):
+            return self._cached_response(
+                ClassificationResponse, *cached, product_description, start
+            )
+
+        return await self._coalesced(
+            self._request_key("single", product_description),
+            partial(self._run_classify, product_description, cache_key, scope, start),
+            product_description,
+            start,
+        )
+
+    async def _run_classify(
+        self, product_description: str, cache_key: str | None, scope: str, start: float
+    ) -> ClassificationResponse:
+        """Run the single-path graph and cache its response."""
+        import time
+
         # Initial state
         initial_state: ClassificationState = {
             "product_description": product_description,
             "chapter_result": None,
             "heading_result": None,
             "subheading_result": None,
+            "tariff_line_result": None,
+            "statistical_suffix_result": None,
             "final_code": None,
+            "national_code": None,
             "overall_confidence": None,
         }
 
-        # Run graph (LangSmith OTEL auto-instruments via Logfire)
-        final_state = await self.graph.ainvoke(initial_state)
+        # Run graph (LangSmith OTEL auto-instruments via Logfire); LLM retries
+        # stop once the request's time budget is spent
+        with deadline_scope(settings.request_timeout_seconds):
+            final_state = await self.graph.ainvoke(initial_state)
 
         processing_time = (time.time() - start) * 1000
 
-        return ClassificationResponse(
+        response = ClassificationResponse(
             product_description=product_description,
             final_code=final_state["final_code"],
             overall_confidence=final_state["overall_confidence"],
             chapter=final_state["chapter_result"],
             heading=final_state["heading_result"],
             subheading=final_state["subheading_result"],
+            tariff_line=final_state.get("tariff_line_result"),
+            statistical_suffix=final_state.get("statistical_suffix_result"),
+            national_code=final_state.get("national_code"),
             processing_time_ms=processing_time,
+            nomenclature_version=self.nomenclature_version,
         )
+        self._store(cache_key, scope, response, response.final_code)
+        return response
 
     async def classify_multi(
         self, product_description: str, max_selections: int = 3
@@ -145,6 +246,38 @@ class HSAgent:
 
         start = time.time()
 
+        scope = self._cache_scope("multi", max_selections)
+        cache_key = self._cache_key("multi", product_description, max_selections)
+        if cache_key and (cached := await self._lookup(cache_key, scope, product_description)):
+            return self._cached_response(
+                MultiChoiceClassificationResponse, *cached, product_description, start
+            )
+
+        return await self._coalesced(
+            self._request_key("multi", product_description, max_selections),
+            partial(
+                self._run_classify_multi,
+                product_description,
+                max_selections,
+                cache_key,
+                scope,
+                start,
+            ),
+            product_description,
+            start,
+        )
+
+    async def _run_classify_multi(
+        self,
+        product_description: str,
+        max_selections: int,
+        cache_key: str | None,
+        scope: str,
+        start: float,
+    ) -> MultiChoiceClassificationResponse:
+        """Run the multi-choice graph and cache its response."""
+        import time
+
         # Initial state
         initial_state: MultiChoiceState = {
             "product_description": product_description,
@@ -166,12 +299,14 @@ class HSAgent:
             "comparison_summary": None,
         }
 
-        # Run multi-choice graph (LangSmith OTEL auto-instruments via Logfire)
-        final_state = await self.multi_graph.ainvoke(initial_state)
+        # Run multi-choice graph (LangSmith OTEL auto-instruments via Logfire); LLM
+        # retries stop once the request's time budget is spent
+        with deadline_scope(settings.request_timeout_seconds):
+            final_state = await self.multi_graph.ainvoke(initial_state)
 
         processing_time = (time.time() - start) * 1000
 
-        return MultiChoiceClassificationResponse(
+        response = MultiChoiceClassificationResponse(
             product_description=product_description,
             paths=final_state["paths"],
             overall_strategy=final_state["overall_strategy"],
@@ -180,4 +315,150 @@ class HSAgent:
             final_confidence=final_state["final_confidence"],
             final_reasoning=final_state["final_reasoning"],
             comparison_summary=final_state["comparison_summary"],
+            nomenclature_version=self.nomenclature_version,
+        )
+        self._store(cache_key, scope, response, response.final_selected_code)
+        return response
+
+    async def _coalesced(
+        self,
+        key: str,
+        run: Callable[[], Awaitable[ResponseT]],
+        product_description: str,
+        start: float,
+    ) -> ResponseT:
+        """Run a classification, or join an identical one already in flight.
+
+        A joined response is the leader's, with the description and processing
+        time of the current request.
+        """
+        import time
+
+        if not settings.enable_request_coalescing:
+            return await run()
+
+        response, joined = await self._flights.do(key, run)
+        if not joined:
+            return response
+        logger.debug(f"🔗 Joined in-flight classification of: {product_description[:60]}")
+        return response.model_copy(
+            update={
+                "product_description": product_description,
+                "processing_time_ms": (time.time() - start) * 1000,
+            }
+        )
+
+    def _cache_key(
+        self, kind: str, product_description: str, max_selections: int | None = None
+    ) -> str | None:
+        """Get the result cache key of a classification (None when caching is off)."""
+        if not settings.enable_caching:
+            return None
+        return self._request_key(kind, product_description, max_selections)
+
+    def _request_key(
+        self, kind: str, product_description: str, max_selections: int | None = None
+    ) -> str:
+        """Get the identity of a classification (its result cache key)."""
+        return result_cache_key(
+            product_description,
+            kind=kind,
+            workflow=self.workflow_name,
+            max_selections=max_selections,
+            model=self.model_name,
+            config_hash=self.config_hash,
+            nomenclature_version=self.nomenclature_version,
+        )
+
+    def _cache_scope(self, kind: str, max_selections: int | None = None) -> str:
+        """Get the fingerprint of everything but the description a result depends on."""
+        return fingerprint(
+            [
+                kind,
+                self.workflow_name,
+                max_selections,
+                self.model_name,
+                self.config_hash,
+                self.nomenclature_version,
+            ]
+        )
+
+    async def _lookup(
+        self, cache_key: str, scope: str, product_description: str
+    ) -> tuple[bytes, NearDuplicateMatch | None] | None:
+        """Get the cached response of a description, else of a near-duplicate one.
+
+        Returns:
+            The serialized response and the near-duplicate match it came from
+            (None for an exact hit), or None on a miss
+        """
+        cached = await self._read(cache_key)
+        if cached is not None:
+            return cached, None
+
+        if settings.enable_near_duplicate_cache:
+            match = self.near_duplicates.find(product_description, scope)
+            if match is not None and (cached := await self._read(match.key)) is not None:
+                return cached, match
+        return None
+
+    async def _read(self, cache_key: str) -> bytes | None:
+        """Get a cached response from memory, else from the shared backend."""
+        cached = self.result_cache.get(cache_key)
+        if cached is None and self.shared_cache is not None:
+            # Backend reads are blocking I/O: keep them off the event loop
+            cached = await asyncio.to_thread(self.shared_cache.get, cache_key)
+            if cached is not None:
+                self.result_cache.set(cache_key, cached)
+        return cached
+
+    def _store(
+        self, cache_key: str | None, scope: str, response: BaseModel, final_code: str | None
+    ) -> None:
+        """Cache a response, unless it is a "000000" (possibly a transient LLM failure).
+
+        The shared backend is written in the background, off the request path.
+        """
+        if cache_key and not is_no_hs_code(final_code):
+            payload = response.model_dump_json().encode()
+            self.result_cache.set(cache_key, payload)
+            if self.shared_cache is not None:
+                self.shared_cache.set(cache_key, payload)
+            if settings.enable_near_duplicate_cache:
+                self.near_duplicates.add(response.product_description, scope, cache_key)
+
+    @staticmethod
+    def _cached_response(
+        response_type: type[ResponseT],
+        payload: bytes,
+        match: NearDuplicateMatch | None,
+        product_description: str,
+        start: float,
+    ) -> ResponseT:
+        """Rebuild a cached response for the current request.
+
+        The description is the one of the current request (it may differ from
+        the cached one in case or whitespace, or be a near duplicate of it),
+        processing_time_ms is the lookup time, and the original processing
+        time is kept separately.
+        """
+        import time
+
+        response = response_type.model_validate_json(payload)
+        if match is None:
+            logger.debug(f"♻️  Result cache hit for: {product_description[:60]}")
+        else:
+            logger.debug(
+                f"♻️  Near-duplicate cache hit ({match.similarity:.2f}) for: "
+                f"{product_description[:60]} ~ {match.description[:60]}"
+            )
+        return response.model_copy(
+            update={
+                "product_description": product_description,
+                "cached": True,
+                "original_processing_time_ms": response.processing_time_ms,
+                "processing_time_ms": (time.time() - start) * 1000,
+                "near_duplicate_of": match.description if match else None,
+                "near_duplicate_similarity": match.similarity if match else None,
+            }
         )
@@ -0,0 +1,44 @@
+"""Caches of classification results.
+
+Each process keeps an in-memory ResultCache of classification results (with a
+NearDuplicateIndex over their descriptions) and a SelectionCache of per-level
+LLM selections; the shared backend selected by settings.cache_backend (SQLite
+or Redis) sits behind both.
+"""
+
+from .backend import CacheBackend, get_shared_backend
+from .near_duplicate import (
+    NearDuplicateIndex,
+    NearDuplicateMatch,
+    canonicalize_description,
+    near_duplicate_index,
+)
+from .redis_store import RedisResultStore
+from .result_cache import (
+    ResultCache,
+    fingerprint,
+    normalize_description,
+    result_cache,
+    result_cache_key,
+)
+from .selection_cache import SelectionCache, selection_cache, selection_cache_key
+from .sqlite_store import SQLiteResultStore
+
+__all__ = [
+    "CacheBackend",
+    "NearDuplicateIndex",
+    "NearDuplicateMatch",
+    "RedisResultStore",
+    "ResultCache",
+    "SQLiteResultStore",
+    "SelectionCache",
+    "canonicalize_description",
+    "fingerprint",
+    "get_shared_backend",
+    "near_duplicate_index",
+    "normalize_description",
+    "result_cache",
+    "result_cache_key",
+    "selection_cache",
+    "selection_cache_key",
+]
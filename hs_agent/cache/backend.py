@@ -0,0 +1,89 @@
+"""Cache backend interface and the shared backend selected in settings.
+
+Every replica keeps its own in-memory ResultCache. Behind it, a shared
+backend (settings.cache_backend) lets a cache fill on one replica serve the
+others, and a restarted process start warm:
+
+- "memory": no shared backend, each process only has its in-memory cache
+- "sqlite": a SQLite file in WAL mode (shared by processes on one host and by
+  CLI runs, see sqlite_store)
+- "redis": a Redis-protocol server shared by every replica (see redis_store)
+
+Backends store opaque payloads (serialized responses or selections) under
+hex-digest keys, so the same backend serves every kind of cached value.
+"""
+
+from abc import ABC, abstractmethod
+from threading import Lock
+
+from hs_agent.config.settings import CacheBackendType, settings
+
+
+class CacheBackend(ABC):
+    """Key/value store of serialized cache entries with a TTL."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """Get a stored payload.
+
+        May block on I/O: async callers run it in a worker thread.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The payload, or None if absent, expired or unreachable
+        """
+
+    @abstractmethod
+    def set(self, key: str, payload: bytes) -> None:
+        """Store a payload for the backend's TTL.
+
+        Must not block on I/O: remote and disk writes are queued.
+
+        Args:
+            key: Cache key
+            payload: Serialized value
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry."""
+
+    def flush(self) -> None:
+        """Wait until every queued write has been applied."""
+        return None
+
+    def close(self) -> None:
+        """Apply queued writes and release connections."""
+        return None
+
+
+_shared_backend: CacheBackend | None = None
+_shared_backend_lock = Lock()
+
+
+def get_shared_backend() -> CacheBackend | None:
+    """Get the process-wide shared cache backend selected in settings.
+
+    Returns:
+        The SQLite or Redis backend, or None for the "memory" backend
+    """
+    global _shared_backend
+    if settings.cache_backend is CacheBackendType.MEMORY:
+        return None
+
+    with _shared_backend_lock:
+        if _shared_backend is None:
+            if settings.cache_backend is CacheBackendType.REDIS:
+                from hs_agent.cache.redis_store import RedisResultStore
+
+                _shared_backend = RedisResultStore()
+            else:
+                from hs_agent.cache.sqlite_store import SQLiteResultStore
+
+                _shared_backend = SQLiteResultStore(
+                    settings.result_store_path
+                    or settings.data_directory / ".cache" / "results.sqlite3"
+                )
+        return _shared_backend
@@ -0,0 +1,307 @@
+"""Near-duplicate lookups of previously classified descriptions (MinHash/LSH).
+
+Catalog feeds send the same product many times with trivial differences:
+SKU suffixes, sizes, colors, punctuation. The exact result cache key misses
+them, so the descriptions HSAgent classifies are also indexed here:
+
+1. canonicalize_description strips what does not change the classification
+   (SKU and model numbers, sizes and quantities, colors in attribute position,
+   punctuation) and tokenizes the rest like the retrieval index does, keeping
+   what does: percentages stay bound to their material ("85%cotton"),
+   hyphenated compounds stay whole ("t-shirt") and single letters are kept
+2. The token set is summarized by a MinHash signature, split into LSH bands;
+   descriptions sharing a band are candidates
+3. Candidates are verified: their product words (every token but the filler
+   words of NOISE_WORDS) must be the same, in the same order, and the exact
+   Jaccard similarity of the token sets must reach
+   settings.near_duplicate_threshold, which bounds how much filler may differ
+
+So "frozen beef cuts" never matches "fresh beef cuts", nor a cotton pullover a
+wool one: a single differing product word can change the heading.
+
+A match points at the result cache key of the prior classification, so the
+reused response is read from the result cache (or the shared backend) like an
+exact hit. Entries are scoped (workflow, model, configs, nomenclature version,
+...) so a match is only made within the same setup. Lookups are counted as
+``near_duplicate.hits`` / ``near_duplicate.misses``.
+"""
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+from hs_agent.cache.result_cache import normalize_description
+from hs_agent.config.settings import settings
+from hs_agent.retrieval import STOPWORDS, tokenize
+from hs_agent.utils.metrics import metrics
+
+# MinHash permutations, split into LSH bands of NUM_PERM // LSH_BANDS rows
+# (candidates from a Jaccard similarity of about 0.5 up)
+NUM_PERM = 64
+LSH_BANDS = 16
+
+# Mersenne prime of the universal hash functions (a * x + b) mod p
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240611)
+_HASH_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_HASH_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+_COLORS = (
+    "black|white|red|blue|green|yellow|purple|pink|grey|gray|brown|beige|navy|teal|"
+    "turquoise|maroon|burgundy|khaki|ivory|multicolou?r"
+)
+
+# Marketing filler: tokens two near duplicates may differ by
+NOISE_WORDS = frozenset(
+    [
+        "authentic",
+        "best",
+        "brand",
+        "classic",
+        "deal",
+        "genuine",
+        "gift",
+        "great",
+        "high",
+        "hot",
+        "new",
+        "official",
+        "original",
+        "premium",
+        "quality",
+        "sale",
+        "stylish",
+        "top",
+        "trendy",
+    ]
+)
+
+# Possessive "'s" ("men's"), dropped before tokenizing
+_POSSESSIVE = re.compile(r"['’]s\b")
+# Percentages bound to the material they describe: "85 % cotton" -> "85%cotton"
+_PERCENTAGE = re.compile(r"(\d+(?:[.,]\d+)?)\s*%\s*([a-z]+)")
+# Canonical tokens: bound percentages, hyphenated compounds and plain words
+_CANONICAL_TOKEN = re.compile(r"\d+(?:[.,]\d+)?%[a-z]+|[a-z0-9]+(?:-[a-z0-9]+)*")
+
+# Canonicalization pipeline, applied in order to the normalized description
+_CANONICAL_STEPS = [
+    # SKU / model / reference numbers: "SKU-12345", "ref: AB12-C", "#4411"
+    re.compile(
+        r"\b(?:sku|item|ref|art|article|model|part|mpn|upc|ean)\b"
+        r"\s*(?:no\.?|#)?\s*[:#]?\s*[\w./-]*\d[\w./-]*"
+    ),
+    re.compile(r"#\s*[\w-]+"),
+    # Dimensions and quantities: "30x40 cm", "500 g", "2.5l", "12-pack", "size XL"
+    re.compile(r"\b\d+(?:[.,]\d+)?\s*(?:x\s*\d+(?:[.,]\d+)?\s*)+(?:mm|cm|m|in|inch|inches|ft)?\b"),
+    re.compile(
+        r"\b\d+(?:[.,]\d+)?\s*-?\s*(?:mm|cm|m|km|in|inch|inches|ft|mg|g|kg|lb|lbs|oz|ml|cl|l|"
+        r"gal|pcs|pc|pieces?|pack|pk|ct|count|gb|tb|mb)\b"
+    ),
+    re.compile(r"\bsize\s*:?\s*[\w.]+"),
+    re.compile(r"\b(?:xxs|xs|xl|xxl|xxxl|[2-5]xl)\b"),
+    # Codes mixing letters and digits ("AB1234X", "x200b") and long digit runs
+    re.compile(r"\b(?=\w*[a-z])(?=\w*\d)\w{5,}\b"),
+    re.compile(r"\b\d{4,}\b"),
+    # Colors given as attributes ("t-shirt - black", "colour: navy", a trailing
+    # "black"), not as part of the product name ("black tea" and "green tea"
+    # classify differently) or of a compound ("off-white", "black-and-white")
+    re.compile(rf"(?:[,;/|(]\s*|\s-\s*|\bcolou?r\s*:?\s*)(?:{_COLORS})\b(?!-)"),
+    re.compile(rf"(?<=\w)\s+(?:{_COLORS})\W*$"),
+]
+
+
+def canonicalize_description(description: str) -> str:
+    """Strip the parts of a description that do not change its classification.
+
+    Args:
+        description: Product description as received
+
+    Returns:
+        Canonical description (normalized, without SKU numbers, sizes and
+        attribute colors)
+    """
+    text = _POSSESSIVE.sub("", normalize_description(description))
+    text = _PERCENTAGE.sub(r"\1%\2", text)
+    for step in _CANONICAL_STEPS:
+        text = step.sub(" ", text)
+
+    tokens = []
+    for token in _CANONICAL_TOKEN.findall(text):
+        if "-" in token or "%" in token:
+            tokens.append(token)
+        elif len(token) == 1:
+            if token not in STOPWORDS:
+                tokens.append(token)
+        else:
+            tokens.extend(tokenize(token))
+    return " ".join(tokens)
+
+
+def product_words(tokens: list[str]) -> tuple[str, ...]:
+    """Get the canonical tokens that name the product (all but NOISE_WORDS), in order."""
+    return tuple(token for token in tokens if token not in NOISE_WORDS)
+
+
+def minhash_signature(tokens: frozenset[str]) -> np.ndarray:
+    """Get the MinHash signature of a (non-empty) token set.
+
+    Args:
+        tokens: Canonical tokens
+
+    Returns:
+        NUM_PERM minimum hash values (stable across processes)
+    """
+    hashes = np.fromiter((zlib.crc32(token.encode()) % _PRIME for token in tokens), dtype=np.uint64)
+    return ((np.outer(hashes, _HASH_A) + _HASH_B) % _PRIME).min(axis=0)
+
+
+class NearDuplicateMatch(NamedTuple):
+    """Prior classification close to a description."""
+
+    key: str
+    description: str
+    similarity: float
+
+
+class _Entry(NamedTuple):
+    tokens: frozenset[str]
+    product: tuple[str, ...]
+    description: str
+    key: str
+    bands: tuple[tuple[str, int, bytes], ...]
+
+
+class NearDuplicateIndex:
+    """Thread-safe LSH index of classified descriptions, bounded by an entry count."""
+
+    def __init__(self, threshold: float | None = None, max_entries: int | None = None):
+        """Initialize the index.
+
+        Args:
+            threshold: Lowest Jaccard similarity of a match (defaults to
+                settings.near_duplicate_threshold)
+            max_entries: Highest number of indexed descriptions, least recently
+                matched are dropped first (defaults to settings.near_duplicate_max_entries)
+        """
+        self._threshold = threshold
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        # entry id -> entry, least recently used first
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._ids_by_key: dict[str, int] = {}
+        self._buckets: dict[tuple[str, int, bytes], set[int]] = {}
+        self._next_id = 0
+
+    @property
+    def threshold(self) -> float:
+        """Lowest Jaccard similarity of a match."""
+        return settings.near_duplicate_threshold if self._threshold is None else self._threshold
+
+    @property
+    def max_entries(self) -> int:
+        """Highest number of indexed descriptions."""
+        if self._max_entries is None:
+            return settings.near_duplicate_max_entries
+        return self._max_entries
+
+    def add(self, description: str, scope: str, key: str) -> None:
+        """Index a classified description.
+
+        Args:
+            description: Product description as received
+            scope: Fingerprint of everything else the result depends on
+            key: Result cache key of its classification
+        """
+        canonical = canonicalize_description(description).split()
+        tokens = frozenset(canonical)
+        if not tokens:
+            return
+        bands = self._band_keys(scope, tokens)
+
+        with self._lock:
+            if key in self._ids_by_key:
+                self._remove(self._ids_by_key[key])
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(
+                tokens, product_words(canonical), description, key, bands
+            )
+            self._ids_by_key[key] = entry_id
+            for band in bands:
+                self._buckets.setdefault(band, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def find(self, description: str, scope: str) -> NearDuplicateMatch | None:
+        """Find the most similar indexed description.
+
+        Args:
+            description: Product description as received
+            scope: Fingerprint of everything else the result depends on
+
+        Returns:
+            The best match at or above the threshold with the same product
+            words, or None
+        """
+        canonical = canonicalize_description(description).split()
+        tokens = frozenset(canonical)
+        product = product_words(canonical)
+        match = None
+        if tokens:
+            bands = self._band_keys(scope, tokens)
+            threshold = self.threshold
+            with self._lock:
+                candidates = set().union(*(self._buckets.get(band, ()) for band in bands))
+                best_id, best_similarity = None, 0.0
+                for entry_id in candidates:
+                    entry = self._entries[entry_id]
+                    if entry.product != product:
+                        continue
+                    entry_tokens = entry.tokens
+                    similarity = len(tokens & entry_tokens) / len(tokens | entry_tokens)
+                    if similarity > best_similarity:
+                        best_id, best_similarity = entry_id, similarity
+                if best_id is not None and best_similarity >= threshold:
+                    self._entries.move_to_end(best_id)
+                    entry = self._entries[best_id]
+                    match = NearDuplicateMatch(entry.key, entry.description, best_similarity)
+
+        metrics.increment("near_duplicate.hits" if match else "near_duplicate.misses")
+        return match
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._ids_by_key.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def _band_keys(scope: str, tokens: frozenset[str]) -> tuple[tuple[str, int, bytes], ...]:
+        signature = minhash_signature(tokens)
+        rows = NUM_PERM // LSH_BANDS
+        return tuple(
+            (scope, band, signature[band * rows : (band + 1) * rows].tobytes())
+            for band in range(LSH_BANDS)
+        )
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        del self._ids_by_key[entry.key]
+        for band in entry.bands:
+            bucket = self._buckets[band]
+            bucket.discard(entry_id)
+            if not bucket:
+                del self._buckets[band]
+
+
+# Process-wide index used by HSAgent
+near_duplicate_index = NearDuplicateIndex()
@@ -0,0 +1,128 @@
+"""Shared cache backend on a Redis-protocol server (settings.cache_backend = "redis").
+
+Replicas behind a load balancer otherwise classify the same popular products
+on their own. With this backend every replica reads and fills one Redis (or
+Redis-compatible) server, so a cache fill on one replica serves the others.
+
+The client is any object with the redis-py ``get``/``set``/``scan_iter``/
+``delete`` methods, so tests pass a local stand-in instead of a server; by
+default a ``redis.Redis`` client is made from settings.redis_url (the redis
+package is only needed for this backend). Writes are applied by a
+background thread, off the request path, and an unreachable server is
+treated as a miss rather than failing the classification.
+"""
+
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from hs_agent.cache.backend import CacheBackend
+from hs_agent.config.settings import settings
+from hs_agent.utils.logger import get_logger
+from hs_agent.utils.metrics import metrics
+
+logger = get_logger("hs_agent.cache.redis_store")
+
+
+class RedisResultStore(CacheBackend):
+    """Cache backend storing entries as Redis strings with an expiry."""
+
+    def __init__(
+        self,
+        client: Any | None = None,
+        prefix: str | None = None,
+        ttl_seconds: float | None = None,
+        max_pending_writes: int = 10_000,
+    ):
+        """Initialize the backend.
+
+        Args:
+            client: Redis client (defaults to ``redis.Redis.from_url(settings.redis_url)``)
+            prefix: Prefix of every key (defaults to settings.redis_key_prefix)
+            ttl_seconds: Lifetime of an entry (defaults to settings.cache_ttl_seconds)
+            max_pending_writes: Queued writes beyond which new writes are dropped
+
+        Raises:
+            ImportError: If no client is given and the redis package is not installed
+        """
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError(
+                    "The redis cache backend needs the redis extra (pip install 'hs-agent[redis]')"
+                ) from e
+            client = redis.Redis.from_url(settings.redis_url)
+
+        self.client = client
+        self.prefix = settings.redis_key_prefix if prefix is None else prefix
+        self._ttl_seconds = ttl_seconds
+        self.max_pending_writes = max_pending_writes
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="redis-store-writer")
+        self._pending = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def ttl_seconds(self) -> float:
+        """Lifetime of an entry."""
+        return settings.cache_ttl_seconds if self._ttl_seconds is None else self._ttl_seconds
+
+    def get(self, key: str) -> bytes | None:
+        """Get a stored payload (None if absent, expired or the server is unreachable)."""
+        try:
+            payload = self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"⚠️  Redis cache read failed: {e}")
+            metrics.increment("result_store.errors")
+            return None
+
+        metrics.increment("result_store.hits" if payload is not None else "result_store.misses")
+        return None if payload is None else bytes(payload)
+
+    def set(self, key: str, payload: bytes) -> None:
+        """Queue a payload to be written by the background thread (dropped once closed)."""
+        with self._lock:
+            if self._closed or self._pending >= self.max_pending_writes:
+                metrics.increment("result_store.dropped_writes")
+                return
+            self._pending += 1
+            # Submitted under the lock, so close() cannot shut the writer down in between
+            self._writer.submit(self._write, self.prefix + key, payload)
+
+    def clear(self) -> None:
+        """Apply queued writes, then drop every key with the backend's prefix."""
+        self.flush()
+        for name in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(name)
+
+    def flush(self) -> None:
+        """Wait until every queued write has been applied (nothing to do once closed)."""
+        with self._lock:
+            if self._closed:
+                return
+            done = self._writer.submit(lambda: None)
+        done.result()
+
+    def close(self) -> None:
+        """Apply queued writes and close the client (closing again does nothing)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._writer.shutdown(wait=True)
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            close()
+
+    def _write(self, name: str, payload: bytes) -> None:
+        try:
+            # Redis expiries are whole seconds
+            self.client.set(name, payload, ex=max(1, math.ceil(self.ttl_seconds)))
+        except Exception as e:
+            logger.warning(f"⚠️  Redis cache write failed: {e}")
+            metrics.increment("result_store.errors")
+        finally:
+            with self._lock:
+                self._pending -= 1
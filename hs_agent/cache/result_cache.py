@@ -0,0 +1,201 @@
+"""Classification result cache.
+
+Traffic contains many exact and near-exact repeats of the same product
+description, and each one re-runs 3 to 14 LLM calls. HSAgent keeps the
+serialized response of every successful classification in a process-wide
+LRU cache with a TTL, bounded by the total size of the stored responses.
+
+A result is only valid for the exact setup that produced it, so the key
+combines the normalized description with the workflow, max_selections, model,
+a fingerprint of the loaded step configs and the nomenclature version.
+Lookups are counted as ``result_cache.hits`` / ``result_cache.misses``,
+and the bytes held are published as the ``result_cache.bytes`` gauge.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any
+
+from hs_agent.cache.backend import CacheBackend
+from hs_agent.config.settings import settings
+from hs_agent.utils.metrics import metrics
+
+# Approximate bookkeeping cost of one entry (key tuple, dict slot, ...)
+ENTRY_OVERHEAD_BYTES = 200
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_description(description: str) -> str:
+    """Normalize a product description for cache lookups.
+
+    Unicode compatibility forms, case and runs of whitespace do not change
+    the classification, so "Men's  COTTON trousers " and "men's cotton
+    trousers" share an entry.
+
+    Args:
+        description: Product description as received
+
+    Returns:
+        Normalized description
+    """
+    text = unicodedata.normalize("NFKC", description).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def fingerprint(value: Any) -> str:
+    """Get a stable hash of a JSON-like value (e.g. the loaded workflow configs).
+
+    Args:
+        value: Value to hash (dict keys are sorted; unknown types use str())
+
+    Returns:
+        Hex digest
+    """
+    payload = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def result_cache_key(
+    description: str,
+    *,
+    kind: str,
+    workflow: str,
+    model: str,
+    config_hash: str,
+    nomenclature_version: str | None,
+    max_selections: int | None = None,
+) -> str:
+    """Build the cache key of a classification.
+
+    Args:
+        description: Product description (normalized here)
+        kind: "single" (classify) or "multi" (classify_multi)
+        workflow: Workflow name
+        model: Model name
+        config_hash: Fingerprint of the loaded step configs
+        nomenclature_version: Nomenclature revision of the agent's data
+        max_selections: Codes selected per level (classify_multi only)
+
+    Returns:
+        Key string (a hex digest, safe for any backend)
+    """
+    return fingerprint(
+        [
+            normalize_description(description),
+            kind,
+            workflow,
+            max_selections,
+            model,
+            config_hash,
+            nomenclature_version,
+        ]
+    )
+
+
+class ResultCache(CacheBackend):
+    """Thread-safe in-memory LRU cache of serialized responses with a TTL and a size bound."""
+
+    # Prefix of the cache's metrics
+    metric_prefix = "result_cache"
+
+    def __init__(self, max_bytes: int | None = None, ttl_seconds: float | None = None):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Highest total size of the stored entries (defaults to
+                settings.result_cache_max_bytes)
+            ttl_seconds: Lifetime of an entry (defaults to settings.cache_ttl_seconds)
+        """
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # key -> (expires_at, payload), least recently used first
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def max_bytes(self) -> int:
+        """Highest total size of the stored entries."""
+        return settings.result_cache_max_bytes if self._max_bytes is None else self._max_bytes
+
+    @property
+    def ttl_seconds(self) -> float:
+        """Lifetime of an entry."""
+        return settings.cache_ttl_seconds if self._ttl_seconds is None else self._ttl_seconds
+
+    def get(self, key: str) -> bytes | None:
+        """Get a stored response.
+
+        Args:
+            key: Cache key (see result_cache_key)
+
+        Returns:
+            The serialized response, or None if absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                metrics.increment(f"{self.metric_prefix}.expirations")
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        outcome = "hits" if entry is not None else "misses"
+        metrics.increment(f"{self.metric_prefix}.{outcome}")
+        return None if entry is None else entry[1]
+
+    def set(self, key: str, payload: bytes) -> None:
+        """Store a response, evicting the least recently used ones to make room.
+
+        Args:
+            key: Cache key (see result_cache_key)
+            payload: Serialized response (not stored if larger than the whole cache)
+        """
+        max_bytes = self.max_bytes
+        if self._entry_size(key, payload) > max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, payload)
+            self._bytes += self._entry_size(key, payload)
+            while self._bytes > max_bytes:
+                self._remove(next(iter(self._entries)))
+                metrics.increment(f"{self.metric_prefix}.evictions")
+            metrics.set_gauge(f"{self.metric_prefix}.bytes", self._bytes)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            metrics.set_gauge(f"{self.metric_prefix}.bytes", 0)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the stored entries."""
+        with self._lock:
+            return self._bytes
+
+    @staticmethod
+    def _entry_size(key: str, payload: bytes) -> int:
+        return len(key) + len(payload) + ENTRY_OVERHEAD_BYTES
+
+    def _remove(self, key: str) -> None:
+        _, payload = self._entries.pop(key)
+        self._bytes -= self._entry_size(key, payload)
+
+
+# Process-wide cache used by HSAgent
+result_cache = ResultCache()
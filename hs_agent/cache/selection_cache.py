@@ -0,0 +1,71 @@
+"""Cache of per-level LLM selections.
+
+Each step of a workflow picks the best code (or 1-N codes) among the
+candidates under one parent. That decision only depends on the description,
+the candidates, the step config, the model and max_selections, so any request
+reaching the same step under the same parent reuses it: a chapter or heading
+choice is shared by requests of every workflow whose step config is the same,
+and a wide-net request skips the branches an earlier request already ran.
+
+Selections are kept in a process-wide in-memory SelectionCache and, through
+the workflows, in the shared cache backend (see backend), so a cache fill on
+one replica serves the others. Lookups are counted as
+``selection_cache.hits`` / ``selection_cache.misses``.
+"""
+
+from hs_agent.cache.result_cache import ResultCache, fingerprint, normalize_description
+from hs_agent.config.settings import settings
+
+
+def selection_cache_key(
+    description: str,
+    *,
+    level: str,
+    parent_code: str | None,
+    candidates: str,
+    config_hash: str,
+    model: str,
+    max_selections: int | None = None,
+) -> str:
+    """Build the cache key of a per-level selection.
+
+    Args:
+        description: Product description (normalized here)
+        level: Classification level value
+        parent_code: Parent code of the candidates (None at the chapter level)
+        candidates: Candidates block sent to the model (covers the codes and
+            their descriptions, so shortlists and shards get their own entries)
+        config_hash: Fingerprint of the step config
+        model: Model name
+        max_selections: Codes selected (multi-selection steps only)
+
+    Returns:
+        Key string (a hex digest, safe for any backend)
+    """
+    return fingerprint(
+        [
+            "selection",
+            normalize_description(description),
+            level,
+            parent_code,
+            candidates,
+            config_hash,
+            model,
+            max_selections,
+        ]
+    )
+
+
+class SelectionCache(ResultCache):
+    """In-memory LRU cache of serialized selections, bounded by settings.selection_cache_max_bytes."""
+
+    metric_prefix = "selection_cache"
+
+    @property
+    def max_bytes(self) -> int:
+        """Highest total size of the stored entries."""
+        return settings.selection_cache_max_bytes if self._max_bytes is None else self._max_bytes
+
+
+# Process-wide cache used by the workflows of every HSAgent
+selection_cache = SelectionCache()
@@ -0,0 +1,255 @@
+"""Persistent cache backend backed by SQLite (settings.cache_backend = "sqlite").
+
+The in-memory ResultCache is lost on every deploy and is not shared with CLI
+runs. The store keeps the same serialized responses, under the same keys (see
+result_cache_key), in a SQLite database in WAL mode, so a restarted process
+starts warm and readers never block on the writer.
+
+Writes are queued and applied in batches by a background thread, off the
+request path; a full queue drops the write rather than slowing the request.
+The writer also removes expired entries and, beyond ``max_entries``, the
+least recently read ones; it keeps a running count of the rows rather than
+counting them on every batch (recounted every RECOUNT_BATCHES batches to pick
+up writes of other processes). Reads are counted as ``result_store.hits`` /
+``result_store.misses``.
+"""
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+from hs_agent.cache.backend import CacheBackend
+from hs_agent.config.settings import settings
+from hs_agent.utils.logger import get_logger
+from hs_agent.utils.metrics import metrics
+
+logger = get_logger("hs_agent.cache.sqlite_store")
+
+# Writes applied per transaction by the writer thread
+WRITE_BATCH_SIZE = 256
+# Batches after which the writer recounts the rows
+RECOUNT_BATCHES = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at);
+CREATE INDEX IF NOT EXISTS results_expires_at ON results (expires_at);
+"""
+
+# Queue items: ("set", key, payload, expires_at, now), ("touch", key, now), _CLEAR or _STOP
+_CLEAR = ("clear",)
+_STOP = ("stop",)
+
+
+class SQLiteResultStore(CacheBackend):
+    """Thread-safe persistent store of serialized responses with a TTL and an entry bound."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        max_pending_writes: int = 10_000,
+    ):
+        """Open (or create) the store.
+
+        Args:
+            path: SQLite database file
+            max_entries: Highest number of stored entries (defaults to
+                settings.result_store_max_entries)
+            ttl_seconds: Lifetime of an entry (defaults to settings.cache_ttl_seconds)
+            max_pending_writes: Queued writes beyond which new writes are dropped
+        """
+        self.path = Path(path)
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending_writes)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+        # Rows in the table, as tracked by the writer thread
+        self._rows = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+        # Pending writes of short-lived processes (CLI runs) still reach the disk
+        atexit.register(self.close)
+
+    @property
+    def max_entries(self) -> int:
+        """Highest number of stored entries."""
+        if self._max_entries is None:
+            return settings.result_store_max_entries
+        return self._max_entries
+
+    @property
+    def ttl_seconds(self) -> float:
+        """Lifetime of an entry."""
+        return settings.cache_ttl_seconds if self._ttl_seconds is None else self._ttl_seconds
+
+    def get(self, key: str) -> bytes | None:
+        """Get a stored response.
+
+        Args:
+            key: Cache key (see result_cache_key)
+
+        Returns:
+            The serialized response, or None if absent or expired
+        """
+        now = time.time()
+        try:
+            row = (
+                self._reader()
+                .execute("SELECT payload, expires_at FROM results WHERE key = ?", (key,))
+                .fetchone()
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Result store read failed: {e}")
+            metrics.increment("result_store.errors")
+            return None
+        if row is None or row[1] <= now:
+            metrics.increment("result_store.misses")
+            return None
+
+        metrics.increment("result_store.hits")
+        self._enqueue(("touch", key, now))
+        return bytes(row[0])
+
+    def set(self, key: str, payload: bytes) -> None:
+        """Queue a response to be stored by the writer thread.
+
+        Args:
+            key: Cache key (see result_cache_key)
+            payload: Serialized response
+        """
+        now = time.time()
+        self._enqueue(("set", key, payload, now + self.ttl_seconds, now))
+
+    def flush(self) -> None:
+        """Wait until every queued write has been applied."""
+        self._queue.join()
+
+    def clear(self) -> None:
+        """Apply queued writes, then drop every entry."""
+        self._start_writer()
+        # Applied by the writer, which keeps the row count
+        self._queue.put(_CLEAR)
+        self.flush()
+
+    def close(self) -> None:
+        """Apply queued writes and stop the writer thread."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(_STOP)
+            writer.join()
+
+    def __len__(self) -> int:
+        return self._reader().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Get the calling thread's read connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _enqueue(self, item: tuple) -> None:
+        self._start_writer()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            metrics.increment("result_store.dropped_writes")
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(
+                target=self._write_loop, name="result-store-writer", daemon=True
+            )
+            self._writer.start()
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        batches = 0
+        try:
+            while True:
+                if batches % RECOUNT_BATCHES == 0:
+                    self._rows = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+                batches += 1
+                batch = [self._queue.get()]
+                while len(batch) < WRITE_BATCH_SIZE:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    self._apply(conn, batch)
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️  Result store write failed: {e}")
+                    # The batch was rolled back: recount before the next one
+                    batches = 0
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if _STOP in batch:
+                    return
+        finally:
+            conn.close()
+
+    def _apply(self, conn: sqlite3.Connection, batch: list[tuple]) -> None:
+        with conn:
+            for item in batch:
+                if item[0] == "set":
+                    inserted = conn.execute(
+                        "INSERT OR IGNORE INTO results (key, payload, expires_at, accessed_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        item[1:],
+                    ).rowcount
+                    if inserted:
+                        self._rows += 1
+                    else:
+                        conn.execute(
+                            "UPDATE results SET payload = ?, expires_at = ?, accessed_at = ? "
+                            "WHERE key = ?",
+                            (*item[2:], item[1]),
+                        )
+                elif item[0] == "clear":
+                    conn.execute("DELETE FROM results")
+                    self._rows = 0
+                elif item[0] == "touch":
+                    conn.execute(
+                        "UPDATE results SET accessed_at = ? WHERE key = ?", (item[2], item[1])
+                    )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Both deletes use an index: no full scan per batch
+        expired = conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+        self._rows -= expired.rowcount
+        excess = self._rows - self.max_entries
+        if excess > 0:
+            evicted = conn.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+            self._rows -= evicted
+            metrics.increment("result_store.evictions", evicted)
@@ -95,7 +95,7 @@ def classify(
         with console.status("[bold green]Initializing HS Agent..."):
             loader = HSDataLoader()
             loader.load_all_data()
-            agent = HSAgent(loader)
+            agent = HSAgent(loader, nomenclature_version=loader.version)
 
         console.print(f"\n[bold]Classifying:[/bold] {product_description}\n")
 
@@ -125,7 +125,7 @@ def classify_multi(
         with console.status("[bold green]Initializing HS Agent..."):
             loader = HSDataLoader()
             loader.load_all_data()
-            agent = HSAgent(loader)
+            agent = HSAgent(loader, nomenclature_version=loader.version)
 
         console.print(f"\n[bold]Multi-classifying:[/bold] {product_description}")
         console.print(f"[dim]Max selections per level: {max_selections}[/dim]\n")
@@ -143,27 +143,53 @@ def serve(
     host: str = typer.Option("0.0.0.0", "--host", "-h", help="Host to bind to"),
     port: int = typer.Option(None, "--port", "-p", help="Port to bind to"),
     reload: bool = typer.Option(False, "--reload", help="Enable auto-reload for development"),
+    workers: int = typer.Option(None, "--workers", "-w", help="Number of worker processes"),
 ):
     """
     Start the FastAPI server.
 
+    With several workers, the code table and chapter notes are built once here
+    and memory-mapped read-only by every worker (see ENABLE_SHARED_CORPUS).
+
     Example:
         hs-agent serve --port 8080 --reload
+        hs-agent serve --workers 4
     """
+    import os
+
     import uvicorn
 
     from hs_agent.config.settings import settings
 
     actual_port = port if port is not None else settings.api_port
+    actual_workers = 1 if reload else (workers or settings.api_workers)
 
     console.print("\n[bold green]Starting HS Agent API server...[/bold green]")
     console.print(f"  Host: {host}")
     console.print(f"  Port: {actual_port}")
+    console.print(f"  Workers: {actual_workers}")
     console.print(
         f"  Docs: http://{host if host != '0.0.0.0' else 'localhost'}:{actual_port}/docs\n"
     )
 
-    uvicorn.run("app:app", host=host, port=actual_port, reload=reload)
+    if actual_workers > 1 and settings.enable_shared_corpus:
+        from hs_agent.data_loader import HSDataLoader
+        from hs_agent.shared_corpus import build_shared_corpus
+
+        with console.status("[bold yellow]Building shared corpus..."):
+            loader = HSDataLoader()
+            loader.load_all_data()
+            corpus_path = build_shared_corpus(
+                loader.table,
+                settings.data_directory / "chapters_markdown",
+                loader.snapshot_dir,
+                version=loader.version,
+            )
+        # Workers are spawned processes: they read the path back through settings
+        os.environ["SHARED_CORPUS_PATH"] = str(corpus_path)
+        console.print(f"  Shared corpus: {corpus_path}")
+
+    uvicorn.run("app:app", host=host, port=actual_port, reload=reload, workers=actual_workers)
 
 
 @app.command()
@@ -180,7 +206,7 @@ def health():
             with console.status("[bold green]Checking system health..."):
                 loader = HSDataLoader()
                 loader.load_all_data()
-                agent = HSAgent(loader)
+                agent = HSAgent(loader, nomenclature_version=loader.version)
 
             table = Table(
                 title="HS Agent Health Status", show_header=True, header_style="bold magenta"
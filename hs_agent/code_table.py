@@ -0,0 +1,309 @@
+"""Compact, read-only struct-of-arrays table for the HS nomenclature.
+
+Instead of one pydantic object per HS code, the table keeps:
+
+- ``codes``: tuple of interned code strings
+- ``descriptions``: one description sequence (row-aligned with codes)
+- ``levels``: int8 array (2, 4, 6)
+- ``parent_rows``: int32 array (-1 for codes under the root)
+- ``child_start``/``child_stop``/``leaf_counts``: int32 arrays for the hierarchy
+
+Rows are ordered by level, then by parent row, then by input order, so the
+children of any code are one contiguous slice of the next level. Per-level and
+per-parent views are therefore just ``(start, stop)`` ranges exposed through a
+read-only ``Mapping`` interface, and records are materialized only on access.
+"""
+
+import sys
+from collections.abc import Iterator, Mapping, Sequence
+from itertools import islice
+from typing import NamedTuple
+
+import numpy as np
+
+# Parent value used in hs_codes_all.csv for chapters (top of the hierarchy)
+ROOT_CODE = "TOTAL"
+
+
+class HSCodeRecord(NamedTuple):
+    """Lightweight, immutable view of one HS code row."""
+
+    code: str
+    description: str
+    level: int
+    parent: str
+
+
+class CodeTableView(Mapping[str, HSCodeRecord]):
+    """Read-only ``{code: HSCodeRecord}`` view over a contiguous row range."""
+
+    __slots__ = ("_table", "_start", "_stop")
+
+    def __init__(self, table: "HSCodeTable", start: int, stop: int):
+        self._table = table
+        self._start = start
+        self._stop = stop
+
+    def __getitem__(self, code: str) -> HSCodeRecord:
+        row = self._table.row_of(code)
+        if row is None or not self._start <= row < self._stop:
+            raise KeyError(code)
+        return self._table.record(row)
+
+    def __contains__(self, code: object) -> bool:
+        row = self._table.row_of(code) if isinstance(code, str) else None
+        return row is not None and self._start <= row < self._stop
+
+    def __iter__(self) -> Iterator[str]:
+        return islice(self._table.codes, self._start, self._stop)
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __repr__(self) -> str:
+        return f"CodeTableView(rows={self._start}:{self._stop})"
+
+
+class HSCodeTable:
+    """Struct-of-arrays HS code table with an implicit hierarchical index."""
+
+    def __init__(
+        self,
+        codes: Sequence[str],
+        descriptions: Sequence[str],
+        levels: Sequence[int] | np.ndarray,
+        parents: Sequence[str],
+    ):
+        """Build the table from row-aligned columns.
+
+        Args:
+            codes: Code per row
+            descriptions: Description per row
+            levels: Level per row (number of digits)
+            parents: Parent code per row (ROOT_CODE for top-level codes)
+        """
+        codes_in = np.asarray(codes, dtype=str)
+        levels_in = np.asarray(levels, dtype=np.int8)
+        parents_in = np.asarray(parents, dtype=str)
+        descriptions_in = list(descriptions)
+
+        order_parts: list[np.ndarray] = []
+        row_of: dict[str, int] = {}
+        parent_rows_parts: list[np.ndarray] = []
+        bounds: list[tuple[int, int, int]] = []
+        self.orphans: list[str] = []
+        offset = 0
+
+        for level in np.unique(levels_in).tolist():
+            idx = np.flatnonzero(levels_in == level)
+            level_parents = parents_in[idx].tolist()
+            parent_rows = np.fromiter(
+                (row_of.get(p, -1) for p in level_parents), dtype=np.int32, count=len(idx)
+            )
+            if offset:
+                self.orphans.extend(
+                    codes_in[idx][(parent_rows == -1) & (parents_in[idx] != ROOT_CODE)].tolist()
+                )
+
+            # Stable sort by parent row keeps siblings contiguous and in input order
+            perm = np.argsort(parent_rows, kind="stable")
+            idx, parent_rows = idx[perm], parent_rows[perm]
+            row_of.update(
+                zip(codes_in[idx].tolist(), range(offset, offset + len(idx)), strict=True)
+            )
+
+            order_parts.append(idx)
+            parent_rows_parts.append(parent_rows)
+            bounds.append((level, offset, offset + len(idx)))
+            offset += len(idx)
+
+        order = np.concatenate(order_parts) if order_parts else np.empty(0, dtype=np.intp)
+        parent_rows = (
+            np.concatenate(parent_rows_parts) if parent_rows_parts else np.empty(0, np.int32)
+        )
+        levels_out = levels_in[order]
+        n = len(order)
+
+        child_start = np.zeros(n, dtype=np.int32)
+        child_stop = np.zeros(n, dtype=np.int32)
+        leaf_counts = np.ones(n, dtype=np.int32)
+
+        for (_, start, stop), (_, next_start, next_stop) in zip(bounds, bounds[1:], strict=False):
+            block = parent_rows[next_start:next_stop]
+            rows = np.arange(start, stop)
+            child_start[start:stop] = next_start + np.searchsorted(block, rows, "left")
+            child_stop[start:stop] = next_start + np.searchsorted(block, rows, "right")
+
+        # Leaf counts bottom-up: a row without children is its own single leaf
+        for _, start, stop in reversed(bounds):
+            has_children = child_stop[start:stop] > child_start[start:stop]
+            if not has_children.any():
+                continue
+            cumulative = np.concatenate(([0], np.cumsum(leaf_counts, dtype=np.int64)))
+            sums = cumulative[child_stop[start:stop]] - cumulative[child_start[start:stop]]
+            leaf_counts[start:stop] = np.where(has_children, sums, 1)
+
+        self._init_arrays(
+            tuple(sys.intern(c) for c in codes_in[order].tolist()),
+            tuple(descriptions_in[i] for i in order.tolist()),
+            levels_out,
+            parent_rows,
+            child_start,
+            child_stop,
+            leaf_counts,
+            row_of,
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        codes: Sequence[str],
+        descriptions: Sequence[str],
+        levels: np.ndarray,
+        parent_rows: np.ndarray,
+        child_start: np.ndarray,
+        child_stop: np.ndarray,
+        leaf_counts: np.ndarray,
+    ) -> "HSCodeTable":
+        """Wrap arrays already in table order (see to_arrays) without rebuilding.
+
+        The arrays are used as-is, so memory-mapped inputs stay shared with
+        every other process mapping the same file.
+        """
+        table = cls.__new__(cls)
+        table.orphans = []
+        codes = tuple(sys.intern(c) for c in codes)
+        table._init_arrays(
+            codes,
+            descriptions,
+            levels,
+            parent_rows,
+            child_start,
+            child_stop,
+            leaf_counts,
+            dict(zip(codes, range(len(codes)), strict=True)),
+        )
+        return table
+
+    def _init_arrays(
+        self,
+        codes: tuple[str, ...],
+        descriptions: Sequence[str],
+        levels: np.ndarray,
+        parent_rows: np.ndarray,
+        child_start: np.ndarray,
+        child_stop: np.ndarray,
+        leaf_counts: np.ndarray,
+        row_of: dict[str, int],
+    ) -> None:
+        """Assign the table arrays and derive the per-level bounds."""
+        self.codes = codes
+        self.descriptions = descriptions
+        self.levels = levels
+        self.parent_rows = parent_rows
+        self.child_start = child_start
+        self.child_stop = child_stop
+        self.leaf_counts = leaf_counts
+        self._row_of = row_of
+
+        for array in (levels, parent_rows, child_start, child_stop, leaf_counts):
+            if array.flags.writeable:
+                array.flags.writeable = False
+
+        # Rows are sorted by level, so each level is one contiguous block
+        level_values, starts = np.unique(levels, return_index=True)
+        stops = [*starts[1:].tolist(), len(codes)] if len(starts) else []
+        self._level_bounds = {
+            int(level): (int(start), stop)
+            for level, start, stop in zip(level_values, starts, stops, strict=True)
+        }
+        self._depths = {int(level): depth for depth, level in enumerate(level_values, start=1)}
+
+        # Chapters (first level) hang under the root
+        self._root_stop = stops[0] if stops else 0
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Export the table as plain arrays (codes as ASCII bytes) for from_arrays."""
+        return {
+            "codes": np.asarray(self.codes, dtype=str).astype(np.bytes_),
+            "levels": np.asarray(self.levels),
+            "parent_rows": np.asarray(self.parent_rows),
+            "child_start": np.asarray(self.child_start),
+            "child_stop": np.asarray(self.child_stop),
+            "leaf_counts": np.asarray(self.leaf_counts),
+        }
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    # ========== Row Access ==========
+
+    def row_of(self, code: str) -> int | None:
+        """Get the row index of a code (None if unknown)."""
+        return self._row_of.get(code)
+
+    def record(self, row: int) -> HSCodeRecord:
+        """Materialize the record for a row."""
+        parent_row = self.parent_rows[row]
+        return HSCodeRecord(
+            self.codes[row],
+            self.descriptions[row],
+            int(self.levels[row]),
+            self.codes[parent_row] if parent_row >= 0 else ROOT_CODE,
+        )
+
+    # ========== Views ==========
+
+    def level_view(self, level: int) -> CodeTableView:
+        """Get a view of all codes at a level (empty if the level is absent)."""
+        start, stop = self._level_bounds.get(level, (0, 0))
+        return CodeTableView(self, start, stop)
+
+    def children(self, code: str) -> CodeTableView:
+        """Get a view of the direct children of a code (ROOT_CODE for chapters)."""
+        if code == ROOT_CODE:
+            return CodeTableView(self, 0, self._root_stop)
+        row = self._row_of.get(code)
+        if row is None:
+            return CodeTableView(self, 0, 0)
+        return CodeTableView(self, int(self.child_start[row]), int(self.child_stop[row]))
+
+    # ========== Hierarchy ==========
+
+    def parent_of(self, code: str) -> str | None:
+        """Get the parent code (ROOT_CODE for top-level codes, None if unknown)."""
+        row = self._row_of.get(code)
+        if row is None:
+            return None
+        parent_row = self.parent_rows[row]
+        return self.codes[parent_row] if parent_row >= 0 else ROOT_CODE
+
+    def child_count(self, code: str) -> int:
+        """Get the number of direct children of a code."""
+        return len(self.children(code))
+
+    def sibling_count(self, code: str) -> int:
+        """Get the number of siblings of a code (excluding the code itself)."""
+        parent = self.parent_of(code)
+        if parent is None:
+            return 0
+        return self.child_count(parent) - 1
+
+    def leaf_count(self, code: str) -> int:
+        """Get the number of leaf codes under a code."""
+        if code == ROOT_CODE:
+            return int(self.leaf_counts[: self._root_stop].sum())
+        row = self._row_of.get(code)
+        return 0 if row is None else int(self.leaf_counts[row])
+
+    def is_leaf(self, code: str) -> bool:
+        """Check whether a known code has no children."""
+        row = self._row_of.get(code)
+        return row is not None and self.child_stop[row] == self.child_start[row]
+
+    def depth(self, code: str) -> int | None:
+        """Get the depth of a code (0=root, 1=chapter, 2=heading, 3=subheading)."""
+        if code == ROOT_CODE:
+            return 0
+        row = self._row_of.get(code)
+        return None if row is None else self._depths[int(self.levels[row])]
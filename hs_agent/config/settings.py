@@ -18,6 +18,14 @@ class AgentType(str, Enum):
     LANGGRAPH = "langgraph"
 
 
+class CacheBackendType(str, Enum):
+    """Available shared cache backends."""
+
+    MEMORY = "memory"
+    SQLITE = "sqlite"
+    REDIS = "redis"
+
+
 class LogLevel(str, Enum):
     """Available log levels."""
 
@@ -48,7 +56,10 @@ class HSAgentSettings(BaseSettings):
     )
 
     fallback_model_name: str = Field(
-        "gemini-2.5-flash", description="Fallback model if default fails", env="FALLBACK_MODEL_NAME"
+        "gemini-2.5-flash",
+        description="Model called while the circuit of a step's model is open "
+        "(unused for steps that already call it)",
+        env="FALLBACK_MODEL_NAME",
     )
 
     # === Agent Configuration ===
@@ -62,6 +73,29 @@ class HSAgentSettings(BaseSettings):
         10, description="Default number of candidates to consider", env="DEFAULT_TOP_K", ge=1, le=50
     )
 
+    enable_candidate_prefilter: bool = Field(
+        False,
+        description="Send only the lexically best-matching chapters/headings (top-k plus a "
+        "margin) to the LLM instead of every candidate",
+        env="ENABLE_CANDIDATE_PREFILTER",
+    )
+
+    candidate_prefilter_margin: int = Field(
+        5,
+        description="Extra candidates kept on top of default_top_k by the pre-filter",
+        env="CANDIDATE_PREFILTER_MARGIN",
+        ge=0,
+    )
+
+    candidate_prefilter_min_coverage: float = Field(
+        0.75,
+        description="Minimum share of product description terms known to the pre-filter index; "
+        "below it the full candidate list is sent",
+        env="CANDIDATE_PREFILTER_MIN_COVERAGE",
+        ge=0.0,
+        le=1.0,
+    )
+
     root_directory: Path = Field(
         default_factory=lambda: Path(__file__).parent.parent.parent,
         description="Root directory of the project",
@@ -97,6 +131,39 @@ class HSAgentSettings(BaseSettings):
         env="TAX_CODES_FILE",
     )
 
+    national_codes_file: str = Field(
+        "htsdata_raw.csv",
+        description="US HTS schedule CSV file name (8/10-digit national levels)",
+        env="NATIONAL_CODES_FILE",
+    )
+
+    enable_national_levels: bool = Field(
+        False,
+        description="Load 8/10-digit HTS national levels and classify below the 6-digit "
+        "subheading when it has national subdivisions",
+        env="ENABLE_NATIONAL_LEVELS",
+    )
+
+    enable_data_snapshot: bool = Field(
+        True,
+        description="Memory-map a binary snapshot of the HS codes table instead of re-parsing the CSV",
+        env="ENABLE_DATA_SNAPSHOT",
+    )
+
+    snapshot_directory: Path | None = Field(
+        None,
+        description="Directory for binary data snapshots (defaults to <data_directory>/.snapshots)",
+        env="SNAPSHOT_DIRECTORY",
+    )
+
+    nomenclature_reload_interval_seconds: int = Field(
+        0,
+        description="Seconds between checks of the HS codes file for a new revision to "
+        "hot-swap into the running API (0 disables)",
+        env="NOMENCLATURE_RELOAD_INTERVAL_SECONDS",
+        ge=0,
+    )
+
     # === API Configuration ===
     api_host: str = Field("0.0.0.0", description="API server host", env="API_HOST")
 
@@ -104,6 +171,20 @@ class HSAgentSettings(BaseSettings):
 
     api_workers: int = Field(1, description="Number of API workers", env="API_WORKERS", ge=1)
 
+    enable_shared_corpus: bool = Field(
+        True,
+        description="With several API workers, build the code table and chapter notes once "
+        "in the parent process and memory-map them read-only in every worker",
+        env="ENABLE_SHARED_CORPUS",
+    )
+
+    shared_corpus_path: Path | None = Field(
+        None,
+        description="Shared corpus directory to attach instead of loading data "
+        "(set by `hs-agent serve` for its workers)",
+        env="SHARED_CORPUS_PATH",
+    )
+
     # === CLI API Client Configuration ===
     api_base_url: str = Field(
         "http://localhost:9999",
@@ -121,20 +202,144 @@ class HSAgentSettings(BaseSettings):
 
     # === Performance Configuration ===
     enable_caching: bool = Field(
-        True, description="Enable data caching for performance", env="ENABLE_CACHING"
+        True,
+        description="Cache classification results (keyed by normalized description, workflow, "
+        "max_selections, model, configs and nomenclature version)",
+        env="ENABLE_CACHING",
     )
 
     cache_ttl_seconds: int = Field(
         3600, description="Cache TTL in seconds", env="CACHE_TTL_SECONDS", ge=60
     )
 
+    result_cache_max_bytes: int = Field(
+        64 * 1024 * 1024,
+        description="Highest total size of the cached classification results in bytes",
+        env="RESULT_CACHE_MAX_BYTES",
+        ge=0,
+    )
+
+    enable_near_duplicate_cache: bool = Field(
+        False,
+        description="Reuse the cached result of a previously classified description that is "
+        "a near duplicate (same product words once SKU numbers, sizes, attribute colors and "
+        "punctuation are stripped; marketing filler may differ up to near_duplicate_threshold)",
+        env="ENABLE_NEAR_DUPLICATE_CACHE",
+    )
+
+    near_duplicate_threshold: float = Field(
+        0.8,
+        description="Lowest Jaccard similarity of the canonical description tokens for a "
+        "near-duplicate match (the product words must match exactly; this bounds how much "
+        "marketing filler may differ)",
+        env="NEAR_DUPLICATE_THRESHOLD",
+        gt=0.0,
+        le=1.0,
+    )
+
+    near_duplicate_max_entries: int = Field(
+        100_000,
+        description="Highest number of classified descriptions kept in the near-duplicate "
+        "index (least recently matched are dropped)",
+        env="NEAR_DUPLICATE_MAX_ENTRIES",
+        ge=1,
+    )
+
+    enable_selection_cache: bool = Field(
+        True,
+        description="Cache per-level LLM selections (keyed by normalized description, level, "
+        "parent code, candidates, step config, model and max_selections), so requests of "
+        "any workflow reuse the steps already run with the same config",
+        env="ENABLE_SELECTION_CACHE",
+    )
+
+    selection_cache_max_bytes: int = Field(
+        16 * 1024 * 1024,
+        description="Highest total size of the cached per-level selections in bytes",
+        env="SELECTION_CACHE_MAX_BYTES",
+        ge=0,
+    )
+
+    cache_backend: CacheBackendType = Field(
+        CacheBackendType.MEMORY,
+        description="Shared cache behind each process's in-memory cache: memory (none), "
+        "sqlite (persistent file in WAL mode, shared by restarts and CLI runs) or "
+        "redis (shared by every replica)",
+        env="CACHE_BACKEND",
+    )
+
+    result_store_path: Path | None = Field(
+        None,
+        description="SQLite file of the sqlite cache backend (defaults to "
+        "<data_directory>/.cache/results.sqlite3)",
+        env="RESULT_STORE_PATH",
+    )
+
+    result_store_max_entries: int = Field(
+        100_000,
+        description="Highest number of entries kept by the sqlite cache backend "
+        "(least recently read are evicted)",
+        env="RESULT_STORE_MAX_ENTRIES",
+        ge=1,
+    )
+
+    redis_url: str = Field(
+        "redis://localhost:6379/0",
+        description="Server of the redis cache backend (needs the redis package)",
+        env="REDIS_URL",
+    )
+
+    redis_key_prefix: str = Field(
+        "hs-agent:",
+        description="Prefix of every key the redis cache backend writes",
+        env="REDIS_KEY_PREFIX",
+    )
+
+    model_cache_size: int = Field(
+        512,
+        description="Maximum number of configured model runnables (model params + output "
+        "schema + candidate codes) reused across LLM calls (0 disables the cache)",
+        env="MODEL_CACHE_SIZE",
+        ge=0,
+    )
+
     max_concurrent_requests: int = Field(
         10,
-        description="Maximum concurrent classification requests",
+        description="Maximum in-flight LLM calls per model across the process "
+        "(queued locally beyond that)",
         env="MAX_CONCURRENT_REQUESTS",
         ge=1,
     )
 
+    model_concurrency_limits: dict[str, int] = Field(
+        default_factory=dict,
+        description='Per-model overrides of max_concurrent_requests, e.g. {"gemini-2.5-pro": 4}',
+        env="MODEL_CONCURRENCY_LIMITS",
+    )
+
+    enable_adaptive_concurrency: bool = Field(
+        False,
+        description="Adapt each model's in-flight LLM call limit (AIMD): start at "
+        "max_concurrent_requests, grow while calls are healthy, cut on throttling or "
+        "persistent latency spikes",
+        env="ENABLE_ADAPTIVE_CONCURRENCY",
+    )
+
+    adaptive_concurrency_max_limit: int = Field(
+        50,
+        description="Highest in-flight LLM call limit the adaptive limiter can grow to",
+        env="ADAPTIVE_CONCURRENCY_MAX_LIMIT",
+        ge=1,
+    )
+
+    max_branch_concurrency: int = Field(
+        4,
+        description="Maximum branch selections (per selected chapter/heading) run concurrently "
+        "within one multi-path classification request (1 runs them sequentially)",
+        env="MAX_BRANCH_CONCURRENCY",
+        ge=1,
+    )
+
     max_output_paths: int = Field(
         20,
         description="Maximum number of classification paths to return in multi-choice mode",
@@ -144,7 +349,76 @@ class HSAgentSettings(BaseSettings):
     )
 
     request_timeout_seconds: int = Field(
-        300, description="Request timeout in seconds", env="REQUEST_TIMEOUT_SECONDS", ge=30
+        300,
+        description="Time budget of one classification in seconds; LLM retries never wait past it",
+        env="REQUEST_TIMEOUT_SECONDS",
+        ge=30,
+    )
+
+    enable_retry_jitter: bool = Field(
+        True,
+        description="Randomize LLM retry backoff (full jitter) so concurrent retries spread out",
+        env="ENABLE_RETRY_JITTER",
+    )
+
+    retry_budget_ratio: float = Field(
+        0.1,
+        description="Process-wide LLM retry budget: retries allowed per successful call "
+        "(0.1 = retries up to 10% of successful calls)",
+        env="RETRY_BUDGET_RATIO",
+        ge=0.0,
+    )
+
+    retry_budget_max_tokens: float = Field(
+        10.0,
+        description="Retries the process-wide budget can bank (burst allowed after a quiet period)",
+        env="RETRY_BUDGET_MAX_TOKENS",
+        ge=0.0,
+    )
+
+    enable_hedged_requests: bool = Field(
+        False,
+        description="Duplicate an LLM call that is slower than its config step's running p95 "
+        "latency and use whichever copy succeeds first",
+        env="ENABLE_HEDGED_REQUESTS",
+    )
+
+    hedge_max_extra_ratio: float = Field(
+        0.05,
+        description="Highest share of LLM calls that may be hedged (bounds the extra cost)",
+        env="HEDGE_MAX_EXTRA_RATIO",
+        ge=0.0,
+        le=1.0,
+    )
+
+    hedge_max_burst: float = Field(
+        5.0,
+        description="Most hedges that can be saved up and fired in a row (bounds the extra "
+        "load when every call slows down at once)",
+        env="HEDGE_MAX_BURST",
+        ge=1.0,
+    )
+
+    enable_request_coalescing: bool = Field(
+        True,
+        description="Let concurrent identical classifications (same result cache key) and "
+        "identical LLM calls share one in-flight run instead of each starting their own",
+        env="ENABLE_REQUEST_COALESCING",
+    )
+
+    circuit_breaker_failure_threshold: int = Field(
+        5,
+        description="Consecutive failed LLM calls that open a model's circuit "
+        "(calls then go to fallback_model_name)",
+        env="CIRCUIT_BREAKER_FAILURE_THRESHOLD",
+        ge=1,
+    )
+
+    circuit_breaker_recovery_seconds: float = Field(
+        30.0,
+        description="Time an open circuit waits before probing its model in the background",
+        env="CIRCUIT_BREAKER_RECOVERY_SECONDS",
+        gt=0,
     )
 
     # === Logging Configuration ===
@@ -1,58 +1,457 @@
 """Simple HS codes data loader."""
 
+from collections.abc import Callable, Iterator, Mapping
+from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
 import pandas as pd
 
+from hs_agent import data_snapshot
+from hs_agent.code_table import ROOT_CODE, HSCodeRecord, HSCodeTable
 from hs_agent.config.settings import settings
-from hs_agent.models import HSCode
+from hs_agent.hts_parser import STATISTICAL_LEVEL, TARIFF_LINE_LEVEL, read_hts_columns
+from hs_agent.models import ClassificationLevel
+from hs_agent.retrieval import LexicalIndex
 from hs_agent.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Levels stored by the loader (the level-5 TOTAL row is skipped)
+CODE_LEVELS = (2, 4, 6)
+
+
+def nomenclature_version(hs_codes_path: Path, checksum: str | None = None) -> str:
+    """Get the version label of an HS codes file ("<stem>@<sha256 prefix>").
+
+    Args:
+        hs_codes_path: HS codes CSV
+        checksum: SHA-256 of the file if already known
+
+    Returns:
+        Version label that changes whenever the file content changes
+    """
+    checksum = checksum or data_snapshot.file_checksum(hs_codes_path)
+    return f"{hs_codes_path.stem}@{checksum[:12]}"
+
+
+class CandidateSet(Mapping[str, HSCodeRecord]):
+    """Immutable candidate codes under one parent, with the prompt block precomputed.
+
+    Behaves as a read-only ``{code: HSCodeRecord}`` mapping, so it can be passed
+    anywhere a codes dict is expected, and additionally carries:
+
+    - ``codes``: candidate code tuple used for the LLM enum constraint
+    - ``prompt_block``: the "code: description" lines sent in prompts
+    """
+
+    __slots__ = ("level", "parent_code", "codes", "prompt_block", "_candidates")
+
+    def __init__(
+        self,
+        level: ClassificationLevel,
+        parent_code: str,
+        candidates: Mapping[str, HSCodeRecord],
+    ):
+        """Initialize the candidate set.
+
+        Args:
+            level: Classification level of the candidates
+            parent_code: Code the candidates hang under (ROOT_CODE for chapters)
+            candidates: Mapping of code -> record (wrapped read-only, not copied)
+        """
+        self.level = level
+        self.parent_code = parent_code
+        self._candidates = MappingProxyType(candidates)
+        self.codes: tuple[str, ...] = tuple(candidates)
+        self.prompt_block = "\n".join(
+            f"{code}: {hs.description}" for code, hs in candidates.items()
+        )
+
+    def __getitem__(self, code: str) -> HSCodeRecord:
+        return self._candidates[code]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._candidates
+
+    def __repr__(self) -> str:
+        return f"CandidateSet(level={self.level.name}, parent_code={self.parent_code!r}, size={len(self)})"
+
 
 class HSDataLoader:
-    """Load and store HS codes data."""
+    """Load and store HS codes data.
+
+    The nomenclature is held in a compact, read-only HSCodeTable (interned code
+    strings, one description array, integer level/parent arrays). The per-level
+    ``codes_*digit`` attributes and ``children_of`` return dict-like views over
+    that table, so workflows can look up the candidates under a code without
+    scanning the full table or keeping one object per code alive.
+    """
 
-    def __init__(self):
-        self.data_dir = settings.data_directory
-        self.codes_2digit: dict[str, HSCode] = {}
-        self.codes_4digit: dict[str, HSCode] = {}
-        self.codes_6digit: dict[str, HSCode] = {}
+    def __init__(self, data_dir: Path | None = None, snapshot_dir: Path | None = None):
+        """Initialize the data loader.
+
+        Args:
+            data_dir: Directory containing the HS codes CSV (defaults to settings.data_directory)
+            snapshot_dir: Directory for binary snapshots (defaults to
+                settings.snapshot_directory, then <data_dir>/.snapshots)
+        """
+        self.data_dir = data_dir or settings.data_directory
+        self.snapshot_dir = (
+            snapshot_dir or settings.snapshot_directory or self.data_dir / ".snapshots"
+        )
+        self.codes_2digit: Mapping[str, HSCodeRecord] = {}
+        self.codes_4digit: Mapping[str, HSCodeRecord] = {}
+        self.codes_6digit: Mapping[str, HSCodeRecord] = {}
+        # National (HTS) levels, empty unless loaded with national levels
+        self.codes_8digit: Mapping[str, HSCodeRecord] = {}
+        self.codes_10digit: Mapping[str, HSCodeRecord] = {}
 
-    def load_all_data(self) -> None:
-        """Load HS codes from CSV file."""
+        # Code table backing the views and hierarchical index (set by set_table)
+        self.table = HSCodeTable([], [], [], [])
+        # Nomenclature revision of the table (see nomenclature_version)
+        self.version: str | None = None
+        self._candidate_sets: dict[tuple[ClassificationLevel, str], CandidateSet] = {}
+        self._lexical_indexes: dict[int, LexicalIndex] = {}
+
+    def load_all_data(
+        self, use_snapshot: bool | None = None, national_levels: bool | None = None
+    ) -> None:
+        """Load HS codes into the code table.
+
+        The CSV is parsed column-wise (no per-row loop). When snapshots are
+        enabled, a binary snapshot keyed by the CSV checksum is memory-mapped
+        instead, and written after the first parse.
+
+        With national levels, the 8/10-digit HTS lines are parsed from
+        settings.national_codes_file (see hs_agent.hts_parser) and merged into
+        the same table, below their 6-digit subheadings.
+
+        Args:
+            use_snapshot: Override settings.enable_data_snapshot
+            national_levels: Override settings.enable_national_levels
+        """
         hs_codes_path = self.data_dir / settings.hs_codes_file
 
         if not hs_codes_path.exists():
             raise FileNotFoundError(f"HS codes file not found: {hs_codes_path}")
 
-        df = pd.read_csv(hs_codes_path)
-        failed_count = 0
-
-        for _, row in df.iterrows():
-            try:
-                code = str(row["hscode"]).strip()
-                description = str(row["description"])
-                level = int(row["level"])
+        if use_snapshot is None:
+            use_snapshot = settings.enable_data_snapshot
+        if national_levels is None:
+            national_levels = settings.enable_national_levels
 
-                hs_code = HSCode(code=code, description=description)
+        codes, levels, parents, descriptions, checksum = self._load_columns(
+            hs_codes_path, self._read_csv_columns, use_snapshot
+        )
+        versions = [nomenclature_version(hs_codes_path, checksum)]
 
-                if level == 2:
-                    self.codes_2digit[code] = hs_code
-                elif level == 4:
-                    self.codes_4digit[code] = hs_code
-                elif level == 6:
-                    self.codes_6digit[code] = hs_code
+        if national_levels:
+            national_path = self.data_dir / settings.national_codes_file
+            if not national_path.exists():
+                raise FileNotFoundError(f"National codes file not found: {national_path}")
 
-            except Exception as e:
-                logger.warning(f"Failed to load HS code row: {e}")
-                failed_count += 1
-                continue
+            n_codes, n_levels, n_parents, n_descriptions, n_checksum = self._load_columns(
+                national_path, read_hts_columns, use_snapshot
+            )
+            keep = self._national_rows_under(codes[levels == 6], n_codes, n_levels, n_parents)
+            codes = np.concatenate([codes, n_codes[keep]])
+            levels = np.concatenate([levels, n_levels[keep]])
+            parents = np.concatenate([parents, n_parents[keep]])
+            descriptions = [
+                *descriptions,
+                *(d for d, k in zip(n_descriptions, keep, strict=True) if k),
+            ]
+            versions.append(nomenclature_version(national_path, n_checksum))
 
-        if failed_count > 0:
-            logger.warning(f"Skipped {failed_count} invalid rows during HS code loading")
+        self.set_table(
+            HSCodeTable(codes, descriptions, levels, parents),
+            version="+".join(versions),
+        )
 
         logger.info(
             f"Loaded {len(self.codes_2digit)} chapters, "
             f"{len(self.codes_4digit)} headings, "
             f"{len(self.codes_6digit)} subheadings"
+            + (
+                f", {len(self.codes_8digit)} tariff lines, "
+                f"{len(self.codes_10digit)} statistical suffixes"
+                if national_levels
+                else ""
+            )
+        )
+
+    def source_version(self, national_levels: bool | None = None) -> str:
+        """Get the version of the source files load_all_data would read, without loading them.
+
+        Args:
+            national_levels: Override settings.enable_national_levels
+
+        Returns:
+            Version label matching HSDataLoader.version after a load
+        """
+        if national_levels is None:
+            national_levels = settings.enable_national_levels
+
+        versions = [nomenclature_version(self.data_dir / settings.hs_codes_file)]
+        if national_levels:
+            versions.append(nomenclature_version(self.data_dir / settings.national_codes_file))
+        return "+".join(versions)
+
+    def _load_columns(
+        self,
+        source_path: Path,
+        read_columns: Callable[[Path], tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]],
+        use_snapshot: bool,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[str], str]:
+        """Get the columns of a source file from its snapshot, or parse them and write one.
+
+        Args:
+            source_path: Source CSV
+            read_columns: Parser returning (codes, levels, parents, descriptions) arrays
+            use_snapshot: Whether to read/write a binary snapshot
+
+        Returns:
+            Tuple of (codes, levels, parents, descriptions, source checksum)
+        """
+        checksum = data_snapshot.file_checksum(source_path)
+        arrays = (
+            data_snapshot.read_snapshot(self.snapshot_dir, source_path, checksum)
+            if use_snapshot
+            else None
+        )
+
+        if arrays is not None:
+            codes = arrays["codes"].astype(str)
+            levels = np.asarray(arrays["levels"])
+            parents = arrays["parents"].astype(str)
+            descriptions = data_snapshot.unpack_strings(arrays["desc_blob"], arrays["desc_offsets"])
+            logger.debug(f"Loaded {source_path.name} from snapshot in {self.snapshot_dir}")
+            return codes, levels, parents, descriptions, checksum
+
+        codes, levels, parents, descriptions = read_columns(source_path)
+        descriptions = descriptions.tolist()
+        if use_snapshot:
+            try:
+                data_snapshot.write_snapshot(
+                    self.snapshot_dir,
+                    source_path,
+                    checksum,
+                    codes,
+                    levels,
+                    parents,
+                    descriptions,
+                )
+            except OSError as e:
+                logger.warning(f"⚠️  Could not write data snapshot: {e}")
+        return codes, levels, parents, descriptions, checksum
+
+    @staticmethod
+    def _national_rows_under(
+        subheadings: np.ndarray, codes: np.ndarray, levels: np.ndarray, parents: np.ndarray
+    ) -> np.ndarray:
+        """Mask the national rows that hang under a known 6-digit subheading.
+
+        Drops HTS lines without an HS parent, such as the chapter 98/99 special
+        provisions, so they do not show up as orphans in the table.
+        """
+        keep = (levels == TARIFF_LINE_LEVEL) & np.isin(parents, subheadings)
+        keep |= (levels == STATISTICAL_LEVEL) & np.isin(parents, codes[keep])
+        return keep
+
+    @staticmethod
+    def _read_csv_columns(
+        hs_codes_path: Path,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Parse the HS codes CSV into column arrays, keeping only levels 2/4/6.
+
+        Returns:
+            Tuple of (codes, levels, parents, descriptions) arrays of equal length
+        """
+        df = pd.read_csv(hs_codes_path, dtype=str, keep_default_na=False)
+
+        codes = df["hscode"].str.strip()
+        levels = pd.to_numeric(df["level"], errors="coerce")
+        parents = df["parent"].str.strip() if "parent" in df.columns else codes.str[:-2]
+
+        valid = levels.notna() & (codes != "")
+        failed_count = int((~valid).sum())
+        if failed_count > 0:
+            logger.warning(f"Skipped {failed_count} invalid rows during HS code loading")
+
+        keep = valid & levels.isin(CODE_LEVELS)
+        return (
+            codes[keep].to_numpy(dtype=str),
+            levels[keep].to_numpy(dtype=np.int8),
+            parents[keep].to_numpy(dtype=str),
+            df["description"][keep].to_numpy(dtype=object),
+        )
+
+    # ========== Hierarchical Index ==========
+
+    def build_index(self, parents: dict[str, str] | None = None) -> None:
+        """Rebuild the code table from the current per-level mappings.
+
+        load_all_data builds the table directly; this is for loaders whose
+        ``codes_*digit`` attributes were populated by hand (e.g. in tests).
+
+        Args:
+            parents: Mapping of code -> parent code (e.g. the CSV ``parent`` column).
+                Codes without an entry fall back to their 2-digit-shorter prefix,
+                chapters hang under ROOT_CODE.
+        """
+        parents = parents or {}
+        codes: list[str] = []
+        descriptions: list[str] = []
+        levels: list[int] = []
+        parent_codes: list[str] = []
+
+        for level, level_codes in zip(
+            CODE_LEVELS, (self.codes_2digit, self.codes_4digit, self.codes_6digit), strict=True
+        ):
+            for code, hs_code in level_codes.items():
+                codes.append(code)
+                descriptions.append(hs_code.description)
+                levels.append(level)
+                parent_codes.append(
+                    parents.get(code) or (code[:-2] if level > CODE_LEVELS[0] else ROOT_CODE)
+                )
+
+        self.set_table(HSCodeTable(codes, descriptions, levels, parent_codes))
+
+    def set_table(self, table: HSCodeTable, version: str | None = None) -> None:
+        """Install a code table and point the per-level views at it.
+
+        Args:
+            table: Table built by load_all_data/build_index, or attached from
+                a shared corpus (see hs_agent.shared_corpus)
+            version: Nomenclature revision of the table, if known
+        """
+        self.table = table
+        self.version = version
+        self.codes_2digit = table.level_view(2)
+        self.codes_4digit = table.level_view(4)
+        self.codes_6digit = table.level_view(6)
+        self.codes_8digit = table.level_view(TARIFF_LINE_LEVEL)
+        self.codes_10digit = table.level_view(STATISTICAL_LEVEL)
+        self._candidate_sets = {}
+        self._lexical_indexes = {}
+
+        if table.orphans:
+            logger.warning(
+                f"{len(table.orphans)} HS codes reference unknown parents: {table.orphans[:5]}"
+            )
+
+    def children_of(self, code: str) -> Mapping[str, HSCodeRecord]:
+        """Get the direct children of a code.
+
+        Args:
+            code: Parent code (ROOT_CODE for all chapters)
+
+        Returns:
+            Read-only mapping of child code -> HSCodeRecord in file order (empty if none)
+        """
+        return self.table.children(code)
+
+    def parent_of(self, code: str) -> str | None:
+        """Get the parent code of a code (ROOT_CODE for chapters, None if unknown)."""
+        return self.table.parent_of(code)
+
+    def child_count(self, code: str) -> int:
+        """Get the number of direct children of a code."""
+        return self.table.child_count(code)
+
+    def sibling_count(self, code: str) -> int:
+        """Get the number of siblings of a code (excluding the code itself)."""
+        return self.table.sibling_count(code)
+
+    def leaf_count(self, code: str) -> int:
+        """Get the number of leaf codes (no further subdivisions) under a code."""
+        return self.table.leaf_count(code)
+
+    def is_leaf(self, code: str) -> bool:
+        """Check whether a known code has no children."""
+        return self.table.is_leaf(code)
+
+    def depth(self, code: str) -> int | None:
+        """Get the depth of a code (1=chapter, 2=heading, 3=subheading, 4/5=national, None if unknown)."""
+        return self.table.depth(code)
+
+    def candidate_set(self, level: ClassificationLevel, parent_code: str) -> CandidateSet:
+        """Get the cached candidate set for a level under a parent code.
+
+        Candidate sets are built on first use and kept for the lifetime of the
+        loader; there is at most one per parent code in the nomenclature.
+
+        Args:
+            level: Level of the candidates
+            parent_code: Parent code (ROOT_CODE for chapters)
+
+        Returns:
+            Immutable CandidateSet (empty if the parent has no children)
+        """
+        key = (level, parent_code)
+        candidate_set = self._candidate_sets.get(key)
+        if candidate_set is None:
+            candidate_set = CandidateSet(level, parent_code, self.children_of(parent_code))
+            self._candidate_sets[key] = candidate_set
+        return candidate_set
+
+    def lexical_index(self, level: int) -> LexicalIndex:
+        """Get the BM25 index over the codes of a level (built on first use).
+
+        Args:
+            level: Code level (2, 4, ...)
+
+        Returns:
+            LexicalIndex for the current table
+        """
+        index = self._lexical_indexes.get(level)
+        if index is None:
+            index = LexicalIndex(self.table, level)
+            self._lexical_indexes[level] = index
+        return index
+
+    def shortlist(self, candidates: CandidateSet, product_description: str) -> CandidateSet:
+        """Narrow a candidate set to the lexically best matches for a product.
+
+        Keeps settings.default_top_k plus settings.candidate_prefilter_margin
+        candidates (in their original order). The full set is returned when the
+        pre-filter is disabled, the set is already small enough, or retrieval
+        is not confident (see LexicalIndex.shortlist).
+
+        Args:
+            candidates: Candidate set from candidate_set
+            product_description: Product being classified
+
+        Returns:
+            The shortlisted CandidateSet, or ``candidates`` itself
+        """
+        if not settings.enable_candidate_prefilter:
+            return candidates
+        keep = settings.default_top_k + settings.candidate_prefilter_margin
+        if len(candidates) <= keep:
+            return candidates
+
+        codes = self.lexical_index(int(candidates.level.value)).shortlist(
+            product_description,
+            candidates.codes,
+            keep,
+            settings.candidate_prefilter_min_coverage,
+        )
+        if codes is None:
+            logger.debug(
+                f"Pre-filter not confident for {candidates!r}, sending all {len(candidates)}"
+            )
+            return candidates
+        return CandidateSet(
+            candidates.level,
+            candidates.parent_code,
+            {code: candidates[code] for code in codes},
         )
@@ -0,0 +1,259 @@
+"""Versioned binary snapshots of the HS codes table.
+
+Parsing ``hs_codes_all.csv`` on every cold start (CLI runs, each uvicorn worker,
+every Cloud Run instance) is wasted work. The first load writes the parsed
+columns as plain ``.npy`` arrays next to a ``meta.json`` holding the format
+version and the SHA-256 of the source CSV. Later boots memory-map those arrays
+instead of re-parsing, and a changed CSV or format version simply produces a
+new snapshot directory.
+
+Snapshot layout (one directory per source checksum)::
+
+    <snapshot_dir>/<csv stem>-v<version>-<checksum[:16]>/
+        codes.npy          fixed-width ASCII bytes (S)
+        levels.npy         int8
+        parents.npy        fixed-width ASCII bytes (S)
+        desc_blob.npy      uint8, UTF-8 descriptions joined by STRING_SEPARATOR
+        desc_offsets.npy   int64, start offset of each description (n + 1 entries)
+        meta.json          written last; marks the snapshot as complete
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from hs_agent.utils.logger import get_logger
+
+logger = get_logger("hs_agent.data_snapshot")
+
+# Bump whenever the array layout changes so old snapshots are ignored
+SNAPSHOT_FORMAT_VERSION = 1
+
+# ASCII unit separator - never appears in HS descriptions
+STRING_SEPARATOR = "\x1f"
+
+META_FILE = "meta.json"
+ARRAY_NAMES = ("codes", "levels", "parents", "desc_blob", "desc_offsets")
+
+
+def file_checksum(path: Path) -> str:
+    """Compute the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_path(snapshot_dir: Path, source_path: Path, checksum: str) -> Path:
+    """Get the snapshot directory for a given source file and checksum."""
+    return snapshot_dir / f"{source_path.stem}-v{SNAPSHOT_FORMAT_VERSION}-{checksum[:16]}"
+
+
+def pack_strings(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Pack strings into a single UTF-8 byte array plus start offsets.
+
+    Args:
+        values: Strings to pack (must not contain STRING_SEPARATOR)
+
+    Returns:
+        Tuple of (uint8 blob, int64 offsets with len(values) + 1 entries)
+    """
+    separator = STRING_SEPARATOR.encode()
+    encoded = [v.encode("utf-8") for v in values]
+    lengths = np.fromiter((len(e) + 1 for e in encoded), dtype=np.int64, count=len(encoded))
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    blob = np.frombuffer(separator.join(encoded) + separator, dtype=np.uint8)
+    return blob, offsets
+
+
+def unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> list[str]:
+    """Unpack all strings packed by pack_strings in one decode/split pass."""
+    if len(offsets) <= 1:
+        return []
+    return blob.tobytes().decode("utf-8").split(STRING_SEPARATOR)[: len(offsets) - 1]
+
+
+class PackedStrings(Sequence[str]):
+    """Read-only sequence over strings packed by pack_strings, decoded on access.
+
+    Unlike unpack_strings, nothing is copied up front: with memory-mapped
+    arrays the bytes stay in the (shared) page cache until an item is read.
+    """
+
+    __slots__ = ("_blob", "_offsets")
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, stop = self._offsets[index], self._offsets[index + 1] - 1
+        return self._blob[start:stop].tobytes().decode("utf-8")
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+
+def publish_arrays(target: Path, arrays: dict[str, np.ndarray], meta: dict) -> bool:
+    """Write arrays plus meta.json into ``target`` atomically (temp directory + rename).
+
+    Concurrent writers (e.g. several workers booting at once) are safe: the
+    first rename wins and the others discard their temp directory.
+
+    Args:
+        target: Directory to publish (must not exist yet)
+        arrays: Arrays to save as ``<name>.npy``
+        meta: JSON-serializable metadata, written last to mark completion
+
+    Returns:
+        True if this call published the directory, False if another process did
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{target.name}-", dir=target.parent))
+    try:
+        for name, array in arrays.items():
+            np.save(tmp_dir / f"{name}.npy", array, allow_pickle=False)
+        (tmp_dir / META_FILE).write_text(json.dumps(meta, indent=2))
+        os.rename(tmp_dir, target)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (target / META_FILE).exists():
+            raise
+        return False
+    return True
+
+
+def load_arrays(
+    target: Path, names: tuple[str, ...], expected: dict
+) -> tuple[dict, dict[str, np.ndarray]] | None:
+    """Memory-map arrays published by publish_arrays.
+
+    Args:
+        target: Published directory
+        names: Array names to load
+        expected: Metadata entries that must match (e.g. format version, checksum)
+
+    Returns:
+        Tuple of (meta, read-only memory-mapped arrays), or None if the
+        directory is missing, incomplete or does not match ``expected``
+    """
+    meta_file = target / META_FILE
+    if not meta_file.exists():
+        return None
+
+    try:
+        meta = json.loads(meta_file.read_text())
+        if any(meta.get(key) != value for key, value in expected.items()):
+            return None
+        arrays = {
+            name: np.load(target / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+            for name in names
+        }
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️  Ignoring unreadable data snapshot {target}: {e}")
+        return None
+
+    return meta, arrays
+
+
+def write_snapshot(
+    snapshot_dir: Path,
+    source_path: Path,
+    checksum: str,
+    codes: np.ndarray,
+    levels: np.ndarray,
+    parents: np.ndarray,
+    descriptions: list[str],
+) -> Path:
+    """Write a snapshot atomically (see publish_arrays).
+
+    Args:
+        snapshot_dir: Root directory for snapshots
+        source_path: CSV the columns were parsed from
+        checksum: SHA-256 of the source CSV
+        codes: Code strings
+        levels: Level per code (2, 4, 6)
+        parents: Parent code per code
+        descriptions: Description per code
+
+    Returns:
+        Path of the snapshot directory
+    """
+    target = snapshot_path(snapshot_dir, source_path, checksum)
+    if (target / META_FILE).exists():
+        return target
+
+    desc_blob, desc_offsets = pack_strings(descriptions)
+    arrays = {
+        "codes": np.asarray(codes, dtype=str).astype(np.bytes_),
+        "levels": np.asarray(levels, dtype=np.int8),
+        "parents": np.asarray(parents, dtype=str).astype(np.bytes_),
+        "desc_blob": desc_blob,
+        "desc_offsets": desc_offsets,
+    }
+    meta = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "source_file": source_path.name,
+        "source_sha256": checksum,
+        "rows": len(arrays["codes"]),
+    }
+
+    if not publish_arrays(target, arrays, meta):
+        # Another process published the same snapshot first
+        return target
+
+    remove_stale(snapshot_dir, f"{source_path.stem}-v", keep=target)
+    logger.info(f"💾 Wrote data snapshot {target.name} ({meta['rows']} rows)")
+    return target
+
+
+def read_snapshot(
+    snapshot_dir: Path, source_path: Path, checksum: str
+) -> dict[str, np.ndarray] | None:
+    """Memory-map a snapshot matching the source checksum.
+
+    Args:
+        snapshot_dir: Root directory for snapshots
+        source_path: CSV the snapshot was built from
+        checksum: Expected SHA-256 of the source CSV
+
+    Returns:
+        Dict of read-only memory-mapped arrays keyed by ARRAY_NAMES,
+        or None if no valid snapshot exists
+    """
+    target = snapshot_path(snapshot_dir, source_path, checksum)
+    loaded = load_arrays(
+        target,
+        ARRAY_NAMES,
+        {"format_version": SNAPSHOT_FORMAT_VERSION, "source_sha256": checksum},
+    )
+    if loaded is None:
+        return None
+
+    meta, arrays = loaded
+    if len(arrays["codes"]) != meta.get("rows"):
+        logger.warning(f"⚠️  Ignoring truncated data snapshot {target}")
+        return None
+
+    return arrays
+
+
+def remove_stale(directory: Path, prefix: str, keep: Path) -> None:
+    """Best-effort removal of older published directories sharing a name prefix."""
+    for path in directory.glob(f"{prefix}*"):
+        if path != keep and path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
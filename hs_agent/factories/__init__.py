@@ -1,5 +1,6 @@
 """Factory classes for creating model instances."""
 
 from .model_factory import ModelFactory
+from .schema_compiler import FrozenDict, SchemaCompiler
 
-__all__ = ["ModelFactory"]
+__all__ = ["FrozenDict", "ModelFactory", "SchemaCompiler"]
@@ -2,33 +2,91 @@
 
 This module provides a centralized factory for creating and configuring
 ChatVertexAI models with various settings and output schemas.
+
+Building a ChatVertexAI client and binding its structured output schema is
+far more expensive than invoking it, and the workflows ask for the same
+(model params, schema, candidate codes) combination over and over. Configured
+runnables are therefore kept in a bounded, process-wide LRU cache shared by
+every agent and workflow (see settings.model_cache_size). Enum-constrained
+schemas are compiled once per candidate set by SchemaCompiler.
 """
 
-import copy
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
 from typing import Any
 
 from langchain_google_vertexai import ChatVertexAI
 
+from hs_agent.config.settings import settings
+from hs_agent.factories.schema_compiler import (
+    MULTI_SELECTION_ENUM_PATH,
+    SchemaCompiler,
+    selection_enum_path,
+)
+from hs_agent.utils.metrics import metrics
+
 
 class ModelFactory:
     """Factory for creating and configuring LLM models."""
 
-    @staticmethod
-    def create_base_model(model_name: str, model_params: dict[str, Any]) -> ChatVertexAI:
-        """Create a base ChatVertexAI model with standard configuration.
+    # Configured runnables keyed by (kind, model kwargs, schema hash, candidate codes)
+    _cache: OrderedDict[tuple, Any] = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop every cached runnable (e.g. after credentials or settings change)."""
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    @classmethod
+    def cache_size(cls) -> int:
+        """Get the number of cached runnables."""
+        with cls._cache_lock:
+            return len(cls._cache)
+
+    @classmethod
+    def _get_or_build(cls, key: tuple, build: Callable[[], Any]) -> Any:
+        """Get a cached runnable, building and caching it on a miss.
+
+        Two concurrent misses for the same key may both build; the second
+        result simply replaces the first, which is harmless.
 
         Args:
-            model_name: Name of the model to use (e.g., "gemini-2.5-flash")
-            model_params: Model parameters from config containing:
-                - model_name: Override model name (optional)
-                - temperature: Model temperature (default: 0.1)
-                - max_tokens: Maximum tokens (default: 8192)
-                - top_p: Top-p sampling (default: 0.95)
-                - thinking_budget: Thinking budget for Gemini 2.5+ (optional)
+            key: Hashable cache key
+            build: Builds the runnable
 
         Returns:
-            Configured ChatVertexAI instance
+            Ready-to-invoke runnable
         """
+        max_size = settings.model_cache_size
+        if max_size <= 0:
+            return build()
+
+        with cls._cache_lock:
+            runnable = cls._cache.get(key)
+            if runnable is not None:
+                cls._cache.move_to_end(key)
+        if runnable is not None:
+            metrics.increment("model_cache.hits")
+            return runnable
+
+        metrics.increment("model_cache.misses")
+        with metrics.timer("model_cache.build_seconds"):
+            runnable = build()
+
+        with cls._cache_lock:
+            cls._cache[key] = runnable
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > max_size:
+                cls._cache.popitem(last=False)
+                metrics.increment("model_cache.evictions")
+        return runnable
+
+    @staticmethod
+    def _model_kwargs(model_name: str, model_params: dict[str, Any]) -> dict[str, Any]:
+        """Get the ChatVertexAI keyword arguments for model parameters."""
         model_kwargs = {
             "model": model_params.get("model_name", model_name),
             "temperature": model_params.get("temperature", 0.1),
@@ -42,65 +100,83 @@ class ModelFactory:
             model_kwargs["thinking_budget"] = thinking_budget
             model_kwargs["include_thoughts"] = True
 
-        return ChatVertexAI(**model_kwargs)
+        return model_kwargs
+
+    @staticmethod
+    def _schema_hash(schema: dict[str, Any] | None) -> str | None:
+        """Get a stable hash of an output schema (None when there is no schema)."""
+        return SchemaCompiler.fingerprint(schema) if schema else None
+
+    @staticmethod
+    def precompile_schema(config: dict[str, Any], enum_codes: Sequence[str]) -> None:
+        """Compile a step's enum-constrained schema ahead of the first request.
+
+        Args:
+            config: Step config (ignored when it has no selection schema)
+            enum_codes: Candidate codes the step will be called with
+        """
+        schema = config.get("output_schema")
+        if schema and enum_codes and (enum_field_path := selection_enum_path(schema)):
+            SchemaCompiler.compile(schema, enum_field_path, enum_codes)
+
+    @staticmethod
+    def create_base_model(model_name: str, model_params: dict[str, Any]) -> ChatVertexAI:
+        """Create a base ChatVertexAI model with standard configuration.
+
+        Args:
+            model_name: Name of the model to use (e.g., "gemini-2.5-flash")
+            model_params: Model parameters from config containing:
+                - model_name: Override model name (optional)
+                - temperature: Model temperature (default: 0.1)
+                - max_tokens: Maximum tokens (default: 8192)
+                - top_p: Top-p sampling (default: 0.95)
+                - thinking_budget: Thinking budget for Gemini 2.5+ (optional)
+
+        Returns:
+            Configured ChatVertexAI instance
+        """
+        return ChatVertexAI(**ModelFactory._model_kwargs(model_name, model_params))
 
     @staticmethod
     def add_structured_output(
         model: ChatVertexAI,
         schema: dict[str, Any],
-        enum_codes: list[str] | None = None,
-        enum_field_path: list[str] | None = None,
+        enum_codes: Sequence[str] | None = None,
+        enum_field_path: Sequence[str] | None = None,
     ) -> ChatVertexAI:
         """Add structured output schema to a model.
 
         Args:
             model: Base ChatVertexAI model
             schema: JSON Schema for structured output
-            enum_codes: Optional list of codes to constrain enum field
+            enum_codes: Optional codes to constrain enum field
             enum_field_path: Path to the enum field in the schema
                             (e.g., ["properties", "selections", "items", "properties", "code"])
 
         Returns:
             Model with structured output configured
         """
-        # If enum codes provided, add constraint to schema
+        # If enum codes provided, use the compiled (frozen) constrained schema
         if enum_codes and enum_field_path:
-            # Deep copy to avoid modifying cached config
-            schema = copy.deepcopy(schema)
-
-            # Navigate to the target field and add enum constraint
-            current = schema
-            for key in enum_field_path[:-1]:
-                if key not in current:
-                    if key == "properties":
-                        current[key] = {}
-                    else:
-                        current[key] = (
-                            {} if isinstance(current.get(key), dict) else current.get(key)
-                        )
-                current = current[key]
-
-            # Set the enum on the final field
-            final_key = enum_field_path[-1]
-            if final_key not in current:
-                current[final_key] = {"type": "string"}
-            if isinstance(current[final_key], dict):
-                current[final_key]["enum"] = enum_codes
+            schema = SchemaCompiler.compile(schema, enum_field_path, enum_codes)
 
         return model.with_structured_output(schema)
 
     @staticmethod
     def create_with_config(
-        model_name: str, config: dict[str, Any], enum_codes: list[str] | None = None
+        model_name: str, config: dict[str, Any], enum_codes: Sequence[str] | None = None
     ) -> ChatVertexAI:
         """Create a model configured for a specific workflow step.
 
+        The configured model is cached (see ModelFactory._get_or_build), so
+        repeated calls with the same model params, schema and codes are cheap.
+
         Args:
             model_name: Default model name
             config: Config dict containing:
                 - model: Model parameters
                 - output_schema: Optional JSON Schema for structured output
-            enum_codes: Optional list of codes to constrain selection enum
+            enum_codes: Optional codes to constrain selection enum
 
         Returns:
             Configured ChatVertexAI model
@@ -116,50 +192,45 @@ class ModelFactory:
 
         # Get model parameters from config
         model_params = get_model_params(config)
-
-        # Create base model
-        model = ModelFactory.create_base_model(model_name, model_params)
-
-        # Add structured output if schema provided
-        if schema := config.get("output_schema"):
-            # Add enum constraint if codes provided
-            if enum_codes:
-                # Detect schema structure and use appropriate field path
-                schema_props = schema.get("properties", {})
-
-                if "selected_code" in schema_props:
-                    # Single selection schema: properties.selected_code
-                    enum_field_path = ["properties", "selected_code"]
-                    model = ModelFactory.add_structured_output(
-                        model, schema, enum_codes, enum_field_path
-                    )
-                elif "selections" in schema_props:
-                    # Multi-selection schema: properties.selections.items.properties.code
-                    enum_field_path = ["properties", "selections", "items", "properties", "code"]
-                    model = ModelFactory.add_structured_output(
-                        model, schema, enum_codes, enum_field_path
-                    )
-                else:
-                    # No recognized selection field, add schema without enum
-                    model = ModelFactory.add_structured_output(model, schema)
-            else:
-                model = ModelFactory.add_structured_output(model, schema)
-
-        return model
+        schema = config.get("output_schema")
+        enum_codes = tuple(enum_codes) if enum_codes else None
+
+        def build() -> ChatVertexAI:
+            # Create base model
+            model = ModelFactory.create_base_model(model_name, model_params)
+
+            # Add structured output if schema provided
+            if not schema:
+                return model
+
+            # Detect schema structure (properties.selected_code for single
+            # selection, properties.selections.items.properties.code for multi)
+            enum_field_path = selection_enum_path(schema) if enum_codes else None
+            # Without codes or a recognized selection field, no enum is added
+            return ModelFactory.add_structured_output(model, schema, enum_codes, enum_field_path)
+
+        key = (
+            "config",
+            tuple(sorted(ModelFactory._model_kwargs(model_name, model_params).items())),
+            ModelFactory._schema_hash(schema),
+            enum_codes,
+        )
+        return ModelFactory._get_or_build(key, build)
 
     @staticmethod
     def create_for_multi_selection(
-        model_name: str, config: dict[str, Any], candidate_codes: list[str]
+        model_name: str, config: dict[str, Any], candidate_codes: Sequence[str]
     ) -> ChatVertexAI:
         """Create a model specifically for multi-selection with enum constraints.
 
         This is a convenience method for creating models with enum constraints
-        on the selections array, commonly used in multi-choice workflows.
+        on the selections array, commonly used in multi-choice workflows. The
+        configured model is cached like create_with_config's.
 
         Args:
             model_name: Default model name
             config: Config dict with model params and output schema
-            candidate_codes: List of valid candidate codes to constrain selection
+            candidate_codes: Valid candidate codes to constrain selection
 
         Returns:
             Configured ChatVertexAI model with enum-constrained selections
@@ -168,33 +239,27 @@ class ModelFactory:
 
         # Get model parameters
         model_params = get_model_params(config)
+        schema = config.get("output_schema")
+        candidate_codes = tuple(candidate_codes)
 
-        # Create base model
-        base_model = ModelFactory.create_base_model(model_name, model_params)
-
-        # Add schema with enum constraints
-        if schema := config.get("output_schema"):
-            # Deep copy to avoid modifying cached config
-            schema = copy.deepcopy(schema)
+        def build() -> ChatVertexAI:
+            # Create base model
+            base_model = ModelFactory.create_base_model(model_name, model_params)
+            if not schema:
+                return base_model
 
             # Add enum constraint for selections.items.properties.code
-            if (
-                "properties" in schema
-                and "selections" in schema["properties"]
-                and "items" in schema["properties"]["selections"]
-            ):
-                # Ensure properties exists
-                if "properties" not in schema["properties"]["selections"]["items"]:
-                    schema["properties"]["selections"]["items"]["properties"] = {}
-
-                # Ensure code field exists
-                code_props = schema["properties"]["selections"]["items"]["properties"]
-                if "code" not in code_props:
-                    code_props["code"] = {"type": "string"}
-
-                # Add enum constraint
-                code_props["code"]["enum"] = candidate_codes
-
+            selections = schema.get("properties", {}).get("selections", {})
+            if "items" in selections:
+                return base_model.with_structured_output(
+                    SchemaCompiler.compile(schema, MULTI_SELECTION_ENUM_PATH, candidate_codes)
+                )
             return base_model.with_structured_output(schema)
 
-        return base_model
+        key = (
+            "multi_selection",
+            tuple(sorted(ModelFactory._model_kwargs(model_name, model_params).items())),
+            ModelFactory._schema_hash(schema),
+            candidate_codes,
+        )
+        return ModelFactory._get_or_build(key, build)
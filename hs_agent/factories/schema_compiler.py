@@ -0,0 +1,180 @@
+"""Precompiled enum-constrained output schemas.
+
+Selection steps constrain the code field of their output schema to the
+candidate codes under the current parent. The constrained schema only
+depends on the step's schema and the candidate codes, so it is compiled once
+per (schema, candidate codes) pair and reused: the hot path never copies,
+walks or re-serializes a schema.
+
+Compiled schemas are FrozenDicts: plain dicts as far as LangChain is
+concerned, but any attempt to modify one raises, so a compiled schema shared
+by every agent in the process can never be corrupted by a caller.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any
+
+from hs_agent.utils.metrics import metrics
+
+# Enum field paths of the two selection schema shapes
+SINGLE_SELECTION_ENUM_PATH = ("properties", "selected_code")
+MULTI_SELECTION_ENUM_PATH = ("properties", "selections", "items", "properties", "code")
+
+# One entry per (step schema, parent) pair; the full HS tree has ~1.3k parents
+MAX_COMPILED_SCHEMAS = 4096
+MAX_FINGERPRINTS = 256
+
+
+class FrozenDict(dict):
+    """Read-only dict used for compiled schemas."""
+
+    __slots__ = ()
+
+    def _readonly(self, *_args, **_kwargs):
+        raise TypeError("Compiled schemas are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "FrozenDict":
+        return self
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts to FrozenDicts and lists to tuples."""
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list | tuple):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def selection_enum_path(schema: dict[str, Any]) -> tuple[str, ...] | None:
+    """Detect the enum field path of a selection schema.
+
+    Args:
+        schema: JSON Schema of a step's output
+
+    Returns:
+        SINGLE_SELECTION_ENUM_PATH, MULTI_SELECTION_ENUM_PATH, or None when the
+        schema has no recognized selection field
+    """
+    schema_props = schema.get("properties", {})
+    if "selected_code" in schema_props:
+        return SINGLE_SELECTION_ENUM_PATH
+    if "selections" in schema_props:
+        return MULTI_SELECTION_ENUM_PATH
+    return None
+
+
+class SchemaCompiler:
+    """Process-wide cache of compiled enum-constrained schemas."""
+
+    _lock = threading.Lock()
+    _compiled: OrderedDict[tuple, FrozenDict] = OrderedDict()
+    # id(schema) -> (schema, fingerprint); the schema is kept so its id is not reused
+    _fingerprints: dict[int, tuple[dict, str]] = {}
+
+    @classmethod
+    def fingerprint(cls, schema: dict[str, Any]) -> str:
+        """Get a stable hash of a schema, computed once per schema object.
+
+        Config schemas are treated as read-only, so equal schemas loaded by
+        different agents share compiled entries while each object is only
+        serialized the first time it is seen.
+
+        Args:
+            schema: JSON Schema
+
+        Returns:
+            Hex digest of the schema's canonical JSON
+        """
+        with cls._lock:
+            entry = cls._fingerprints.get(id(schema))
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+
+        encoded = json.dumps(schema, sort_keys=True, default=str).encode()
+        digest = hashlib.sha256(encoded).hexdigest()
+        with cls._lock:
+            if len(cls._fingerprints) >= MAX_FINGERPRINTS:
+                cls._fingerprints.clear()
+            cls._fingerprints[id(schema)] = (schema, digest)
+        return digest
+
+    @classmethod
+    def compile(
+        cls,
+        schema: dict[str, Any],
+        enum_field_path: Sequence[str],
+        enum_codes: Sequence[str],
+    ) -> FrozenDict:
+        """Get the schema with an enum constraint on one field, compiling it once.
+
+        Args:
+            schema: JSON Schema (left untouched)
+            enum_field_path: Path to the enum field in the schema
+            enum_codes: Allowed values (e.g. a CandidateSet's codes)
+
+        Returns:
+            Frozen constrained schema, shared by every caller with the same inputs
+        """
+        key = (cls.fingerprint(schema), tuple(enum_field_path), tuple(enum_codes))
+        with cls._lock:
+            compiled = cls._compiled.get(key)
+            if compiled is not None:
+                cls._compiled.move_to_end(key)
+        if compiled is not None:
+            metrics.increment("schema_cache.hits")
+            return compiled
+
+        metrics.increment("schema_cache.misses")
+        compiled = freeze(_with_enum(schema, key[1], key[2]))
+        with cls._lock:
+            cls._compiled[key] = compiled
+            while len(cls._compiled) > MAX_COMPILED_SCHEMAS:
+                cls._compiled.popitem(last=False)
+        return compiled
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop every compiled schema and fingerprint."""
+        with cls._lock:
+            cls._compiled.clear()
+            cls._fingerprints.clear()
+
+    @classmethod
+    def size(cls) -> int:
+        """Get the number of compiled schemas."""
+        with cls._lock:
+            return len(cls._compiled)
+
+
+def _with_enum(
+    schema: dict[str, Any], enum_field_path: Sequence[str], enum_codes: Sequence[str]
+) -> dict[str, Any]:
+    """Copy the dicts along enum_field_path and set the enum on the final field."""
+    schema = dict(schema)
+    current = schema
+    for key in enum_field_path[:-1]:
+        child = current.get(key)
+        current[key] = dict(child) if isinstance(child, dict) else {}
+        current = current[key]
+
+    final_key = enum_field_path[-1]
+    field = current.get(final_key, {"type": "string"})
+    if isinstance(field, dict):
+        current[final_key] = {**field, "enum": list(enum_codes)}
+    return schema
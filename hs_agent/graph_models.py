@@ -19,8 +19,13 @@ class ClassificationState(TypedDict):
     # Subheading level
     subheading_result: ClassificationResult | None
 
+    # National levels (only set when the subheading has HTS subdivisions)
+    tariff_line_result: ClassificationResult | None
+    statistical_suffix_result: ClassificationResult | None
+
     # Final results
     final_code: str | None
+    national_code: str | None
     overall_confidence: float | None
 
 
@@ -0,0 +1,89 @@
+"""Streaming parser for the US HTS schedule (htsdata_raw.csv).
+
+The HTS export is a flat list of rows whose hierarchy is given by the
+``Indent`` column, not by the codes: unnumbered rows ("Horses:", "Dairy:") are
+grouping labels for the rows indented below them, and 10-digit statistical
+lines may appear without an explicit 8-digit tariff line above them.
+
+The parser walks the rows once with an indent stack and yields only the
+national levels (8-digit tariff lines and 10-digit statistical suffixes), with:
+
+- descriptions prefixed by the grouping labels between the row and its nearest
+  numbered ancestor ("Dairy: Male"), so each line is understandable on its own
+- the parent code (6-digit subheading for tariff lines, 8-digit tariff line for
+  statistical suffixes), synthesizing the implicit 8-digit line when needed
+"""
+
+import csv
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+# National levels (number of digits) produced by the parser
+TARIFF_LINE_LEVEL = 8
+STATISTICAL_LEVEL = 10
+
+
+def parse_hts_rows(hts_path: Path) -> Iterator[tuple[str, str, int, str]]:
+    """Stream national HTS codes from the raw schedule.
+
+    Args:
+        hts_path: Path to htsdata_raw.csv
+
+    Yields:
+        Tuples of (code, description, level, parent code), parents before children
+    """
+    # Entries of (indent, digits or "" for grouping labels, description)
+    stack: list[tuple[int, str, str]] = []
+    emitted: set[str] = set()
+
+    with open(hts_path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                indent = int(row["Indent"])
+            except (TypeError, ValueError):
+                continue
+            digits = row["HTS Number"].replace(".", "").strip()
+            description = row["Description"].strip()
+
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+
+            if len(digits) in (TARIFF_LINE_LEVEL, STATISTICAL_LEVEL) and digits.isdigit():
+                labels = []
+                for _, ancestor, label in reversed(stack):
+                    if ancestor:
+                        break
+                    labels.append(label)
+                full_description = " ".join([*reversed(labels), description])
+
+                tariff_line = digits[:TARIFF_LINE_LEVEL]
+                if tariff_line not in emitted:
+                    emitted.add(tariff_line)
+                    yield tariff_line, full_description, TARIFF_LINE_LEVEL, digits[:6]
+                if len(digits) == STATISTICAL_LEVEL and digits not in emitted:
+                    emitted.add(digits)
+                    yield digits, full_description, STATISTICAL_LEVEL, tariff_line
+
+            stack.append((indent, digits, description))
+
+
+def read_hts_columns(hts_path: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Parse the HTS schedule into column arrays (same layout as the HS codes columns).
+
+    Returns:
+        Tuple of (codes, levels, parents, descriptions) arrays of equal length
+    """
+    rows = list(parse_hts_rows(hts_path))
+    if not rows:
+        empty = np.empty(0, dtype=str)
+        return empty, np.empty(0, dtype=np.int8), empty, np.empty(0, dtype=object)
+
+    codes, descriptions, levels, parents = zip(*rows, strict=True)
+    return (
+        np.asarray(codes, dtype=str),
+        np.asarray(levels, dtype=np.int8),
+        np.asarray(parents, dtype=str),
+        np.asarray(descriptions, dtype=object),
+    )
@@ -11,6 +11,9 @@ class ClassificationLevel(str, Enum):
     CHAPTER = "2"  # 2-digit
     HEADING = "4"  # 4-digit
     SUBHEADING = "6"  # 6-digit
+    # National (US HTS) levels, only used when national levels are enabled
+    TARIFF_LINE = "8"  # 8-digit
+    STATISTICAL_SUFFIX = "10"  # 10-digit
 
 
 # === Special Code Constants ===
@@ -152,6 +155,16 @@ class ClassificationResponse(BaseModel):
     heading: ClassificationResult
     subheading: ClassificationResult
     processing_time_ms: float
+    # National levels (only present when the subheading has HTS subdivisions)
+    tariff_line: ClassificationResult | None = Field(
+        None, description="Selected 8-digit HTS tariff line"
+    )
+    statistical_suffix: ClassificationResult | None = Field(
+        None, description="Selected 10-digit HTS statistical suffix"
+    )
+    national_code: str | None = Field(
+        None, description="Most specific HTS code selected below final_code"
+    )
     # High performance mode results (only present when high_performance=True)
     paths_explored: list[ClassificationPath] | None = Field(
         None, description="All paths explored in high performance mode"
@@ -160,6 +173,19 @@ class ClassificationResponse(BaseModel):
         None, description="Reasoning for final selection using chapter notes"
     )
     comparison_summary: str | None = Field(None, description="Summary of path comparison")
+    nomenclature_version: str | None = Field(
+        None, description="HS nomenclature revision the classification was made against"
+    )
+    cached: bool = Field(False, description="Whether the response was served from the result cache")
+    original_processing_time_ms: float | None = Field(
+        None, description="processing_time_ms of the classification a cached response came from"
+    )
+    near_duplicate_of: str | None = Field(
+        None, description="Prior description whose cached result was reused (near-duplicate match)"
+    )
+    near_duplicate_similarity: float | None = Field(
+        None, description="Similarity of the description to near_duplicate_of (0.0-1.0)"
+    )
 
 
 class MultiChoiceClassificationResponse(BaseModel):
@@ -176,3 +202,16 @@ class MultiChoiceClassificationResponse(BaseModel):
     final_confidence: float | None = Field(None, description="Confidence in the final selection")
     final_reasoning: str | None = Field(None, description="Reasoning for the final selection")
     comparison_summary: str | None = Field(None, description="Summary of the comparison process")
+    nomenclature_version: str | None = Field(
+        None, description="HS nomenclature revision the classification was made against"
+    )
+    cached: bool = Field(False, description="Whether the response was served from the result cache")
+    original_processing_time_ms: float | None = Field(
+        None, description="processing_time_ms of the classification a cached response came from"
+    )
+    near_duplicate_of: str | None = Field(
+        None, description="Prior description whose cached result was reused (near-duplicate match)"
+    )
+    near_duplicate_similarity: float | None = Field(
+        None, description="Similarity of the description to near_duplicate_of (0.0-1.0)"
+    )
@@ -0,0 +1,150 @@
+"""Versioned HS nomenclature releases with atomic hot-swap.
+
+A NomenclatureRelease pairs a loaded HSDataLoader with its version label and
+is never mutated after it is built. NomenclatureManager holds the active
+release: a reload builds the next release (and anything warmed from it, such as
+agents) in a worker thread, then swaps the reference in one assignment.
+Requests read ``manager.current`` once when they start, so in-flight requests
+finish on the release they started with while new requests see the new one.
+"""
+
+import asyncio
+import threading
+from collections.abc import Callable
+from datetime import datetime
+
+from hs_agent.data_loader import HSDataLoader
+from hs_agent.utils.logger import get_logger
+
+logger = get_logger("hs_agent.nomenclature")
+
+
+class NomenclatureRelease:
+    """One loaded nomenclature revision (never mutated after creation)."""
+
+    __slots__ = ("version", "data_loader", "loaded_at")
+
+    def __init__(self, data_loader: HSDataLoader, version: str | None = None):
+        """Initialize the release.
+
+        Args:
+            data_loader: Fully loaded data loader
+            version: Version label (defaults to data_loader.version)
+        """
+        self.data_loader = data_loader
+        self.version = version or data_loader.version or "unversioned"
+        self.loaded_at = datetime.now()
+
+    def __repr__(self) -> str:
+        return f"NomenclatureRelease(version={self.version!r})"
+
+
+class NomenclatureManager:
+    """Hold the active nomenclature release and hot-swap new revisions."""
+
+    def __init__(
+        self,
+        loader_factory: Callable[[], HSDataLoader],
+        source_version: Callable[[], str] | None = None,
+        warmup: Callable[[NomenclatureRelease], None] | None = None,
+    ):
+        """Initialize the manager.
+
+        Args:
+            loader_factory: Builds a fully loaded HSDataLoader (runs off the event loop
+                on reload)
+            source_version: Returns the version of the source files without loading
+                them, e.g. HSDataLoader.source_version (polled by watch)
+            warmup: Called with a new release before it becomes active, e.g. to
+                build agents for it so the first request after a swap is not cold
+        """
+        self._loader_factory = loader_factory
+        self._source_version = source_version
+        self._warmup = warmup
+        self._current: NomenclatureRelease | None = None
+        self._init_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    @property
+    def current(self) -> NomenclatureRelease:
+        """Get the active release, loading the first one on demand."""
+        release = self._current
+        if release is None:
+            with self._init_lock:
+                if self._current is None:
+                    self._current = self._build()
+                    logger.info(f"📚 Nomenclature {self._current.version} active")
+                release = self._current
+        return release
+
+    def swap(self, release: NomenclatureRelease) -> NomenclatureRelease | None:
+        """Make a release active (atomic reference swap).
+
+        Args:
+            release: Release to activate
+
+        Returns:
+            The previously active release (None if there was none)
+        """
+        previous, self._current = self._current, release
+        if previous is not None:
+            logger.info(f"🔄 Nomenclature swapped {previous.version} → {release.version}")
+        return previous
+
+    def reload(self, force: bool = False) -> NomenclatureRelease | None:
+        """Load the current source into a new release and swap it in (blocking).
+
+        Concurrent reloads are serialized; a reload that finds the same version
+        as the active release is a no-op unless ``force`` is set.
+
+        Args:
+            force: Swap even if the version did not change
+
+        Returns:
+            The newly active release, or None if nothing changed
+        """
+        with self._reload_lock:
+            release = self._build()
+            current = self._current
+            if not force and current is not None and current.version == release.version:
+                logger.debug(f"Nomenclature {release.version} unchanged, keeping active release")
+                return None
+            self.swap(release)
+            return release
+
+    async def reload_async(self, force: bool = False) -> NomenclatureRelease | None:
+        """Run reload in a worker thread so the event loop keeps serving requests."""
+        return await asyncio.to_thread(self.reload, force)
+
+    def source_changed(self) -> bool:
+        """Check whether the watched source files hold a different revision."""
+        if self._source_version is None:
+            return False
+        try:
+            version = self._source_version()
+        except FileNotFoundError:
+            return False
+        return version != self.current.version
+
+    async def watch(self, interval_seconds: float) -> None:
+        """Poll the source files and hot-swap when their revision changes (runs until cancelled).
+
+        Args:
+            interval_seconds: Seconds between checks
+        """
+        logger.info("👀 Watching the nomenclature source files for new revisions")
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                if await asyncio.to_thread(self.source_changed):
+                    await self.reload_async()
+            except Exception as e:
+                # Keep serving the active release; retry on the next tick
+                logger.warning(f"⚠️  Nomenclature reload failed: {e}")
+
+    def _build(self) -> NomenclatureRelease:
+        """Load a new release and warm it up (not yet active)."""
+        release = NomenclatureRelease(self._loader_factory())
+        if self._warmup is not None:
+            self._warmup(release)
+        return release
@@ -1,5 +1,31 @@
 """Retry policies for LLM invocation."""
 
+from .adaptive_limiter import AdaptiveConcurrencyLimiter, adaptive_llm_limiter
+from .circuit_breaker import CircuitBreaker, CircuitState, circuit_breaker
+from .concurrency_limiter import LLMConcurrencyLimiter, llm_limiter
+from .deadline import deadline_scope, remaining_time
+from .errors import ErrorKind, classify_error
+from .hedging import HedgingPolicy, hedging_policy
+from .retry_budget import RetryBudget, retry_budget
 from .retry_policy import RetryPolicy
+from .single_flight import SingleFlight
 
-__all__ = ["RetryPolicy"]
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "CircuitBreaker",
+    "CircuitState",
+    "ErrorKind",
+    "HedgingPolicy",
+    "LLMConcurrencyLimiter",
+    "RetryBudget",
+    "RetryPolicy",
+    "SingleFlight",
+    "adaptive_llm_limiter",
+    "circuit_breaker",
+    "classify_error",
+    "deadline_scope",
+    "hedging_policy",
+    "llm_limiter",
+    "remaining_time",
+    "retry_budget",
+]
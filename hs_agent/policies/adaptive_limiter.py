@@ -0,0 +1,266 @@
+"""Adaptive (AIMD) concurrency limit for LLM calls.
+
+A fixed cap (LLMConcurrencyLimiter) is either too low when the provider is
+healthy or too high when it degrades. The adaptive limiter starts each model
+at its fixed cap and adjusts it from the outcome of every call:
+
+- additive increase: each healthy call while the limit is (nearly) fully used
+  adds ``increase / limit``, i.e. about ``increase`` per limit's worth of calls
+- multiplicative decrease: a throttling error (429 / resource exhausted /
+  unavailable) or persistent latency spikes multiply the limit by
+  ``decrease_factor``
+
+A call is a latency spike when it takes more than ``latency_tolerance`` times
+the smoothed latency of its config step (chapter and subheading prompts take
+very different times). Every call feeds the baseline, spikes included, so a
+lasting shift to a new healthy latency level costs at most one decrease and
+the baseline then catches up; the limit is only cut after SPIKE_PERSISTENCE
+consecutive spikes of a step, so a single slow call does not cut it.
+
+Only calls started after the last decrease can trigger another one, so a
+burst of failures from the same overloaded window cuts the limit once. The
+current limit of each model is published as the
+``llm_limiter.<model>.limit`` gauge.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from hs_agent.config.settings import settings
+from hs_agent.policies.concurrency_limiter import LLMConcurrencyLimiter
+from hs_agent.policies.errors import is_throttling_error
+from hs_agent.utils.metrics import metrics
+
+# Calls of a step needed before latency spikes are judged against its baseline
+MIN_LATENCY_SAMPLES = 5
+# Consecutive latency spikes of a step needed to cut the limit
+SPIKE_PERSISTENCE = 3
+
+
+class _Latency:
+    """Smoothed latency of one model's calls for one config step."""
+
+    __slots__ = ("baseline", "samples", "spikes")
+
+    def __init__(self):
+        self.baseline: float | None = None
+        self.samples = 0
+        self.spikes = 0
+
+
+class _ModelLimit:
+    """Adaptive limit state of one model (shared by every event loop)."""
+
+    __slots__ = ("limit", "latencies", "last_decrease")
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.latencies: dict[str | None, _Latency] = {}
+        self.last_decrease = 0.0
+
+
+class _Gate:
+    """Admission gate of one model on one event loop."""
+
+    __slots__ = ("state", "in_flight", "waiters")
+
+    def __init__(self, state: _ModelLimit):
+        self.state = state
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+
+    def has_room(self) -> bool:
+        return self.in_flight < max(1, int(self.state.limit))
+
+    async def acquire(self) -> None:
+        if self.has_room() and not self.waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before the cancellation: hand the slot back
+                self.release()
+            else:
+                self.waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self.wake()
+
+    def wake(self) -> None:
+        while self.waiters and self.has_room():
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter(LLMConcurrencyLimiter):
+    """Per-model concurrency limiter whose limits follow an AIMD policy."""
+
+    def __init__(
+        self,
+        limits: dict[str, int] | None = None,
+        default_limit: int | None = None,
+        min_limit: int = 1,
+        max_limit: int | None = None,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_smoothing: float = 0.1,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            limits: Initial per-model limits (defaults to settings.model_concurrency_limits)
+            default_limit: Initial limit of other models (defaults to
+                settings.max_concurrent_requests)
+            min_limit: Lowest limit a model can be cut to
+            max_limit: Highest limit a model can grow to (defaults to
+                settings.adaptive_concurrency_max_limit)
+            increase: Limit added per limit's worth of healthy calls
+            decrease_factor: Multiplier applied on throttling or a latency spike
+            latency_tolerance: Latency above this multiple of the step's baseline is a spike
+            latency_smoothing: Weight of each call in the latency baseline (EWMA)
+        """
+        super().__init__(limits=limits, default_limit=default_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.latency_smoothing = latency_smoothing
+        self._states: dict[str, _ModelLimit] = {}
+        self._gates: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, _Gate]] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def current_limit(self, model_name: str) -> float:
+        """Get the current (adapted) limit of a model.
+
+        Args:
+            model_name: Model name
+
+        Returns:
+            Current limit (the initial limit if the model was never called)
+        """
+        return self._state(model_name).limit
+
+    def current_limits(self) -> dict[str, float]:
+        """Get the current limit of every model called so far."""
+        with self._lock:
+            return {name: state.limit for name, state in self._states.items()}
+
+    @asynccontextmanager
+    async def slot(self, model_name: str, step: str | None = None) -> AsyncIterator[None]:
+        """Hold one of a model's slots for a call and adapt the limit to its outcome.
+
+        Args:
+            model_name: Model being called
+            step: Config step of the call (latency baselines are kept per step)
+        """
+        gate = self._gate(model_name)
+        queued_at = time.perf_counter()
+        await gate.acquire()
+        started_at = time.perf_counter()
+        waited = started_at - queued_at
+        metrics.observe("llm_limiter.queue_wait_seconds", waited)
+        metrics.observe(f"llm_limiter.{model_name}.queue_wait_seconds", waited)
+
+        saturated = gate.in_flight >= int(gate.state.limit) - 1
+        try:
+            yield
+        except Exception as e:
+            if is_throttling_error(e):
+                self._decrease(model_name, gate, started_at, "throttled")
+            raise
+        else:
+            self._on_success(model_name, step, gate, started_at, saturated)
+        finally:
+            gate.release()
+
+    def reset(self) -> None:
+        """Drop all adapted limits and gates (limits restart from their initial values)."""
+        with self._lock:
+            self._states.clear()
+            self._gates = weakref.WeakKeyDictionary()
+        super().reset()
+
+    def _state(self, model_name: str) -> _ModelLimit:
+        with self._lock:
+            state = self._states.get(model_name)
+            if state is None:
+                state = _ModelLimit(float(self.limit_for(model_name)))
+                self._states[model_name] = state
+        return state
+
+    def _gate(self, model_name: str) -> _Gate:
+        state = self._state(model_name)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            gates = self._gates.setdefault(loop, {})
+            gate = gates.get(model_name)
+            if gate is None:
+                gate = gates[model_name] = _Gate(state)
+        return gate
+
+    def _on_success(
+        self,
+        model_name: str,
+        step: str | None,
+        gate: _Gate,
+        started_at: float,
+        saturated: bool,
+    ):
+        state = gate.state
+        latency = time.perf_counter() - started_at
+        with self._lock:
+            stats = state.latencies.setdefault(step, _Latency())
+        baseline = stats.baseline
+        spike = (
+            baseline is not None
+            and stats.samples >= MIN_LATENCY_SAMPLES
+            and latency > baseline * self.latency_tolerance
+        )
+        # Spikes feed the baseline too, so it follows a lasting shift in latency
+        stats.baseline = (
+            latency
+            if baseline is None
+            else (1 - self.latency_smoothing) * baseline + self.latency_smoothing * latency
+        )
+        stats.samples += 1
+        stats.spikes = stats.spikes + 1 if spike else 0
+        if spike:
+            if stats.spikes >= SPIKE_PERSISTENCE:
+                stats.spikes = 0
+                self._decrease(model_name, gate, started_at, "latency_spike")
+            return
+
+        if saturated:
+            max_limit = self.max_limit or settings.adaptive_concurrency_max_limit
+            state.limit = min(float(max_limit), state.limit + self.increase / state.limit)
+            metrics.set_gauge(f"llm_limiter.{model_name}.limit", state.limit)
+            gate.wake()
+
+    def _decrease(self, model_name: str, gate: _Gate, started_at: float, reason: str):
+        state = gate.state
+        if started_at <= state.last_decrease:
+            return
+        state.limit = max(float(self.min_limit), state.limit * self.decrease_factor)
+        state.last_decrease = time.perf_counter()
+        metrics.set_gauge(f"llm_limiter.{model_name}.limit", state.limit)
+        metrics.increment(f"llm_limiter.{model_name}.decreases.{reason}")
+
+
+# Process-wide adaptive limiter (used by RetryPolicy when enabled in settings)
+adaptive_llm_limiter = AdaptiveConcurrencyLimiter()
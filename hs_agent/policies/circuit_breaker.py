@@ -0,0 +1,143 @@
+"""Per-model circuit breaker for LLM calls.
+
+When a model endpoint starts failing, every request would otherwise burn
+through all its retries before degrading to "000000". The breaker tracks the
+consecutive failures of each model:
+
+- CLOSED: calls go to the model. ``failure_threshold`` consecutive failures
+  (transient errors or throttling, see errors) open the circuit.
+- OPEN: RetryPolicy routes calls to the fallback model (settings.
+  fallback_model_name) at once. After ``recovery_seconds`` one call is also
+  sent to the model in the background as a probe.
+- HALF_OPEN: the probe is in flight. Its success closes the circuit, its
+  failure opens it again for another ``recovery_seconds``.
+
+Any successful call closes the circuit. Transitions are counted as
+``circuit_breaker.<model>.opened`` / ``circuit_breaker.<model>.closed``.
+"""
+
+import threading
+import time
+from enum import Enum
+
+from hs_agent.config.settings import settings
+from hs_agent.utils.logger import get_logger
+from hs_agent.utils.metrics import metrics
+
+logger = get_logger("hs_agent.policies.circuit_breaker")
+
+
+class CircuitState(str, Enum):
+    """State of a model's circuit."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class _Circuit:
+    """Circuit state of one model."""
+
+    __slots__ = ("state", "failures", "opened_at")
+
+    def __init__(self):
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+
+class CircuitBreaker:
+    """Per-model circuits shared by every RetryPolicy in the process."""
+
+    def __init__(self, failure_threshold: int | None = None, recovery_seconds: float | None = None):
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open a circuit (defaults to
+                settings.circuit_breaker_failure_threshold)
+            recovery_seconds: Time an open circuit waits before probing the model
+                (defaults to settings.circuit_breaker_recovery_seconds)
+        """
+        self._failure_threshold = failure_threshold
+        self._recovery_seconds = recovery_seconds
+        self._lock = threading.Lock()
+        self._circuits: dict[str, _Circuit] = {}
+
+    @property
+    def failure_threshold(self) -> int:
+        """Consecutive failures that open a circuit."""
+        if self._failure_threshold is None:
+            return settings.circuit_breaker_failure_threshold
+        return self._failure_threshold
+
+    @property
+    def recovery_seconds(self) -> float:
+        """Time an open circuit waits before probing the model."""
+        if self._recovery_seconds is None:
+            return settings.circuit_breaker_recovery_seconds
+        return self._recovery_seconds
+
+    def state(self, model_name: str) -> CircuitState:
+        """Get the circuit state of a model (CLOSED if never called)."""
+        with self._lock:
+            circuit = self._circuits.get(model_name)
+            return CircuitState.CLOSED if circuit is None else circuit.state
+
+    def allow_request(self, model_name: str) -> bool:
+        """Check whether calls may go to a model (its circuit is closed)."""
+        return self.state(model_name) is CircuitState.CLOSED
+
+    def try_probe(self, model_name: str) -> bool:
+        """Claim the probe of an open circuit whose recovery time has elapsed.
+
+        Returns:
+            True if the caller should probe the model (the circuit is now HALF_OPEN)
+        """
+        with self._lock:
+            circuit = self._circuits.get(model_name)
+            if (
+                circuit is None
+                or circuit.state is not CircuitState.OPEN
+                or time.monotonic() - circuit.opened_at < self.recovery_seconds
+            ):
+                return False
+            circuit.state = CircuitState.HALF_OPEN
+        logger.info(f"🔌 Probing {model_name} (circuit half-open)")
+        return True
+
+    def record_success(self, model_name: str) -> None:
+        """Record a successful call (closes the model's circuit)."""
+        with self._lock:
+            circuit = self._circuits.get(model_name)
+            if circuit is None:
+                return
+            circuit.failures = 0
+            if circuit.state is CircuitState.CLOSED:
+                return
+            circuit.state = CircuitState.CLOSED
+        metrics.increment(f"circuit_breaker.{model_name}.closed")
+        logger.info(f"🔌 Circuit of {model_name} closed")
+
+    def record_failure(self, model_name: str) -> None:
+        """Record a failed call (may open the model's circuit)."""
+        with self._lock:
+            circuit = self._circuits.setdefault(model_name, _Circuit())
+            circuit.failures += 1
+            if circuit.state is CircuitState.OPEN or (
+                circuit.state is CircuitState.CLOSED and circuit.failures < self.failure_threshold
+            ):
+                return
+            circuit.state = CircuitState.OPEN
+            circuit.opened_at = time.monotonic()
+            failures = circuit.failures
+        metrics.increment(f"circuit_breaker.{model_name}.opened")
+        logger.warning(f"🔌 Circuit of {model_name} opened after {failures} consecutive failures")
+
+    def reset(self) -> None:
+        """Close all circuits."""
+        with self._lock:
+            self._circuits.clear()
+
+
+# Process-wide breaker used by RetryPolicy
+circuit_breaker = CircuitBreaker()
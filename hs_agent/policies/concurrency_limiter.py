@@ -0,0 +1,115 @@
+"""Process-wide cap on in-flight LLM calls, per model.
+
+Every classification fans out into several LLM calls (chapters, headings per
+chapter, subheadings per heading, shards...), so a burst of requests can fire
+far more simultaneous Vertex AI calls than the quota allows. The limiter
+queues calls beyond the cap locally instead of letting the provider throttle
+them and RetryPolicy back off on top.
+
+Each model name gets its own cap: settings.model_concurrency_limits[name]
+when set, else settings.max_concurrent_requests. The time spent waiting for
+a slot is recorded as ``llm_limiter.queue_wait_seconds`` (and per model as
+``llm_limiter.<model>.queue_wait_seconds``) to tell local queueing apart from
+provider latency.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from hs_agent.config.settings import settings
+from hs_agent.utils.metrics import metrics
+
+DEFAULT_MODEL_KEY = "default"
+
+
+def model_name_of(model: Any) -> str:
+    """Get the model name behind a (possibly wrapped) LangChain runnable.
+
+    Structured-output runnables are a RunnableSequence whose first step binds
+    the chat model, so the name is found by following ``first``/``bound``.
+
+    Args:
+        model: Chat model or runnable built by ModelFactory
+
+    Returns:
+        Model name, or DEFAULT_MODEL_KEY when it cannot be determined
+    """
+    for _ in range(4):
+        name = getattr(model, "model_name", None)
+        if isinstance(name, str):
+            return name
+        model = getattr(model, "bound", None) or getattr(model, "first", None)
+        if model is None:
+            break
+    return DEFAULT_MODEL_KEY
+
+
+class LLMConcurrencyLimiter:
+    """Per-model async semaphores shared by every RetryPolicy in the process."""
+
+    def __init__(self, limits: dict[str, int] | None = None, default_limit: int | None = None):
+        """Initialize the limiter.
+
+        Args:
+            limits: Per-model caps (defaults to settings.model_concurrency_limits)
+            default_limit: Cap for other models (defaults to settings.max_concurrent_requests)
+        """
+        self._limits = limits
+        self._default_limit = default_limit
+        self._lock = threading.Lock()
+        # asyncio primitives are bound to one event loop, so semaphores are kept per loop
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]
+        ] = weakref.WeakKeyDictionary()
+
+    def limit_for(self, model_name: str) -> int:
+        """Get the concurrency cap of a model."""
+        limits = settings.model_concurrency_limits if self._limits is None else self._limits
+        if model_name in limits:
+            return limits[model_name]
+        return self._default_limit or settings.max_concurrent_requests
+
+    def _semaphore(self, model_name: str) -> asyncio.Semaphore:
+        """Get the semaphore of a model on the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._semaphores.setdefault(loop, {})
+            semaphore = semaphores.get(model_name)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.limit_for(model_name))
+                semaphores[model_name] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        model_name: str,
+        step: str | None = None,  # noqa: ARG002
+    ) -> AsyncIterator[None]:
+        """Hold one of a model's concurrency slots for the duration of a call.
+
+        Args:
+            model_name: Model being called
+            step: Config step of the call (unused by fixed limits)
+        """
+        semaphore = self._semaphore(model_name)
+        start = time.perf_counter()
+        async with semaphore:
+            waited = time.perf_counter() - start
+            metrics.observe("llm_limiter.queue_wait_seconds", waited)
+            metrics.observe(f"llm_limiter.{model_name}.queue_wait_seconds", waited)
+            yield
+
+    def reset(self) -> None:
+        """Drop all semaphores (limits are re-read on next use)."""
+        with self._lock:
+            self._semaphores = weakref.WeakKeyDictionary()
+
+
+# Process-wide limiter used by RetryPolicy
+llm_limiter = LLMConcurrencyLimiter()
@@ -0,0 +1,47 @@
+"""Per-request deadlines.
+
+A classification is only useful if it finishes within the request's time
+budget. The deadline is kept in a ContextVar, so it is set once where a
+request starts (HSAgent.classify/classify_multi) and is visible to every LLM
+call the request makes, including calls in tasks spawned for concurrent
+branches, without threading it through the workflows.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_deadline: ContextVar[float | None] = ContextVar("hs_agent_request_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[None]:
+    """Run a block under a deadline ``seconds`` from now.
+
+    A scope nested in another keeps the earlier of the two deadlines.
+
+    Args:
+        seconds: Time budget of the block (None or <= 0 means no new deadline)
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> float | None:
+    """Get the time left before the current request's deadline.
+
+    Returns:
+        Seconds left (<= 0 once the deadline has passed), or None without a deadline
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
@@ -0,0 +1,130 @@
+"""Classification of LLM call errors for retries and concurrency control.
+
+Not every failure deserves a retry:
+
+- THROTTLED: the provider is shedding load (429/503, ResourceExhausted,
+  ServiceUnavailable). Retry, after the provider's retry-after hint if any,
+  and tell the concurrency limiter to back off.
+- FATAL: the request itself is wrong (invalid argument or schema, auth,
+  permissions, unknown model, or a local programming error). Retrying would
+  fail the same way, so give up at once.
+- RETRYABLE: everything else (timeouts, 5xx, dropped connections, malformed
+  model output) may succeed on another attempt.
+
+Errors are recognized by class name and status code rather than by type, so
+google.api_core, HTTP client and LangChain errors are handled without
+importing any of them.
+"""
+
+from enum import Enum
+from typing import Any
+
+# Exception class names / status codes treated as provider throttling
+THROTTLING_ERROR_NAMES = frozenset(
+    ["ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "RateLimitError"]
+)
+THROTTLING_STATUS_CODES = frozenset([429, 503])
+
+# Exception class names / status codes of requests that can never succeed as sent
+FATAL_ERROR_NAMES = frozenset(
+    [
+        "InvalidArgument",
+        "BadRequest",
+        "Unauthenticated",
+        "Unauthorized",
+        "PermissionDenied",
+        "Forbidden",
+        "NotFound",
+        "FailedPrecondition",
+        "MethodNotImplemented",
+    ]
+)
+FATAL_STATUS_CODES = frozenset([400, 401, 403, 404, 422])
+# Local bugs, not transient failures
+FATAL_ERROR_TYPES = (TypeError, AttributeError, KeyError, NotImplementedError)
+
+
+class ErrorKind(str, Enum):
+    """How a failed LLM call should be handled."""
+
+    RETRYABLE = "retryable"
+    THROTTLED = "throttled"
+    FATAL = "fatal"
+
+
+def _status_code(error: BaseException) -> int | None:
+    """Get the HTTP-style status code of an error, if it has one."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    try:
+        return int(code)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """Check whether an error means the provider is shedding load.
+
+    Args:
+        error: Exception raised by a model call
+
+    Returns:
+        True for rate limiting / overload errors (google.api_core or HTTP style)
+    """
+    if type(error).__name__ in THROTTLING_ERROR_NAMES:
+        return True
+    return _status_code(error) in THROTTLING_STATUS_CODES
+
+
+def classify_error(error: BaseException) -> ErrorKind:
+    """Classify an error raised by a model call.
+
+    Args:
+        error: Exception raised by a model call
+
+    Returns:
+        ErrorKind of the error
+    """
+    if is_throttling_error(error):
+        return ErrorKind.THROTTLED
+    if (
+        type(error).__name__ in FATAL_ERROR_NAMES
+        or _status_code(error) in FATAL_STATUS_CODES
+        or isinstance(error, FATAL_ERROR_TYPES)
+    ):
+        return ErrorKind.FATAL
+    return ErrorKind.RETRYABLE
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """Get the provider's retry-after hint from an error.
+
+    Looks for (in order) a ``retry_after`` attribute, a ``Retry-After`` header
+    on an attached HTTP response, and a google.rpc RetryInfo ``retry_delay``
+    in the error details.
+
+    Args:
+        error: Exception raised by a model call
+
+    Returns:
+        Seconds to wait before retrying, or None without a usable hint
+    """
+    hint: Any = getattr(error, "retry_after", None)
+    if hint is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if headers is not None:
+            try:
+                hint = headers.get("retry-after") or headers.get("Retry-After")
+            except AttributeError:
+                hint = None
+    if hint is None:
+        for detail in getattr(error, "details", None) or []:
+            delay = getattr(detail, "retry_delay", None)
+            if delay is not None:
+                hint = getattr(delay, "seconds", 0) + getattr(delay, "nanos", 0) / 1e9
+                break
+
+    try:
+        seconds = float(hint)
+    except (TypeError, ValueError):
+        return None
+    return seconds if seconds >= 0 else None
@@ -0,0 +1,131 @@
+"""Hedged LLM requests.
+
+Tail latency of a classification is dominated by single slow model calls,
+not by the average. When hedging is enabled, a call that has not returned by
+the running p95 latency of its config step (e.g. "select_heading_candidates")
+gets a duplicate; whichever copy succeeds first is used and the other one is
+cancelled.
+
+Hedges cost extra calls, so they are capped process-wide by a token bucket
+(like the retry budget): each hedgeable call deposits ``max_extra_ratio``
+tokens (5% by default) and each hedge withdraws one. The bucket starts empty
+and holds at most ``max_burst`` tokens, so credit earned over hours of healthy
+traffic cannot all be spent at once when the provider slows down and every
+call runs past its p95: over any stretch of calls, hedges stay within
+``max_extra_ratio`` of them plus ``max_burst``. A step is only
+hedged once it has ``MIN_HEDGE_SAMPLES`` latency samples. Fired hedges, hedges
+that won and hedges skipped by the cap are counted as ``llm_hedge.fired`` /
+``llm_hedge.wins`` / ``llm_hedge.capped``.
+"""
+
+import math
+import threading
+from collections import deque
+
+from hs_agent.config.settings import settings
+from hs_agent.utils.metrics import metrics
+
+# Latency samples needed before a step is hedged
+MIN_HEDGE_SAMPLES = 20
+# Recent latencies kept per step
+LATENCY_WINDOW = 500
+
+
+class HedgingPolicy:
+    """Per-step latency percentiles and the process-wide hedge token bucket."""
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_extra_ratio: float | None = None,
+        max_burst: float | None = None,
+        min_samples: int = MIN_HEDGE_SAMPLES,
+        window: int = LATENCY_WINDOW,
+    ):
+        """Initialize the policy.
+
+        Args:
+            percentile: Latency percentile after which a call is hedged
+            max_extra_ratio: Highest share of calls that may be hedged (defaults
+                to settings.hedge_max_extra_ratio)
+            max_burst: Most hedge tokens that can be saved up (defaults to
+                settings.hedge_max_burst)
+            min_samples: Latency samples a step needs before it is hedged
+            window: Recent latencies kept per step
+        """
+        self.percentile = percentile
+        self._max_extra_ratio = max_extra_ratio
+        self._max_burst = max_burst
+        self.min_samples = min_samples
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies: dict[str, deque[float]] = {}
+        self._tokens = 0.0
+
+    @property
+    def max_extra_ratio(self) -> float:
+        """Highest share of calls that may be hedged."""
+        if self._max_extra_ratio is None:
+            return settings.hedge_max_extra_ratio
+        return self._max_extra_ratio
+
+    @property
+    def max_burst(self) -> float:
+        """Most hedge tokens that can be saved up."""
+        return settings.hedge_max_burst if self._max_burst is None else self._max_burst
+
+    def record(self, step: str, latency: float) -> None:
+        """Record the latency of a successful call of a step.
+
+        Args:
+            step: Config step name
+            latency: Call latency in seconds
+        """
+        with self._lock:
+            samples = self._latencies.get(step)
+            if samples is None:
+                samples = self._latencies[step] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def hedge_delay(self, step: str) -> float | None:
+        """Get how long a call of a step may run before it is hedged.
+
+        Every call asking for a delay deposits ``max_extra_ratio`` hedge tokens.
+
+        Args:
+            step: Config step name
+
+        Returns:
+            The step's running latency percentile, or None if it has too few samples
+        """
+        with self._lock:
+            self._tokens = min(self.max_burst, self._tokens + self.max_extra_ratio)
+            samples = self._latencies.get(step)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[max(0, math.ceil(self.percentile * len(ordered)) - 1)]
+
+    def try_hedge(self) -> bool:
+        """Withdraw the token of one hedge.
+
+        Returns:
+            True if the hedge may be fired
+        """
+        with self._lock:
+            # Tolerate the rounding of repeated fractional deposits (10 x 0.1)
+            allowed = self._tokens >= 1 or math.isclose(self._tokens, 1)
+            if allowed:
+                self._tokens = max(0.0, self._tokens - 1)
+        metrics.increment("llm_hedge.fired" if allowed else "llm_hedge.capped")
+        return allowed
+
+    def reset(self) -> None:
+        """Drop all latency samples and hedge tokens."""
+        with self._lock:
+            self._latencies.clear()
+            self._tokens = 0.0
+
+
+# Process-wide policy used by RetryPolicy
+hedging_policy = HedgingPolicy()
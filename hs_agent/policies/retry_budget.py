@@ -0,0 +1,92 @@
+"""Process-wide retry budget.
+
+During a partial provider outage every in-flight classification retries
+each failing LLM call independently, multiplying the load on a backend that
+is already struggling. The retry budget is a token bucket shared by every
+RetryPolicy in the process:
+
+- each successful call deposits ``ratio`` tokens (so retries are limited to
+  about ``ratio`` times the successful calls)
+- each retry withdraws one token, and is not made when less than one is left
+- the bucket holds at most ``max_tokens`` (and starts full), allowing a burst
+  of retries after a quiet period
+
+When the budget is exhausted, RetryPolicy gives up at once and the caller
+falls back to the "000000" (insufficient information) response. The tokens
+left are published as the ``retry_budget.tokens`` gauge, and retries that
+were allowed / denied are counted as ``retry_budget.allowed`` /
+``retry_budget.denied``.
+"""
+
+import threading
+
+from hs_agent.config.settings import settings
+from hs_agent.utils.metrics import metrics
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a share of successful calls."""
+
+    def __init__(self, ratio: float | None = None, max_tokens: float | None = None):
+        """Initialize the budget.
+
+        Args:
+            ratio: Tokens deposited per successful call (defaults to settings.retry_budget_ratio)
+            max_tokens: Bucket capacity (defaults to settings.retry_budget_max_tokens)
+        """
+        self._ratio = ratio
+        self._max_tokens = max_tokens
+        self._lock = threading.Lock()
+        # Filled on first use, so the capacity is read from settings lazily
+        self._tokens: float | None = None
+
+    @property
+    def ratio(self) -> float:
+        """Tokens deposited per successful call."""
+        return settings.retry_budget_ratio if self._ratio is None else self._ratio
+
+    @property
+    def max_tokens(self) -> float:
+        """Bucket capacity."""
+        return settings.retry_budget_max_tokens if self._max_tokens is None else self._max_tokens
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently in the bucket."""
+        with self._lock:
+            return self._current()
+
+    def record_success(self) -> None:
+        """Deposit ``ratio`` tokens for a successful call."""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._current() + self.ratio)
+            metrics.set_gauge("retry_budget.tokens", self._tokens)
+
+    def try_acquire(self) -> bool:
+        """Withdraw the token of one retry.
+
+        Returns:
+            True if the retry may go ahead, False if the budget is exhausted
+        """
+        with self._lock:
+            tokens = self._current()
+            allowed = tokens >= 1
+            if allowed:
+                self._tokens = tokens - 1
+            metrics.set_gauge("retry_budget.tokens", self._current())
+        metrics.increment("retry_budget.allowed" if allowed else "retry_budget.denied")
+        return allowed
+
+    def reset(self) -> None:
+        """Refill the bucket (the capacity is re-read on next use)."""
+        with self._lock:
+            self._tokens = None
+
+    def _current(self) -> float:
+        if self._tokens is None:
+            self._tokens = float(self.max_tokens)
+        return self._tokens
+
+
+# Process-wide budget used by RetryPolicy
+retry_budget = RetryBudget()
@@ -1,16 +1,44 @@
 """Retry policy for LLM invocations with exponential backoff and prompt variation.
 
 This module provides a reusable retry policy that handles:
-- Exponential backoff for transient failures
+- Exponential backoff for transient failures (capped, optionally full-jitter)
+- Error classification: fatal errors are not retried, throttled calls honor
+  the provider's retry-after hint (see errors)
+- The per-request deadline: no call or sleep runs past it (see deadline)
 - Prompt variation on retries (adds line breaks)
 - Comprehensive logging of retry attempts
 - Graceful degradation after max retries
+- A process-wide, per-model cap on in-flight calls (fixed, or adaptive - see
+  concurrency_limiter and adaptive_limiter)
+- A process-wide retry budget so outages do not turn into retry storms (see
+  retry_budget)
+- Optional hedging: a duplicate call when the first one is slower than its
+  step's running p95 latency (see hedging)
+- A per-model circuit breaker: while a model's circuit is open, calls go to
+  the fallback model and the model is probed in the background (see
+  circuit_breaker)
+- Optional coalescing: concurrent identical invocations (same model, step and
+  messages) share one run, retries included (see single_flight)
 """
 
 import asyncio
+import random
+import time
+from collections.abc import Callable
+from functools import partial
 from typing import Any
 
+from hs_agent.config.settings import settings
+from hs_agent.policies.adaptive_limiter import adaptive_llm_limiter
+from hs_agent.policies.circuit_breaker import CircuitBreaker, circuit_breaker
+from hs_agent.policies.concurrency_limiter import LLMConcurrencyLimiter, llm_limiter, model_name_of
+from hs_agent.policies.deadline import remaining_time
+from hs_agent.policies.errors import ErrorKind, classify_error, retry_after_seconds
+from hs_agent.policies.hedging import HedgingPolicy, hedging_policy
+from hs_agent.policies.retry_budget import RetryBudget, retry_budget
+from hs_agent.policies.single_flight import SingleFlight
 from hs_agent.utils.logger import get_logger
+from hs_agent.utils.metrics import metrics
 
 logger = get_logger("hs_agent.policies.retry")
 
@@ -19,7 +47,18 @@ class RetryPolicy:
     """Policy for retrying LLM invocations with exponential backoff."""
 
     def __init__(
-        self, max_retries: int = 3, initial_delay: float = 1.0, prompt_variation: bool = True
+        self,
+        max_retries: int = 3,
+        initial_delay: float = 1.0,
+        prompt_variation: bool = True,
+        limiter: LLMConcurrencyLimiter | None = None,
+        max_delay: float = 30.0,
+        jitter: bool = False,
+        budget: RetryBudget | None = None,
+        hedging: bool = False,
+        hedger: HedgingPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        coalescing: bool = False,
     ):
         """Initialize retry policy.
 
@@ -27,34 +66,121 @@ class RetryPolicy:
             max_retries: Maximum number of retry attempts (default: 3)
             initial_delay: Initial delay between retries in seconds (default: 1.0)
             prompt_variation: Whether to add line breaks to prompts on retry (default: True)
+            limiter: Concurrency limiter for model calls (default: the process-wide
+                adaptive limiter if settings.enable_adaptive_concurrency, else the fixed one)
+            max_delay: Upper bound of a backoff delay in seconds (default: 30.0)
+            jitter: Sleep a random time between 0 and the backoff delay ("full
+                jitter") so concurrent retries spread out (default: False)
+            budget: Retry budget consulted before each retry (default: the
+                process-wide budget)
+            hedging: Duplicate calls slower than their step's running p95 latency
+                and use whichever copy succeeds first (default: False)
+            hedger: Latency percentiles and hedge cap (default: the process-wide policy)
+            breaker: Per-model circuit breaker (default: the process-wide breaker)
+            coalescing: Let concurrent identical invocations share one run
+                (default: False)
         """
         self.max_retries = max_retries
         self.initial_delay = initial_delay
         self.prompt_variation = prompt_variation
+        self.max_delay = max_delay
+        self.jitter = jitter
+        if limiter is None:
+            limiter = adaptive_llm_limiter if settings.enable_adaptive_concurrency else llm_limiter
+        self.limiter = limiter
+        self.budget = retry_budget if budget is None else budget
+        self.hedging = hedging
+        self.hedger = hedging_policy if hedger is None else hedger
+        self.breaker = circuit_breaker if breaker is None else breaker
+        # Background probes of open circuits (referenced until done)
+        self._probes: set[asyncio.Future] = set()
+        self.coalescing = coalescing
+        self._flights = SingleFlight("llm_coalescing")
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Get the delay before the retry following a failed attempt.
+
+        Args:
+            attempt: Zero-based number of the failed attempt
+
+        Returns:
+            initial_delay * 2**attempt capped at max_delay (1s, 2s, 4s, ... by
+            default), or a uniform random delay up to that with jitter
+        """
+        delay = min(self.max_delay, self.initial_delay * (2**attempt))
+        return random.uniform(0, delay) if self.jitter else delay
 
     async def invoke_with_retry(
         self,
         model: Any,
         messages: list,
+        step: str | None = None,
+        fallback: Callable[[], Any] | None = None,
+    ) -> Any | None:
+        """Invoke LLM with retry logic, sharing the run of an identical in-flight invocation.
+
+        With coalescing, an invocation of the same model (configured runnables
+        are cached, so the same config gives the same object) with the same
+        step and messages as one already in flight awaits that one instead.
+
+        Args:
+            model: The LLM model to invoke
+            messages: Messages to send to the model
+            step: Config step of the call
+            fallback: Builds the fallback model called while the model's circuit is open
+
+        Returns:
+            LLM response, or None if all retries exhausted (see _invoke_with_retry)
+        """
+        call = partial(self._invoke_with_retry, model, messages, step, fallback)
+        if not self.coalescing:
+            return await call()
+
+        key = (id(model), step, tuple((type(m).__name__, str(m.content)) for m in messages))
+        result, _ = await self._flights.do(key, call)
+        return result
+
+    async def _invoke_with_retry(
+        self,
+        model: Any,
+        messages: list,
+        step: str | None = None,
+        fallback: Callable[[], Any] | None = None,
     ) -> Any | None:
         """Invoke LLM with retry logic for None results.
 
         Args:
             model: The LLM model to invoke
             messages: Messages to send to the model
+            step: Config step of the call (e.g. "select_chapter_candidates"); calls
+                are only hedged when it is given
+            fallback: Builds the fallback model called while the model's circuit is
+                open (without it, calls go to the model whatever its circuit state)
 
         Returns:
             LLM response, or None if all retries exhausted
 
         Note:
-            Returns None if all retries are exhausted. Caller should handle this
-            by returning a "000000" (insufficient information) response.
+            Returns None if all retries are exhausted, on a fatal error, when
+            the retry budget is exhausted, or when the request deadline leaves
+            no time for another attempt. Caller
+            should handle this by returning a "000000" (insufficient information)
+            response.
 
             On retries, adds line breaks to the prompt for variation if enabled.
         """
         last_exception = None
+        model_name = model_name_of(model)
+        attempts = 0
 
         for attempt in range(self.max_retries):
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                logger.warning("⏱️  Request deadline reached, not calling the LLM again")
+                break
+
+            attempts += 1
+            target_name = model_name
             try:
                 # Add prompt variation on retries by appending line breaks
                 # This gives the LLM a slightly different context which may help
@@ -66,35 +192,181 @@ class RetryPolicy:
                     ]
                     logger.debug(f"🔄 Added {attempt} line break(s) to prompt for variation")
 
+                target = self._route(model, model_name, messages_to_send, fallback)
+                target_name = model_name_of(target) if target is not model else model_name
+
                 # LangSmith OTEL auto-instruments LLM calls via Logfire
-                result = await model.ainvoke(messages_to_send)
+                if self.hedging and step is not None:
+                    result = await self._call_hedged(
+                        target, messages_to_send, target_name, remaining, step
+                    )
+                else:
+                    result = await self._call(
+                        target, messages_to_send, target_name, remaining, step
+                    )
 
+                # The model answered, even if with an unusable result
+                self.breaker.record_success(target_name)
                 if result is not None:
+                    self.budget.record_success()
                     return result
 
                 # Log None result and retry
                 logger.warning(f"⚠️  LLM returned None (attempt {attempt + 1}/{self.max_retries})")
-
-                if attempt < self.max_retries - 1:
-                    # Exponential backoff: 1s, 2s, 4s, etc.
-                    delay = self.initial_delay * (2**attempt)
-                    logger.info(f"🔄 Retrying in {delay}s...")
-                    await asyncio.sleep(delay)
+                delay = self.backoff_delay(attempt)
 
             except Exception as e:
                 last_exception = e
+                kind = classify_error(e)
+                metrics.increment(f"llm_retry.errors.{kind.value}")
+
+                if kind is ErrorKind.FATAL:
+                    logger.error(f"❌ Non-retryable LLM error: {e}")
+                    break
+                self.breaker.record_failure(target_name)
+
                 logger.warning(
-                    f"⚠️  LLM invocation error (attempt {attempt + 1}/{self.max_retries}): {e}"
+                    f"⚠️  LLM invocation error (attempt {attempt + 1}/{self.max_retries}, "
+                    f"{kind.value}): {e}"
                 )
+                delay = self.backoff_delay(attempt)
+                if kind is ErrorKind.THROTTLED and (hint := retry_after_seconds(e)) is not None:
+                    delay = max(delay, hint)
 
-                if attempt < self.max_retries - 1:
-                    delay = self.initial_delay * (2**attempt)
-                    logger.info(f"🔄 Retrying in {delay}s...")
-                    await asyncio.sleep(delay)
+            if attempt < self.max_retries - 1 and not await self._sleep_before_retry(delay):
+                break
 
         # All retries exhausted - return None to signal caller to use "000000" code
         error_context = f" (last error: {last_exception})" if last_exception else ""
         logger.error(
-            f"❌ LLM failed after {self.max_retries} attempts{error_context} - will return 000000 (insufficient information)"
+            f"❌ LLM failed after {attempts} attempt(s){error_context} - will return 000000 (insufficient information)"
         )
         return None
+
+    def _route(
+        self,
+        model: Any,
+        model_name: str,
+        messages: list,
+        fallback: Callable[[], Any] | None,
+    ) -> Any:
+        """Get the model to call: the fallback model while the model's circuit is open.
+
+        Also starts the background probe of an open circuit once it is due.
+        """
+        if fallback is None or self.breaker.allow_request(model_name):
+            return model
+
+        if self.breaker.try_probe(model_name):
+            probe = asyncio.ensure_future(self._probe(model, messages, model_name))
+            self._probes.add(probe)
+            probe.add_done_callback(self._probes.discard)
+
+        metrics.increment("llm_retry.fallback_calls")
+        logger.debug(f"🔌 Circuit of {model_name} open, calling the fallback model")
+        return fallback()
+
+    async def _probe(self, model: Any, messages: list, model_name: str) -> None:
+        """Call a model with an open circuit to find out whether it recovered."""
+        try:
+            await self._call(model, messages, model_name, settings.request_timeout_seconds)
+        except asyncio.CancelledError:
+            self.breaker.record_failure(model_name)
+            raise
+        except Exception as e:
+            logger.warning(f"🔌 Probe of {model_name} failed: {e}")
+            self.breaker.record_failure(model_name)
+        else:
+            self.breaker.record_success(model_name)
+
+    async def _call(
+        self,
+        model: Any,
+        messages: list,
+        model_name: str,
+        timeout: float | None,
+        step: str | None = None,
+    ) -> Any:
+        """Make one model call under the concurrency limiter and the deadline.
+
+        The limiter slot is held for the call only, never during backoff sleeps.
+        The step keys the adaptive limiter's latency baselines; with hedging,
+        the latency of a successful call is also recorded for hedging.
+        """
+        start = time.perf_counter()
+        async with self.limiter.slot(model_name, step), asyncio.timeout(timeout):
+            result = await model.ainvoke(messages)
+        if self.hedging and step is not None and result is not None:
+            self.hedger.record(step, time.perf_counter() - start)
+        return result
+
+    async def _call_hedged(
+        self, model: Any, messages: list, model_name: str, timeout: float | None, step: str
+    ) -> Any:
+        """Make one model call, duplicated if it is slower than the step's p95.
+
+        Returns:
+            The first non-None result of either copy (None if both return None)
+
+        Raises:
+            The first copy's error if both copies fail
+        """
+        hedge_after = self.hedger.hedge_delay(step)
+        primary = asyncio.ensure_future(self._call(model, messages, model_name, timeout, step))
+        tasks = [primary]
+        try:
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done and self.hedger.try_hedge():
+                    logger.debug(f"🪞 Hedging {step} call after {hedge_after:.2f}s")
+                    tasks.append(
+                        asyncio.ensure_future(
+                            self._call(model, messages, model_name, timeout, step)
+                        )
+                    )
+
+            first_error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in (t for t in tasks if t in done):
+                    if task.exception() is None and task.result() is not None:
+                        if task is not primary:
+                            metrics.increment("llm_hedge.wins")
+                        return task.result()
+                    first_error = first_error or task.exception()
+            if first_error is not None:
+                raise first_error
+            return None
+        finally:
+            # Cancel the loser (or both copies if the caller was cancelled)
+            for task in tasks:
+                task.cancel()
+
+    async def _sleep_before_retry(self, delay: float) -> bool:
+        """Sleep before the next attempt, unless the retry budget is exhausted or
+        the sleep would end past the request deadline.
+
+        Args:
+            delay: Backoff delay in seconds
+
+        Returns:
+            True if the caller should retry, False otherwise
+        """
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            logger.warning(
+                f"⏱️  Not retrying: {delay:.2f}s backoff exceeds the {max(remaining, 0):.2f}s "
+                "left before the request deadline"
+            )
+            metrics.increment("llm_retry.deadline_exceeded")
+            return False
+
+        if not self.budget.try_acquire():
+            logger.warning("🪣 Not retrying: process-wide retry budget exhausted")
+            return False
+
+        metrics.increment("llm_retry.retries")
+        logger.info(f"🔄 Retrying in {delay:.2f}s...")
+        await asyncio.sleep(delay)
+        return True
@@ -0,0 +1,91 @@
+"""Single-flight coalescing of identical concurrent work.
+
+A marketplace import can send the same description hundreds of times at
+once. Before the first classification finishes nothing is cached, so every
+copy would run the whole graph. A SingleFlight runs one task per key and
+lets every concurrent caller with that key await it:
+
+- the first caller (the leader) starts the task; the others join it
+- the task runs in the leader's context (its request deadline applies)
+- a waiter that is cancelled (e.g. its client went away) only stops waiting;
+  the task is cancelled once no waiter is left, so work nobody wants is not
+  finished in the background
+- the key is released as soon as the task finishes, so later callers start
+  afresh (results are reused through the caches, not kept here)
+
+HSAgent coalesces whole classifications by their result cache key, and
+RetryPolicy coalesces identical LLM calls (same model and messages).
+Callers that joined an in-flight task are counted as ``<name>.coalesced``.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+from hs_agent.utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """An in-flight task and the number of callers awaiting it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one task per key at a time, shared by every concurrent caller."""
+
+    def __init__(self, name: str):
+        """Initialize the coalescer.
+
+        Args:
+            name: Metric prefix (e.g. "request_coalescing")
+        """
+        self.name = name
+        self._flights: dict[Hashable, _Flight] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Await the in-flight task for key, starting it with call if there is none.
+
+        Args:
+            key: Identity of the work
+            call: Starts the work (only called by the leader)
+
+        Returns:
+            The task's result, and whether the caller joined another caller's task
+
+        Raises:
+            The task's exception, to every waiter
+        """
+        flight = self._flights.get(key)
+        # A flight left behind by another (closed) event loop cannot be awaited
+        joined = flight is not None and flight.task.get_loop() is asyncio.get_running_loop()
+        if joined:
+            metrics.increment(f"{self.name}.coalesced")
+        else:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._release(key, flight))
+
+        flight.waiters += 1
+        try:
+            # Shielded: one waiter's cancellation must not cancel the others' work
+            return await asyncio.shield(flight.task), joined
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                self._release(key, flight)
+                flight.task.cancel()
+
+    def in_flight(self) -> int:
+        """Get the number of keys with a running task."""
+        return len(self._flights)
+
+    def _release(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,255 @@
+"""Lexical (BM25) candidate retrieval over HS descriptions.
+
+Chapter and heading prompts list every candidate under the parent (all 97
+chapters, or hundreds of headings for chapters like 84/85). A LexicalIndex
+ranks the candidates of one level for a product description so the workflow
+can send only a shortlist, falling back to the full list when the ranking is
+not trustworthy (see LexicalIndex.shortlist).
+
+Each code is indexed with the text of its whole subtree (its own description
+plus all descendant descriptions), since chapter and heading titles alone are
+too terse: "keyboard" matches no chapter title, but matches chapter 84 (and
+92) through subheadings such as 8471.30 (portable data processing machines
+with a keyboard and a display). Words the nomenclature never uses, such as
+"laptop", match nothing at any level and fall back to the full list.
+Postings are stored as flat NumPy arrays (CSR by term) with the BM25 weight
+of each (term, code) pair precomputed, so scoring a query is a handful of
+vectorized slice additions.
+"""
+
+import re
+from collections import Counter
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from hs_agent.code_table import HSCodeTable
+
+# Words that carry no signal in HS descriptions or product titles
+STOPWORDS = frozenset(
+    [
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "but",
+        "by",
+        "for",
+        "from",
+        "in",
+        "into",
+        "is",
+        "it",
+        "its",
+        "nes",
+        "not",
+        "of",
+        "on",
+        "or",
+        "other",
+        "others",
+        "than",
+        "that",
+        "the",
+        "their",
+        "thereof",
+        "this",
+        "to",
+        "whether",
+        "which",
+        "with",
+        "without",
+    ]
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase, lightly stemmed tokens without stopwords.
+
+    Args:
+        text: Description or product text
+
+    Returns:
+        Tokens in text order
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS or (len(token) < 2 and not token.isdigit()):
+            continue
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class BM25Postings:
+    """BM25 weights of a document collection, stored CSR-by-term.
+
+    ``docs[term_ptr[t]:term_ptr[t + 1]]`` are the documents containing term
+    ``t`` and ``weights`` the matching precomputed BM25 term weights, so a
+    query score is the sum of a few array slices.
+    """
+
+    __slots__ = ("term_ptr", "docs", "weights", "n_docs")
+
+    def __init__(self, term_ptr: np.ndarray, docs: np.ndarray, weights: np.ndarray, n_docs: int):
+        self.term_ptr = term_ptr
+        self.docs = docs
+        self.weights = weights
+        self.n_docs = n_docs
+
+    @classmethod
+    def build(
+        cls,
+        documents: Iterable[Iterable[str]],
+        vocabulary: dict[str, int],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "BM25Postings":
+        """Index tokenized documents.
+
+        Args:
+            documents: Tokens per document
+            vocabulary: Token -> term id, extended in place with new tokens
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+
+        Returns:
+            Postings over the documents (document ids in input order)
+        """
+        term_ids: list[int] = []
+        doc_ids: list[int] = []
+        tfs: list[int] = []
+        lengths: list[int] = []
+        for doc, tokens in enumerate(documents):
+            counts = Counter(tokens)
+            lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                doc_ids.append(doc)
+                tfs.append(tf)
+
+        n_docs = len(lengths)
+        terms = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(terms, kind="stable")
+        terms = terms[order]
+        docs = np.asarray(doc_ids, dtype=np.int32)[order]
+        tf = np.asarray(tfs, dtype=np.float32)[order]
+        doc_lengths = np.asarray(lengths, dtype=np.float32)
+
+        df = np.bincount(terms, minlength=len(vocabulary)).astype(np.float32)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        avg_length = float(doc_lengths.mean()) if n_docs else 0.0
+        norm = k1 * (1 - b + b * doc_lengths[docs] / max(avg_length, 1.0))
+
+        return cls(
+            term_ptr=np.concatenate([[0], np.cumsum(df, dtype=np.int64)]),
+            docs=docs,
+            weights=(idf[terms] * tf * (k1 + 1) / (tf + norm)).astype(np.float32),
+            n_docs=n_docs,
+        )
+
+    def score(self, term_ids: Iterable[int]) -> np.ndarray:
+        """Get the BM25 score of every document for a query.
+
+        Args:
+            term_ids: Distinct term ids of the query
+
+        Returns:
+            float32 array of scores per document
+        """
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term in term_ids:
+            postings = slice(self.term_ptr[term], self.term_ptr[term + 1])
+            scores[self.docs[postings]] += self.weights[postings]
+        return scores
+
+
+class LexicalIndex:
+    """BM25 index over the codes of one level of an HSCodeTable."""
+
+    def __init__(self, table: HSCodeTable, level: int, k1: float = 1.2, b: float = 0.75):
+        """Build the index.
+
+        Args:
+            table: Code table to index
+            level: Level whose codes are the documents (e.g. 2 or 4)
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+        """
+        self._table = table
+        view = table.level_view(level)
+        self._start = table.row_of(next(iter(view))) if len(view) else 0
+
+        self.level = level
+        self._vocabulary: dict[str, int] = {}
+        self._postings = BM25Postings.build(
+            (
+                tokenize(" ".join(self._subtree_descriptions(self._start + doc)))
+                for doc in range(len(view))
+            ),
+            self._vocabulary,
+            k1=k1,
+            b=b,
+        )
+
+    def __len__(self) -> int:
+        return self._postings.n_docs
+
+    def shortlist(
+        self,
+        query: str,
+        codes: Sequence[str],
+        keep: int,
+        min_coverage: float = 0.75,
+    ) -> list[str] | None:
+        """Get the best-matching codes among the given candidates.
+
+        Retrieval is considered unreliable, and None is returned so the caller
+        sends the full list, when too few of the query's terms are known to
+        the index (coverage below ``min_coverage``, e.g. "laptop" or brand
+        names that HS descriptions never use) or when no candidate matches.
+
+        Args:
+            query: Product description
+            codes: Candidate codes of this index's level (e.g. a CandidateSet's codes)
+            keep: Maximum number of codes to return
+            min_coverage: Minimum share (0.0-1.0) of query terms known to the index
+
+        Returns:
+            Shortlisted codes in their original order, or None to use all codes
+        """
+        query_tokens = set(tokenize(query))
+        query_terms = [self._vocabulary[t] for t in query_tokens if t in self._vocabulary]
+        if not codes or not query_terms or len(query_terms) / len(query_tokens) < min_coverage:
+            return None
+
+        scores = self._postings.score(query_terms)
+        rows = np.fromiter((self._table.row_of(code) for code in codes), np.int64, len(codes))
+        candidate_scores = scores[rows - self._start]
+        top = np.argsort(-candidate_scores, kind="stable")[:keep]
+        if candidate_scores[top[0]] <= 0:
+            return None
+
+        return [codes[i] for i in np.sort(top)]
+
+    def _subtree_descriptions(self, row: int) -> list[str]:
+        """Get the descriptions of a row and all its descendants.
+
+        Descendants at each level are one contiguous row range, so the subtree
+        is walked level by level without visiting individual children.
+        """
+        table = self._table
+        descriptions = [table.descriptions[row]]
+        start, stop = int(table.child_start[row]), int(table.child_stop[row])
+        while start < stop:
+            descriptions.extend(table.descriptions[start:stop])
+            start, stop = int(table.child_start[start]), int(table.child_stop[stop - 1])
+        return descriptions
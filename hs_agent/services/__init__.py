@@ -1,5 +1,6 @@
 """Service classes for external resources and utilities."""
 
 from .chapter_notes_service import ChapterNotesService
+from .examples_service import ExamplesService, SimilarExample
 
-__all__ = ["ChapterNotesService"]
+__all__ = ["ChapterNotesService", "ExamplesService", "SimilarExample"]
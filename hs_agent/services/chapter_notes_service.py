@@ -7,6 +7,7 @@ Chapter notes contain important information about:
 - Trade classification rules and precedence
 """
 
+from collections.abc import Mapping
 from pathlib import Path
 
 from hs_agent.utils.logger import get_logger
@@ -17,13 +18,20 @@ logger = get_logger("hs_agent.services.chapter_notes")
 class ChapterNotesService:
     """Service for loading and managing HS chapter notes."""
 
-    def __init__(self, notes_directory: str = "data/chapters_markdown"):
+    def __init__(
+        self,
+        notes_directory: str = "data/chapters_markdown",
+        notes: Mapping[str, str] | None = None,
+    ):
         """Initialize the chapter notes service.
 
         Args:
             notes_directory: Path to directory containing chapter note markdown files
+            notes: Preloaded chapter code -> notes text (e.g. from the shared corpus).
+                When given, notes are served from it and the directory is not read.
         """
         self.notes_dir = Path(notes_directory)
+        self.notes = notes
 
     def load_chapter_notes(self, chapter_codes: list[str]) -> str:
         """Load chapter notes for given chapter codes.
@@ -44,6 +52,9 @@ class ChapterNotesService:
             ═══ CHAPTER 92 NOTES ═══
             Musical instruments...
         """
+        if self.notes is not None:
+            return self._format_preloaded_notes(chapter_codes)
+
         if not self.notes_dir.exists():
             logger.warning(f"⚠️  Chapter notes directory not found: {self.notes_dir}")
             return "Chapter notes not available."
@@ -69,3 +80,16 @@ class ChapterNotesService:
             return "No chapter notes available for the chapters in these paths."
 
         return "\n\n".join(chapter_notes)
+
+    def _format_preloaded_notes(self, chapter_codes: list[str]) -> str:
+        """Format notes from the preloaded mapping, same output as the file-based path."""
+        chapter_notes = [
+            f"═══ CHAPTER {chapter_code} NOTES ═══\n{self.notes[chapter_code]}"
+            for chapter_code in sorted(set(chapter_codes))
+            if chapter_code in self.notes
+        ]
+
+        if not chapter_notes:
+            return "No chapter notes available for the chapters in these paths."
+
+        return "\n\n".join(chapter_notes)
@@ -0,0 +1,238 @@
+"""Service for retrieving similar labeled product examples.
+
+The examples file (``hs6_examples_cleaned.csv``) holds ~16k product
+descriptions labeled with their HS6 code. The service keeps a BM25 inverted
+index over those descriptions (see hs_agent.retrieval) so workflows can look
+up the nearest labeled examples of a product, e.g. to:
+
+- inject a few of them into a prompt as few-shot hints (format_examples)
+- use the codes they point to as a candidate shortlist (candidate_codes)
+
+The index is built once per examples file revision and snapshotted next to
+the HS codes snapshots, so later boots memory-map it instead of re-tokenizing.
+"""
+
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from hs_agent import data_snapshot
+from hs_agent.config.settings import settings
+from hs_agent.retrieval import BM25Postings, tokenize
+from hs_agent.utils.logger import get_logger
+
+logger = get_logger("hs_agent.services.examples")
+
+# Bump whenever the index layout changes so old snapshots are ignored
+EXAMPLES_INDEX_VERSION = 1
+
+INDEX_ARRAY_NAMES = (
+    "term_ptr",
+    "docs",
+    "weights",
+    "vocab_blob",
+    "vocab_offsets",
+    "codes",
+    "desc_blob",
+    "desc_offsets",
+    "title_blob",
+    "title_offsets",
+)
+
+
+class SimilarExample(NamedTuple):
+    """Labeled example close to a product description."""
+
+    hs_code: str
+    product_description: str
+    hs_title: str
+    score: float
+
+
+class ExamplesService:
+    """Service for nearest labeled example lookups."""
+
+    def __init__(
+        self,
+        examples_path: Path | None = None,
+        snapshot_dir: Path | None = None,
+        use_snapshot: bool | None = None,
+    ):
+        """Initialize the examples service (the index is loaded on first lookup).
+
+        Args:
+            examples_path: Labeled examples CSV (defaults to settings.examples_path)
+            snapshot_dir: Directory for the index snapshot (defaults to
+                settings.snapshot_directory, then <data_directory>/.snapshots)
+            use_snapshot: Override settings.enable_data_snapshot
+        """
+        self.examples_path = Path(examples_path or settings.examples_path)
+        self.snapshot_dir = (
+            snapshot_dir or settings.snapshot_directory or self.examples_path.parent / ".snapshots"
+        )
+        self.use_snapshot = settings.enable_data_snapshot if use_snapshot is None else use_snapshot
+
+        self._vocabulary: dict[str, int] | None = None
+        self._postings: BM25Postings | None = None
+        self._codes: list[str] = []
+        self._descriptions: data_snapshot.PackedStrings | list[str] = []
+        self._titles: data_snapshot.PackedStrings | list[str] = []
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._codes)
+
+    def find_similar(self, product_description: str, limit: int = 5) -> list[SimilarExample]:
+        """Find the labeled examples closest to a product description.
+
+        Args:
+            product_description: Product to look up
+            limit: Maximum number of examples
+
+        Returns:
+            Examples with a positive BM25 score, best first (empty if nothing matches)
+        """
+        self._ensure_loaded()
+        term_ids = {
+            self._vocabulary[t] for t in tokenize(product_description) if t in self._vocabulary
+        }
+        if not term_ids or limit <= 0:
+            return []
+
+        scores = self._postings.score(term_ids)
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [
+            SimilarExample(self._codes[i], self._descriptions[i], self._titles[i], float(scores[i]))
+            for i in top.tolist()
+            if scores[i] > 0
+        ]
+
+    def candidate_codes(self, product_description: str, limit: int = 10) -> list[str]:
+        """Get the distinct HS6 codes of the nearest examples, best first.
+
+        Args:
+            product_description: Product to look up
+            limit: Maximum number of codes
+
+        Returns:
+            HS6 codes (at most ``limit``)
+        """
+        codes: dict[str, None] = {}
+        for example in self.find_similar(product_description, limit=limit * 5):
+            codes.setdefault(example.hs_code)
+            if len(codes) == limit:
+                break
+        return list(codes)
+
+    def format_examples(self, examples: list[SimilarExample]) -> str:
+        """Format examples as few-shot hints for a prompt.
+
+        Args:
+            examples: Examples from find_similar
+
+        Returns:
+            One "description → code (title)" line per example, or a placeholder
+        """
+        if not examples:
+            return "No similar labeled examples available."
+        return "\n".join(
+            f'- "{example.product_description}" → {example.hs_code} ({example.hs_title})'
+            for example in examples
+        )
+
+    # ========== Index Loading ==========
+
+    def _ensure_loaded(self) -> None:
+        """Load the index from its snapshot, or build it from the CSV."""
+        if self._postings is not None:
+            return
+
+        if not self.examples_path.exists():
+            logger.warning(f"⚠️  Examples file not found: {self.examples_path}")
+            self._vocabulary = {}
+            self._postings = BM25Postings.build([], self._vocabulary)
+            return
+
+        checksum = data_snapshot.file_checksum(self.examples_path)
+        target = self.snapshot_dir / (
+            f"{self.examples_path.stem}-index-v{EXAMPLES_INDEX_VERSION}-{checksum[:16]}"
+        )
+        loaded = (
+            data_snapshot.load_arrays(
+                target,
+                INDEX_ARRAY_NAMES,
+                {"format_version": EXAMPLES_INDEX_VERSION, "source_sha256": checksum},
+            )
+            if self.use_snapshot
+            else None
+        )
+
+        if loaded is not None:
+            _, arrays = loaded
+            self._set_index(arrays)
+            logger.debug(f"Loaded examples index from snapshot {target.name}")
+            return
+
+        arrays = self._build_arrays()
+        self._set_index(arrays)
+        logger.info(f"Indexed {len(self._codes)} labeled examples")
+
+        if self.use_snapshot:
+            meta = {
+                "format_version": EXAMPLES_INDEX_VERSION,
+                "source_file": self.examples_path.name,
+                "source_sha256": checksum,
+                "examples": len(self._codes),
+            }
+            try:
+                if data_snapshot.publish_arrays(target, arrays, meta):
+                    data_snapshot.remove_stale(
+                        self.snapshot_dir,
+                        f"{self.examples_path.stem}-index-v",
+                        keep=target,
+                    )
+            except OSError as e:
+                logger.warning(f"⚠️  Could not write examples index snapshot: {e}")
+
+    def _build_arrays(self) -> dict[str, np.ndarray]:
+        """Parse the examples CSV and build the index arrays."""
+        df = pd.read_csv(self.examples_path, dtype=str, keep_default_na=False)
+        df = df[(df["hs6_code"].str.strip() != "") & (df["product_description"].str.strip() != "")]
+        descriptions = df["product_description"].str.strip().tolist()
+        titles = (
+            df["hs6_title"].str.strip().tolist() if "hs6_title" in df.columns else [""] * len(df)
+        )
+
+        vocabulary: dict[str, int] = {}
+        postings = BM25Postings.build((tokenize(text) for text in descriptions), vocabulary)
+
+        arrays = {
+            "term_ptr": postings.term_ptr,
+            "docs": postings.docs,
+            "weights": postings.weights,
+            "codes": df["hs6_code"].str.strip().to_numpy(dtype=str).astype(np.bytes_),
+        }
+        arrays["vocab_blob"], arrays["vocab_offsets"] = data_snapshot.pack_strings(list(vocabulary))
+        arrays["desc_blob"], arrays["desc_offsets"] = data_snapshot.pack_strings(descriptions)
+        arrays["title_blob"], arrays["title_offsets"] = data_snapshot.pack_strings(titles)
+        return arrays
+
+    def _set_index(self, arrays: dict[str, np.ndarray]) -> None:
+        """Install the index from its arrays (built or memory-mapped)."""
+        self._codes = np.asarray(arrays["codes"]).astype(str).tolist()
+        self._descriptions = data_snapshot.PackedStrings(
+            arrays["desc_blob"], arrays["desc_offsets"]
+        )
+        self._titles = data_snapshot.PackedStrings(arrays["title_blob"], arrays["title_offsets"])
+        vocabulary = data_snapshot.unpack_strings(arrays["vocab_blob"], arrays["vocab_offsets"])
+        self._vocabulary = {token: term for term, token in enumerate(vocabulary)}
+        self._postings = BM25Postings(
+            arrays["term_ptr"], arrays["docs"], arrays["weights"], n_docs=len(self._codes)
+        )
@@ -0,0 +1,192 @@
+"""Read-only nomenclature + chapter notes corpus shared across worker processes.
+
+With ``hs-agent serve --workers N`` every uvicorn worker would otherwise parse
+the HS codes, rebuild the code table and re-read the chapter notes on its own.
+Instead the parent process builds the corpus once into a directory of plain
+``.npy`` arrays (see data_snapshot.publish_arrays) and exports its path in
+SHARED_CORPUS_PATH. Workers memory-map the arrays read-only, so the table
+arrays, descriptions and notes live once in the OS page cache no matter how
+many workers attach, and attaching is much cheaper than loading.
+
+Corpus layout::
+
+    <snapshot_dir>/corpus-v<version>-<digest[:16]>/
+        codes.npy, levels.npy, parent_rows.npy,        HSCodeTable.to_arrays()
+        child_start.npy, child_stop.npy, leaf_counts.npy
+        desc_blob.npy, desc_offsets.npy                 packed descriptions
+        note_chapters.npy                               chapter code per note (S)
+        notes_blob.npy, notes_offsets.npy               packed chapter notes
+        meta.json
+"""
+
+import hashlib
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+
+import numpy as np
+
+from hs_agent import data_snapshot
+from hs_agent.code_table import HSCodeTable
+from hs_agent.utils.logger import get_logger
+
+logger = get_logger("hs_agent.shared_corpus")
+
+# Bump whenever the corpus layout changes so old corpora are ignored
+CORPUS_FORMAT_VERSION = 1
+
+CORPUS_PREFIX = "corpus-v"
+TABLE_ARRAY_NAMES = (
+    "codes",
+    "levels",
+    "parent_rows",
+    "child_start",
+    "child_stop",
+    "leaf_counts",
+)
+CORPUS_ARRAY_NAMES = (
+    *TABLE_ARRAY_NAMES,
+    "desc_blob",
+    "desc_offsets",
+    "note_chapters",
+    "notes_blob",
+    "notes_offsets",
+)
+
+
+class PackedNotes(Mapping[str, str]):
+    """Read-only ``{chapter code: notes}`` mapping over packed, memory-mapped notes."""
+
+    __slots__ = ("_index", "_notes")
+
+    def __init__(self, chapters: list[str], notes: data_snapshot.PackedStrings):
+        self._index = {chapter: i for i, chapter in enumerate(chapters)}
+        self._notes = notes
+
+    def __getitem__(self, chapter: str) -> str:
+        return self._notes[self._index[chapter]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class SharedCorpus:
+    """Code table and chapter notes attached from a shared corpus directory."""
+
+    def __init__(
+        self,
+        path: Path,
+        table: HSCodeTable,
+        notes: Mapping[str, str],
+        version: str | None = None,
+    ):
+        """Initialize the corpus.
+
+        Args:
+            path: Corpus directory the arrays are mapped from
+            table: Code table backed by the mapped arrays
+            notes: Chapter code -> notes text
+            version: Nomenclature revision the table was built from
+        """
+        self.path = path
+        self.table = table
+        self.notes = notes
+        self.version = version
+
+
+def build_shared_corpus(
+    table: HSCodeTable, notes_dir: Path, corpus_dir: Path, version: str | None = None
+) -> Path:
+    """Publish a code table and the chapter notes as a shared corpus.
+
+    The corpus directory name is derived from its contents, so rebuilding an
+    unchanged corpus is a no-op and concurrent builders are safe.
+
+    Args:
+        table: Loaded code table (HSDataLoader.table)
+        notes_dir: Directory with chapter_XX_notes.md files
+        corpus_dir: Root directory to publish into
+        version: Nomenclature revision of the table (HSDataLoader.version)
+
+    Returns:
+        Path of the published corpus directory
+    """
+    arrays = table.to_arrays()
+    arrays["desc_blob"], arrays["desc_offsets"] = data_snapshot.pack_strings(
+        list(table.descriptions)
+    )
+
+    chapters, notes = _read_notes(notes_dir)
+    arrays["note_chapters"] = np.asarray(chapters, dtype=str).astype(np.bytes_)
+    arrays["notes_blob"], arrays["notes_offsets"] = data_snapshot.pack_strings(notes)
+
+    digest = hashlib.sha256(str(version).encode())
+    for name in CORPUS_ARRAY_NAMES:
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    digest = digest.hexdigest()
+
+    target = corpus_dir / f"{CORPUS_PREFIX}{CORPUS_FORMAT_VERSION}-{digest[:16]}"
+    if (target / data_snapshot.META_FILE).exists():
+        return target
+
+    meta = {
+        "format_version": CORPUS_FORMAT_VERSION,
+        "sha256": digest,
+        "nomenclature_version": version,
+        "rows": len(table),
+        "chapter_notes": len(chapters),
+    }
+    if data_snapshot.publish_arrays(target, arrays, meta):
+        data_snapshot.remove_stale(corpus_dir, CORPUS_PREFIX, keep=target)
+        logger.info(
+            f"💾 Built shared corpus {target.name} ({len(table)} codes, {len(chapters)} notes)"
+        )
+    return target
+
+
+def attach_shared_corpus(path: Path) -> SharedCorpus:
+    """Memory-map a shared corpus read-only.
+
+    Args:
+        path: Corpus directory returned by build_shared_corpus
+
+    Returns:
+        SharedCorpus backed by the mapped arrays
+
+    Raises:
+        FileNotFoundError: If the corpus is missing, incomplete or of another format version
+    """
+    loaded = data_snapshot.load_arrays(
+        path, CORPUS_ARRAY_NAMES, {"format_version": CORPUS_FORMAT_VERSION}
+    )
+    if loaded is None:
+        raise FileNotFoundError(f"Shared corpus not found or incompatible: {path}")
+
+    meta, arrays = loaded
+    table = HSCodeTable.from_arrays(
+        arrays["codes"].astype(str).tolist(),
+        data_snapshot.PackedStrings(arrays["desc_blob"], arrays["desc_offsets"]),
+        *(arrays[name] for name in TABLE_ARRAY_NAMES[1:]),
+    )
+    notes = PackedNotes(
+        arrays["note_chapters"].astype(str).tolist(),
+        data_snapshot.PackedStrings(arrays["notes_blob"], arrays["notes_offsets"]),
+    )
+    logger.debug(f"Attached shared corpus {path.name}")
+    return SharedCorpus(path, table, notes, version=meta.get("nomenclature_version"))
+
+
+def _read_notes(notes_dir: Path) -> tuple[list[str], list[str]]:
+    """Read chapter_XX_notes.md files as (chapter codes, stripped contents)."""
+    chapters: list[str] = []
+    notes: list[str] = []
+    if not notes_dir.exists():
+        logger.warning(f"⚠️  Chapter notes directory not found: {notes_dir}")
+        return chapters, notes
+
+    for notes_file in sorted(notes_dir.glob("chapter_*_notes.md")):
+        chapters.append(notes_file.stem.removeprefix("chapter_").removesuffix("_notes"))
+        notes.append(notes_file.read_text(encoding="utf-8").strip())
+    return chapters, notes
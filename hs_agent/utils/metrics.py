@@ -0,0 +1,121 @@
+"""In-process counters, gauges and timings.
+
+A single process-wide ``metrics`` registry collects cheap counters (cache
+hits/misses, retries, ...), gauges (current limits, ...) and timings (build
+time, queue wait, ...) from anywhere in the package. It is thread-safe, so
+it can be updated from asyncio code and worker threads alike, and
+``snapshot()`` returns a plain dict suitable for a health endpoint or a log
+line.
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+@dataclass
+class TimingStats:
+    """Aggregated observations of one timing (seconds)."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        """Average observation (0.0 when nothing was observed)."""
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        """Get the stats as a plain dict."""
+        return {"count": self.count, "total": self.total, "mean": self.mean, "max": self.max}
+
+
+class Metrics:
+    """Thread-safe registry of named counters, gauges and timings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {}
+        self._gauges: dict[str, float] = {}
+        self._timings: dict[str, TimingStats] = {}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Add to a counter (created at 0 on first use).
+
+        Args:
+            name: Counter name (e.g. "model_cache.hits")
+            value: Amount to add
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its current value.
+
+        Args:
+            name: Gauge name (e.g. "llm_limiter.gemini-2.5-flash.limit")
+            value: Current value
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record one observation of a timing.
+
+        Args:
+            name: Timing name (e.g. "model_cache.build_seconds")
+            seconds: Observed duration
+        """
+        with self._lock:
+            stats = self._timings.setdefault(name, TimingStats())
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time a block and record it as one observation of ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def counter(self, name: str) -> int:
+        """Get the current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def gauge(self, name: str) -> float | None:
+        """Get the current value of a gauge (None if never set)."""
+        with self._lock:
+            return self._gauges.get(name)
+
+    def timing(self, name: str) -> TimingStats:
+        """Get a copy of the stats of a timing (empty if never observed)."""
+        with self._lock:
+            stats = self._timings.get(name, TimingStats())
+            return TimingStats(stats.count, stats.total, stats.max)
+
+    def snapshot(self) -> dict[str, dict]:
+        """Get all counters, gauges and timings as plain dicts."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": {name: stats.as_dict() for name, stats in self._timings.items()},
+            }
+
+    def reset(self) -> None:
+        """Clear all counters, gauges and timings."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timings.clear()
+
+
+# Process-wide registry
+metrics = Metrics()
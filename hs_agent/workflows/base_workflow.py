@@ -4,6 +4,15 @@ This module provides common functionality shared by both single-path and
 multi-path classification workflows to reduce code duplication.
 """
 
+import asyncio
+import json
+from collections.abc import Mapping
+from typing import Any
+
+from hs_agent.cache import CacheBackend, ResultCache, fingerprint, selection_cache_key
+from hs_agent.config.settings import settings
+from hs_agent.config_loader import get_model_params
+from hs_agent.data_loader import CandidateSet
 from hs_agent.models import ClassificationLevel
 
 
@@ -12,13 +21,22 @@ class BaseWorkflow:
 
     Provides common utilities:
     - Level name mapping and formatting
-    - Candidates list formatting
+    - Candidates list formatting (cached per CandidateSet)
     - Template variable building with parent context
     - Confidence calculation with weighted averages
+    - Sharding of oversized candidate lists (per-step ``sharding`` config)
+    - Fallback model configs for the circuit breaker
+    - Per-level selection caching (in memory and in the shared cache backend)
     """
 
     # Class-level constants
-    LEVEL_NAMES = {"2": "CHAPTER", "4": "HEADING", "6": "SUBHEADING"}
+    LEVEL_NAMES = {
+        "2": "CHAPTER",
+        "4": "HEADING",
+        "6": "SUBHEADING",
+        "8": "TARIFF LINE",
+        "10": "STATISTICAL SUFFIX",
+    }
 
     # Confidence weights for overall score calculation
     # Chapter decisions are foundational but less certain at high level
@@ -29,6 +47,26 @@ class BaseWorkflow:
         "subheading": 0.4,
     }
 
+    def __init__(
+        self,
+        configs: dict | None = None,
+        selection_cache: ResultCache | None = None,
+        shared_cache: CacheBackend | None = None,
+    ):
+        """Initialize the per-workflow selection caching state.
+
+        Args:
+            configs: Workflow configuration dictionary (step config name -> config)
+            selection_cache: In-memory cache of per-level selections (None disables
+                selection caching)
+            shared_cache: Shared cache backend behind selection_cache
+        """
+        self.configs = configs or {}
+        self.selection_cache = selection_cache
+        self.shared_cache = shared_cache
+        # Step config name -> fingerprint, part of every selection key
+        self.config_hashes = {name: fingerprint(config) for name, config in self.configs.items()}
+
     @classmethod
     def calculate_overall_confidence(
         cls, chapter_conf: float, heading_conf: float, subheading_conf: float
@@ -61,17 +99,50 @@ class BaseWorkflow:
         """
         return self.LEVEL_NAMES[level.value]
 
-    def _format_candidates_list(self, codes_dict: dict) -> str:
+    def _format_candidates_list(self, codes_dict: Mapping) -> str:
         """Format HS codes dictionary into a human-readable candidates list.
 
+        CandidateSets carry a precomputed block, so it is returned as-is.
+
         Args:
-            codes_dict: Dictionary mapping code strings to HSCode objects
+            codes_dict: Mapping of code strings to HS code records, or a CandidateSet
 
         Returns:
             Formatted string with one candidate per line: "code: description"
         """
+        if isinstance(codes_dict, CandidateSet):
+            return codes_dict.prompt_block
         return "\n".join([f"{code}: {hs.description}" for code, hs in codes_dict.items()])
 
+    def _candidate_codes(self, codes_dict: Mapping) -> tuple[str, ...]:
+        """Get the candidate codes used for the LLM enum constraint.
+
+        Args:
+            codes_dict: Mapping of code strings to HS code records, or a CandidateSet
+
+        Returns:
+            Tuple of candidate codes (cached on CandidateSets)
+        """
+        if isinstance(codes_dict, CandidateSet):
+            return codes_dict.codes
+        return tuple(codes_dict)
+
+    @staticmethod
+    def _fallback_config(config: dict[str, Any]) -> dict[str, Any] | None:
+        """Get a copy of a step config that calls settings.fallback_model_name.
+
+        Args:
+            config: Step config
+
+        Returns:
+            The config with the fallback model, or None when the step already
+            uses it (or no fallback model is set)
+        """
+        fallback_model_name = settings.fallback_model_name
+        if not fallback_model_name or fallback_model_name == get_model_params(config)["model_name"]:
+            return None
+        return {**config, "model": {**config.get("model", {}), "name": fallback_model_name}}
+
     def _add_parent_context(
         self, template_vars: dict, level: ClassificationLevel, parent_code: str = None
     ) -> None:
@@ -80,10 +151,111 @@ class BaseWorkflow:
         Args:
             template_vars: Template variables dictionary (modified in place)
             level: Current classification level
-            parent_code: Parent code (chapter for heading, heading for subheading)
+            parent_code: Parent code (chapter for heading, heading for subheading,
+                subheading or tariff line for the national levels)
         """
         if parent_code:
             if level == ClassificationLevel.HEADING:
                 template_vars["parent_chapter"] = parent_code
             elif level == ClassificationLevel.SUBHEADING:
                 template_vars["parent_heading"] = parent_code
+            elif level in (ClassificationLevel.TARIFF_LINE, ClassificationLevel.STATISTICAL_SUFFIX):
+                template_vars["parent_code"] = parent_code
+
+    def _candidate_shards(self, codes_dict: Mapping, config: dict) -> list[dict] | None:
+        """Split an oversized candidate list into shards for tournament selection.
+
+        Steps opt in through their config.yaml::
+
+            sharding:
+              threshold: 40   # shard lists with more candidates than this
+              shard_size: 25  # maximum candidates per shard
+
+        Args:
+            codes_dict: Mapping of code strings to HS code records, or a CandidateSet
+            config: Step configuration
+
+        Returns:
+            Balanced shards (code -> record, in candidate order), or None when the
+            step has no sharding config or the list is within the threshold
+        """
+        sharding = config.get("sharding") or {}
+        threshold = sharding.get("threshold")
+        if not threshold or len(codes_dict) <= threshold:
+            return None
+
+        shard_size = max(2, min(int(sharding.get("shard_size", threshold)), int(threshold)))
+        codes = self._candidate_codes(codes_dict)
+        n_shards = -(-len(codes) // shard_size)
+        base, extra = divmod(len(codes), n_shards)
+
+        shards = []
+        start = 0
+        for i in range(n_shards):
+            stop = start + base + (i < extra)
+            shards.append({code: codes_dict[code] for code in codes[start:stop]})
+            start = stop
+        return shards
+
+    def _selection_key(
+        self,
+        product_description: str,
+        codes_dict: Mapping,
+        level: ClassificationLevel,
+        config_name: str,
+        parent_code: str | None = None,
+        max_selections: int | None = None,
+    ) -> str | None:
+        """Get the cache key of a selection step (None when selection caching is off).
+
+        Args:
+            product_description: Product being classified
+            codes_dict: Candidates of the step
+            level: Classification level
+            config_name: Step config name
+            parent_code: Parent code of the candidates
+            max_selections: Codes selected (multi-selection steps only)
+
+        Returns:
+            Key shared by every workflow running the same step config
+        """
+        if self.selection_cache is None or not settings.enable_selection_cache:
+            return None
+        return selection_cache_key(
+            product_description,
+            level=level.value,
+            parent_code=parent_code,
+            candidates=self._format_candidates_list(codes_dict),
+            config_hash=self.config_hashes.get(config_name, ""),
+            model=self.model_name,
+            max_selections=max_selections,
+        )
+
+    async def _cached_selection(self, cache_key: str) -> Any | None:
+        """Get a cached selection from memory, else from the shared backend.
+
+        Args:
+            cache_key: Key from _selection_key
+
+        Returns:
+            The decoded selection, or None on a miss
+        """
+        payload = self.selection_cache.get(cache_key)
+        if payload is None and self.shared_cache is not None:
+            # Backend reads are blocking I/O: keep them off the event loop
+            payload = await asyncio.to_thread(self.shared_cache.get, cache_key)
+            if payload is not None:
+                self.selection_cache.set(cache_key, payload)
+        return None if payload is None else json.loads(payload)
+
+    def _store_selection(self, cache_key: str, selection: Any) -> None:
+        """Cache a selection in memory and (in the background) in the shared backend.
+
+        Args:
+            cache_key: Key from _selection_key
+            selection: JSON-serializable selection
+        """
+        payload = json.dumps(selection).encode()
+        self.selection_cache.set(cache_key, payload)
+        if self.shared_cache is not None:
+            self.shared_cache.set(cache_key, payload)
@@ -2,20 +2,24 @@
 
 This workflow explores multiple classification paths simultaneously:
 1. Select top N chapters (2-digit)
-2. For each chapter, select top N headings (4-digit)
-3. For each heading, select top N subheadings (6-digit)
+2. For each chapter, select top N headings (4-digit), chapters concurrently
+3. For each heading, select top N subheadings (6-digit), headings concurrently
 4. Build all possible classification paths
 5. Compare paths using chapter notes and select the single best HS code
 """
 
-from typing import Any
+import asyncio
+from collections.abc import Awaitable, Iterable, Mapping
+from functools import partial
+from typing import Any, TypeVar
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import END, START, StateGraph
 
+from hs_agent.cache import CacheBackend, ResultCache
 from hs_agent.config.settings import settings
 from hs_agent.config_loader import get_prompt
-from hs_agent.data_loader import HSDataLoader
+from hs_agent.data_loader import ROOT_CODE, HSDataLoader
 from hs_agent.factories import ModelFactory
 from hs_agent.graph_models import MultiChoiceState
 from hs_agent.models import (
@@ -31,6 +35,8 @@ from hs_agent.workflows.base_workflow import BaseWorkflow
 
 logger = get_logger("hs_agent.workflows.multi_path")
 
+T = TypeVar("T")
+
 
 class MultiPathWorkflow(BaseWorkflow):
     """Workflow for multi-path HS code classification with path comparison."""
@@ -42,6 +48,8 @@ class MultiPathWorkflow(BaseWorkflow):
         configs: dict,
         retry_policy: RetryPolicy,
         chapter_notes_service: ChapterNotesService,
+        selection_cache: ResultCache | None = None,
+        shared_cache: CacheBackend | None = None,
     ):
         """Initialize the multi-path workflow.
 
@@ -51,10 +59,13 @@ class MultiPathWorkflow(BaseWorkflow):
             configs: Workflow configuration dictionary
             retry_policy: Retry policy for LLM invocations
             chapter_notes_service: Service for loading chapter notes
+            selection_cache: In-memory cache of per-level selections (None disables
+                selection caching)
+            shared_cache: Shared cache backend behind selection_cache
         """
+        super().__init__(configs, selection_cache, shared_cache)
         self.data_loader = data_loader
         self.model_name = model_name
-        self.configs = configs
         self.retry_policy = retry_policy
         self.chapter_notes_service = chapter_notes_service
 
@@ -82,10 +93,14 @@ class MultiPathWorkflow(BaseWorkflow):
     # ========== Multi-Choice Graph Nodes ==========
 
     async def _multi_select_chapters(self, state: MultiChoiceState) -> MultiChoiceState:
-        """Evaluate all chapters and select 1-N best."""
+        """Evaluate all chapters (or the pre-filtered shortlist) and select 1-N best."""
+        codes = self.data_loader.shortlist(
+            self.data_loader.candidate_set(ClassificationLevel.CHAPTER, ROOT_CODE),
+            state["product_description"],
+        )
         result = await self._multi_select_codes(
             state["product_description"],
-            self.data_loader.codes_2digit,
+            codes,
             "select_chapter_candidates",
             ClassificationLevel.CHAPTER,
             max_selections=state["max_selections"],
@@ -98,66 +113,100 @@ class MultiPathWorkflow(BaseWorkflow):
         }
 
     async def _multi_select_headings(self, state: MultiChoiceState) -> MultiChoiceState:
-        """Evaluate all headings for each chapter and select 1-N best."""
-        selected_headings = {}
-        confidences = {}
-        reasonings = {}
-
-        for chapter_code in state["selected_chapters"]:
-            codes = {
-                c: h for c, h in self.data_loader.codes_4digit.items() if c.startswith(chapter_code)
-            }
-            result = await self._multi_select_codes(
+        """Evaluate all headings for each chapter (concurrently) and select 1-N best."""
+        chapter_codes = state["selected_chapters"]
+        results = await self._run_branches(
+            self._multi_select_codes(
                 state["product_description"],
-                codes,
+                self.data_loader.shortlist(
+                    self.data_loader.candidate_set(ClassificationLevel.HEADING, chapter_code),
+                    state["product_description"],
+                ),
                 "select_heading_candidates",
                 ClassificationLevel.HEADING,
                 max_selections=state["max_selections"],
                 parent_code=chapter_code,
             )
-            selected_headings[chapter_code] = result["codes"]
-            confidences[chapter_code] = result["confidences"]
-            reasonings[chapter_code] = result["reasonings"]
+            for chapter_code in chapter_codes
+        )
 
         return {
             **state,
-            "selected_headings_by_chapter": selected_headings,
-            "heading_confidences_by_chapter": confidences,
-            "heading_reasonings_by_chapter": reasonings,
+            "selected_headings_by_chapter": {
+                code: result["codes"] for code, result in zip(chapter_codes, results, strict=True)
+            },
+            "heading_confidences_by_chapter": {
+                code: result["confidences"]
+                for code, result in zip(chapter_codes, results, strict=True)
+            },
+            "heading_reasonings_by_chapter": {
+                code: result["reasonings"]
+                for code, result in zip(chapter_codes, results, strict=True)
+            },
         }
 
     async def _multi_select_subheadings(self, state: MultiChoiceState) -> MultiChoiceState:
-        """Evaluate all subheadings for each heading and select 1-N best."""
-        selected_subheadings = {}
-        confidences = {}
-        reasonings = {}
-
-        for _chapter_code, headings in state["selected_headings_by_chapter"].items():
-            for heading_code in headings:
-                codes = {
-                    c: h
-                    for c, h in self.data_loader.codes_6digit.items()
-                    if c.startswith(heading_code)
-                }
-                result = await self._multi_select_codes(
-                    state["product_description"],
-                    codes,
-                    "select_subheading_candidates",
-                    ClassificationLevel.SUBHEADING,
-                    max_selections=state["max_selections"],
-                    parent_code=heading_code,
-                )
-                selected_subheadings[heading_code] = result["codes"]
-                confidences[heading_code] = result["confidences"]
-                reasonings[heading_code] = result["reasonings"]
+        """Evaluate all subheadings for each heading (concurrently) and select 1-N best."""
+        heading_codes = [
+            heading_code
+            for headings in state["selected_headings_by_chapter"].values()
+            for heading_code in headings
+        ]
+        results = await self._run_branches(
+            self._multi_select_codes(
+                state["product_description"],
+                self.data_loader.candidate_set(ClassificationLevel.SUBHEADING, heading_code),
+                "select_subheading_candidates",
+                ClassificationLevel.SUBHEADING,
+                max_selections=state["max_selections"],
+                parent_code=heading_code,
+            )
+            for heading_code in heading_codes
+        )
 
         return {
             **state,
-            "selected_subheadings_by_heading": selected_subheadings,
-            "subheading_confidences_by_heading": confidences,
-            "subheading_reasonings_by_heading": reasonings,
+            "selected_subheadings_by_heading": {
+                code: result["codes"] for code, result in zip(heading_codes, results, strict=True)
+            },
+            "subheading_confidences_by_heading": {
+                code: result["confidences"]
+                for code, result in zip(heading_codes, results, strict=True)
+            },
+            "subheading_reasonings_by_heading": {
+                code: result["reasonings"]
+                for code, result in zip(heading_codes, results, strict=True)
+            },
         }
 
+    async def _run_branches(self, calls: Iterable[Awaitable[T]]) -> list[T]:
+        """Run one request's branch selections concurrently.
+
+        At most settings.max_branch_concurrency branches are in flight at once.
+        Results come back in the order of ``calls`` regardless of completion
+        order, so path building stays deterministic. If a branch fails, the
+        others are cancelled and its exception propagates unchanged.
+
+        Args:
+            calls: Branch coroutines, in parent order
+
+        Returns:
+            Branch results in the same order
+        """
+        semaphore = asyncio.Semaphore(settings.max_branch_concurrency)
+
+        async def run(call: Awaitable[T]) -> T:
+            async with semaphore:
+                return await call
+
+        tasks = [asyncio.ensure_future(run(call)) for call in calls]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
     async def _multi_build_paths(self, state: MultiChoiceState) -> MultiChoiceState:
         """Build all complete classification paths from selections."""
         paths = []
@@ -278,11 +327,15 @@ Select the SINGLE BEST HS code from these {len(paths)} paths."""
         try:
             # Get config-specific model for comparison
             comparison_model = ModelFactory.create_with_config(self.model_name, config)
+            fallback_config = self._fallback_config(config)
 
-            # Invoke with retry logic
+            # Invoke with retry logic (on the fallback model while the circuit is open)
             result = await self.retry_policy.invoke_with_retry(
                 comparison_model,
                 [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)],
+                step="compare_final_codes",
+                fallback=fallback_config
+                and partial(ModelFactory.create_with_config, self.model_name, fallback_config),
             )
 
             # Handle exhausted retries - return "000000" (insufficient information)
@@ -327,20 +380,65 @@ Select the SINGLE BEST HS code from these {len(paths)} paths."""
     async def _multi_select_codes(
         self,
         product_description: str,
-        codes_dict: dict,
+        codes_dict: Mapping,
         config_name: str,
         level: ClassificationLevel,
         max_selections: int = 3,
         parent_code: str | None = None,
+        allow_sharding: bool = True,
     ) -> dict[str, Any]:
-        """Evaluate all codes and select 1-N best using multi-selection."""
+        """Select 1-N best codes, reusing a cached selection of the same step.
 
-        # Use base class helper to format candidates
-        candidates_list = self._format_candidates_list(codes_dict)
+        Only real selections are cached, not "000000" results (which may come
+        from a transient LLM failure).
+        """
+        cache_key = self._selection_key(
+            product_description, codes_dict, level, config_name, parent_code, max_selections
+        )
+        if cache_key and (cached := await self._cached_selection(cache_key)) is not None:
+            return cached
+
+        result = await self._multi_select_codes_uncached(
+            product_description,
+            codes_dict,
+            config_name,
+            level,
+            max_selections,
+            parent_code,
+            allow_sharding,
+        )
+        if cache_key and not any(map(is_no_hs_code, result["codes"])):
+            self._store_selection(cache_key, result)
+        return result
+
+    async def _multi_select_codes_uncached(
+        self,
+        product_description: str,
+        codes_dict: Mapping,
+        config_name: str,
+        level: ClassificationLevel,
+        max_selections: int = 3,
+        parent_code: str | None = None,
+        allow_sharding: bool = True,
+    ) -> dict[str, Any]:
+        """Evaluate all codes and select 1-N best using multi-selection.
+
+        Candidate lists above the step's sharding threshold are selected as a
+        tournament instead (see _multi_select_codes_sharded).
+        """
 
         # Get config
         config = self.configs.get(config_name, {})
 
+        shards = self._candidate_shards(codes_dict, config) if allow_sharding else None
+        if shards:
+            return await self._multi_select_codes_sharded(
+                product_description, shards, config_name, level, max_selections, parent_code
+            )
+
+        # Use base class helper to format candidates
+        candidates_list = self._format_candidates_list(codes_dict)
+
         system_prompt = (
             get_prompt(config, "system")
             or f"""You are an HS code classification expert.
@@ -372,14 +470,24 @@ Evaluate all codes and select 1-{max_selections} most accurate codes."""
 
         try:
             # Use ModelFactory for multi-selection with enum constraints
+            candidate_codes = self._candidate_codes(codes_dict)
             multi_selection_model = ModelFactory.create_for_multi_selection(
-                self.model_name, config, list(codes_dict.keys())
+                self.model_name, config, candidate_codes
             )
+            fallback_config = self._fallback_config(config)
 
-            # Invoke with retry logic
+            # Invoke with retry logic (on the fallback model while the circuit is open)
             result = await self.retry_policy.invoke_with_retry(
                 multi_selection_model,
                 [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)],
+                step=config_name,
+                fallback=fallback_config
+                and partial(
+                    ModelFactory.create_for_multi_selection,
+                    self.model_name,
+                    fallback_config,
+                    candidate_codes,
+                ),
             )
 
             # Handle exhausted retries - return "000000" (insufficient information)
@@ -449,3 +557,72 @@ Evaluate all codes and select 1-{max_selections} most accurate codes."""
         except Exception as e:
             logger.error(f"❌ Multi-selection failed for config '{config_name}': {e}")
             raise RuntimeError(f"Multi-selection failed for config '{config_name}': {e}") from e
+
+    async def _multi_select_codes_sharded(
+        self,
+        product_description: str,
+        shards: list[dict],
+        config_name: str,
+        level: ClassificationLevel,
+        max_selections: int = 3,
+        parent_code: str | None = None,
+    ) -> dict[str, Any]:
+        """Multi-select from each shard in parallel, then select among the shard winners.
+
+        Args:
+            product_description: Product being classified
+            shards: Candidate shards from _candidate_shards
+            config_name: Step config used for the shard and final calls
+            level: Classification level
+            max_selections: Maximum codes to select
+            parent_code: Parent code of the candidates
+
+        Returns:
+            Selection over the shard winners (no final call if they already fit
+            within max_selections)
+        """
+        logger.debug(
+            f"Sharding {sum(map(len, shards))} {self._get_level_name(level)} candidates "
+            f"into {len(shards)} shards"
+        )
+        results = await asyncio.gather(
+            *(
+                self._multi_select_codes(
+                    product_description,
+                    shard,
+                    config_name,
+                    level,
+                    max_selections=max_selections,
+                    parent_code=parent_code,
+                    allow_sharding=False,
+                )
+                for shard in shards
+            )
+        )
+
+        winners: dict[str, tuple[float, str, Any]] = {}
+        for result, shard in zip(results, shards, strict=True):
+            for code, confidence, reasoning in zip(
+                result["codes"], result["confidences"], result["reasonings"], strict=True
+            ):
+                if code in shard:
+                    winners[code] = (confidence, reasoning, shard[code])
+
+        if not winners:
+            return results[0]
+        if len(winners) <= max_selections:
+            return {
+                "codes": list(winners),
+                "confidences": [confidence for confidence, _, _ in winners.values()],
+                "reasonings": [reasoning for _, reasoning, _ in winners.values()],
+            }
+
+        return await self._multi_select_codes(
+            product_description,
+            {code: record for code, (_, _, record) in winners.items()},
+            config_name,
+            level,
+            max_selections=max_selections,
+            parent_code=parent_code,
+            allow_sharding=False,
+        )
@@ -4,14 +4,22 @@ This workflow performs step-by-step hierarchical classification:
 1. Select best chapter (2-digit)
 2. Select best heading within chapter (4-digit)
 3. Select best subheading within heading (6-digit)
-4. Calculate final confidence score
+4. If national levels are loaded and the subheading has HTS subdivisions,
+   descend to the 8-digit tariff line and 10-digit statistical suffix
+   (single-child levels are taken without an LLM call)
+5. Calculate final confidence score
 """
 
+import asyncio
+from collections.abc import Mapping
+from functools import partial
+
 from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import END, START, StateGraph
 
+from hs_agent.cache import CacheBackend, ResultCache
 from hs_agent.config_loader import get_prompt
-from hs_agent.data_loader import HSDataLoader
+from hs_agent.data_loader import ROOT_CODE, HSDataLoader
 from hs_agent.factories import ModelFactory
 from hs_agent.graph_models import ClassificationState
 from hs_agent.models import (
@@ -31,7 +39,13 @@ class SinglePathWorkflow(BaseWorkflow):
     """Workflow for single-path hierarchical HS code classification."""
 
     def __init__(
-        self, data_loader: HSDataLoader, model_name: str, configs: dict, retry_policy: RetryPolicy
+        self,
+        data_loader: HSDataLoader,
+        model_name: str,
+        configs: dict,
+        retry_policy: RetryPolicy,
+        selection_cache: ResultCache | None = None,
+        shared_cache: CacheBackend | None = None,
     ):
         """Initialize the single-path workflow.
 
@@ -40,10 +54,13 @@ class SinglePathWorkflow(BaseWorkflow):
             model_name: Name of the LLM model to use
             configs: Workflow configuration dictionary
             retry_policy: Retry policy for LLM invocations
+            selection_cache: In-memory cache of per-level selections (None disables
+                selection caching)
+            shared_cache: Shared cache backend behind selection_cache
         """
+        super().__init__(configs, selection_cache, shared_cache)
         self.data_loader = data_loader
         self.model_name = model_name
-        self.configs = configs
         self.retry_policy = retry_policy
 
     def build_graph(self):
@@ -54,13 +71,19 @@ class SinglePathWorkflow(BaseWorkflow):
         workflow.add_node("select_chapter", self._select_chapter)
         workflow.add_node("select_heading", self._select_heading)
         workflow.add_node("select_subheading", self._select_subheading)
+        workflow.add_node("select_national", self._select_national)
         workflow.add_node("finalize", self._finalize)
 
         # Define edges
         workflow.add_edge(START, "select_chapter")
         workflow.add_edge("select_chapter", "select_heading")
         workflow.add_edge("select_heading", "select_subheading")
-        workflow.add_edge("select_subheading", "finalize")
+        workflow.add_conditional_edges(
+            "select_subheading",
+            self._route_after_subheading,
+            {"select_national": "select_national", "finalize": "finalize"},
+        )
+        workflow.add_edge("select_national", "finalize")
         workflow.add_edge("finalize", END)
 
         return workflow.compile()
@@ -68,10 +91,14 @@ class SinglePathWorkflow(BaseWorkflow):
     # ========== Graph Node Methods ==========
 
     async def _select_chapter(self, state: ClassificationState) -> ClassificationState:
-        """Evaluate all chapters and select the best one."""
+        """Evaluate all chapters (or the pre-filtered shortlist) and select the best one."""
+        codes = self.data_loader.shortlist(
+            self.data_loader.candidate_set(ClassificationLevel.CHAPTER, ROOT_CODE),
+            state["product_description"],
+        )
         result = await self._select_code(
             state["product_description"],
-            self.data_loader.codes_2digit,
+            codes,
             ClassificationLevel.CHAPTER,
             config_name="select_chapter_candidates",
         )
@@ -80,9 +107,10 @@ class SinglePathWorkflow(BaseWorkflow):
     async def _select_heading(self, state: ClassificationState) -> ClassificationState:
         """Evaluate all headings under selected chapter and select the best one."""
         chapter_code = state["chapter_result"].selected_code
-        codes = {
-            c: h for c, h in self.data_loader.codes_4digit.items() if c.startswith(chapter_code)
-        }
+        codes = self.data_loader.shortlist(
+            self.data_loader.candidate_set(ClassificationLevel.HEADING, chapter_code),
+            state["product_description"],
+        )
         result = await self._select_code(
             state["product_description"],
             codes,
@@ -95,9 +123,7 @@ class SinglePathWorkflow(BaseWorkflow):
     async def _select_subheading(self, state: ClassificationState) -> ClassificationState:
         """Evaluate all subheadings under selected heading and select the best one."""
         heading_code = state["heading_result"].selected_code
-        codes = {
-            c: h for c, h in self.data_loader.codes_6digit.items() if c.startswith(heading_code)
-        }
+        codes = self.data_loader.candidate_set(ClassificationLevel.SUBHEADING, heading_code)
         result = await self._select_code(
             state["product_description"],
             codes,
@@ -107,6 +133,55 @@ class SinglePathWorkflow(BaseWorkflow):
         )
         return {**state, "subheading_result": result}
 
+    def _route_after_subheading(self, state: ClassificationState) -> str:
+        """Continue to the national levels only if the subheading has HTS subdivisions."""
+        if self.data_loader.child_count(state["subheading_result"].selected_code):
+            return "select_national"
+        return "finalize"
+
+    async def _select_national(self, state: ClassificationState) -> ClassificationState:
+        """Descend through the national (HTS) levels below the selected subheading.
+
+        Each level is an O(1) children lookup in the code table; a parent with a
+        single subdivision is selected directly without an LLM call.
+        """
+        results = {}
+        parent_code = state["subheading_result"].selected_code
+        for level, key in (
+            (ClassificationLevel.TARIFF_LINE, "tariff_line_result"),
+            (ClassificationLevel.STATISTICAL_SUFFIX, "statistical_suffix_result"),
+        ):
+            codes = self.data_loader.candidate_set(level, parent_code)
+            if not codes:
+                break
+
+            if len(codes) == 1:
+                (code,) = codes.codes
+                result = ClassificationResult(
+                    level=level,
+                    selected_code=code,
+                    description=codes[code].description,
+                    confidence=1.0,
+                    reasoning=f"Only {self._get_level_name(level).lower()} under {parent_code}",
+                )
+            else:
+                result = await self._select_code(
+                    state["product_description"],
+                    codes,
+                    level,
+                    config_name="select_national_candidates",
+                    parent_code=parent_code,
+                )
+                if is_no_hs_code(result.selected_code):
+                    # Keep the 6-digit classification rather than a made-up national code
+                    break
+
+            results[key] = result
+            parent_code = result.selected_code
+
+        national_code = parent_code if results else None
+        return {**state, **results, "national_code": national_code}
+
     async def _finalize(self, state: ClassificationState) -> ClassificationState:
         """Calculate final confidence and code."""
         overall_confidence = self.calculate_overall_confidence(
@@ -125,19 +200,57 @@ class SinglePathWorkflow(BaseWorkflow):
     async def _select_code(
         self,
         product_description: str,
-        codes_dict: dict,
+        codes_dict: Mapping,
         level: ClassificationLevel,
         config_name: str = "select_chapter_candidates",
         parent_code: str | None = None,
+        allow_sharding: bool = True,
     ) -> ClassificationResult:
-        """Evaluate all codes and select the best one using config prompts."""
+        """Select the best code, reusing a cached selection of the same step.
 
-        # Use base class helper to format candidates
-        candidates_list = self._format_candidates_list(codes_dict)
+        Only real selections are cached, not "000000" results (which may come
+        from a transient LLM failure).
+        """
+        cache_key = self._selection_key(
+            product_description, codes_dict, level, config_name, parent_code
+        )
+        if cache_key and (cached := await self._cached_selection(cache_key)) is not None:
+            return ClassificationResult.model_validate(cached)
+
+        result = await self._select_code_uncached(
+            product_description, codes_dict, level, config_name, parent_code, allow_sharding
+        )
+        if cache_key and not is_no_hs_code(result.selected_code):
+            self._store_selection(cache_key, result.model_dump(mode="json"))
+        return result
+
+    async def _select_code_uncached(
+        self,
+        product_description: str,
+        codes_dict: Mapping,
+        level: ClassificationLevel,
+        config_name: str = "select_chapter_candidates",
+        parent_code: str | None = None,
+        allow_sharding: bool = True,
+    ) -> ClassificationResult:
+        """Evaluate all codes and select the best one using config prompts.
+
+        Candidate lists above the step's sharding threshold are selected as a
+        tournament instead (see _select_code_sharded).
+        """
 
         # Use prompts from config if available
         config = self.configs.get(config_name, {})
 
+        shards = self._candidate_shards(codes_dict, config) if allow_sharding else None
+        if shards:
+            return await self._select_code_sharded(
+                product_description, shards, level, config_name, parent_code
+            )
+
+        # Use base class helper to format candidates
+        candidates_list = self._format_candidates_list(codes_dict)
+
         system_prompt = (
             get_prompt(config, "system")
             or """You are an HS code classification expert.
@@ -167,14 +280,24 @@ Evaluate all codes and select the most accurate one."""
         try:
             # Get config-specific model for this selection step
             # Pass enum codes to constrain LLM to only select from valid codes
+            enum_codes = self._candidate_codes(codes_dict)
             selection_model = ModelFactory.create_with_config(
-                self.model_name, config, enum_codes=list(codes_dict.keys())
+                self.model_name, config, enum_codes=enum_codes
             )
+            fallback_config = self._fallback_config(config)
 
-            # Invoke with retry logic
+            # Invoke with retry logic (on the fallback model while the circuit is open)
             result = await self.retry_policy.invoke_with_retry(
                 selection_model,
                 [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)],
+                step=config_name,
+                fallback=fallback_config
+                and partial(
+                    ModelFactory.create_with_config,
+                    self.model_name,
+                    fallback_config,
+                    enum_codes=enum_codes,
+                ),
             )
 
             # Handle exhausted retries - return "000000" (insufficient information)
@@ -209,3 +332,60 @@ Evaluate all codes and select the most accurate one."""
         except Exception as e:
             logger.error(f"❌ Selection failed for config '{config_name}': {e}")
             raise RuntimeError(f"Selection failed for config '{config_name}': {e}") from e
+
+    async def _select_code_sharded(
+        self,
+        product_description: str,
+        shards: list[dict],
+        level: ClassificationLevel,
+        config_name: str,
+        parent_code: str | None = None,
+    ) -> ClassificationResult:
+        """Select from each shard in parallel, then pick the best shard winner.
+
+        Args:
+            product_description: Product being classified
+            shards: Candidate shards from _candidate_shards
+            level: Classification level
+            config_name: Step config used for the shard and final calls
+            parent_code: Parent code of the candidates
+
+        Returns:
+            Result of the final call over the shard winners (no final call if
+            only one shard produced a winner)
+        """
+        logger.debug(
+            f"Sharding {sum(map(len, shards))} {self._get_level_name(level)} candidates "
+            f"into {len(shards)} shards"
+        )
+        results = await asyncio.gather(
+            *(
+                self._select_code(
+                    product_description,
+                    shard,
+                    level,
+                    config_name=config_name,
+                    parent_code=parent_code,
+                    allow_sharding=False,
+                )
+                for shard in shards
+            )
+        )
+
+        winners = {}
+        for result, shard in zip(results, shards, strict=True):
+            if not is_no_hs_code(result.selected_code):
+                winners[result.selected_code] = (result, shard[result.selected_code])
+        if not winners:
+            return max(results, key=lambda result: result.confidence)
+        if len(winners) == 1:
+            return next(iter(winners.values()))[0]
+
+        return await self._select_code(
+            product_description,
+            {code: record for code, (_, record) in winners.items()},
+            level,
+            config_name=config_name,
+            parent_code=parent_code,
+            allow_sharding=False,
+        )
@@ -17,6 +17,7 @@ import pytest
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from hs_agent.cache import near_duplicate_index, result_cache, selection_cache  # noqa: E402
 from hs_agent.config.settings import HSAgentSettings  # noqa: E402
 
 
@@ -45,6 +46,14 @@ class ProductExample:
         self.confidence = confidence
 
 
+@pytest.fixture(autouse=True)
+def empty_result_cache():
+    """Start every test with empty process-wide result and selection caches."""
+    result_cache.clear()
+    selection_cache.clear()
+    near_duplicate_index.clear()
+
+
 @pytest.fixture(scope="session")
 def test_settings():
     """Provide test-specific settings."""
@@ -427,6 +436,59 @@ def sample_multi_choice_state():
     }
 
 
+@pytest.fixture
+def classification_state():
+    """Provide a builder of the final state of a single-path classification graph run."""
+    from hs_agent.models import ClassificationLevel, ClassificationResult
+
+    def build(final_code: str = "847130", description: str = "Portable computers") -> dict:
+        results = {
+            f"{name}_result": ClassificationResult(
+                level=level,
+                selected_code=final_code[: int(level.value)],
+                description=description,
+                confidence=0.9,
+                reasoning="test",
+            )
+            for name, level in [
+                ("chapter", ClassificationLevel.CHAPTER),
+                ("heading", ClassificationLevel.HEADING),
+                ("subheading", ClassificationLevel.SUBHEADING),
+            ]
+        }
+        return {**results, "final_code": final_code, "overall_confidence": 0.9}
+
+    return build
+
+
+@pytest.fixture
+def make_agent():
+    """Provide a builder of single-path HSAgents with a private (cold) result cache.
+
+    Keyword arguments are passed on to HSAgent (e.g. shared_cache).
+    """
+    from hs_agent.agent import HSAgent
+    from hs_agent.cache import ResultCache
+    from hs_agent.data_loader import HSDataLoader
+
+    def build(**kwargs):
+        return HSAgent(
+            data_loader=Mock(spec=HSDataLoader),
+            workflow_name="single_path_classification",
+            nomenclature_version="2022",
+            cache=ResultCache(max_bytes=1_000_000, ttl_seconds=60),
+            **kwargs,
+        )
+
+    return build
+
+
+@pytest.fixture
+def agent(make_agent):
+    """Provide a single-path HSAgent with a private result cache."""
+    return make_agent()
+
+
 # Test utilities
 
 
@@ -0,0 +1,220 @@
+"""Tests for the adaptive (AIMD) concurrency limiter.
+
+Tests cover:
+- Admission beyond the current limit
+- Additive increase only while the limit is used
+- Multiplicative decrease on throttling (once per overload window) and persistent
+  latency spikes (per-step baselines that follow a lasting latency shift)
+- RetryPolicy selecting the adaptive limiter from settings
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from hs_agent.policies import AdaptiveConcurrencyLimiter, RetryPolicy, adaptive_llm_limiter
+from hs_agent.policies import adaptive_limiter as adaptive_limiter_module
+from hs_agent.policies.adaptive_limiter import MIN_LATENCY_SAMPLES, SPIKE_PERSISTENCE
+from hs_agent.utils.metrics import metrics
+
+
+class ResourceExhausted(Exception):
+    """Stand-in for google.api_core.exceptions.ResourceExhausted."""
+
+
+async def call(limiter, hold=0.0, error=None, model="gemini-2.5-flash"):
+    """Make one call through the limiter."""
+    async with limiter.slot(model):
+        await asyncio.sleep(hold)
+        if error is not None:
+            raise error
+
+
+@pytest.fixture
+def clock():
+    """Fake perf_counter clock of the limiter, advanced by timed_call."""
+    fake = SimpleNamespace(now=0.0)
+    fake.perf_counter = lambda: fake.now
+    with patch.object(adaptive_limiter_module, "time", fake):
+        yield fake
+
+
+async def timed_call(limiter, clock, latency, step="select_chapter_candidates"):
+    """Make one call through the limiter taking ``latency`` seconds on the fake clock."""
+    async with limiter.slot("gemini-2.5-flash", step):
+        clock.now += latency
+
+
+def make_limiter(limit, **kwargs):
+    """Create an adaptive limiter starting every model at ``limit``."""
+    kwargs.setdefault("max_limit", 100)
+    return AdaptiveConcurrencyLimiter(limits={}, default_limit=limit, **kwargs)
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Tests for AdaptiveConcurrencyLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_admits_up_to_limit(self):
+        """Test calls beyond the current limit wait for a slot."""
+        limiter = make_limiter(2)
+        running = 0
+        peak = 0
+
+        async def tracked():
+            nonlocal running, peak
+            async with limiter.slot("gemini-2.5-flash"):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.002)
+                running -= 1
+
+        await asyncio.gather(*(tracked() for _ in range(6)))
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_additive_increase_when_saturated(self):
+        """Test healthy calls at the limit raise it, capped at max_limit."""
+        limiter = make_limiter(2, max_limit=3)
+
+        for _ in range(10):
+            await asyncio.gather(*(call(limiter, hold=0.001) for _ in range(4)))
+
+        assert limiter.current_limit("gemini-2.5-flash") == 3
+        assert metrics.gauge("llm_limiter.gemini-2.5-flash.limit") == 3
+
+    @pytest.mark.asyncio
+    async def test_no_increase_when_underused(self):
+        """Test one call at a time does not grow a limit of 10."""
+        limiter = make_limiter(10)
+
+        for _ in range(5):
+            await call(limiter)
+
+        assert limiter.current_limit("gemini-2.5-flash") == 10
+
+    @pytest.mark.asyncio
+    async def test_multiplicative_decrease_on_throttling(self):
+        """Test a throttling error halves the limit, other errors do not."""
+        limiter = make_limiter(8)
+
+        with pytest.raises(ValueError):
+            await call(limiter, error=ValueError("bad output"))
+        assert limiter.current_limit("gemini-2.5-flash") == 8
+
+        with pytest.raises(ResourceExhausted):
+            await call(limiter, error=ResourceExhausted("quota"))
+        assert limiter.current_limit("gemini-2.5-flash") == 4
+
+    @pytest.mark.asyncio
+    async def test_one_decrease_per_overload_window(self):
+        """Test concurrent failures started before a decrease only cut once."""
+        limiter = make_limiter(8)
+
+        results = await asyncio.gather(
+            *(call(limiter, hold=0.001, error=ResourceExhausted("quota")) for _ in range(4)),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, ResourceExhausted) for result in results)
+        assert limiter.current_limit("gemini-2.5-flash") == 4
+
+    @pytest.mark.asyncio
+    async def test_limit_floor(self):
+        """Test the limit never drops below min_limit."""
+        limiter = make_limiter(2, min_limit=1)
+
+        for _ in range(3):
+            with pytest.raises(ResourceExhausted):
+                await call(limiter, error=ResourceExhausted("quota"))
+
+        assert limiter.current_limit("gemini-2.5-flash") == 1
+
+    @pytest.mark.asyncio
+    async def test_decrease_on_persistent_latency_spikes(self, clock):
+        """Test calls persistently far slower than the step's baseline cut the limit."""
+        limiter = make_limiter(8)
+
+        for _ in range(MIN_LATENCY_SAMPLES):
+            await timed_call(limiter, clock, 0.01)
+        for _ in range(SPIKE_PERSISTENCE):
+            await timed_call(limiter, clock, 0.1)
+
+        assert limiter.current_limit("gemini-2.5-flash") == 4
+
+    @pytest.mark.asyncio
+    async def test_single_spike_does_not_cut(self, clock):
+        """Test one slow call among healthy ones leaves the limit alone."""
+        limiter = make_limiter(8)
+
+        for _ in range(MIN_LATENCY_SAMPLES):
+            await timed_call(limiter, clock, 0.01)
+        await timed_call(limiter, clock, 0.1)
+        for _ in range(MIN_LATENCY_SAMPLES):
+            await timed_call(limiter, clock, 0.01)
+
+        assert limiter.current_limit("gemini-2.5-flash") == 8
+
+    @pytest.mark.asyncio
+    async def test_latency_shift_cuts_at_most_once(self, clock):
+        """Test a lasting shift to a slower healthy latency is absorbed by the baseline."""
+        metrics.reset()
+        limiter = make_limiter(10)
+
+        for latency in [0.01] * 30 + [0.03] * 30:
+            await timed_call(limiter, clock, latency)
+
+        assert limiter.current_limit("gemini-2.5-flash") == 5
+        assert metrics.counter("llm_limiter.gemini-2.5-flash.decreases.latency_spike") == 1
+
+    @pytest.mark.asyncio
+    async def test_steps_have_own_baselines(self, clock):
+        """Test a slow step is not judged against the baseline of a fast one."""
+        limiter = make_limiter(8)
+
+        for _ in range(MIN_LATENCY_SAMPLES):
+            await timed_call(limiter, clock, 0.01, step="select_chapter_candidates")
+        for _ in range(2 * MIN_LATENCY_SAMPLES):
+            await timed_call(limiter, clock, 0.1, step="select_subheading_candidates")
+
+        assert limiter.current_limit("gemini-2.5-flash") == 8
+
+    @pytest.mark.asyncio
+    async def test_limit_recovers_after_latency_shift(self, clock):
+        """Test the limit grows back once the baseline has followed a latency shift."""
+        metrics.reset()
+        # At a limit of 2, one call at a time uses the limit
+        limiter = make_limiter(2, max_limit=2)
+
+        for latency in [0.01] * 30 + [0.03] * 30:
+            await timed_call(limiter, clock, latency)
+
+        assert metrics.counter("llm_limiter.gemini-2.5-flash.decreases.latency_spike") == 1
+        assert limiter.current_limit("gemini-2.5-flash") == 2
+
+    @pytest.mark.asyncio
+    async def test_models_adapt_independently(self):
+        """Test throttling one model leaves the others' limits alone."""
+        limiter = make_limiter(8)
+
+        with pytest.raises(ResourceExhausted):
+            await call(limiter, error=ResourceExhausted("quota"), model="gemini-2.5-pro")
+        await call(limiter)
+
+        assert limiter.current_limits() == {"gemini-2.5-pro": 4, "gemini-2.5-flash": 8}
+
+
+class TestRetryPolicyAdaptive:
+    """Tests for plugging the adaptive limiter into RetryPolicy."""
+
+    def test_selected_from_settings(self):
+        """Test RetryPolicy uses the adaptive limiter when enabled."""
+        with patch("hs_agent.policies.retry_policy.settings") as mock_settings:
+            mock_settings.enable_adaptive_concurrency = True
+            assert RetryPolicy().limiter is adaptive_llm_limiter
+
+            mock_settings.enable_adaptive_concurrency = False
+            assert RetryPolicy().limiter is not adaptive_llm_limiter
@@ -3,12 +3,18 @@
 Tests cover:
 - Confidence calculation with weighted averages
 - Level name mapping
-- Candidates list formatting
+- Candidates list formatting and cached candidate sets
 - Parent context addition to template variables
+- Candidate sharding for tournament selection
+- Fallback model configs
+- Per-instance selection caching state
 """
 
+from unittest.mock import patch
+
 import pytest
 
+from hs_agent.data_loader import CandidateSet
 from hs_agent.models import ClassificationLevel
 from hs_agent.workflows.base_workflow import BaseWorkflow
 
@@ -22,6 +28,8 @@ class TestBaseWorkflowConstants:
             "2": "CHAPTER",
             "4": "HEADING",
             "6": "SUBHEADING",
+            "8": "TARIFF LINE",
+            "10": "STATISTICAL SUFFIX",
         }
 
     def test_confidence_weights_values(self):
@@ -177,6 +185,37 @@ class TestFormatCandidatesList:
         assert lines[1] == "02: Second"
         assert lines[2] == "03: Third"
 
+    def test_uses_precomputed_candidate_set_block(self, mock_data_loader):
+        """Test CandidateSets return their cached block without reformatting."""
+        workflow = BaseWorkflow()
+        candidates = CandidateSet(
+            ClassificationLevel.CHAPTER, "TOTAL", mock_data_loader.codes_2digit
+        )
+
+        result = workflow._format_candidates_list(candidates)
+
+        assert result is candidates.prompt_block
+        assert result == "84: Machinery\n62: Articles of apparel"
+
+
+class TestCandidateCodes:
+    """Tests for _candidate_codes method."""
+
+    def test_plain_dict_returns_tuple(self, mock_data_loader):
+        """Test codes of a plain dict come back as a tuple in order."""
+        workflow = BaseWorkflow()
+
+        assert workflow._candidate_codes(mock_data_loader.codes_2digit) == ("84", "62")
+
+    def test_candidate_set_returns_cached_tuple(self, mock_data_loader):
+        """Test CandidateSets return their cached code tuple."""
+        workflow = BaseWorkflow()
+        candidates = CandidateSet(
+            ClassificationLevel.CHAPTER, "TOTAL", mock_data_loader.codes_2digit
+        )
+
+        assert workflow._candidate_codes(candidates) is candidates.codes
+
 
 class TestAddParentContext:
     """Tests for _add_parent_context method."""
@@ -218,6 +257,18 @@ class TestAddParentContext:
         assert template_vars["parent_heading"] == "8471"
         assert "parent_chapter" not in template_vars
 
+    def test_national_level_adds_parent_code(self):
+        """Test parent_code added for the national (HTS) levels."""
+        workflow = BaseWorkflow()
+        template_vars = {"product_description": "test"}
+
+        workflow._add_parent_context(
+            template_vars, ClassificationLevel.STATISTICAL_SUFFIX, parent_code="84714101"
+        )
+
+        assert template_vars["parent_code"] == "84714101"
+        assert "parent_heading" not in template_vars
+
     def test_no_parent_code_no_context(self):
         """Test no context added when parent_code is None."""
         workflow = BaseWorkflow()
@@ -264,3 +315,81 @@ class TestAddParentContext:
         assert template_vars["level"] == "HEADING"
         # New var added
         assert template_vars["parent_chapter"] == "84"
+
+
+class TestCandidateShards:
+    """Tests for _candidate_shards method."""
+
+    @staticmethod
+    def codes(n):
+        """Build n candidate codes in order."""
+        return {f"{i:02d}": f"record {i}" for i in range(1, n + 1)}
+
+    def test_no_sharding_config(self):
+        """Test steps without a sharding config are never sharded."""
+        assert BaseWorkflow()._candidate_shards(self.codes(100), {}) is None
+
+    def test_within_threshold(self):
+        """Test lists up to the threshold are not sharded."""
+        config = {"sharding": {"threshold": 10, "shard_size": 4}}
+
+        assert BaseWorkflow()._candidate_shards(self.codes(10), config) is None
+
+    def test_balanced_shards_in_order(self):
+        """Test shards are balanced and keep candidate order."""
+        config = {"sharding": {"threshold": 4, "shard_size": 4}}
+
+        shards = BaseWorkflow()._candidate_shards(self.codes(10), config)
+
+        assert [len(shard) for shard in shards] == [4, 3, 3]
+        assert [code for shard in shards for code in shard] == list(self.codes(10))
+        assert shards[0]["01"] == "record 1"
+
+    def test_shard_size_capped_by_threshold(self):
+        """Test shards never exceed the threshold (so they are not re-sharded)."""
+        config = {"sharding": {"threshold": 3, "shard_size": 50}}
+
+        shards = BaseWorkflow()._candidate_shards(self.codes(7), config)
+
+        assert max(len(shard) for shard in shards) <= 3
+
+
+class TestFallbackConfig:
+    """Tests for _fallback_config."""
+
+    def test_swaps_model_name(self):
+        """Test the fallback config calls the fallback model with the step's parameters."""
+        config = {"model": {"name": "gemini-2.5-pro", "parameters": {"temperature": 0.2}}}
+
+        with patch("hs_agent.workflows.base_workflow.settings") as mock_settings:
+            mock_settings.fallback_model_name = "gemini-2.5-flash"
+            fallback = BaseWorkflow._fallback_config(config)
+
+        assert fallback["model"] == {"name": "gemini-2.5-flash", "parameters": {"temperature": 0.2}}
+        assert config["model"]["name"] == "gemini-2.5-pro"
+
+    def test_none_when_step_uses_fallback(self):
+        """Test there is no fallback for a step already calling the fallback model."""
+        with patch("hs_agent.workflows.base_workflow.settings") as mock_settings:
+            mock_settings.fallback_model_name = "gemini-2.5-flash"
+
+            assert BaseWorkflow._fallback_config({"model": {"name": "gemini-2.5-flash"}}) is None
+
+
+
+class TestSelectionCachingState:
+    """Tests for the selection caching state set up by BaseWorkflow.__init__."""
+
+    def test_config_hashes_per_instance(self):
+        """Test every workflow has its own step config fingerprints."""
+        first = BaseWorkflow({"select_chapter_candidates": {"prompts": {"system": "A"}}})
+        second = BaseWorkflow({"select_chapter_candidates": {"prompts": {"system": "B"}}})
+        first.config_hashes["select_heading_candidates"] = "abc"
+
+        assert first.config_hashes is not second.config_hashes
+        assert "select_heading_candidates" not in second.config_hashes
+        assert (
+            first.config_hashes["select_chapter_candidates"]
+            != second.config_hashes["select_chapter_candidates"]
+        )
+        assert BaseWorkflow().config_hashes == {}
@@ -5,6 +5,7 @@ Tests cover:
 - Loading chapter notes from files
 - Deduplication and sorting of chapter codes
 - Graceful handling of missing files/directories
+- Serving preloaded (shared corpus) notes
 """
 
 from pathlib import Path
@@ -210,3 +211,34 @@ This chapter covers machinery.
         assert "## Scope" in result
         assert "## Exclusions" in result
         assert "- Electrical items (Chapter 85)" in result
+
+
+class TestPreloadedNotes:
+    """Tests for notes served from a preloaded mapping."""
+
+    def test_matches_file_based_output(self, tmp_path):
+        """Test preloaded notes format exactly like notes read from files."""
+        (tmp_path / "chapter_84_notes.md").write_text("Machinery chapter.\n")
+        (tmp_path / "chapter_85_notes.md").write_text("Electrical chapter.")
+        from_files = ChapterNotesService(notes_directory=str(tmp_path))
+        preloaded = ChapterNotesService(
+            notes={"84": "Machinery chapter.", "85": "Electrical chapter."}
+        )
+
+        assert preloaded.load_chapter_notes(["85", "84", "99"]) == (
+            from_files.load_chapter_notes(["85", "84", "99"])
+        )
+
+    def test_does_not_read_directory(self):
+        """Test the notes directory is ignored when notes are preloaded."""
+        service = ChapterNotesService(notes_directory="/nonexistent", notes={"84": "Notes."})
+
+        assert "Notes." in service.load_chapter_notes(["84"])
+
+    def test_no_matching_chapters(self):
+        """Test message when no preloaded chapter matches."""
+        service = ChapterNotesService(notes={})
+
+        result = service.load_chapter_notes(["84"])
+
+        assert result == "No chapter notes available for the chapters in these paths."
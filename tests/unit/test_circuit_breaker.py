@@ -0,0 +1,113 @@
+"""Tests for the per-model circuit breaker.
+
+Tests cover:
+- Opening after consecutive failures, per model
+- Probing an open circuit after the recovery time (half-open)
+- Closing on success, re-opening on a failed probe
+- Defaults from settings, reset and metrics
+"""
+
+import time
+from unittest.mock import patch
+
+from hs_agent.policies.circuit_breaker import CircuitBreaker, CircuitState
+from hs_agent.utils.metrics import metrics
+
+
+def opened(breaker, model_name="gemini-2.5-pro"):
+    """Fail a model until its circuit opens."""
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(model_name)
+    return breaker
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker state transitions."""
+
+    def test_closed_by_default(self):
+        """Test models never called have a closed circuit."""
+        breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=30)
+
+        assert breaker.state("gemini-2.5-pro") is CircuitState.CLOSED
+        assert breaker.allow_request("gemini-2.5-pro") is True
+
+    def test_opens_after_threshold(self):
+        """Test the circuit opens after failure_threshold consecutive failures."""
+        breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=30)
+
+        breaker.record_failure("gemini-2.5-pro")
+        breaker.record_failure("gemini-2.5-pro")
+        assert breaker.allow_request("gemini-2.5-pro") is True
+
+        breaker.record_failure("gemini-2.5-pro")
+        assert breaker.state("gemini-2.5-pro") is CircuitState.OPEN
+        assert breaker.allow_request("gemini-2.5-pro") is False
+        assert breaker.allow_request("gemini-2.5-flash") is True
+
+    def test_success_resets_failures(self):
+        """Test only consecutive failures count."""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=30)
+
+        breaker.record_failure("gemini-2.5-pro")
+        breaker.record_success("gemini-2.5-pro")
+        breaker.record_failure("gemini-2.5-pro")
+
+        assert breaker.state("gemini-2.5-pro") is CircuitState.CLOSED
+
+    def test_probe_after_recovery_time(self):
+        """Test one probe is allowed once the recovery time has elapsed."""
+        breaker = opened(CircuitBreaker(failure_threshold=1, recovery_seconds=0.01))
+        assert breaker.try_probe("gemini-2.5-pro") is False
+
+        time.sleep(0.02)
+
+        assert breaker.try_probe("gemini-2.5-pro") is True
+        assert breaker.state("gemini-2.5-pro") is CircuitState.HALF_OPEN
+        assert breaker.try_probe("gemini-2.5-pro") is False
+        assert breaker.allow_request("gemini-2.5-pro") is False
+
+    def test_successful_probe_closes(self):
+        """Test a successful probe closes the circuit."""
+        breaker = opened(CircuitBreaker(failure_threshold=1, recovery_seconds=0))
+        breaker.try_probe("gemini-2.5-pro")
+
+        breaker.record_success("gemini-2.5-pro")
+
+        assert breaker.state("gemini-2.5-pro") is CircuitState.CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test a failed probe opens the circuit for another recovery period."""
+        breaker = opened(CircuitBreaker(failure_threshold=3, recovery_seconds=0))
+        breaker.try_probe("gemini-2.5-pro")
+
+        breaker.record_failure("gemini-2.5-pro")
+
+        assert breaker.state("gemini-2.5-pro") is CircuitState.OPEN
+
+    def test_defaults_from_settings(self):
+        """Test threshold and recovery time are read from settings."""
+        with patch("hs_agent.policies.circuit_breaker.settings") as mock_settings:
+            mock_settings.circuit_breaker_failure_threshold = 7
+            mock_settings.circuit_breaker_recovery_seconds = 12.0
+            breaker = CircuitBreaker()
+
+            assert breaker.failure_threshold == 7
+            assert breaker.recovery_seconds == 12.0
+
+    def test_reset(self):
+        """Test reset closes every circuit."""
+        breaker = opened(CircuitBreaker(failure_threshold=1, recovery_seconds=30))
+
+        breaker.reset()
+
+        assert breaker.state("gemini-2.5-pro") is CircuitState.CLOSED
+
+    def test_metrics(self):
+        """Test opening and closing are counted per model."""
+        metrics.reset()
+        breaker = opened(CircuitBreaker(failure_threshold=1, recovery_seconds=0))
+        breaker.try_probe("gemini-2.5-pro")
+        breaker.record_success("gemini-2.5-pro")
+
+        assert metrics.counter("circuit_breaker.gemini-2.5-pro.opened") == 1
+        assert metrics.counter("circuit_breaker.gemini-2.5-pro.closed") == 1
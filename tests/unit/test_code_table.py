@@ -0,0 +1,133 @@
+"""Tests for HSCodeTable.
+
+Tests cover:
+- Row ordering (level, then parent, then input order)
+- Read-only per-level and per-parent views
+- Record materialization
+- Hierarchy arrays (children ranges, leaf counts, depth)
+- Orphan detection
+"""
+
+import sys
+
+import pytest
+
+from hs_agent.code_table import ROOT_CODE, CodeTableView, HSCodeRecord, HSCodeTable
+
+
+@pytest.fixture
+def table():
+    """Provide a table whose input rows interleave levels, like the CSV."""
+    rows = [
+        ("84", "Machinery", 2, ROOT_CODE),
+        ("8471", "Data processing machines", 4, "84"),
+        ("847130", "Portable computers", 6, "8471"),
+        ("847141", "Other data processing", 6, "8471"),
+        ("8473", "Parts for machines", 4, "84"),
+        ("847330", "Parts for 8471", 6, "8473"),
+        ("85", "Electrical machinery", 2, ROOT_CODE),
+        ("8501", "Electric motors", 4, "85"),
+    ]
+    codes, descriptions, levels, parents = zip(*rows, strict=True)
+    return HSCodeTable(codes, descriptions, levels, parents)
+
+
+class TestLayout:
+    """Tests for the struct-of-arrays layout."""
+
+    def test_rows_grouped_by_level(self, table):
+        """Test rows are ordered by level, keeping input order within a parent."""
+        assert table.codes == ("84", "85", "8471", "8473", "8501", "847130", "847141", "847330")
+        assert table.levels.tolist() == [2, 2, 4, 4, 4, 6, 6, 6]
+
+    def test_parent_rows(self, table):
+        """Test parents are stored as row indices (-1 under the root)."""
+        assert table.parent_rows.tolist() == [-1, -1, 0, 0, 1, 2, 2, 3]
+
+    def test_arrays_are_read_only(self, table):
+        """Test the integer arrays cannot be mutated."""
+        with pytest.raises(ValueError):
+            table.levels[0] = 4
+
+    def test_codes_are_interned(self, table):
+        """Test code strings are interned."""
+        assert table.codes[0] is sys.intern("".join(["8", "4"]))
+
+    def test_empty_table(self):
+        """Test an empty table has empty views."""
+        empty = HSCodeTable([], [], [], [])
+
+        assert len(empty) == 0
+        assert dict(empty.level_view(2)) == {}
+        assert empty.children(ROOT_CODE) == {}
+
+
+class TestViews:
+    """Tests for dict-like views."""
+
+    def test_level_view(self, table):
+        """Test a level view behaves like a read-only dict."""
+        headings = table.level_view(4)
+
+        assert isinstance(headings, CodeTableView)
+        assert list(headings) == ["8471", "8473", "8501"]
+        assert len(headings) == 3
+        assert "8471" in headings
+        assert "84" not in headings
+        assert headings.get("84") is None
+        assert headings["8501"].description == "Electric motors"
+
+    def test_missing_key_raises(self, table):
+        """Test codes outside the view raise KeyError."""
+        with pytest.raises(KeyError):
+            table.level_view(6)["8471"]
+
+    def test_view_is_read_only(self, table):
+        """Test views do not support item assignment."""
+        with pytest.raises(TypeError):
+            table.level_view(2)["99"] = None
+
+    def test_record(self, table):
+        """Test records carry code, description, level and parent."""
+        assert table.level_view(6)["847330"] == HSCodeRecord("847330", "Parts for 8471", 6, "8473")
+        assert table.level_view(2)["84"].parent == ROOT_CODE
+
+    def test_children_views(self, table):
+        """Test children are contiguous views in input order."""
+        assert list(table.children(ROOT_CODE)) == ["84", "85"]
+        assert list(table.children("84")) == ["8471", "8473"]
+        assert list(table.children("8471")) == ["847130", "847141"]
+        assert table.children("847130") == {}
+        assert table.children("99") == {}
+
+
+class TestHierarchy:
+    """Tests for hierarchy queries."""
+
+    def test_parent_of(self, table):
+        """Test parent lookup."""
+        assert table.parent_of("847141") == "8471"
+        assert table.parent_of("85") == ROOT_CODE
+        assert table.parent_of("99") is None
+
+    def test_leaf_counts(self, table):
+        """Test leaf counts aggregate bottom-up."""
+        assert table.leaf_count("8471") == 2
+        assert table.leaf_count("84") == 3
+        assert table.leaf_count("85") == 1
+        assert table.leaf_count(ROOT_CODE) == 4
+        assert table.leaf_count("99") == 0
+
+    def test_depth(self, table):
+        """Test depth follows the level order."""
+        assert [table.depth(c) for c in (ROOT_CODE, "85", "8501", "847330")] == [0, 1, 2, 3]
+
+    def test_orphans_are_reported(self):
+        """Test codes with unknown parents are listed and kept in their level."""
+        table = HSCodeTable(
+            ["84", "8471", "9999"], ["a", "b", "c"], [2, 4, 4], [ROOT_CODE, "84", "99"]
+        )
+
+        assert table.orphans == ["9999"]
+        assert "9999" in table.level_view(4)
+        assert list(table.children("84")) == ["8471"]
@@ -0,0 +1,130 @@
+"""Tests for the LLM concurrency limiter.
+
+Tests cover:
+- Model name resolution through wrapped runnables
+- Per-model caps (default and overrides)
+- Queue-wait metrics
+- RetryPolicy holding a slot only around model calls
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from hs_agent.policies import LLMConcurrencyLimiter, RetryPolicy
+from hs_agent.policies.concurrency_limiter import DEFAULT_MODEL_KEY, model_name_of
+from hs_agent.utils.metrics import metrics
+
+
+async def run_calls(limiter, model_name, n, hold=0.005):
+    """Run n calls through the limiter and return the peak concurrency."""
+    running = 0
+    peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with limiter.slot(model_name):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(hold)
+            running -= 1
+
+    await asyncio.gather(*(call() for _ in range(n)))
+    return peak
+
+
+class TestModelNameOf:
+    """Tests for model_name_of."""
+
+    def test_plain_model(self):
+        """Test a chat model's own name is used."""
+        assert model_name_of(SimpleNamespace(model_name="gemini-2.5-pro")) == "gemini-2.5-pro"
+
+    def test_wrapped_runnable(self):
+        """Test the name is found through sequence and binding wrappers."""
+        chat_model = SimpleNamespace(model_name="gemini-2.5-flash")
+        runnable = SimpleNamespace(first=SimpleNamespace(bound=chat_model))
+
+        assert model_name_of(runnable) == "gemini-2.5-flash"
+
+    def test_unknown_model(self):
+        """Test mocks and unknown objects fall back to the default key."""
+        assert model_name_of(MagicMock()) == DEFAULT_MODEL_KEY
+        assert model_name_of(object()) == DEFAULT_MODEL_KEY
+
+
+class TestLLMConcurrencyLimiter:
+    """Tests for LLMConcurrencyLimiter."""
+
+    def test_limits(self):
+        """Test per-model overrides and the default cap."""
+        limiter = LLMConcurrencyLimiter(limits={"gemini-2.5-pro": 2}, default_limit=5)
+
+        assert limiter.limit_for("gemini-2.5-pro") == 2
+        assert limiter.limit_for("gemini-2.5-flash") == 5
+
+    def test_default_from_settings(self):
+        """Test caps come from settings when not given."""
+        limiter = LLMConcurrencyLimiter()
+
+        with patch("hs_agent.policies.concurrency_limiter.settings") as mock_settings:
+            mock_settings.model_concurrency_limits = {"gemini-2.5-pro": 3}
+            mock_settings.max_concurrent_requests = 7
+            assert limiter.limit_for("gemini-2.5-pro") == 3
+            assert limiter.limit_for("gemini-2.5-flash") == 7
+
+    @pytest.mark.asyncio
+    async def test_caps_in_flight_calls(self):
+        """Test no more than the cap run at once."""
+        limiter = LLMConcurrencyLimiter(limits={}, default_limit=3)
+
+        assert await run_calls(limiter, "gemini-2.5-flash", 10) == 3
+
+    @pytest.mark.asyncio
+    async def test_models_capped_separately(self):
+        """Test each model has its own slots."""
+        limiter = LLMConcurrencyLimiter(limits={}, default_limit=2)
+
+        peaks = await asyncio.gather(
+            run_calls(limiter, "model-a", 6), run_calls(limiter, "model-b", 6)
+        )
+
+        assert peaks == [2, 2]
+
+    @pytest.mark.asyncio
+    async def test_records_queue_wait(self):
+        """Test queue wait is recorded overall and per model."""
+        metrics.reset()
+        limiter = LLMConcurrencyLimiter(limits={}, default_limit=1)
+
+        await run_calls(limiter, "gemini-2.5-flash", 3, hold=0.01)
+
+        overall = metrics.timing("llm_limiter.queue_wait_seconds")
+        assert overall.count == 3
+        assert overall.max >= 0.01
+        assert metrics.timing("llm_limiter.gemini-2.5-flash.queue_wait_seconds").count == 3
+
+
+class TestRetryPolicyLimiter:
+    """Tests for RetryPolicy's use of the limiter."""
+
+    def test_uses_shared_limiter_by_default(self):
+        """Test every RetryPolicy shares the process-wide limiter."""
+        assert RetryPolicy().limiter is RetryPolicy().limiter
+
+    @pytest.mark.asyncio
+    async def test_slot_not_held_during_backoff(self):
+        """Test the slot is released while sleeping between retries."""
+        limiter = LLMConcurrencyLimiter(limits={}, default_limit=1)
+        policy = RetryPolicy(max_retries=2, initial_delay=0.05, limiter=limiter)
+        model = MagicMock()
+        model.ainvoke = AsyncMock(side_effect=[None, {"ok": True}])
+
+        retrying = asyncio.create_task(policy.invoke_with_retry(model, [MagicMock(content="x")]))
+        await asyncio.sleep(0.01)
+        # The retrying call is backing off, so another call gets the only slot at once
+        await asyncio.wait_for(run_calls(limiter, DEFAULT_MODEL_KEY, 1, hold=0), timeout=0.03)
+
+        assert await retrying == {"ok": True}
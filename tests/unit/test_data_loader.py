@@ -0,0 +1,405 @@
+"""Tests for HSDataLoader.
+
+Tests cover:
+- Loading codes per level from CSV
+- Hierarchical index (children, parent, sibling/leaf counts, depth)
+- Index fallback when no parent mapping is given
+- Binary snapshot write, reuse and invalidation
+- Cached candidate sets per (level, parent code)
+- National (HTS) levels merged below the subheadings
+- Lexical pre-filter shortlists
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from hs_agent.code_table import HSCodeRecord
+from hs_agent.data_loader import ROOT_CODE, HSDataLoader, nomenclature_version
+from hs_agent.models import ClassificationLevel
+
+
+@pytest.fixture
+def hierarchy_data_dir(tmp_path):
+    """Provide a data directory with a small two-chapter hierarchy."""
+    (tmp_path / "hs_codes_all.csv").write_text(
+        "section,hscode,description,parent,level\n"
+        "XVI,84,Machinery,TOTAL,2\n"
+        "XVI,8471,Data processing machines,84,4\n"
+        "XVI,847130,Portable computers,8471,6\n"
+        "XVI,847141,Other data processing,8471,6\n"
+        "XVI,8473,Parts for machines,84,4\n"
+        "XVI,847330,Parts for 8471,8473,6\n"
+        "XVI,85,Electrical machinery,TOTAL,2\n"
+        "XVI,8501,Electric motors,85,4\n"
+        "TOTAL,TOTAL,Total of all HS2022 commodities,TOTAL,5\n"
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def national_data_dir(hierarchy_data_dir):
+    """Add a small HTS schedule to the hierarchy data directory."""
+    (hierarchy_data_dir / "htsdata_raw.csv").write_text(
+        "HTS Number,Indent,Description\n"
+        '"8471","0","Automatic data processing machines"\n'
+        '"8471.30.01","1","Portable computers"\n'
+        '"8471.30.01.00","2","Portable computers"\n'
+        '"8471.41.01","1","Other data processing machines"\n'
+        '"8471.41.01.05","2","Laptops"\n'
+        '"8471.41.01.50","2","Other"\n'
+        '"0101.21.00","1","Purebred breeding horses"\n'
+        '"9903.01.01","0","Special provision"\n'
+    )
+    return hierarchy_data_dir
+
+
+@pytest.fixture
+def loader(hierarchy_data_dir):
+    """Provide a loader with the hierarchy data loaded."""
+    loader = HSDataLoader(data_dir=hierarchy_data_dir)
+    loader.load_all_data()
+    return loader
+
+
+class TestLoadAllData:
+    """Tests for load_all_data method."""
+
+    def test_loads_codes_by_level(self, temp_data_dir):
+        """Test codes are split into per-level dictionaries."""
+        loader = HSDataLoader(data_dir=temp_data_dir)
+        loader.load_all_data()
+
+        assert list(loader.codes_2digit) == ["84"]
+        assert list(loader.codes_4digit) == ["8471"]
+        assert list(loader.codes_6digit) == ["847130"]
+        assert loader.codes_6digit["847130"].description == "Portable computers"
+
+    def test_sets_version_from_checksum(self, loader, hierarchy_data_dir):
+        """Test the loaded table is labelled with the CSV revision."""
+        csv_path = hierarchy_data_dir / "hs_codes_all.csv"
+
+        assert loader.version == nomenclature_version(csv_path)
+        assert loader.version.startswith("hs_codes_all@")
+
+    def test_skips_total_row(self, loader):
+        """Test the level-5 TOTAL row is not loaded as a code."""
+        assert "TOTAL" not in loader.codes_2digit
+        assert loader.parent_of("TOTAL") is None
+
+    def test_missing_file_raises(self, tmp_path):
+        """Test FileNotFoundError when CSV is missing."""
+        loader = HSDataLoader(data_dir=tmp_path)
+
+        with pytest.raises(FileNotFoundError):
+            loader.load_all_data()
+
+
+class TestHierarchicalIndex:
+    """Tests for the parent -> children index."""
+
+    def test_children_of_chapter(self, loader):
+        """Test headings under a chapter are returned in file order."""
+        assert list(loader.children_of("84")) == ["8471", "8473"]
+
+    def test_children_of_heading(self, loader):
+        """Test subheadings under a heading."""
+        children = loader.children_of("8471")
+
+        assert list(children) == ["847130", "847141"]
+        assert children["847130"].description == "Portable computers"
+
+    def test_children_of_root_are_chapters(self, loader):
+        """Test chapters hang under the root code."""
+        assert list(loader.children_of(ROOT_CODE)) == ["84", "85"]
+
+    def test_children_of_unknown_code(self, loader):
+        """Test unknown codes (including 000000) have no children."""
+        assert loader.children_of("99") == {}
+        assert loader.children_of("000000") == {}
+
+    def test_parent_of(self, loader):
+        """Test parent lookup at every level."""
+        assert loader.parent_of("847130") == "8471"
+        assert loader.parent_of("8471") == "84"
+        assert loader.parent_of("84") == ROOT_CODE
+        assert loader.parent_of("99") is None
+
+    def test_child_and_sibling_counts(self, loader):
+        """Test direct child and sibling counts."""
+        assert loader.child_count("84") == 2
+        assert loader.child_count("8501") == 0
+        assert loader.sibling_count("847130") == 1
+        assert loader.sibling_count("847330") == 0
+        assert loader.sibling_count("99") == 0
+
+    def test_leaf_counts(self, loader):
+        """Test leaf counts aggregate over descendants."""
+        assert loader.leaf_count("847130") == 1
+        assert loader.leaf_count("8471") == 2
+        assert loader.leaf_count("84") == 3
+        # Heading without subheadings is itself a leaf
+        assert loader.leaf_count("85") == 1
+        assert loader.leaf_count(ROOT_CODE) == 4
+
+    def test_is_leaf(self, loader):
+        """Test leaf detection."""
+        assert loader.is_leaf("847130")
+        assert loader.is_leaf("8501")
+        assert not loader.is_leaf("8471")
+        assert not loader.is_leaf("99")
+
+    def test_depth(self, loader):
+        """Test depth per level."""
+        assert loader.depth(ROOT_CODE) == 0
+        assert loader.depth("84") == 1
+        assert loader.depth("8471") == 2
+        assert loader.depth("847130") == 3
+        assert loader.depth("99") is None
+
+    def test_build_index_without_parent_mapping(self):
+        """Test parents fall back to code prefixes when no mapping is given."""
+        loader = HSDataLoader()
+        loader.codes_2digit = {"84": Mock(description="Machinery")}
+        loader.codes_4digit = {"8471": Mock(description="Data processing machines")}
+        loader.codes_6digit = {"847130": Mock(description="Portable computers")}
+
+        loader.build_index()
+
+        assert loader.parent_of("847130") == "8471"
+        assert loader.parent_of("84") == ROOT_CODE
+        assert loader.children_of("8471") == {
+            "847130": HSCodeRecord("847130", "Portable computers", 6, "8471")
+        }
+
+
+class TestSnapshotLoading:
+    """Tests for loading through the binary snapshot."""
+
+    def test_first_load_writes_snapshot(self, hierarchy_data_dir):
+        """Test the first load publishes a snapshot directory."""
+        loader = HSDataLoader(data_dir=hierarchy_data_dir)
+        loader.load_all_data(use_snapshot=True)
+
+        snapshots = list((hierarchy_data_dir / ".snapshots").iterdir())
+        assert len(snapshots) == 1
+        assert (snapshots[0] / "meta.json").exists()
+
+    def test_second_load_skips_csv_parse(self, hierarchy_data_dir):
+        """Test a warm snapshot is used instead of parsing the CSV."""
+        HSDataLoader(data_dir=hierarchy_data_dir).load_all_data(use_snapshot=True)
+
+        loader = HSDataLoader(data_dir=hierarchy_data_dir)
+        with patch("hs_agent.data_loader.pd.read_csv", side_effect=AssertionError("parsed")):
+            loader.load_all_data(use_snapshot=True)
+
+        assert list(loader.codes_4digit) == ["8471", "8473", "8501"]
+        assert loader.codes_6digit["847141"].description == "Other data processing"
+        assert list(loader.children_of("8471")) == ["847130", "847141"]
+
+    def test_snapshot_matches_csv_load(self, hierarchy_data_dir):
+        """Test snapshot and CSV loads produce identical tables."""
+        HSDataLoader(data_dir=hierarchy_data_dir).load_all_data(use_snapshot=True)
+        from_snapshot = HSDataLoader(data_dir=hierarchy_data_dir)
+        from_snapshot.load_all_data(use_snapshot=True)
+        from_csv = HSDataLoader(data_dir=hierarchy_data_dir)
+        from_csv.load_all_data(use_snapshot=False)
+
+        for level in ("codes_2digit", "codes_4digit", "codes_6digit"):
+            assert {c: h.description for c, h in getattr(from_snapshot, level).items()} == {
+                c: h.description for c, h in getattr(from_csv, level).items()
+            }
+
+    def test_changed_csv_invalidates_snapshot(self, hierarchy_data_dir):
+        """Test editing the CSV produces a fresh snapshot."""
+        HSDataLoader(data_dir=hierarchy_data_dir).load_all_data(use_snapshot=True)
+        csv_path = hierarchy_data_dir / "hs_codes_all.csv"
+        csv_path.write_text(csv_path.read_text() + "XVI,8502,Generating sets,85,4\n")
+
+        loader = HSDataLoader(data_dir=hierarchy_data_dir)
+        loader.load_all_data(use_snapshot=True)
+
+        assert "8502" in loader.codes_4digit
+        assert len(list((hierarchy_data_dir / ".snapshots").iterdir())) == 1
+
+    def test_snapshot_disabled_writes_nothing(self, hierarchy_data_dir):
+        """Test use_snapshot=False neither reads nor writes snapshots."""
+        HSDataLoader(data_dir=hierarchy_data_dir).load_all_data(use_snapshot=False)
+
+        assert not (hierarchy_data_dir / ".snapshots").exists()
+
+    def test_invalid_level_rows_are_skipped(self, tmp_path):
+        """Test rows with a non-numeric level are skipped, not fatal."""
+        (tmp_path / "hs_codes_all.csv").write_text(
+            "section,hscode,description,parent,level\n"
+            "XVI,84,Machinery,TOTAL,2\n"
+            "XVI,8471,Broken row,84,not-a-level\n"
+        )
+        loader = HSDataLoader(data_dir=tmp_path)
+        loader.load_all_data(use_snapshot=False)
+
+        assert list(loader.codes_2digit) == ["84"]
+        assert loader.codes_4digit == {}
+
+
+class TestNationalLevels:
+    """Tests for loading the 8/10-digit HTS levels."""
+
+    def test_national_codes_hang_under_subheadings(self, national_data_dir):
+        """Test tariff lines and statistical suffixes extend the hierarchy."""
+        loader = HSDataLoader(data_dir=national_data_dir)
+        loader.load_all_data(use_snapshot=False, national_levels=True)
+
+        assert list(loader.children_of("847141")) == ["84714101"]
+        assert list(loader.children_of("84714101")) == ["8471410105", "8471410150"]
+        assert loader.depth("8471410105") == 5
+        assert loader.leaf_count("8471") == 3
+        assert loader.codes_10digit["8471410105"].description == "Laptops"
+
+    def test_codes_without_hs_parent_are_dropped(self, national_data_dir):
+        """Test lines under unknown subheadings (e.g. chapter 99) are not loaded."""
+        loader = HSDataLoader(data_dir=national_data_dir)
+        loader.load_all_data(use_snapshot=False, national_levels=True)
+
+        assert list(loader.codes_8digit) == ["84713001", "84714101"]
+        assert loader.table.orphans == []
+
+    def test_disabled_by_default(self, national_data_dir):
+        """Test the national levels are only loaded when enabled."""
+        loader = HSDataLoader(data_dir=national_data_dir)
+        loader.load_all_data(use_snapshot=False, national_levels=False)
+
+        assert loader.codes_8digit == {}
+        assert loader.is_leaf("847141")
+
+    def test_snapshot_round_trip(self, national_data_dir):
+        """Test the parsed schedule is reused from its snapshot."""
+        HSDataLoader(data_dir=national_data_dir).load_all_data(
+            use_snapshot=True, national_levels=True
+        )
+
+        loader = HSDataLoader(data_dir=national_data_dir)
+        with patch("hs_agent.data_loader.read_hts_columns", side_effect=AssertionError("parsed")):
+            loader.load_all_data(use_snapshot=True, national_levels=True)
+
+        assert list(loader.children_of("84714101")) == ["8471410105", "8471410150"]
+
+    def test_version_covers_both_files(self, national_data_dir):
+        """Test the version changes with either source file."""
+        loader = HSDataLoader(data_dir=national_data_dir)
+        loader.load_all_data(use_snapshot=False, national_levels=True)
+
+        assert loader.version == loader.source_version(national_levels=True)
+        assert loader.version.endswith(
+            "+" + nomenclature_version(national_data_dir / "htsdata_raw.csv")
+        )
+
+    def test_missing_schedule_raises(self, hierarchy_data_dir):
+        """Test FileNotFoundError when national levels are enabled without the file."""
+        loader = HSDataLoader(data_dir=hierarchy_data_dir)
+
+        with pytest.raises(FileNotFoundError):
+            loader.load_all_data(use_snapshot=False, national_levels=True)
+
+
+class TestCandidateSets:
+    """Tests for cached candidate sets."""
+
+    def test_candidate_set_contents(self, loader):
+        """Test codes, prompt block and mapping access."""
+        candidates = loader.candidate_set(ClassificationLevel.SUBHEADING, "8471")
+
+        assert candidates.codes == ("847130", "847141")
+        assert candidates.prompt_block == (
+            "847130: Portable computers\n847141: Other data processing"
+        )
+        assert candidates["847130"].description == "Portable computers"
+        assert "847330" not in candidates
+        assert len(candidates) == 2
+        assert candidates.level == ClassificationLevel.SUBHEADING
+        assert candidates.parent_code == "8471"
+
+    def test_chapter_candidates_under_root(self, loader):
+        """Test the chapter list is the candidate set under the root code."""
+        candidates = loader.candidate_set(ClassificationLevel.CHAPTER, ROOT_CODE)
+
+        assert candidates.codes == ("84", "85")
+
+    def test_candidate_set_is_cached(self, loader):
+        """Test repeated lookups return the same object."""
+        first = loader.candidate_set(ClassificationLevel.HEADING, "84")
+
+        assert loader.candidate_set(ClassificationLevel.HEADING, "84") is first
+
+    def test_candidate_set_is_read_only(self, loader):
+        """Test the candidate mapping cannot be mutated."""
+        candidates = loader.candidate_set(ClassificationLevel.HEADING, "84")
+
+        with pytest.raises(TypeError):
+            candidates._candidates["9999"] = None
+
+    def test_unknown_parent_is_empty(self, loader):
+        """Test a parent without children yields an empty set."""
+        candidates = loader.candidate_set(ClassificationLevel.HEADING, "000000")
+
+        assert candidates.codes == ()
+        assert candidates.prompt_block == ""
+
+    def test_rebuilding_index_clears_cache(self, loader):
+        """Test build_index drops stale candidate sets."""
+        first = loader.candidate_set(ClassificationLevel.HEADING, "84")
+        loader.build_index()
+
+        assert loader.candidate_set(ClassificationLevel.HEADING, "84") is not first
+
+
+class TestShortlist:
+    """Tests for the lexical pre-filter."""
+
+    @pytest.fixture
+    def prefilter_settings(self):
+        """Enable the pre-filter with a one-candidate shortlist."""
+        with patch("hs_agent.data_loader.settings") as mock_settings:
+            mock_settings.enable_candidate_prefilter = True
+            mock_settings.default_top_k = 1
+            mock_settings.candidate_prefilter_margin = 0
+            mock_settings.candidate_prefilter_min_coverage = 0.75
+            yield mock_settings
+
+    def test_disabled_returns_full_set(self, loader):
+        """Test the full candidate set is used when the pre-filter is off."""
+        chapters = loader.candidate_set(ClassificationLevel.CHAPTER, ROOT_CODE)
+
+        with patch("hs_agent.data_loader.settings") as mock_settings:
+            mock_settings.enable_candidate_prefilter = False
+            assert loader.shortlist(chapters, "portable computers") is chapters
+
+    def test_shortlists_matching_candidates(self, loader, prefilter_settings):
+        """Test the best-matching candidates are kept as a CandidateSet."""
+        chapters = loader.candidate_set(ClassificationLevel.CHAPTER, ROOT_CODE)
+
+        shortlist = loader.shortlist(chapters, "electric motors")
+
+        assert shortlist.codes == ("85",)
+        assert shortlist.prompt_block == "85: Electrical machinery"
+        assert shortlist.parent_code == ROOT_CODE
+
+    def test_small_set_is_not_filtered(self, loader, prefilter_settings):
+        """Test sets within top-k plus margin are returned as-is."""
+        headings = loader.candidate_set(ClassificationLevel.HEADING, "85")
+
+        assert loader.shortlist(headings, "electric motors") is headings
+
+    def test_low_confidence_falls_back(self, loader, prefilter_settings):
+        """Test unknown product terms send the full set."""
+        chapters = loader.candidate_set(ClassificationLevel.CHAPTER, ROOT_CODE)
+
+        assert loader.shortlist(chapters, "wireless earbuds") is chapters
+
+    def test_index_is_cached_per_table(self, loader):
+        """Test the index is built once and rebuilt for a new table."""
+        index = loader.lexical_index(2)
+
+        assert loader.lexical_index(2) is index
+        loader.set_table(loader.table)
+        assert loader.lexical_index(2) is not index
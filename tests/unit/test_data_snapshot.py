@@ -0,0 +1,133 @@
+"""Tests for the binary data snapshot helpers.
+
+Tests cover:
+- String packing round trip and lazy access
+- Snapshot write/read round trip with memory-mapped arrays
+- Checksum and format-version mismatches
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from hs_agent import data_snapshot
+
+
+class TestPackStrings:
+    """Tests for pack_strings/unpack_strings."""
+
+    def test_round_trip(self):
+        """Test strings survive packing, including non-ASCII text."""
+        values = ["Machinery", "", "Pure‑bred Arabian mare; ½ size"]
+
+        blob, offsets = data_snapshot.pack_strings(values)
+
+        assert data_snapshot.unpack_strings(blob, offsets) == values
+        assert len(offsets) == len(values) + 1
+
+    def test_offsets_point_at_each_string(self):
+        """Test offsets allow random access without unpacking everything."""
+        blob, offsets = data_snapshot.pack_strings(["ab", "cde"])
+
+        assert blob[offsets[1] : offsets[2] - 1].tobytes() == b"cde"
+
+    def test_empty_list(self):
+        """Test packing no strings."""
+        blob, offsets = data_snapshot.pack_strings([])
+
+        assert data_snapshot.unpack_strings(blob, offsets) == []
+
+
+class TestPackedStrings:
+    """Tests for the lazy PackedStrings sequence."""
+
+    def test_random_access(self):
+        """Test items decode individually, including negative indexes and slices."""
+        values = ["Machinery", "", "Pure‑bred Arabian mare; ½ size"]
+        packed = data_snapshot.PackedStrings(*data_snapshot.pack_strings(values))
+
+        assert len(packed) == 3
+        assert packed[2] == values[2]
+        assert packed[-2] == ""
+        assert packed[:2] == values[:2]
+        assert list(packed) == values
+
+    def test_out_of_range(self):
+        """Test indexing past the end raises IndexError."""
+        packed = data_snapshot.PackedStrings(*data_snapshot.pack_strings(["a"]))
+
+        with pytest.raises(IndexError):
+            packed[1]
+
+
+class TestWriteReadSnapshot:
+    """Tests for write_snapshot/read_snapshot."""
+
+    def _write(self, tmp_path, checksum="a" * 64):
+        source = tmp_path / "hs_codes_all.csv"
+        source.write_text("unused")
+        data_snapshot.write_snapshot(
+            tmp_path / "snapshots",
+            source,
+            checksum,
+            np.array(["84", "8471"]),
+            np.array([2, 4]),
+            np.array(["TOTAL", "84"]),
+            ["Machinery", "Data processing machines"],
+        )
+        return source
+
+    def test_round_trip(self, tmp_path):
+        """Test arrays read back memory-mapped and unchanged."""
+        source = self._write(tmp_path)
+
+        arrays = data_snapshot.read_snapshot(tmp_path / "snapshots", source, "a" * 64)
+
+        assert isinstance(arrays["codes"], np.memmap)
+        assert arrays["codes"].astype(str).tolist() == ["84", "8471"]
+        assert arrays["levels"].tolist() == [2, 4]
+        assert arrays["parents"].astype(str).tolist() == ["TOTAL", "84"]
+        assert data_snapshot.unpack_strings(arrays["desc_blob"], arrays["desc_offsets"]) == [
+            "Machinery",
+            "Data processing machines",
+        ]
+
+    def test_checksum_mismatch_returns_none(self, tmp_path):
+        """Test a different source checksum finds no snapshot."""
+        source = self._write(tmp_path)
+
+        assert data_snapshot.read_snapshot(tmp_path / "snapshots", source, "b" * 64) is None
+
+    def test_format_version_mismatch_returns_none(self, tmp_path):
+        """Test snapshots from another format version are ignored."""
+        source = self._write(tmp_path)
+        target = data_snapshot.snapshot_path(tmp_path / "snapshots", source, "a" * 64)
+        meta = json.loads((target / "meta.json").read_text())
+        meta["format_version"] = data_snapshot.SNAPSHOT_FORMAT_VERSION + 1
+        (target / "meta.json").write_text(json.dumps(meta))
+
+        assert data_snapshot.read_snapshot(tmp_path / "snapshots", source, "a" * 64) is None
+
+    def test_missing_snapshot_returns_none(self, tmp_path):
+        """Test reading before any snapshot exists."""
+        source = tmp_path / "hs_codes_all.csv"
+
+        assert data_snapshot.read_snapshot(tmp_path / "snapshots", source, "a" * 64) is None
+
+    def test_rewrite_is_noop(self, tmp_path):
+        """Test writing an existing snapshot again keeps the published one."""
+        self._write(tmp_path)
+        self._write(tmp_path)
+
+        assert len(list((tmp_path / "snapshots").iterdir())) == 1
+
+    def test_file_checksum(self, tmp_path):
+        """Test checksum changes with file content."""
+        path = tmp_path / "f.csv"
+        path.write_text("a")
+        first = data_snapshot.file_checksum(path)
+        path.write_text("b")
+
+        assert first != data_snapshot.file_checksum(path)
+        assert len(first) == 64
@@ -0,0 +1,52 @@
+"""Tests for per-request deadlines.
+
+Tests cover:
+- No deadline by default
+- Scopes, nesting and reset
+- Propagation into concurrent tasks
+"""
+
+import asyncio
+
+import pytest
+
+from hs_agent.policies.deadline import deadline_scope, remaining_time
+
+
+class TestDeadlineScope:
+    """Tests for deadline_scope and remaining_time."""
+
+    def test_no_deadline_by_default(self):
+        """Test there is no deadline outside a scope."""
+        assert remaining_time() is None
+
+    def test_scope_sets_and_resets(self):
+        """Test a scope sets the deadline and restores the previous one on exit."""
+        with deadline_scope(10):
+            assert 9 < remaining_time() <= 10
+        assert remaining_time() is None
+
+    def test_nested_scope_keeps_earlier_deadline(self):
+        """Test a nested scope cannot extend the outer deadline."""
+        with deadline_scope(5):
+            with deadline_scope(60):
+                assert remaining_time() <= 5
+            with deadline_scope(1):
+                assert remaining_time() <= 1
+
+    def test_empty_budget_sets_nothing(self):
+        """Test None or 0 seconds leave the current deadline alone."""
+        with deadline_scope(None), deadline_scope(0):
+            assert remaining_time() is None
+
+    @pytest.mark.asyncio
+    async def test_visible_in_spawned_tasks(self):
+        """Test concurrent branch tasks see the request deadline."""
+
+        async def branch():
+            return remaining_time()
+
+        with deadline_scope(10):
+            results = await asyncio.gather(branch(), branch())
+
+        assert all(result is not None and result <= 10 for result in results)
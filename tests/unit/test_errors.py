@@ -0,0 +1,86 @@
+"""Tests for LLM call error classification.
+
+Tests cover:
+- Throttling, fatal and retryable errors
+- Retry-after hints (attribute, HTTP header, google.rpc RetryInfo)
+"""
+
+from http import HTTPStatus
+from types import SimpleNamespace
+
+from google.api_core import exceptions as google_exceptions
+from langchain_core.exceptions import OutputParserException
+
+from hs_agent.policies.errors import (
+    ErrorKind,
+    classify_error,
+    is_throttling_error,
+    retry_after_seconds,
+)
+
+
+class HTTPError(Exception):
+    """Error carrying an HTTP status code."""
+
+    def __init__(self, code, response=None):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+        self.response = response
+
+
+class TestClassifyError:
+    """Tests for classify_error and is_throttling_error."""
+
+    def test_throttled(self):
+        """Test rate limit / overload errors by class name or status code."""
+        assert classify_error(google_exceptions.ResourceExhausted("quota")) is ErrorKind.THROTTLED
+        assert classify_error(google_exceptions.ServiceUnavailable("busy")) is ErrorKind.THROTTLED
+        assert classify_error(HTTPError(HTTPStatus.TOO_MANY_REQUESTS)) is ErrorKind.THROTTLED
+        assert is_throttling_error(HTTPError(503))
+
+    def test_fatal(self):
+        """Test invalid requests and local bugs are fatal."""
+        assert classify_error(google_exceptions.InvalidArgument("schema")) is ErrorKind.FATAL
+        assert classify_error(google_exceptions.PermissionDenied("denied")) is ErrorKind.FATAL
+        assert classify_error(HTTPError(404)) is ErrorKind.FATAL
+        assert classify_error(TypeError("bad call")) is ErrorKind.FATAL
+
+    def test_retryable(self):
+        """Test transient failures and malformed model output are retryable."""
+        assert classify_error(google_exceptions.InternalServerError("oops")) is ErrorKind.RETRYABLE
+        assert classify_error(TimeoutError()) is ErrorKind.RETRYABLE
+        assert classify_error(OutputParserException("not json")) is ErrorKind.RETRYABLE
+        assert classify_error(Exception("unknown")) is ErrorKind.RETRYABLE
+        assert not is_throttling_error(HTTPError("n/a"))
+
+
+class TestRetryAfterSeconds:
+    """Tests for retry_after_seconds."""
+
+    def test_attribute(self):
+        """Test a retry_after attribute is used."""
+        error = Exception("slow down")
+        error.retry_after = 2.5
+
+        assert retry_after_seconds(error) == 2.5
+
+    def test_http_header(self):
+        """Test the Retry-After header of an attached response is used."""
+        response = SimpleNamespace(headers={"retry-after": "7"})
+
+        assert retry_after_seconds(HTTPError(429, response=response)) == 7.0
+
+    def test_retry_info_detail(self):
+        """Test a google.rpc RetryInfo retry_delay in the details is used."""
+        retry_info = SimpleNamespace(retry_delay=SimpleNamespace(seconds=3, nanos=500_000_000))
+        error = google_exceptions.ResourceExhausted("quota", details=[retry_info])
+
+        assert retry_after_seconds(error) == 3.5
+
+    def test_no_hint(self):
+        """Test errors without a usable hint return None."""
+        assert retry_after_seconds(Exception("boom")) is None
+        assert retry_after_seconds(HTTPError(429, SimpleNamespace(headers={}))) is None
+        error = Exception("bad")
+        error.retry_after = "soon"
+        assert retry_after_seconds(error) is None
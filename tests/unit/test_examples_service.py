@@ -0,0 +1,131 @@
+"""Tests for ExamplesService.
+
+Tests cover:
+- Nearest labeled examples, best first
+- Distinct candidate codes
+- Few-shot formatting
+- Index snapshot reuse and missing files
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from hs_agent.services.examples_service import ExamplesService
+
+
+@pytest.fixture
+def examples_path(tmp_path):
+    """Provide a small labeled examples CSV."""
+    path = tmp_path / "hs6_examples_cleaned.csv"
+    path.write_text(
+        "hs6_code,hs4_code,hs6_title,category,product_description\n"
+        "847130,8471,Portable computers,Computers,Lightweight laptop with keyboard\n"
+        "847130,8471,Portable computers,Computers,Gaming laptop with 17-inch display\n"
+        "620342,6203,Men's cotton trousers,Apparel,Men's cotton chino trousers\n"
+        "610910,6109,Cotton T-shirts,Apparel,Cotton crew-neck t-shirt\n"
+        "030616,0306,Frozen shrimps,Seafood,Frozen cooked cold-water shrimp\n"
+        ",,,,\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.fixture
+def service(examples_path, tmp_path):
+    """Provide a service with snapshots written under tmp_path."""
+    return ExamplesService(examples_path, snapshot_dir=tmp_path / "snapshots", use_snapshot=True)
+
+
+class TestFindSimilar:
+    """Tests for find_similar."""
+
+    def test_best_match_first(self, service):
+        """Test the closest example ranks first and carries its label."""
+        examples = service.find_similar("laptop with keyboard", limit=2)
+
+        assert examples[0].product_description == "Lightweight laptop with keyboard"
+        assert examples[0].hs_code == "847130"
+        assert examples[0].hs_title == "Portable computers"
+        assert examples[0].score >= examples[1].score
+
+    def test_only_matching_examples(self, service):
+        """Test examples without any shared term are not returned."""
+        examples = service.find_similar("frozen shrimp", limit=5)
+
+        assert [example.hs_code for example in examples] == ["030616"]
+
+    def test_no_match(self, service):
+        """Test unknown terms return no examples."""
+        assert service.find_similar("xyzzy", limit=5) == []
+
+    def test_blank_rows_skipped(self, service):
+        """Test rows without a code or description are not indexed."""
+        assert len(service) == 5
+
+
+class TestCandidateCodes:
+    """Tests for candidate_codes."""
+
+    def test_distinct_codes(self, service):
+        """Test examples sharing a code yield the code once."""
+        assert service.candidate_codes("laptop", limit=3) == ["847130"]
+
+    def test_codes_from_all_matches(self, service):
+        """Test codes of every matching example are collected."""
+        assert sorted(service.candidate_codes("cotton laptop", limit=5)) == [
+            "610910",
+            "620342",
+            "847130",
+        ]
+
+    def test_limit(self, service):
+        """Test at most limit codes are returned."""
+        assert service.candidate_codes("cotton", limit=1) in (["620342"], ["610910"])
+
+
+class TestFormatExamples:
+    """Tests for format_examples."""
+
+    def test_format(self, service):
+        """Test one few-shot line per example."""
+        text = service.format_examples(service.find_similar("frozen shrimp", limit=1))
+
+        assert text == '- "Frozen cooked cold-water shrimp" → 030616 (Frozen shrimps)'
+
+    def test_empty(self, service):
+        """Test a placeholder when there are no examples."""
+        assert service.format_examples([]) == "No similar labeled examples available."
+
+
+class TestIndexSnapshot:
+    """Tests for the index snapshot."""
+
+    def test_second_service_uses_snapshot(self, examples_path, tmp_path):
+        """Test a warm snapshot is memory-mapped instead of rebuilding the index."""
+        snapshots = tmp_path / "snapshots"
+        first = ExamplesService(examples_path, snapshot_dir=snapshots, use_snapshot=True)
+        expected = first.find_similar("cotton trousers", limit=3)
+
+        second = ExamplesService(examples_path, snapshot_dir=snapshots, use_snapshot=True)
+        with patch(
+            "hs_agent.services.examples_service.pd.read_csv",
+            side_effect=AssertionError("parsed"),
+        ):
+            assert second.find_similar("cotton trousers", limit=3) == expected
+
+    def test_snapshot_disabled_writes_nothing(self, examples_path, tmp_path):
+        """Test use_snapshot=False builds in memory only."""
+        service = ExamplesService(
+            examples_path, snapshot_dir=tmp_path / "snapshots", use_snapshot=False
+        )
+
+        assert service.find_similar("laptop", limit=1)
+        assert not (tmp_path / "snapshots").exists()
+
+    def test_missing_file(self, tmp_path):
+        """Test a missing examples file yields an empty service."""
+        service = ExamplesService(tmp_path / "missing.csv", use_snapshot=False)
+
+        assert len(service) == 0
+        assert service.find_similar("laptop") == []
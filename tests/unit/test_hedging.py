@@ -0,0 +1,118 @@
+"""Tests for hedged LLM request policy.
+
+Tests cover:
+- Hedge delay from the running latency percentile, per step
+- Minimum samples and the latency window
+- Process-wide cap on the share of hedged calls (token bucket bounded by max_burst)
+- Defaults from settings, reset and metrics
+"""
+
+from unittest.mock import patch
+
+from hs_agent.policies.hedging import HedgingPolicy
+from hs_agent.utils.metrics import metrics
+
+
+def warmed_up(policy, step="select_chapter_candidates", latencies=range(1, 101)):
+    """Record latencies (seconds) for a step."""
+    for latency in latencies:
+        policy.record(step, float(latency))
+    return policy
+
+
+class TestHedgeDelay:
+    """Tests for HedgingPolicy.hedge_delay."""
+
+    def test_no_delay_before_min_samples(self):
+        """Test a step is not hedged until it has enough samples."""
+        policy = warmed_up(HedgingPolicy(min_samples=5), latencies=[1.0] * 4)
+
+        assert policy.hedge_delay("select_chapter_candidates") is None
+
+    def test_delay_is_percentile(self):
+        """Test the delay is the running p95 of the step's latencies."""
+        policy = warmed_up(HedgingPolicy(min_samples=5))
+
+        assert policy.hedge_delay("select_chapter_candidates") == 95.0
+
+    def test_steps_tracked_separately(self):
+        """Test each step has its own latency percentile."""
+        policy = warmed_up(HedgingPolicy(min_samples=5))
+        warmed_up(policy, "compare_final_codes", [0.5] * 10)
+
+        assert policy.hedge_delay("compare_final_codes") == 0.5
+        assert policy.hedge_delay("select_heading_candidates") is None
+
+    def test_window_keeps_recent_latencies(self):
+        """Test old latencies fall out of the window."""
+        policy = warmed_up(HedgingPolicy(min_samples=5, window=10))
+        warmed_up(policy, latencies=[1.0] * 10)
+
+        assert policy.hedge_delay("select_chapter_candidates") == 1.0
+
+
+class TestHedgeCap:
+    """Tests for HedgingPolicy.try_hedge."""
+
+    def test_cap_on_extra_calls(self):
+        """Test at most max_extra_ratio of the calls are hedged."""
+        policy = warmed_up(HedgingPolicy(max_extra_ratio=0.1, min_samples=5))
+
+        hedged = 0
+        for _ in range(50):
+            policy.hedge_delay("select_chapter_candidates")
+            hedged += policy.try_hedge()
+
+        assert hedged == 5
+
+    def test_saved_credit_bounded_by_burst(self):
+        """Test a slowdown after long healthy traffic only hedges within the ratio and burst."""
+        policy = warmed_up(HedgingPolicy(max_extra_ratio=0.05, max_burst=5, min_samples=5))
+        for _ in range(10_000):
+            policy.hedge_delay("select_chapter_candidates")
+
+        # Every call of the slowdown runs past p95 and asks for a hedge
+        hedged = 0
+        for _ in range(200):
+            policy.hedge_delay("select_chapter_candidates")
+            hedged += policy.try_hedge()
+
+        assert hedged <= 0.05 * 200 + 5
+
+    def test_zero_ratio_disables_hedges(self):
+        """Test a zero ratio never allows a hedge."""
+        policy = warmed_up(HedgingPolicy(max_extra_ratio=0.0, min_samples=5))
+        policy.hedge_delay("select_chapter_candidates")
+
+        assert policy.try_hedge() is False
+
+    def test_ratio_from_settings(self):
+        """Test the cap defaults to settings.hedge_max_extra_ratio and hedge_max_burst."""
+        with patch("hs_agent.policies.hedging.settings") as mock_settings:
+            mock_settings.hedge_max_extra_ratio = 0.25
+            mock_settings.hedge_max_burst = 3.0
+
+            assert HedgingPolicy().max_extra_ratio == 0.25
+            assert HedgingPolicy().max_burst == 3.0
+
+    def test_reset(self):
+        """Test reset drops samples and hedge tokens."""
+        policy = warmed_up(HedgingPolicy(max_extra_ratio=1.0, min_samples=5))
+        policy.hedge_delay("select_chapter_candidates")
+
+        policy.reset()
+
+        assert policy.try_hedge() is False
+        assert policy.hedge_delay("select_chapter_candidates") is None
+
+    def test_metrics(self):
+        """Test fired and capped hedges are counted."""
+        metrics.reset()
+        policy = HedgingPolicy(max_extra_ratio=1.0)
+        policy.hedge_delay("select_chapter_candidates")
+
+        policy.try_hedge()
+        policy.try_hedge()
+
+        assert metrics.counter("llm_hedge.fired") == 1
+        assert metrics.counter("llm_hedge.capped") == 1
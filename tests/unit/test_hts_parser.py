@@ -0,0 +1,93 @@
+"""Tests for the streaming HTS schedule parser.
+
+Tests cover:
+- Indent-based hierarchy (tariff lines under subheadings, suffixes under lines)
+- Grouping labels prefixed into descriptions
+- Implicit 8-digit tariff lines synthesized for bare 10-digit rows
+- Column arrays for the code table
+"""
+
+import pytest
+
+from hs_agent.hts_parser import parse_hts_rows, read_hts_columns
+
+HTS_HEADER = (
+    "﻿HTS Number,Indent,Description,Unit of Quantity,General Rate of Duty,"
+    "Special Rate of Duty,Column 2 Rate of Duty,Quota Quantity,Additional Duties\n"
+)
+
+
+@pytest.fixture
+def hts_csv(tmp_path):
+    """Provide a small HTS schedule in the raw export format."""
+    path = tmp_path / "htsdata_raw.csv"
+    path.write_text(
+        HTS_HEADER
+        + '"0102","0","Live bovine animals:","","","","","",""\n'
+        + '"","1","Cattle:","","","","","",""\n'
+        + '"0102.21.00","2","Purebred breeding animals","","Free","","","",""\n'
+        + '"","3","Dairy:","","","","","",""\n'
+        + '"0102.21.00.10","4","Male","No.","","","","",""\n'
+        + '"0102.21.00.20","4","Female","No.","","","","",""\n'
+        + '"0102.21.00.50","3","Other","No.","","","","",""\n'
+        + '"0102.90.00.00","1","Other","No.","Free","","","",""\n'
+        + '"9903.01.01","0","Special provision","","","","","",""\n',
+        encoding="utf-8",
+    )
+    return path
+
+
+class TestParseHtsRows:
+    """Tests for parse_hts_rows."""
+
+    def test_hierarchy(self, hts_csv):
+        """Test codes, levels and parents follow the indent hierarchy."""
+        rows = [(code, level, parent) for code, _, level, parent in parse_hts_rows(hts_csv)]
+
+        assert rows == [
+            ("01022100", 8, "010221"),
+            ("0102210010", 10, "01022100"),
+            ("0102210020", 10, "01022100"),
+            ("0102210050", 10, "01022100"),
+            ("01029000", 8, "010290"),
+            ("0102900000", 10, "01029000"),
+            ("99030101", 8, "990301"),
+        ]
+
+    def test_grouping_labels_prefix_descriptions(self, hts_csv):
+        """Test unnumbered labels are prefixed up to the nearest numbered ancestor."""
+        descriptions = {code: desc for code, desc, _, _ in parse_hts_rows(hts_csv)}
+
+        assert descriptions["01022100"] == "Cattle: Purebred breeding animals"
+        assert descriptions["0102210010"] == "Dairy: Male"
+        # The "Dairy:" group ended at the dedent
+        assert descriptions["0102210050"] == "Other"
+
+    def test_implicit_tariff_line(self, hts_csv):
+        """Test a bare 10-digit row gets a synthesized 8-digit parent."""
+        descriptions = {code: desc for code, desc, _, _ in parse_hts_rows(hts_csv)}
+
+        assert descriptions["01029000"] == "Other"
+
+
+class TestReadHtsColumns:
+    """Tests for read_hts_columns."""
+
+    def test_columns(self, hts_csv):
+        """Test the columns line up with the parsed rows."""
+        codes, levels, parents, descriptions = read_hts_columns(hts_csv)
+
+        assert len(codes) == len(levels) == len(parents) == len(descriptions) == 7
+        assert codes[1] == "0102210010"
+        assert levels.tolist() == [8, 10, 10, 10, 8, 10, 8]
+        assert parents[1] == "01022100"
+        assert descriptions[1] == "Dairy: Male"
+
+    def test_empty_schedule(self, tmp_path):
+        """Test a schedule without national lines yields empty columns."""
+        path = tmp_path / "htsdata_raw.csv"
+        path.write_text(HTS_HEADER + '"0101","0","Live horses","","","","","",""\n')
+
+        codes, levels, parents, descriptions = read_hts_columns(path)
+
+        assert len(codes) == len(levels) == len(parents) == len(descriptions) == 0
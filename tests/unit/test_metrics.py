@@ -0,0 +1,70 @@
+"""Tests for the in-process metrics registry.
+
+Tests cover:
+- Counters and gauges
+- Timings and the timer context manager
+- Snapshot and reset
+"""
+
+import pytest
+
+from hs_agent.utils.metrics import Metrics
+
+
+class TestMetrics:
+    """Tests for Metrics."""
+
+    def test_counters_start_at_zero(self):
+        """Test counters are created on first increment."""
+        registry = Metrics()
+
+        assert registry.counter("hits") == 0
+        registry.increment("hits")
+        registry.increment("hits", 2)
+        assert registry.counter("hits") == 3
+
+    def test_gauges_hold_last_value(self):
+        """Test gauges keep the last value set."""
+        registry = Metrics()
+
+        assert registry.gauge("limit") is None
+        registry.set_gauge("limit", 10)
+        registry.set_gauge("limit", 5.5)
+        assert registry.gauge("limit") == 5.5
+
+    def test_observe_aggregates(self):
+        """Test timings aggregate count, total, mean and max."""
+        registry = Metrics()
+
+        registry.observe("build", 0.5)
+        registry.observe("build", 1.5)
+
+        stats = registry.timing("build")
+        assert stats.count == 2
+        assert stats.total == pytest.approx(2.0)
+        assert stats.mean == pytest.approx(1.0)
+        assert stats.max == pytest.approx(1.5)
+
+    def test_timer_records_even_on_error(self):
+        """Test the timer context manager records one observation, even when raising."""
+        registry = Metrics()
+
+        with pytest.raises(ValueError), registry.timer("step"):
+            raise ValueError("boom")
+
+        assert registry.timing("step").count == 1
+
+    def test_snapshot_and_reset(self):
+        """Test snapshot returns plain dicts and reset clears everything."""
+        registry = Metrics()
+        registry.increment("hits")
+        registry.set_gauge("limit", 4)
+        registry.observe("build", 0.25)
+
+        snapshot = registry.snapshot()
+        assert snapshot["counters"] == {"hits": 1}
+        assert snapshot["gauges"] == {"limit": 4}
+        assert snapshot["timings"]["build"]["count"] == 1
+
+        registry.reset()
+        assert registry.snapshot() == {"counters": {}, "gauges": {}, "timings": {}}
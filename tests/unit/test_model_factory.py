@@ -0,0 +1,173 @@
+"""Tests for ModelFactory.
+
+Tests cover:
+- Enum constraints on single and multi-selection schemas (compiled, frozen)
+- Config schemas are never mutated
+- Runnable cache hits, misses, eviction and hit/miss counters
+- Disabling the cache
+"""
+
+import copy
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from hs_agent.factories import FrozenDict, ModelFactory, SchemaCompiler
+from hs_agent.utils.metrics import metrics
+
+SINGLE_CONFIG = {
+    "model": {"name": "gemini-2.5-flash", "parameters": {"temperature": 0.0}},
+    "output_schema": {
+        "type": "object",
+        "properties": {"selected_code": {"type": "string"}, "confidence": {"type": "number"}},
+    },
+}
+
+MULTI_CONFIG = {
+    "model": {"name": "gemini-2.5-flash"},
+    "output_schema": {
+        "type": "object",
+        "properties": {
+            "selections": {
+                "type": "array",
+                "items": {"type": "object", "properties": {"code": {"type": "string"}}},
+            }
+        },
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Start every test with empty runnable/schema caches and counters."""
+    ModelFactory.clear_cache()
+    SchemaCompiler.clear()
+    metrics.reset()
+    yield
+    ModelFactory.clear_cache()
+    SchemaCompiler.clear()
+
+
+@pytest.fixture
+def built_models():
+    """Patch ChatVertexAI and collect the mock models it builds."""
+    models = []
+
+    def build(**kwargs):
+        model = MagicMock(name=kwargs["model"])
+        models.append(model)
+        return model
+
+    with patch("hs_agent.factories.model_factory.ChatVertexAI", side_effect=build):
+        yield models
+
+
+def bound_schema(model):
+    """Get the schema a mocked model was bound to."""
+    return model.with_structured_output.call_args.args[0]
+
+
+class TestEnumConstraint:
+    """Tests for enum constraints on output schemas."""
+
+    def test_single_selection_enum(self, built_models):
+        """Test selected_code gets the candidate codes as enum."""
+        ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, enum_codes=("84", "85"))
+
+        schema = bound_schema(built_models[-1])
+        assert schema["properties"]["selected_code"] == {"type": "string", "enum": ("84", "85")}
+        assert schema["properties"]["confidence"] == {"type": "number"}
+
+    def test_multi_selection_enum(self, built_models):
+        """Test selections.items.properties.code gets the candidate codes as enum."""
+        ModelFactory.create_for_multi_selection("gemini-2.5-flash", MULTI_CONFIG, ["01", "02"])
+
+        schema = bound_schema(built_models[-1])
+        code = schema["properties"]["selections"]["items"]["properties"]["code"]
+        assert code["enum"] == ("01", "02")
+
+    def test_bound_schema_is_compiled_once(self, built_models):
+        """Test models for the same codes are bound to one shared frozen schema."""
+        with patch("hs_agent.factories.model_factory.settings") as mock_settings:
+            mock_settings.model_cache_size = 0
+            ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("84", "85"))
+            ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("84", "85"))
+
+        first, second = (bound_schema(model) for model in built_models)
+        assert first is second
+        assert isinstance(first, FrozenDict)
+
+    def test_config_schema_not_mutated(self, built_models):
+        """Test the enum is added to a copy, leaving the config schema untouched."""
+        ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, enum_codes=("84",))
+        ModelFactory.create_for_multi_selection("gemini-2.5-flash", MULTI_CONFIG, ["01"])
+
+        assert "enum" not in SINGLE_CONFIG["output_schema"]["properties"]["selected_code"]
+        items = MULTI_CONFIG["output_schema"]["properties"]["selections"]["items"]
+        assert "enum" not in items["properties"]["code"]
+
+    def test_no_codes_no_enum(self, built_models):
+        """Test the schema is bound as-is without candidate codes."""
+        ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG)
+
+        assert bound_schema(built_models[-1]) is SINGLE_CONFIG["output_schema"]
+
+
+class TestRunnableCache:
+    """Tests for the process-wide runnable cache."""
+
+    def test_same_inputs_reuse_runnable(self, built_models):
+        """Test identical requests build once and share the runnable."""
+        first = ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("84", "85"))
+        second = ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ["84", "85"])
+
+        assert first is second
+        assert len(built_models) == 1
+        assert metrics.counter("model_cache.misses") == 1
+        assert metrics.counter("model_cache.hits") == 1
+        assert metrics.timing("model_cache.build_seconds").count == 1
+
+    def test_equal_configs_share_entry(self, built_models):
+        """Test configs loaded separately (e.g. per agent) hit the same entry."""
+        ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("84",))
+        ModelFactory.create_with_config("gemini-2.5-flash", copy.deepcopy(SINGLE_CONFIG), ("84",))
+
+        assert len(built_models) == 1
+
+    def test_distinct_keys_build_separately(self, built_models):
+        """Test codes, model params and factory method are all part of the key."""
+        ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("84",))
+        ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("85",))
+        hotter = {**SINGLE_CONFIG, "model": {"parameters": {"temperature": 0.7}}}
+        ModelFactory.create_with_config("gemini-2.5-flash", hotter, ("84",))
+        ModelFactory.create_for_multi_selection("gemini-2.5-flash", SINGLE_CONFIG, ("84",))
+
+        assert len(built_models) == 4
+        assert ModelFactory.cache_size() == 4
+
+    def test_least_recently_used_evicted(self, built_models):
+        """Test the cache is bounded and evicts the least recently used entry."""
+        with patch("hs_agent.factories.model_factory.settings") as mock_settings:
+            mock_settings.model_cache_size = 2
+            ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("01",))
+            ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("02",))
+            ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("01",))
+            ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("03",))
+            ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("01",))
+            ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("02",))
+
+        assert ModelFactory.cache_size() == 2
+        # "02" was evicted by "03" and had to be rebuilt
+        assert len(built_models) == 4
+        assert metrics.counter("model_cache.evictions") == 2
+
+    def test_cache_disabled(self, built_models):
+        """Test a cache size of 0 builds a new runnable every time."""
+        with patch("hs_agent.factories.model_factory.settings") as mock_settings:
+            mock_settings.model_cache_size = 0
+            first = ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("84",))
+            second = ModelFactory.create_with_config("gemini-2.5-flash", SINGLE_CONFIG, ("84",))
+
+        assert first is not second
+        assert ModelFactory.cache_size() == 0
+        assert metrics.counter("model_cache.hits") == 0
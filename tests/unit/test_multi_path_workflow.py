@@ -2,16 +2,20 @@
 
 Tests cover:
 - Graph structure and node connections
-- Multi-selection filtering by parent (startswith logic)
+- Multi-selection filtering by parent (hierarchical index)
 - Path building (cartesian product, sorting, limiting)
 - Final code comparison and validation
 - _multi_select_codes result handling (empty, invalid, valid)
+- Sharded (tournament) multi-selection of oversized candidate lists
+- Concurrent branch fan-out (ordering, concurrency cap, failures)
 """
 
+import asyncio
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from hs_agent.data_loader import HSDataLoader
 from hs_agent.models import ClassificationLevel, ClassificationPath
 from hs_agent.workflows.multi_path_workflow import MultiPathWorkflow
 
@@ -25,8 +29,8 @@ class MockHSCode:
 
 @pytest.fixture
 def mock_data_loader():
-    """Create a mock data loader with test HS codes."""
-    loader = Mock()
+    """Create a data loader with test HS codes and its hierarchical index."""
+    loader = HSDataLoader()
     loader.codes_2digit = {
         "84": MockHSCode("84", "Machinery"),
         "85": MockHSCode("85", "Electrical"),
@@ -44,6 +48,7 @@ def mock_data_loader():
         "850110": MockHSCode("850110", "Electric motors small"),
         "852841": MockHSCode("852841", "Computer monitors"),
     }
+    loader.build_index()
     return loader
 
 
@@ -557,3 +562,141 @@ class TestMultiSelectCodes:
         assert result["codes"] == ["84", "85"]
         assert result["confidences"] == [0.9, 0.7]
         assert result["reasonings"] == ["Machinery chapter", "Electrical chapter"]
+
+
+def pick_highest_codes(model, messages, step=None, fallback=None):
+    """Fake LLM: select the highest candidate code listed in the prompt."""
+    codes = [line.split(":")[0] for line in messages[1].content.splitlines() if line[:2].isdigit()]
+    return {"selections": [{"code": max(codes), "confidence": 0.8, "reasoning": "highest"}]}
+
+
+class TestShardedMultiSelection:
+    """Tests for tournament multi-selection over oversized candidate lists."""
+
+    @pytest.fixture
+    def candidates(self):
+        """Provide five chapter candidates."""
+        return {f"0{i}": MockHSCode(f"0{i}", f"Chapter {i}") for i in range(1, 6)}
+
+    @pytest.fixture
+    def sharded_workflow(self, mock_data_loader, mock_retry_policy, mock_chapter_notes_service):
+        """Create a workflow whose chapter step shards lists above 2 candidates."""
+        return MultiPathWorkflow(
+            mock_data_loader,
+            "gemini-2.5-flash",
+            {"select_chapter_candidates": {"sharding": {"threshold": 2, "shard_size": 2}}},
+            mock_retry_policy,
+            mock_chapter_notes_service,
+        )
+
+    @pytest.mark.asyncio
+    async def test_final_call_over_winners(self, sharded_workflow, mock_retry_policy, candidates):
+        """Test more winners than max_selections are resolved by a final call."""
+        mock_retry_policy.invoke_with_retry.side_effect = pick_highest_codes
+
+        with patch("hs_agent.workflows.multi_path_workflow.ModelFactory"):
+            result = await sharded_workflow._multi_select_codes(
+                "product",
+                candidates,
+                "select_chapter_candidates",
+                ClassificationLevel.CHAPTER,
+                max_selections=1,
+            )
+
+        assert mock_retry_policy.invoke_with_retry.call_count == 4
+        assert result["codes"] == ["05"]
+
+    @pytest.mark.asyncio
+    async def test_winners_within_max_selections(
+        self, sharded_workflow, mock_retry_policy, candidates
+    ):
+        """Test shard winners are returned directly when they fit max_selections."""
+        mock_retry_policy.invoke_with_retry.side_effect = pick_highest_codes
+
+        with patch("hs_agent.workflows.multi_path_workflow.ModelFactory"):
+            result = await sharded_workflow._multi_select_codes(
+                "product",
+                candidates,
+                "select_chapter_candidates",
+                ClassificationLevel.CHAPTER,
+                max_selections=3,
+            )
+
+        assert mock_retry_policy.invoke_with_retry.call_count == 3
+        assert result == {
+            "codes": ["02", "04", "05"],
+            "confidences": [0.8, 0.8, 0.8],
+            "reasonings": ["highest", "highest", "highest"],
+        }
+
+
+class TestBranchFanOut:
+    """Tests for concurrent branch selection."""
+
+    @pytest.mark.asyncio
+    async def test_results_keep_parent_order(self, workflow):
+        """Test branch results follow chapter order, not completion order."""
+        delays = {"84": 0.02, "85": 0.0}
+
+        async def select(description, codes, config_name, level, max_selections, parent_code):
+            await asyncio.sleep(delays[parent_code])
+            return {
+                "codes": [f"{parent_code}00"],
+                "confidences": [0.5],
+                "reasonings": [parent_code],
+            }
+
+        state = {
+            "product_description": "laptop",
+            "max_selections": 1,
+            "selected_chapters": ["84", "85"],
+        }
+
+        with patch.object(workflow, "_multi_select_codes", side_effect=select):
+            result = await workflow._multi_select_headings(state)
+
+        assert list(result["selected_headings_by_chapter"]) == ["84", "85"]
+        assert result["heading_reasonings_by_chapter"] == {"84": ["84"], "85": ["85"]}
+
+    @pytest.mark.asyncio
+    async def test_concurrency_capped(self, workflow):
+        """Test no more than max_branch_concurrency branches run at once."""
+        running = 0
+        peak = 0
+
+        async def branch(i):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            return i
+
+        with patch("hs_agent.workflows.multi_path_workflow.settings") as mock_settings:
+            mock_settings.max_branch_concurrency = 2
+            results = await workflow._run_branches(branch(i) for i in range(6))
+
+        assert results == [0, 1, 2, 3, 4, 5]
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_other_branches(self, workflow):
+        """Test a failing branch propagates its error and cancels the rest."""
+        cancelled = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def failing():
+            raise RuntimeError("Selection failed")
+
+        with pytest.raises(RuntimeError, match="Selection failed"):
+            await workflow._run_branches([slow(), failing()])
+        await asyncio.sleep(0)
+
+        assert cancelled.is_set()
+
@@ -0,0 +1,245 @@
+"""Tests for the near-duplicate (MinHash/LSH) description index.
+
+Tests cover:
+- Canonicalization of SKU numbers, sizes, attribute colors and punctuation (keeping
+  percentages bound to their material, hyphenated compounds and single letters)
+- MinHash signatures (stable, similarity-preserving)
+- Matching above the threshold, within one scope, only with the same product words
+- Re-indexing, entry bound and clearing
+- HSAgent reuse of a near-duplicate's cached result (with the response flags)
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from hs_agent.cache import NearDuplicateIndex, canonicalize_description
+from hs_agent.cache.near_duplicate import minhash_signature
+from hs_agent.config.settings import settings
+from hs_agent.utils.metrics import metrics
+
+
+@pytest.fixture
+def index():
+    """Private index with a fixed threshold."""
+    return NearDuplicateIndex(threshold=0.8, max_entries=100)
+
+
+class TestCanonicalizeDescription:
+    """Tests for canonicalize_description."""
+
+    @pytest.mark.parametrize(
+        "description",
+        [
+            "Men's Cotton T-Shirt - Black, XL (SKU-88213)",
+            "men's cotton t-shirt navy size M",
+            "MEN'S COTTON T-SHIRT, colour: grey, 2XL",
+            "Men's cotton t-shirt #A-1129 white",
+        ],
+    )
+    def test_strips_catalog_noise(self, description):
+        """Test SKU numbers, sizes, colors and punctuation are stripped."""
+        assert canonicalize_description(description) == "men cotton t-shirt"
+
+    def test_strips_quantities(self):
+        """Test weights, volumes and dimensions are stripped."""
+        assert canonicalize_description("Olive oil 500 ml, 12-pack") == "olive oil"
+        assert canonicalize_description("Oak table 120x80 cm AB1234X") == "oak table"
+
+    def test_keeps_colors_in_product_name(self):
+        """Test a color that is part of the product name is kept."""
+        assert canonicalize_description("Black tea 100g") == "black tea"
+        assert canonicalize_description("Green tea 100g") == "green tea"
+
+    def test_keeps_hyphenated_color_compounds(self):
+        """Test a color joined by a hyphen is kept with its compound."""
+        assert canonicalize_description("Off-white paint 5l") == "off-white paint"
+        assert canonicalize_description("Photo print, black-and-white") == (
+            "photo print black-and-white"
+        )
+        assert canonicalize_description("Paint - white") == "paint"
+
+    def test_keeps_what_changes_classification(self):
+        """Test percentages stay bound to their material and compounds and letters are kept."""
+        assert (
+            canonicalize_description("Trousers 85 % cotton, 15% polyester")
+            == "trouser 85%cotton 15%polyester"
+        )
+        assert canonicalize_description("Mens cotton T-shirt") == "men cotton t-shirt"
+        assert canonicalize_description("Vitamin C tablets") == "vitamin c tablet"
+
+
+class TestMinhashSignature:
+    """Tests for minhash_signature."""
+
+    def test_identical_sets_share_signature(self):
+        """Test signatures only depend on the token set."""
+        first = minhash_signature(frozenset(["men", "cotton", "shirt"]))
+        second = minhash_signature(frozenset(["shirt", "cotton", "men"]))
+
+        np.testing.assert_array_equal(first, second)
+
+    def test_estimates_jaccard_similarity(self):
+        """Test the share of equal signature values tracks the Jaccard similarity."""
+        tokens = [f"token{i}" for i in range(100)]
+        first = minhash_signature(frozenset(tokens[:80]))
+        second = minhash_signature(frozenset(tokens[20:]))
+
+        # Jaccard similarity 60 / 100
+        assert abs(np.mean(first == second) - 0.6) < 0.2
+
+
+class TestNearDuplicateIndex:
+    """Tests for NearDuplicateIndex."""
+
+    def test_finds_near_duplicate(self, index):
+        """Test a catalog variant matches the classified description."""
+        metrics.reset()
+        index.add("Men's cotton t-shirt, black, XL", "scope", "key-1")
+
+        match = index.find("men's cotton t-shirt - navy - size S (SKU-1)", "scope")
+
+        assert match.key == "key-1"
+        assert match.description == "Men's cotton t-shirt, black, XL"
+        assert match.similarity == 1.0
+        assert metrics.counter("near_duplicate.hits") == 1
+
+    def test_threshold(self, index):
+        """Test the threshold bounds how much marketing filler may differ."""
+        index.add("premium stainless steel kitchen knife", "scope", "key-1")
+
+        # 4 of 5 tokens shared: 0.8
+        assert index.find("stainless steel kitchen knife", "scope").similarity == 0.8
+        # 4 of 7 tokens shared: 0.57
+        assert index.find("new genuine stainless steel kitchen knife", "scope") is None
+
+    @pytest.mark.parametrize(
+        ("classified", "description"),
+        [
+            (
+                "womens woven fabric trousers 85% cotton 15% polyester",
+                "womens woven fabric trousers 85% polyester 15% cotton",
+            ),
+            ("mens cotton t-shirt", "mens cotton shirt"),
+            ("frozen boneless beef cuts vacuum packed", "fresh boneless beef cuts vacuum packed"),
+            (
+                "mens knitted cotton pullover long sleeves",
+                "mens knitted wool pullover long sleeves",
+            ),
+            ("stainless steel kitchen knife set", "stainless steel kitchen knife"),
+            ("cotton shirt polyester lining", "polyester shirt cotton lining"),
+        ],
+    )
+    def test_product_words_must_match(self, index, classified, description):
+        """Test descriptions differing in a product word (or its order) never match."""
+        index.add(classified, "scope", "key-1")
+
+        assert index.find(description, "scope") is None
+
+    def test_scope_separates_entries(self, index):
+        """Test results are only matched within the same setup."""
+        index.add("men's cotton t-shirt", "single", "key-1")
+
+        assert index.find("men's cotton t-shirt", "multi") is None
+
+    def test_readding_key_replaces_entry(self, index):
+        """Test a key is indexed once, under its latest description."""
+        index.add("men's cotton t-shirt", "scope", "key-1")
+        index.add("women's wool sweater", "scope", "key-1")
+
+        assert len(index) == 1
+        assert index.find("men's cotton t-shirt", "scope") is None
+
+    def test_drops_least_recently_matched(self):
+        """Test the entry bound drops the least recently matched description."""
+        index = NearDuplicateIndex(threshold=0.8, max_entries=2)
+        index.add("men's cotton t-shirt", "scope", "a")
+        index.add("women's wool sweater", "scope", "b")
+        index.find("men's cotton t-shirt", "scope")
+
+        index.add("leather handbag", "scope", "c")
+
+        assert index.find("men's cotton t-shirt", "scope").key == "a"
+        assert index.find("women's wool sweater", "scope") is None
+
+    def test_ignores_descriptions_without_tokens(self, index):
+        """Test descriptions that are only noise are not indexed."""
+        index.add("SKU-12345, XL", "scope", "key-1")
+
+        assert len(index) == 0
+        assert index.find("SKU-12345, XL", "scope") is None
+
+    def test_clear(self, index):
+        """Test clear drops every entry."""
+        index.add("men's cotton t-shirt", "scope", "key-1")
+
+        index.clear()
+
+        assert len(index) == 0
+        assert index.find("men's cotton t-shirt", "scope") is None
+
+
+@pytest.fixture
+def agent(make_agent, index):
+    """HSAgent with a private result cache and near-duplicate index."""
+    return make_agent(near_duplicates=index)
+
+
+@pytest.fixture
+def tshirt_state(classification_state):
+    """Final graph state of a cotton t-shirt classification."""
+    return classification_state("610910", "T-shirts of cotton")
+
+
+class TestHSAgentNearDuplicates:
+    """Tests for near-duplicate reuse in HSAgent.classify."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_near_duplicate_result(self, agent, tshirt_state):
+        """Test a catalog variant is answered from the prior result, with the match flagged."""
+        with (
+            patch.object(settings, "enable_near_duplicate_cache", True),
+            patch.object(agent.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke,
+        ):
+            mock_invoke.return_value = tshirt_state
+
+            first = await agent.classify("Men's cotton t-shirt, black, XL")
+            second = await agent.classify("Men's cotton t-shirt - navy - size M (SKU-4410)")
+
+        mock_invoke.assert_called_once()
+        assert first.near_duplicate_of is None
+        assert second.cached is True
+        assert second.final_code == "610910"
+        assert second.product_description == "Men's cotton t-shirt - navy - size M (SKU-4410)"
+        assert second.near_duplicate_of == "Men's cotton t-shirt, black, XL"
+        assert second.near_duplicate_similarity == 1.0
+
+    @pytest.mark.asyncio
+    async def test_exact_hit_not_flagged(self, agent, tshirt_state):
+        """Test exact cache hits do not report a near-duplicate match."""
+        with (
+            patch.object(settings, "enable_near_duplicate_cache", True),
+            patch.object(agent.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke,
+        ):
+            mock_invoke.return_value = tshirt_state
+
+            await agent.classify("Men's cotton t-shirt")
+            second = await agent.classify("men's cotton t-shirt")
+
+        assert second.cached is True
+        assert second.near_duplicate_of is None
+        assert second.near_duplicate_similarity is None
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, agent, tshirt_state):
+        """Test near duplicates are classified on their own unless enabled."""
+        with patch.object(agent.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke:
+            mock_invoke.return_value = tshirt_state
+
+            await agent.classify("Men's cotton t-shirt, black, XL")
+            second = await agent.classify("Men's cotton t-shirt - navy - size M")
+
+        assert mock_invoke.call_count == 2
+        assert second.cached is False
+        assert len(agent.near_duplicates) == 0
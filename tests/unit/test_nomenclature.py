@@ -0,0 +1,168 @@
+"""Tests for nomenclature releases and hot-swapping.
+
+Tests cover:
+- Lazy first load
+- Reload swaps only on a new revision (or when forced)
+- In-flight holders keep the release they started with
+- Warmup runs before a release becomes active
+- Source file watching and failure handling
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from hs_agent.data_loader import HSDataLoader, nomenclature_version
+from hs_agent.nomenclature import NomenclatureManager, NomenclatureRelease
+
+
+@pytest.fixture
+def source_dir(temp_data_dir):
+    """Provide the sample data directory."""
+    return temp_data_dir
+
+
+def make_manager(data_dir, **kwargs):
+    """Build a manager loading real HSDataLoaders from data_dir."""
+
+    def factory():
+        loader = HSDataLoader(data_dir=data_dir)
+        loader.load_all_data(use_snapshot=False)
+        return loader
+
+    return NomenclatureManager(
+        factory, source_version=HSDataLoader(data_dir=data_dir).source_version, **kwargs
+    )
+
+
+def add_code(data_dir):
+    """Append a subheading to the sample CSV (a new revision)."""
+    csv_path = data_dir / "hs_codes_all.csv"
+    csv_path.write_text(csv_path.read_text() + "847141,Other data processing,6,8471,XVI\n")
+
+
+class TestRelease:
+    """Tests for NomenclatureRelease."""
+
+    def test_version_from_loader(self):
+        """Test the release takes the loader's version."""
+        loader = HSDataLoader()
+        loader.version = "hs_codes_all@abc"
+
+        assert NomenclatureRelease(loader).version == "hs_codes_all@abc"
+
+    def test_unversioned_loader(self):
+        """Test loaders without a version get a placeholder label."""
+        assert NomenclatureRelease(HSDataLoader()).version == "unversioned"
+
+
+class TestManager:
+    """Tests for NomenclatureManager."""
+
+    def test_current_loads_lazily_once(self):
+        """Test the first access loads and later accesses reuse the release."""
+        factory = Mock(return_value=HSDataLoader())
+        manager = NomenclatureManager(factory)
+
+        first = manager.current
+
+        assert manager.current is first
+        factory.assert_called_once()
+
+    def test_version_matches_source(self, source_dir):
+        """Test the active version is derived from the source file."""
+        manager = make_manager(source_dir)
+
+        assert manager.current.version == nomenclature_version(source_dir / "hs_codes_all.csv")
+
+    def test_reload_unchanged_is_noop(self, source_dir):
+        """Test reloading the same revision keeps the active release."""
+        manager = make_manager(source_dir)
+        active = manager.current
+
+        assert manager.reload() is None
+        assert manager.current is active
+
+    def test_reload_force_swaps(self, source_dir):
+        """Test a forced reload swaps even without changes."""
+        manager = make_manager(source_dir)
+        active = manager.current
+
+        assert manager.reload(force=True) is manager.current
+        assert manager.current is not active
+
+    def test_reload_new_revision(self, source_dir):
+        """Test a changed source swaps in a new release."""
+        manager = make_manager(source_dir)
+        in_flight = manager.current
+        add_code(source_dir)
+
+        new = manager.reload()
+
+        assert new is manager.current
+        assert new.version != in_flight.version
+        assert "847141" in new.data_loader.codes_6digit
+        # A request holding the old release still sees the old table
+        assert "847141" not in in_flight.data_loader.codes_6digit
+
+    def test_warmup_runs_before_swap(self, source_dir):
+        """Test warmup sees the new release while the old one is still active."""
+        seen = []
+
+        def warmup(release):
+            seen.append((release, manager._current))
+
+        manager = make_manager(source_dir, warmup=warmup)
+        previous = manager.current
+
+        new = manager.reload(force=True)
+
+        # First load had nothing active yet; the reload warmed up while previous was active
+        assert seen == [(previous, None), (new, previous)]
+
+    def test_failed_reload_keeps_active_release(self, source_dir):
+        """Test a loader error leaves the active release in place."""
+        manager = make_manager(source_dir)
+        active = manager.current
+        (source_dir / "hs_codes_all.csv").unlink()
+
+        with pytest.raises(FileNotFoundError):
+            manager.reload()
+
+        assert manager.current is active
+
+    def test_source_changed(self, source_dir):
+        """Test change detection compares the source revision to the active one."""
+        manager = make_manager(source_dir)
+        assert manager.current is not None
+
+        assert not manager.source_changed()
+        add_code(source_dir)
+        assert manager.source_changed()
+
+    async def test_reload_async(self, source_dir):
+        """Test reloading off the event loop."""
+        manager = make_manager(source_dir)
+        old = manager.current
+        add_code(source_dir)
+
+        new = await manager.reload_async()
+
+        assert new is manager.current
+        assert new is not old
+
+    async def test_watch_swaps_on_change(self, source_dir):
+        """Test the watcher picks up a new revision."""
+        manager = make_manager(source_dir)
+        active = manager.current
+        add_code(source_dir)
+
+        watcher = asyncio.create_task(manager.watch(0.01))
+        for _ in range(200):
+            if manager.current is not active:
+                break
+            await asyncio.sleep(0.01)
+        watcher.cancel()
+
+        assert manager.current is not active
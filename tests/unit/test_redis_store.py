@@ -0,0 +1,186 @@
+"""Tests for the Redis-protocol cache backend.
+
+Tests cover:
+- Round trips through background writes, with the key prefix and expiry
+- Sharing entries between replicas through one server
+- Unreachable servers treated as misses
+- Dropped writes beyond the pending write limit
+- Clearing only the backend's own keys
+- Closing (flush, writes and close after close do nothing)
+- The optional redis package
+- Process-wide backend from settings
+"""
+
+import fnmatch
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from hs_agent.cache import RedisResultStore
+from hs_agent.cache import backend as backend_module
+from hs_agent.config.settings import CacheBackendType
+from hs_agent.utils.metrics import metrics
+
+
+class FakeRedis:
+    """In-process stand-in for a Redis server (the redis-py methods the backend uses)."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.expiries: dict[str, int] = {}
+        self.closed = False
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def set(self, name, value, ex=None):
+        self.data[name] = value
+        self.expiries[name] = ex
+
+    def scan_iter(self, match="*"):
+        return [name for name in list(self.data) if fnmatch.fnmatchcase(name, match)]
+
+    def delete(self, *names):
+        for name in names:
+            self.data.pop(name, None)
+
+    def close(self):
+        self.closed = True
+
+
+class UnreachableRedis(FakeRedis):
+    """Redis stand-in whose server cannot be reached."""
+
+    def get(self, name):
+        raise ConnectionError("connection refused")
+
+    def set(self, name, value, ex=None):
+        raise ConnectionError("connection refused")
+
+
+@pytest.fixture
+def server():
+    """Shared fake server."""
+    return FakeRedis()
+
+
+@pytest.fixture
+def store(server):
+    """Backend on the fake server."""
+    store = RedisResultStore(client=server, prefix="test:", ttl_seconds=90.5)
+    yield store
+    store.close()
+
+
+class TestRedisResultStore:
+    """Tests for RedisResultStore."""
+
+    def test_round_trip(self, store, server):
+        """Test a written payload is read back once the write is applied."""
+        store.set("k", b"payload")
+        store.flush()
+
+        assert store.get("k") == b"payload"
+        assert store.get("missing") is None
+        assert server.data == {"test:k": b"payload"}
+        assert server.expiries == {"test:k": 91}
+
+    def test_shared_between_replicas(self, server):
+        """Test a cache fill on one replica serves another."""
+        first = RedisResultStore(client=server, prefix="test:", ttl_seconds=60)
+        second = RedisResultStore(client=server, prefix="test:", ttl_seconds=60)
+
+        first.set("k", b"payload")
+        first.flush()
+
+        assert second.get("k") == b"payload"
+        first.close()
+        second.close()
+
+    def test_unreachable_server_is_a_miss(self):
+        """Test server errors never fail the caller."""
+        metrics.reset()
+        store = RedisResultStore(client=UnreachableRedis(), prefix="test:", ttl_seconds=60)
+
+        store.set("k", b"payload")
+        store.flush()
+
+        assert store.get("k") is None
+        assert metrics.counter("result_store.errors") == 2
+        store.close()
+
+    def test_drops_writes_beyond_limit(self, server):
+        """Test writes are dropped rather than queued without bound."""
+        metrics.reset()
+        release = threading.Event()
+        unblocked_set = server.set
+
+        def blocked_set(*args, **kwargs):
+            release.wait()
+            unblocked_set(*args, **kwargs)
+
+        store = RedisResultStore(client=server, prefix="test:", max_pending_writes=1)
+
+        with patch.object(server, "set", side_effect=blocked_set):
+            store.set("a", b"1")
+            store.set("b", b"2")
+            release.set()
+            store.flush()
+
+        assert metrics.counter("result_store.dropped_writes") == 1
+        assert store.get("a") == b"1"
+        assert store.get("b") is None
+        store.close()
+
+    def test_clear_keeps_other_prefixes(self, store, server):
+        """Test clear only drops the backend's own keys."""
+        server.set("other:k", b"kept")
+        store.set("k", b"payload")
+
+        store.clear()
+
+        assert server.data == {"other:k": b"kept"}
+
+    def test_requires_redis_package(self):
+        """Test a missing redis package is reported when no client is given."""
+        with (
+            patch.dict("sys.modules", {"redis": None}),
+            pytest.raises(ImportError, match=r"hs-agent\[redis\]"),
+        ):
+            RedisResultStore()
+
+    def test_close_closes_client(self, server):
+        """Test close releases the client."""
+        store = RedisResultStore(client=server, prefix="test:")
+
+        store.close()
+
+        assert server.closed is True
+
+    def test_use_after_close(self, server):
+        """Test flushing, writing and closing again after close do nothing."""
+        metrics.reset()
+        store = RedisResultStore(client=server, prefix="test:")
+        store.close()
+
+        store.flush()
+        store.set("k", b"payload")
+        store.close()
+
+        assert server.get("test:k") is None
+        assert metrics.counter("result_store.dropped_writes") == 1
+
+    def test_process_wide_backend(self):
+        """Test settings select the Redis backend."""
+        with (
+            patch.object(backend_module, "_shared_backend", None),
+            patch("hs_agent.cache.backend.settings") as mock_settings,
+            patch("hs_agent.cache.redis_store.RedisResultStore.__init__", return_value=None),
+        ):
+            mock_settings.cache_backend = CacheBackendType.REDIS
+
+            backend = backend_module.get_shared_backend()
+
+            assert isinstance(backend, RedisResultStore)
+            assert backend_module.get_shared_backend() is backend
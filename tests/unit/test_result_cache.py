@@ -0,0 +1,197 @@
+"""Tests for the classification result cache.
+
+Tests cover:
+- Description normalization and cache keys
+- LRU eviction under the size bound, TTL expiry
+- Metrics
+- HSAgent integration (hits, cached flags, "000000" results not cached)
+"""
+
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from hs_agent.cache import ResultCache, fingerprint, normalize_description, result_cache_key
+from hs_agent.cache.result_cache import ENTRY_OVERHEAD_BYTES
+from hs_agent.utils.metrics import metrics
+
+
+def key_for(description, **overrides):
+    """Build a cache key with default setup values."""
+    setup = {
+        "kind": "single",
+        "workflow": "single_path_classification",
+        "model": "gemini-2.5-flash",
+        "config_hash": "abc",
+        "nomenclature_version": "2022",
+    }
+    return result_cache_key(description, **{**setup, **overrides})
+
+
+class TestCacheKey:
+    """Tests for normalize_description, fingerprint and result_cache_key."""
+
+    def test_normalize_description(self):
+        """Test case, whitespace and compatibility forms are normalized."""
+        assert normalize_description("  Men's\tCOTTON   trousers\n") == "men's cotton trousers"
+        assert normalize_description("ＬＡＰＴＯＰ") == "laptop"
+
+    def test_equivalent_descriptions_share_key(self):
+        """Test descriptions differing only in case/whitespace share a key."""
+        assert key_for("Laptop  computer") == key_for("laptop computer ")
+
+    @pytest.mark.parametrize(
+        "override",
+        [
+            {"kind": "multi"},
+            {"workflow": "wide_net_classification"},
+            {"model": "gemini-2.5-pro"},
+            {"config_hash": "def"},
+            {"nomenclature_version": "2027"},
+            {"max_selections": 5},
+        ],
+    )
+    def test_setup_changes_key(self, override):
+        """Test every part of the setup is part of the key."""
+        assert key_for("laptop computer", **override) != key_for("laptop computer")
+
+    def test_fingerprint_ignores_key_order(self):
+        """Test fingerprints of equal dicts match regardless of key order."""
+        assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+        assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+class TestResultCache:
+    """Tests for ResultCache."""
+
+    def test_get_set(self):
+        """Test stored payloads are returned and missing keys give None."""
+        cache = ResultCache(max_bytes=10_000, ttl_seconds=60)
+        cache.set("k", b"payload")
+
+        assert cache.get("k") == b"payload"
+        assert cache.get("missing") is None
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL."""
+        cache = ResultCache(max_bytes=10_000, ttl_seconds=0.01)
+        cache.set("k", b"payload")
+
+        time.sleep(0.02)
+
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction_by_size(self):
+        """Test the least recently used entries are evicted to stay under max_bytes."""
+        entry_size = 1 + 100 + ENTRY_OVERHEAD_BYTES
+        cache = ResultCache(max_bytes=2 * entry_size, ttl_seconds=60)
+        cache.set("a", b"x" * 100)
+        cache.set("b", b"x" * 100)
+        cache.get("a")
+
+        cache.set("c", b"x" * 100)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.size_bytes == 2 * entry_size
+
+    def test_oversized_entry_not_stored(self):
+        """Test a payload larger than the whole cache is skipped."""
+        cache = ResultCache(max_bytes=100, ttl_seconds=60)
+        cache.set("k", b"x" * 1000)
+
+        assert len(cache) == 0
+
+    def test_overwrite_accounts_size(self):
+        """Test replacing an entry does not leak its old size."""
+        cache = ResultCache(max_bytes=10_000, ttl_seconds=60)
+        cache.set("k", b"x" * 100)
+        cache.set("k", b"x" * 10)
+
+        assert cache.size_bytes == 1 + 10 + ENTRY_OVERHEAD_BYTES
+
+    def test_clear(self):
+        """Test clear drops every entry."""
+        cache = ResultCache(max_bytes=10_000, ttl_seconds=60)
+        cache.set("k", b"payload")
+
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
+
+    def test_defaults_from_settings(self):
+        """Test size bound and TTL are read from settings."""
+        with patch("hs_agent.cache.result_cache.settings") as mock_settings:
+            mock_settings.result_cache_max_bytes = 1234
+            mock_settings.cache_ttl_seconds = 60
+
+            cache = ResultCache()
+
+            assert cache.max_bytes == 1234
+            assert cache.ttl_seconds == 60
+
+    def test_metrics(self):
+        """Test hits, misses and stored bytes are reported."""
+        metrics.reset()
+        cache = ResultCache(max_bytes=10_000, ttl_seconds=60)
+        cache.set("k", b"payload")
+
+        cache.get("k")
+        cache.get("missing")
+
+        assert metrics.counter("result_cache.hits") == 1
+        assert metrics.counter("result_cache.misses") == 1
+        assert metrics.gauge("result_cache.bytes") == cache.size_bytes
+
+
+class TestHSAgentResultCache:
+    """Tests for result caching in HSAgent.classify."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_served_from_cache(self, agent, classification_state):
+        """Test a repeated description is answered without running the graph."""
+        with patch.object(agent.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke:
+            mock_invoke.return_value = classification_state()
+
+            first = await agent.classify("Laptop computer")
+            second = await agent.classify("laptop  computer")
+
+        mock_invoke.assert_called_once()
+        assert first.cached is False
+        assert first.original_processing_time_ms is None
+        assert second.cached is True
+        assert second.final_code == first.final_code
+        assert second.product_description == "laptop  computer"
+        assert second.original_processing_time_ms == first.processing_time_ms
+
+    @pytest.mark.asyncio
+    async def test_no_hs_code_not_cached(self, agent, classification_state):
+        """Test "000000" results (possibly transient LLM failures) are not cached."""
+        with patch.object(agent.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke:
+            mock_invoke.return_value = classification_state("000000")
+
+            await agent.classify("laptop computer")
+            await agent.classify("laptop computer")
+
+        assert mock_invoke.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_in_settings(self, agent, classification_state):
+        """Test nothing is cached when settings.enable_caching is off."""
+        with (
+            patch("hs_agent.agent.settings") as mock_settings,
+            patch.object(agent.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke,
+        ):
+            mock_settings.enable_caching = False
+            mock_settings.request_timeout_seconds = 300
+            mock_invoke.return_value = classification_state()
+
+            await agent.classify("laptop computer")
+            await agent.classify("laptop computer")
+
+        assert mock_invoke.call_count == 2
+        assert len(agent.result_cache) == 0
@@ -0,0 +1,89 @@
+"""Tests for the lexical (BM25) candidate retrieval.
+
+Tests cover:
+- Tokenization (stopwords, light stemming)
+- Ranking by subtree text
+- Fallback when retrieval is not confident
+"""
+
+import pytest
+
+from hs_agent.code_table import ROOT_CODE, HSCodeTable
+from hs_agent.retrieval import LexicalIndex, tokenize
+
+
+@pytest.fixture
+def table():
+    """Provide a small table whose subheadings carry the distinguishing words."""
+    rows = [
+        ("03", "Fish and crustaceans", 2, ROOT_CODE),
+        ("61", "Apparel, knitted", 2, ROOT_CODE),
+        ("62", "Apparel, not knitted", 2, ROOT_CODE),
+        ("82", "Tools, cutlery", 2, ROOT_CODE),
+        ("84", "Machinery", 2, ROOT_CODE),
+        ("0306", "Crustaceans", 4, "03"),
+        ("6109", "T-shirts, knitted", 4, "61"),
+        ("6203", "Men's suits and trousers", 4, "62"),
+        ("8211", "Knives with cutting blades", 4, "82"),
+        ("8471", "Data processing machines", 4, "84"),
+        ("030617", "Frozen shrimps and prawns", 6, "0306"),
+        ("610910", "T-shirts of cotton", 6, "6109"),
+        ("620342", "Trousers of cotton", 6, "6203"),
+        ("821191", "Table knives of stainless steel", 6, "8211"),
+        ("847130", "Portable computers", 6, "8471"),
+    ]
+    return HSCodeTable(*(list(column) for column in zip(*rows, strict=True)))
+
+
+@pytest.fixture
+def chapters(table):
+    """Provide the chapter index."""
+    return LexicalIndex(table, 2)
+
+
+class TestTokenize:
+    """Tests for tokenize."""
+
+    def test_lowercases_and_drops_stopwords(self):
+        """Test case folding and stopword removal."""
+        assert tokenize("Knives OF stainless steel, other") == ["knive", "stainless", "steel"]
+
+    def test_light_stemming(self):
+        """Test plural forms map onto the same token."""
+        assert tokenize("shrimps batteries glass") == ["shrimp", "battery", "glass"]
+
+
+class TestShortlist:
+    """Tests for LexicalIndex.shortlist."""
+
+    def test_ranks_by_subtree_text(self, chapters):
+        """Test chapters are matched through their subheading descriptions."""
+        codes = ("03", "61", "62", "82", "84")
+
+        assert chapters.shortlist("frozen shrimps", codes, keep=1) == ["03"]
+        assert chapters.shortlist("stainless steel table knife", codes, keep=1) == ["82"]
+
+    def test_keeps_original_order(self, chapters):
+        """Test the shortlist is returned in candidate order, not score order."""
+        codes = ("03", "61", "62", "82", "84")
+
+        assert chapters.shortlist("cotton trousers", codes, keep=2) == ["61", "62"]
+
+    def test_restricted_to_given_codes(self, chapters):
+        """Test only the given candidates are ranked."""
+        assert chapters.shortlist("cotton trousers", ("61", "82"), keep=1) == ["61"]
+
+    def test_unknown_terms_fall_back(self, chapters):
+        """Test low coverage of the query by the vocabulary returns None."""
+        codes = ("03", "61", "62", "82", "84")
+
+        assert chapters.shortlist("laptop notebook", codes, keep=2) is None
+        assert chapters.shortlist("cotton hoodie sweatshirt", codes, keep=2) is None
+        assert chapters.shortlist("cotton hoodie sweatshirt", codes, keep=2, min_coverage=0.3)
+
+    def test_no_match_falls_back(self, table):
+        """Test a query known to the index but matching no candidate returns None."""
+        index = LexicalIndex(table, 4)
+
+        assert index.shortlist("frozen shrimp", ("6109", "6203"), keep=1) is None
+        assert index.shortlist("", ("6109", "6203"), keep=1) is None
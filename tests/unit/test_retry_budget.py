@@ -0,0 +1,84 @@
+"""Tests for the process-wide retry budget.
+
+Tests cover:
+- Starting full and spending tokens
+- Deposits per successful call, capped at max_tokens
+- Defaults from settings and reset
+- Metrics
+"""
+
+from unittest.mock import patch
+
+from hs_agent.policies.retry_budget import RetryBudget
+from hs_agent.utils.metrics import metrics
+
+
+class TestRetryBudget:
+    """Tests for RetryBudget."""
+
+    def test_starts_full(self):
+        """Test a new budget allows max_tokens retries, then none."""
+        budget = RetryBudget(ratio=0.1, max_tokens=3)
+
+        assert [budget.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_successes_earn_retries(self):
+        """Test every 1/ratio successful calls earn one retry."""
+        budget = RetryBudget(ratio=0.25, max_tokens=1)
+        budget.try_acquire()
+
+        for _ in range(3):
+            budget.record_success()
+        assert budget.try_acquire() is False
+
+        for _ in range(4):
+            budget.record_success()
+        assert budget.try_acquire() is True
+
+    def test_deposits_capped(self):
+        """Test the bucket never holds more than max_tokens."""
+        budget = RetryBudget(ratio=1.0, max_tokens=2)
+
+        for _ in range(10):
+            budget.record_success()
+
+        assert budget.tokens == 2.0
+
+    def test_zero_ratio_only_allows_burst(self):
+        """Test a zero ratio never refills the bucket."""
+        budget = RetryBudget(ratio=0.0, max_tokens=1)
+        budget.try_acquire()
+        budget.record_success()
+
+        assert budget.try_acquire() is False
+
+    def test_defaults_from_settings(self):
+        """Test ratio and capacity are read from settings."""
+        with patch("hs_agent.policies.retry_budget.settings") as mock_settings:
+            mock_settings.retry_budget_ratio = 0.5
+            mock_settings.retry_budget_max_tokens = 4.0
+            budget = RetryBudget()
+
+            assert budget.ratio == 0.5
+            assert budget.tokens == 4.0
+
+    def test_reset_refills(self):
+        """Test reset refills the bucket."""
+        budget = RetryBudget(ratio=0.1, max_tokens=1)
+        budget.try_acquire()
+
+        budget.reset()
+
+        assert budget.tokens == 1.0
+
+    def test_metrics(self):
+        """Test allowed/denied retries are counted and the tokens published."""
+        metrics.reset()
+        budget = RetryBudget(ratio=0.1, max_tokens=1)
+
+        budget.try_acquire()
+        budget.try_acquire()
+
+        assert metrics.counter("retry_budget.allowed") == 1
+        assert metrics.counter("retry_budget.denied") == 1
+        assert metrics.gauge("retry_budget.tokens") == 0.0
@@ -8,6 +8,12 @@ Tests cover:
 - Prompt variation on retries
 - Max retries exhaustion
 - Custom configuration
+- Error classification (fatal errors not retried, retry-after hints)
+- Capped, full-jitter backoff
+- Per-request deadline
+- Process-wide retry budget
+- Hedged calls
+- Circuit breaker failover to the fallback model
 """
 
 import asyncio
@@ -15,9 +21,19 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from hs_agent.policies.circuit_breaker import CircuitBreaker, CircuitState
+from hs_agent.policies.deadline import deadline_scope
+from hs_agent.policies.hedging import HedgingPolicy
+from hs_agent.policies.retry_budget import RetryBudget, retry_budget
 from hs_agent.policies.retry_policy import RetryPolicy
 
 
+@pytest.fixture(autouse=True)
+def full_retry_budget():
+    """Start every test with a full process-wide retry budget."""
+    retry_budget.reset()
+
+
 class TestRetryPolicyInit:
     """Tests for RetryPolicy initialization."""
 
@@ -322,3 +338,404 @@ class TestRetryPolicyEdgeCases:
         assert result == {"result": "ok"}
         # With 0 initial delay, sleep should still be called with 0
         assert sleep_calls == [0.0]
+
+
+class ResourceExhausted(Exception):
+    """Stand-in for google.api_core.exceptions.ResourceExhausted."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InvalidArgument(Exception):
+    """Stand-in for google.api_core.exceptions.InvalidArgument."""
+
+
+def record_sleeps():
+    """Patch asyncio.sleep to record delays instead of sleeping."""
+    sleep_calls = []
+
+    async def mock_sleep(delay):
+        sleep_calls.append(delay)
+
+    return sleep_calls, patch.object(asyncio, "sleep", mock_sleep)
+
+
+class TestRetryPolicyErrorHandling:
+    """Tests for error classification in invoke_with_retry."""
+
+    @pytest.mark.asyncio
+    async def test_fatal_error_not_retried(self):
+        """Test invalid requests give up after one attempt."""
+        policy = RetryPolicy(max_retries=3, initial_delay=0.01)
+        mock_model = MagicMock()
+        mock_model.ainvoke = AsyncMock(side_effect=InvalidArgument("Bad schema"))
+
+        result = await policy.invoke_with_retry(mock_model, [MagicMock(content="test")])
+
+        assert result is None
+        assert mock_model.ainvoke.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_throttled_honors_retry_after(self):
+        """Test a provider retry-after hint longer than the backoff is used."""
+        policy = RetryPolicy(max_retries=2, initial_delay=1.0)
+        mock_model = MagicMock()
+        mock_model.ainvoke = AsyncMock(
+            side_effect=[ResourceExhausted("Quota", retry_after=5.0), {"result": "ok"}]
+        )
+        sleep_calls, sleep_patch = record_sleeps()
+
+        with sleep_patch:
+            result = await policy.invoke_with_retry(mock_model, [MagicMock(content="test")])
+
+        assert result == {"result": "ok"}
+        assert sleep_calls == [5.0]
+
+    @pytest.mark.asyncio
+    async def test_throttled_without_hint_uses_backoff(self):
+        """Test throttling without a hint falls back to the backoff delay."""
+        policy = RetryPolicy(max_retries=2, initial_delay=1.0)
+        mock_model = MagicMock()
+        mock_model.ainvoke = AsyncMock(side_effect=[ResourceExhausted("Quota"), {"result": "ok"}])
+        sleep_calls, sleep_patch = record_sleeps()
+
+        with sleep_patch:
+            await policy.invoke_with_retry(mock_model, [MagicMock(content="test")])
+
+        assert sleep_calls == [1.0]
+
+
+class TestRetryPolicyBackoff:
+    """Tests for backoff_delay."""
+
+    def test_capped_at_max_delay(self):
+        """Test exponential delays stop growing at max_delay."""
+        policy = RetryPolicy(initial_delay=1.0, max_delay=5.0)
+
+        assert [policy.backoff_delay(attempt) for attempt in range(5)] == [1, 2, 4, 5, 5]
+
+    def test_full_jitter(self):
+        """Test jittered delays are uniform between 0 and the exponential delay."""
+        policy = RetryPolicy(initial_delay=1.0, jitter=True)
+
+        with patch("hs_agent.policies.retry_policy.random.uniform", return_value=0.7) as uniform:
+            delay = policy.backoff_delay(2)
+
+        uniform.assert_called_once_with(0, 4.0)
+        assert delay == 0.7
+
+
+class TestRetryPolicyDeadline:
+    """Tests for the per-request deadline."""
+
+    @pytest.mark.asyncio
+    async def test_no_sleep_past_deadline(self):
+        """Test a backoff longer than the time left ends the retries."""
+        policy = RetryPolicy(max_retries=3, initial_delay=10.0)
+        mock_model = MagicMock()
+        mock_model.ainvoke = AsyncMock(side_effect=[None, {"result": "ok"}])
+        sleep_calls, sleep_patch = record_sleeps()
+
+        with sleep_patch, deadline_scope(5):
+            result = await policy.invoke_with_retry(mock_model, [MagicMock(content="test")])
+
+        assert result is None
+        assert sleep_calls == []
+        assert mock_model.ainvoke.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_call_bounded_by_deadline(self):
+        """Test a call still running at the deadline is abandoned."""
+        policy = RetryPolicy(max_retries=3, initial_delay=0.01)
+
+        async def hang(messages):
+            await asyncio.sleep(10)
+
+        mock_model = MagicMock()
+        mock_model.ainvoke = hang
+
+        with deadline_scope(0.05):
+            result = await asyncio.wait_for(
+                policy.invoke_with_retry(mock_model, [MagicMock(content="test")]), timeout=1
+            )
+
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_skips_call(self):
+        """Test no call is made once the deadline has passed."""
+        policy = RetryPolicy(max_retries=3)
+        mock_model = MagicMock()
+        mock_model.ainvoke = AsyncMock(return_value={"result": "ok"})
+
+        with deadline_scope(0.001):
+            await asyncio.sleep(0.01)
+            result = await policy.invoke_with_retry(mock_model, [MagicMock(content="test")])
+
+        assert result is None
+        mock_model.ainvoke.assert_not_called()
+
+
+class TestRetryPolicyBudget:
+    """Tests for the retry budget."""
+
+    def test_uses_process_wide_budget(self):
+        """Test policies share the process-wide budget by default."""
+        assert RetryPolicy().budget is retry_budget
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_fails_fast(self):
+        """Test no retry is made once the budget is spent."""
+        policy = RetryPolicy(max_retries=3, initial_delay=0.01, budget=RetryBudget(0.1, 1))
+        mock_model = MagicMock()
+        mock_model.ainvoke = AsyncMock(return_value=None)
+        sleep_calls, sleep_patch = record_sleeps()
+
+        with sleep_patch:
+            result = await policy.invoke_with_retry(mock_model, [MagicMock(content="test")])
+
+        assert result is None
+        assert mock_model.ainvoke.call_count == 2
+        assert len(sleep_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_success_refills_budget(self):
+        """Test successful calls deposit tokens in the budget."""
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+        budget.try_acquire()
+        budget.try_acquire()
+        policy = RetryPolicy(budget=budget)
+        mock_model = MagicMock()
+        mock_model.ainvoke = AsyncMock(return_value={"result": "ok"})
+
+        await policy.invoke_with_retry(mock_model, [MagicMock(content="test")])
+        await policy.invoke_with_retry(mock_model, [MagicMock(content="test")])
+
+        assert budget.tokens == 1.0
+
+
+def hedging_policy_after(seconds, step="select_chapter_candidates"):
+    """Hedging policy that hedges calls of a step after ``seconds``."""
+    hedger = HedgingPolicy(max_extra_ratio=1.0, min_samples=1)
+    hedger.record(step, seconds)
+    return hedger
+
+
+def model_with_latencies(*calls):
+    """Fake model whose n-th call sleeps calls[n][0] and returns calls[n][1]."""
+    calls = list(calls)
+    started = []
+
+    async def ainvoke(messages):
+        delay, result = calls[len(started)]
+        started.append(delay)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    model = MagicMock()
+    model.ainvoke = ainvoke
+    return model, started
+
+
+class TestRetryPolicyHedging:
+    """Tests for hedged calls."""
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_hedged(self):
+        """Test a call slower than the step's p95 is duplicated and the faster copy wins."""
+        policy = RetryPolicy(hedging=True, hedger=hedging_policy_after(0.01))
+        model, started = model_with_latencies((10, {"result": "slow"}), (0, {"result": "fast"}))
+
+        result = await asyncio.wait_for(
+            policy.invoke_with_retry(
+                model, [MagicMock(content="test")], step="select_chapter_candidates"
+            ),
+            timeout=1,
+        )
+
+        assert result == {"result": "fast"}
+        assert len(started) == 2
+
+    @pytest.mark.asyncio
+    async def test_fast_call_not_hedged(self):
+        """Test a call finishing before the hedge delay is not duplicated."""
+        policy = RetryPolicy(hedging=True, hedger=hedging_policy_after(1.0))
+        model, started = model_with_latencies((0, {"result": "ok"}))
+
+        result = await policy.invoke_with_retry(
+            model, [MagicMock(content="test")], step="select_chapter_candidates"
+        )
+
+        assert result == {"result": "ok"}
+        assert len(started) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_copy_waits_for_other(self):
+        """Test a copy that fails first does not end the call."""
+        policy = RetryPolicy(hedging=True, hedger=hedging_policy_after(0.01))
+        model, _ = model_with_latencies((0.05, {"result": "ok"}), (0, RuntimeError("boom")))
+
+        result = await policy.invoke_with_retry(
+            model, [MagicMock(content="test")], step="select_chapter_candidates"
+        )
+
+        assert result == {"result": "ok"}
+
+    @pytest.mark.asyncio
+    async def test_loser_cancelled(self):
+        """Test the slower copy is cancelled once the other succeeds."""
+        policy = RetryPolicy(hedging=True, hedger=hedging_policy_after(0.01))
+        cancelled = asyncio.Event()
+        started = []
+
+        async def ainvoke(messages):
+            started.append(messages)
+            if len(started) == 1:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return {"result": "ok"}
+
+        model = MagicMock()
+        model.ainvoke = ainvoke
+
+        await policy.invoke_with_retry(
+            model, [MagicMock(content="test")], step="select_chapter_candidates"
+        )
+        await asyncio.sleep(0)
+
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_disabled_or_without_step(self):
+        """Test calls are not hedged when hedging is off or no step is given."""
+        for policy, step in [
+            (RetryPolicy(hedger=hedging_policy_after(0.01)), "select_chapter_candidates"),
+            (RetryPolicy(hedging=True, hedger=hedging_policy_after(0.01)), None),
+        ]:
+            model, started = model_with_latencies((0.05, {"result": "ok"}))
+
+            await policy.invoke_with_retry(model, [MagicMock(content="test")], step=step)
+
+            assert len(started) == 1
+
+    @pytest.mark.asyncio
+    async def test_records_step_latency(self):
+        """Test successful hedged-mode calls feed the step's latency samples."""
+        hedger = HedgingPolicy(min_samples=1)
+        policy = RetryPolicy(hedging=True, hedger=hedger)
+        model, _ = model_with_latencies((0, {"result": "ok"}))
+
+        await policy.invoke_with_retry(
+            model, [MagicMock(content="test")], step="compare_final_codes"
+        )
+
+        assert hedger.hedge_delay("compare_final_codes") is not None
+
+
+def named_model(name, **ainvoke_kwargs):
+    """Fake model whose name is found by model_name_of."""
+    model = MagicMock()
+    model.model_name = name
+    model.ainvoke = AsyncMock(**ainvoke_kwargs)
+    return model
+
+
+class TestRetryPolicyCircuitBreaker:
+    """Tests for failover to the fallback model."""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_uses_fallback(self):
+        """Test calls go straight to the fallback model while the circuit is open."""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30)
+        breaker.record_failure("gemini-2.5-pro")
+        policy = RetryPolicy(breaker=breaker)
+        primary = named_model("gemini-2.5-pro", return_value={"result": "primary"})
+        fallback = named_model("gemini-2.5-flash", return_value={"result": "fallback"})
+
+        result = await policy.invoke_with_retry(
+            primary, [MagicMock(content="test")], fallback=lambda: fallback
+        )
+
+        assert result == {"result": "fallback"}
+        primary.ainvoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failures_fail_over_within_request(self):
+        """Test retries switch to the fallback model once the circuit opens."""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=30)
+        policy = RetryPolicy(max_retries=3, initial_delay=0.01, breaker=breaker)
+        primary = named_model("gemini-2.5-pro", side_effect=RuntimeError("Unavailable"))
+        fallback = named_model("gemini-2.5-flash", return_value={"result": "fallback"})
+
+        result = await policy.invoke_with_retry(
+            primary, [MagicMock(content="test")], fallback=lambda: fallback
+        )
+
+        assert result == {"result": "fallback"}
+        assert primary.ainvoke.call_count == 2
+        assert breaker.state("gemini-2.5-pro") is CircuitState.OPEN
+
+    @pytest.mark.asyncio
+    async def test_without_fallback_calls_model(self):
+        """Test an open circuit does not block calls when there is no fallback."""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30)
+        breaker.record_failure("gemini-2.5-pro")
+        policy = RetryPolicy(breaker=breaker)
+        primary = named_model("gemini-2.5-pro", return_value={"result": "primary"})
+
+        result = await policy.invoke_with_retry(primary, [MagicMock(content="test")])
+
+        assert result == {"result": "primary"}
+        assert breaker.state("gemini-2.5-pro") is CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_fatal_errors_do_not_open_circuit(self):
+        """Test errors in the request itself are not held against the model."""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30)
+        policy = RetryPolicy(breaker=breaker)
+        primary = named_model("gemini-2.5-pro", side_effect=InvalidArgument("Bad schema"))
+
+        await policy.invoke_with_retry(primary, [MagicMock(content="test")])
+
+        assert breaker.state("gemini-2.5-pro") is CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_background_probe_closes_circuit(self):
+        """Test a due circuit is probed in the background while the fallback answers."""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0)
+        breaker.record_failure("gemini-2.5-pro")
+        policy = RetryPolicy(breaker=breaker)
+        primary = named_model("gemini-2.5-pro", return_value={"result": "primary"})
+        fallback = named_model("gemini-2.5-flash", return_value={"result": "fallback"})
+
+        result = await policy.invoke_with_retry(
+            primary, [MagicMock(content="test")], fallback=lambda: fallback
+        )
+        await asyncio.gather(*policy._probes)
+
+        assert result == {"result": "fallback"}
+        primary.ainvoke.assert_called_once()
+        assert breaker.state("gemini-2.5-pro") is CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_failed_probe_keeps_fallback(self):
+        """Test a failed probe re-opens the circuit."""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0)
+        breaker.record_failure("gemini-2.5-pro")
+        policy = RetryPolicy(breaker=breaker)
+        primary = named_model("gemini-2.5-pro", side_effect=RuntimeError("Unavailable"))
+        fallback = named_model("gemini-2.5-flash", return_value={"result": "fallback"})
+
+        await policy.invoke_with_retry(
+            primary, [MagicMock(content="test")], fallback=lambda: fallback
+        )
+        await asyncio.gather(*policy._probes)
+
+        assert breaker.state("gemini-2.5-pro") is CircuitState.OPEN
@@ -0,0 +1,123 @@
+"""Tests for the schema compiler.
+
+Tests cover:
+- FrozenDict immutability (and copy/pickle behavior)
+- Selection schema shape detection
+- Compiling enum constraints once per (schema, codes)
+- Fingerprints shared by equal schemas
+"""
+
+import copy
+import pickle
+
+import pytest
+
+from hs_agent.factories.schema_compiler import (
+    MULTI_SELECTION_ENUM_PATH,
+    SINGLE_SELECTION_ENUM_PATH,
+    FrozenDict,
+    SchemaCompiler,
+    freeze,
+    selection_enum_path,
+)
+from hs_agent.utils.metrics import metrics
+
+SCHEMA = {
+    "type": "object",
+    "required": ["selected_code"],
+    "properties": {"selected_code": {"type": "string"}, "reasoning": {"type": "string"}},
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_compiler():
+    """Start every test with an empty compiler and counters."""
+    SchemaCompiler.clear()
+    metrics.reset()
+    yield
+    SchemaCompiler.clear()
+
+
+class TestFrozenDict:
+    """Tests for FrozenDict and freeze."""
+
+    def test_mutation_raises(self):
+        """Test every mutating dict method is rejected."""
+        frozen = freeze({"a": {"b": [1, 2]}})
+
+        with pytest.raises(TypeError):
+            frozen["a"] = 1
+        with pytest.raises(TypeError):
+            frozen.update(c=1)
+        with pytest.raises(TypeError):
+            frozen["a"].pop("b")
+        assert frozen["a"]["b"] == (1, 2)
+
+    def test_still_a_dict(self):
+        """Test frozen schemas compare equal to and behave as plain dicts."""
+        frozen = freeze(SCHEMA)
+
+        assert isinstance(frozen, FrozenDict)
+        assert isinstance(frozen, dict)
+        assert frozen == {**SCHEMA, "required": ("selected_code",)}
+
+    def test_copies_share_and_pickle_round_trips(self):
+        """Test copies return the same object and pickling works."""
+        frozen = freeze(SCHEMA)
+
+        assert copy.copy(frozen) is frozen
+        assert copy.deepcopy(frozen) is frozen
+        assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+
+class TestSelectionEnumPath:
+    """Tests for selection_enum_path."""
+
+    def test_detects_shapes(self):
+        """Test single, multi and unrecognized schemas."""
+        multi = {"properties": {"selections": {"type": "array"}}}
+
+        assert selection_enum_path(SCHEMA) == SINGLE_SELECTION_ENUM_PATH
+        assert selection_enum_path(multi) == MULTI_SELECTION_ENUM_PATH
+        assert selection_enum_path({"properties": {"answer": {}}}) is None
+
+
+class TestSchemaCompiler:
+    """Tests for SchemaCompiler."""
+
+    def test_compiles_enum_without_touching_source(self):
+        """Test the enum is set on a frozen copy and the source is unchanged."""
+        compiled = SchemaCompiler.compile(SCHEMA, SINGLE_SELECTION_ENUM_PATH, ["84", "85"])
+
+        assert compiled["properties"]["selected_code"]["enum"] == ("84", "85")
+        assert compiled["properties"]["reasoning"] == {"type": "string"}
+        assert "enum" not in SCHEMA["properties"]["selected_code"]
+
+    def test_compiled_once_per_codes(self):
+        """Test the same schema and codes return the same compiled object."""
+        first = SchemaCompiler.compile(SCHEMA, SINGLE_SELECTION_ENUM_PATH, ("84", "85"))
+        second = SchemaCompiler.compile(SCHEMA, SINGLE_SELECTION_ENUM_PATH, ["84", "85"])
+        other = SchemaCompiler.compile(SCHEMA, SINGLE_SELECTION_ENUM_PATH, ("01",))
+
+        assert first is second
+        assert other is not first
+        assert SchemaCompiler.size() == 2
+        assert metrics.counter("schema_cache.hits") == 1
+        assert metrics.counter("schema_cache.misses") == 2
+
+    def test_equal_schemas_share_entries(self):
+        """Test separately loaded but equal schemas hit the same entry."""
+        first = SchemaCompiler.compile(SCHEMA, SINGLE_SELECTION_ENUM_PATH, ("84",))
+        second = SchemaCompiler.compile(copy.deepcopy(SCHEMA), SINGLE_SELECTION_ENUM_PATH, ("84",))
+
+        assert first is second
+        assert SchemaCompiler.fingerprint(SCHEMA) == SchemaCompiler.fingerprint(
+            copy.deepcopy(SCHEMA)
+        )
+
+    def test_missing_field_created(self):
+        """Test missing intermediate objects along the path are created."""
+        compiled = SchemaCompiler.compile({"type": "object"}, MULTI_SELECTION_ENUM_PATH, ("01",))
+
+        code = compiled["properties"]["selections"]["items"]["properties"]["code"]
+        assert code == {"type": "string", "enum": ("01",)}
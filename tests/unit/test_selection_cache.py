@@ -0,0 +1,253 @@
+"""Tests for the per-level selection cache.
+
+Tests cover:
+- Key normalization and the inputs that separate entries
+- Reuse of single and multi selections across requests and workflows
+- "000000" selections are not cached
+- Read-through from the shared backend (hits warm the in-memory cache)
+- Disabling through settings
+"""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from hs_agent.cache import ResultCache, SelectionCache, selection_cache_key
+from hs_agent.data_loader import HSDataLoader
+from hs_agent.models import ClassificationLevel
+from hs_agent.utils.metrics import metrics
+from hs_agent.workflows.multi_path_workflow import MultiPathWorkflow
+from hs_agent.workflows.single_path_workflow import SinglePathWorkflow
+
+
+class MockHSCode:
+    def __init__(self, code, description):
+        self.code = code
+        self.description = description
+
+
+CHAPTERS = {
+    "84": MockHSCode("84", "Machinery"),
+    "85": MockHSCode("85", "Electrical"),
+}
+
+SINGLE_CONFIG = {"model": {"name": "gemini-2.5-flash"}, "prompts": {"system": "Select one."}}
+MULTI_CONFIG = {"model": {"name": "gemini-2.5-flash"}, "prompts": {"system": "Select 1-N."}}
+
+
+def key(**overrides):
+    """Selection key with default inputs."""
+    inputs = {
+        "level": "2",
+        "parent_code": None,
+        "candidates": "84: Machinery",
+        "config_hash": "abc",
+        "model": "gemini-2.5-flash",
+    }
+    return selection_cache_key(overrides.pop("description", "laptop"), **{**inputs, **overrides})
+
+
+def retry_policy(result):
+    """Retry policy whose LLM calls return result."""
+    policy = Mock()
+    policy.invoke_with_retry = AsyncMock(return_value=result)
+    return policy
+
+
+def single_workflow(policy, cache, shared_cache=None, config=SINGLE_CONFIG):
+    """Single-path workflow with the given caches."""
+    return SinglePathWorkflow(
+        data_loader=Mock(spec=HSDataLoader),
+        model_name="gemini-2.5-flash",
+        configs={"select_chapter_candidates": config},
+        retry_policy=policy,
+        selection_cache=cache,
+        shared_cache=shared_cache,
+    )
+
+
+def multi_workflow(policy, cache):
+    """Multi-path workflow with the given in-memory cache."""
+    return MultiPathWorkflow(
+        data_loader=Mock(spec=HSDataLoader),
+        model_name="gemini-2.5-flash",
+        configs={"select_chapter_candidates": MULTI_CONFIG},
+        retry_policy=policy,
+        chapter_notes_service=Mock(),
+        selection_cache=cache,
+    )
+
+
+async def select_chapter(workflow, description="laptop computer"):
+    """Run a single-path chapter selection."""
+    with patch("hs_agent.workflows.single_path_workflow.ModelFactory"):
+        return await workflow._select_code(
+            description, CHAPTERS, ClassificationLevel.CHAPTER, "select_chapter_candidates"
+        )
+
+
+async def multi_select_chapters(workflow, max_selections=3):
+    """Run a multi-path chapter selection."""
+    with patch("hs_agent.workflows.multi_path_workflow.ModelFactory"):
+        return await workflow._multi_select_codes(
+            "laptop computer",
+            CHAPTERS,
+            "select_chapter_candidates",
+            ClassificationLevel.CHAPTER,
+            max_selections=max_selections,
+        )
+
+
+CHAPTER_84 = {"selected_code": "84", "confidence": 0.9, "reasoning": "Machinery"}
+CHAPTERS_84_85 = {
+    "selections": [
+        {"code": "84", "confidence": 0.9, "reasoning": "Machinery"},
+        {"code": "85", "confidence": 0.4, "reasoning": "Electrical"},
+    ]
+}
+
+
+@pytest.fixture
+def cache():
+    """Private selection cache."""
+    return SelectionCache(max_bytes=1_000_000, ttl_seconds=60)
+
+
+class TestSelectionCacheKey:
+    """Tests for selection_cache_key."""
+
+    def test_normalizes_description(self):
+        """Test case and whitespace variants share a key."""
+        assert key(description="Laptop  COMPUTER ") == key(description="laptop computer")
+
+    @pytest.mark.parametrize(
+        "override",
+        [
+            {"level": "4"},
+            {"parent_code": "84"},
+            {"candidates": "84: Machinery\n85: Electrical"},
+            {"config_hash": "def"},
+            {"model": "gemini-2.5-pro"},
+            {"max_selections": 3},
+        ],
+    )
+    def test_inputs_separate_entries(self, override):
+        """Test every input of the decision is part of the key."""
+        assert key(**override) != key()
+
+
+class TestSingleSelectionCache:
+    """Tests for selection caching in SinglePathWorkflow._select_code."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_selection_skips_llm(self, cache):
+        """Test a repeated step (same description, any case) is served from the cache."""
+        metrics.reset()
+        policy = retry_policy(CHAPTER_84)
+        workflow = single_workflow(policy, cache)
+
+        first = await select_chapter(workflow)
+        second = await select_chapter(workflow, "Laptop Computer")
+
+        policy.invoke_with_retry.assert_awaited_once()
+        assert second == first
+        assert metrics.counter("selection_cache.hits") == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_across_workflows(self, cache):
+        """Test one workflow's selection warms another running the same step config."""
+        await select_chapter(single_workflow(retry_policy(CHAPTER_84), cache))
+        other_policy = retry_policy(CHAPTER_84)
+
+        result = await select_chapter(single_workflow(other_policy, cache))
+
+        other_policy.invoke_with_retry.assert_not_awaited()
+        assert result.selected_code == "84"
+
+    @pytest.mark.asyncio
+    async def test_other_step_config_not_shared(self, cache):
+        """Test a different step config makes its own decision."""
+        await select_chapter(single_workflow(retry_policy(CHAPTER_84), cache))
+        other_policy = retry_policy(CHAPTER_84)
+        other_config = {**SINGLE_CONFIG, "prompts": {"system": "Pick the chapter."}}
+
+        await select_chapter(single_workflow(other_policy, cache, config=other_config))
+
+        other_policy.invoke_with_retry.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_no_hs_code_not_cached(self, cache):
+        """Test failed selections ("000000") are retried by the next request."""
+        policy = retry_policy(None)
+        workflow = single_workflow(policy, cache)
+
+        await select_chapter(workflow)
+        await select_chapter(workflow)
+
+        assert policy.invoke_with_retry.await_count == 2
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_read_through_shared_backend(self, cache):
+        """Test a replica with a cold memory cache is served from the shared backend."""
+        shared = ResultCache(max_bytes=1_000_000, ttl_seconds=60)
+        await select_chapter(single_workflow(retry_policy(CHAPTER_84), cache, shared))
+        other_policy = retry_policy(CHAPTER_84)
+        cold_cache = SelectionCache(max_bytes=1_000_000, ttl_seconds=60)
+
+        result = await select_chapter(single_workflow(other_policy, cold_cache, shared))
+
+        other_policy.invoke_with_retry.assert_not_awaited()
+        assert result.selected_code == "84"
+        assert len(cold_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_settings(self, cache):
+        """Test settings.enable_selection_cache turns caching off."""
+        policy = retry_policy(CHAPTER_84)
+        workflow = single_workflow(policy, cache)
+
+        with patch("hs_agent.workflows.base_workflow.settings") as mock_settings:
+            mock_settings.enable_selection_cache = False
+            await select_chapter(workflow)
+            await select_chapter(workflow)
+
+        assert policy.invoke_with_retry.await_count == 2
+        assert len(cache) == 0
+
+
+class TestMultiSelectionCache:
+    """Tests for selection caching in MultiPathWorkflow._multi_select_codes."""
+
+    @pytest.mark.asyncio
+    async def test_following_request_skips_llm(self, cache):
+        """Test a later request of another workflow instance reuses the selections."""
+        first = await multi_select_chapters(multi_workflow(retry_policy(CHAPTERS_84_85), cache))
+        other_policy = retry_policy(CHAPTERS_84_85)
+
+        second = await multi_select_chapters(multi_workflow(other_policy, cache))
+
+        other_policy.invoke_with_retry.assert_not_awaited()
+        assert second == first
+        assert second["codes"] == ["84", "85"]
+
+    @pytest.mark.asyncio
+    async def test_max_selections_separates_entries(self, cache):
+        """Test a different max_selections makes its own decision."""
+        policy = retry_policy(CHAPTERS_84_85)
+        workflow = multi_workflow(policy, cache)
+
+        await multi_select_chapters(workflow, max_selections=3)
+        await multi_select_chapters(workflow, max_selections=2)
+
+        assert policy.invoke_with_retry.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_no_hs_code_not_cached(self, cache):
+        """Test failed multi-selections ("000000") are not cached."""
+        policy = retry_policy({"selections": []})
+        workflow = multi_workflow(policy, cache)
+
+        await multi_select_chapters(workflow)
+
+        assert len(cache) == 0
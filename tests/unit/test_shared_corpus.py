@@ -0,0 +1,118 @@
+"""Tests for the shared (memory-mapped) nomenclature and notes corpus.
+
+Tests cover:
+- Building and attaching a corpus
+- Attached table matches the loaded table
+- Chapter notes served from the corpus
+- Idempotent rebuilds and incompatible corpora
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from hs_agent import data_snapshot
+from hs_agent.data_loader import HSDataLoader
+from hs_agent.shared_corpus import attach_shared_corpus, build_shared_corpus
+
+
+@pytest.fixture
+def notes_dir(tmp_path):
+    """Provide a chapter notes directory."""
+    notes = tmp_path / "chapters_markdown"
+    notes.mkdir()
+    (notes / "chapter_84_notes.md").write_text("Machinery notes.\n")
+    (notes / "chapter_85_notes.md").write_text("Électrical notes.")
+    return notes
+
+
+@pytest.fixture
+def loaded(temp_data_dir):
+    """Provide a loader with the sample data loaded from CSV."""
+    loader = HSDataLoader(data_dir=temp_data_dir)
+    loader.load_all_data(use_snapshot=False)
+    return loader
+
+
+class TestBuildAndAttach:
+    """Tests for build_shared_corpus/attach_shared_corpus."""
+
+    def test_attached_table_matches_loaded(self, loaded, notes_dir, tmp_path):
+        """Test a worker attaching the corpus sees the same codes and hierarchy."""
+        path = build_shared_corpus(loaded.table, notes_dir, tmp_path / "corpus")
+        corpus = attach_shared_corpus(path)
+
+        worker = HSDataLoader()
+        worker.set_table(corpus.table)
+
+        for level in ("codes_2digit", "codes_4digit", "codes_6digit"):
+            assert dict(getattr(worker, level)) == dict(getattr(loaded, level))
+        assert list(worker.children_of("8471")) == ["847130"]
+        assert worker.leaf_count("84") == loaded.leaf_count("84")
+
+    def test_arrays_are_memory_mapped_read_only(self, loaded, notes_dir, tmp_path):
+        """Test the attached arrays are read-only maps of the corpus files."""
+        corpus = attach_shared_corpus(
+            build_shared_corpus(loaded.table, notes_dir, tmp_path / "corpus")
+        )
+
+        assert isinstance(corpus.table.parent_rows, np.memmap)
+        with pytest.raises(ValueError):
+            corpus.table.leaf_counts[0] = 0
+
+    def test_version_round_trip(self, loaded, notes_dir, tmp_path):
+        """Test the nomenclature version is carried in the corpus metadata."""
+        path = build_shared_corpus(loaded.table, notes_dir, tmp_path / "corpus", loaded.version)
+
+        assert attach_shared_corpus(path).version == loaded.version
+
+    def test_notes(self, loaded, notes_dir, tmp_path):
+        """Test chapter notes are stripped and keyed by chapter code."""
+        corpus = attach_shared_corpus(
+            build_shared_corpus(loaded.table, notes_dir, tmp_path / "corpus")
+        )
+
+        assert dict(corpus.notes) == {"84": "Machinery notes.", "85": "Électrical notes."}
+
+    def test_missing_notes_directory(self, loaded, tmp_path):
+        """Test a corpus without notes can still be built and attached."""
+        corpus = attach_shared_corpus(
+            build_shared_corpus(loaded.table, tmp_path / "missing", tmp_path / "corpus")
+        )
+
+        assert len(corpus.notes) == 0
+        assert len(corpus.table) == len(loaded.table)
+
+    def test_rebuild_is_noop(self, loaded, notes_dir, tmp_path):
+        """Test building an unchanged corpus returns the same directory."""
+        first = build_shared_corpus(loaded.table, notes_dir, tmp_path / "corpus")
+        second = build_shared_corpus(loaded.table, notes_dir, tmp_path / "corpus")
+
+        assert first == second
+        assert len(list((tmp_path / "corpus").iterdir())) == 1
+
+    def test_changed_notes_replace_corpus(self, loaded, notes_dir, tmp_path):
+        """Test changed inputs publish a new corpus and drop the old one."""
+        first = build_shared_corpus(loaded.table, notes_dir, tmp_path / "corpus")
+        (notes_dir / "chapter_84_notes.md").write_text("Updated notes.")
+        second = build_shared_corpus(loaded.table, notes_dir, tmp_path / "corpus")
+
+        assert second != first
+        assert list((tmp_path / "corpus").iterdir()) == [second]
+
+    def test_attach_missing_raises(self, tmp_path):
+        """Test attaching a missing corpus raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            attach_shared_corpus(tmp_path / "corpus-v1-missing")
+
+    def test_attach_other_format_version_raises(self, loaded, notes_dir, tmp_path):
+        """Test a corpus with another format version is rejected."""
+        path = build_shared_corpus(loaded.table, notes_dir, tmp_path / "corpus")
+        meta_file = path / data_snapshot.META_FILE
+        meta = json.loads(meta_file.read_text())
+        meta["format_version"] = 0
+        meta_file.write_text(json.dumps(meta))
+
+        with pytest.raises(FileNotFoundError):
+            attach_shared_corpus(path)
@@ -0,0 +1,248 @@
+"""Tests for single-flight coalescing of identical concurrent work.
+
+Tests cover:
+- Concurrent callers of one key share a single run (and the joined flag)
+- Exceptions reach every waiter
+- Cancellation of one waiter, and of all waiters
+- Keys are released once the run finishes
+- RetryPolicy coalescing of identical LLM calls
+- HSAgent coalescing of identical concurrent classifications
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from hs_agent.config.settings import settings
+from hs_agent.policies import RetryPolicy, SingleFlight
+from hs_agent.utils.metrics import metrics
+
+
+class Work:
+    """Awaitable work that counts its runs and finishes when released."""
+
+    def __init__(self, result="done"):
+        self.result = result
+        self.runs = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight.do."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_run(self):
+        """Test callers of an in-flight key join the leader's run."""
+        metrics.reset()
+        flights = SingleFlight("test")
+        work = Work()
+
+        calls = [asyncio.ensure_future(flights.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        work.release.set()
+        results = await asyncio.gather(*calls)
+
+        assert work.runs == 1
+        assert results == [("done", False), ("done", True), ("done", True)]
+        assert metrics.counter("test.coalesced") == 2
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test only callers of the same key are coalesced."""
+        flights = SingleFlight("test")
+        work = Work()
+        work.release.set()
+
+        await asyncio.gather(flights.do("a", work), flights.do("b", work))
+
+        assert work.runs == 2
+
+    @pytest.mark.asyncio
+    async def test_exception_reaches_every_waiter(self):
+        """Test a failed run fails every caller that joined it."""
+        flights = SingleFlight("test")
+        work = Work(result=ValueError("LLM failed"))
+
+        calls = [asyncio.ensure_future(flights.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        work.release.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flights.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_run_for_others(self):
+        """Test a cancelled waiter does not cancel the run the others await."""
+        flights = SingleFlight("test")
+        work = Work()
+        leader = asyncio.ensure_future(flights.do("key", work))
+        follower = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        work.release.set()
+
+        assert await follower == ("done", True)
+        assert leader.cancelled()
+        assert work.cancelled is False
+
+    @pytest.mark.asyncio
+    async def test_run_cancelled_when_no_waiter_left(self):
+        """Test the run is cancelled and its key released once every waiter is gone."""
+        flights = SingleFlight("test")
+        work = Work()
+        calls = [asyncio.ensure_future(flights.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        assert work.cancelled is True
+        assert flights.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_key_released_after_run(self):
+        """Test a later caller starts a new run (results are not kept)."""
+        flights = SingleFlight("test")
+        work = Work()
+        work.release.set()
+
+        await flights.do("key", work)
+        result = await flights.do("key", work)
+
+        assert result == ("done", False)
+        assert work.runs == 2
+        assert flights.in_flight() == 0
+
+
+def messages(description="laptop"):
+    """Messages of an LLM call."""
+    return [SystemMessage(content="Select one."), HumanMessage(content=description)]
+
+
+class TestRetryPolicyCoalescing:
+    """Tests for coalescing in RetryPolicy.invoke_with_retry."""
+
+    async def slow_result(self, _messages):
+        """Model response that takes long enough for concurrent calls to overlap."""
+        await asyncio.sleep(0.01)
+        return {"selected_code": "84"}
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_share_one_invocation(self):
+        """Test concurrent identical calls invoke the model once."""
+        policy = RetryPolicy(max_retries=1, coalescing=True)
+        model = Mock()
+        model.ainvoke = AsyncMock(side_effect=self.slow_result)
+
+        results = await asyncio.gather(
+            policy.invoke_with_retry(model, messages(), step="select_chapter_candidates"),
+            policy.invoke_with_retry(model, messages(), step="select_chapter_candidates"),
+        )
+
+        model.ainvoke.assert_awaited_once()
+        assert results == [{"selected_code": "84"}] * 2
+
+    @pytest.mark.asyncio
+    async def test_different_messages_not_shared(self):
+        """Test calls with other messages make their own invocation."""
+        policy = RetryPolicy(max_retries=1, coalescing=True)
+        model = Mock()
+        model.ainvoke = AsyncMock(side_effect=self.slow_result)
+
+        await asyncio.gather(
+            policy.invoke_with_retry(model, messages("laptop")),
+            policy.invoke_with_retry(model, messages("phone")),
+        )
+
+        assert model.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_off_by_default(self):
+        """Test a policy without coalescing invokes the model per call."""
+        policy = RetryPolicy(max_retries=1)
+        model = Mock()
+        model.ainvoke = AsyncMock(side_effect=self.slow_result)
+
+        await asyncio.gather(
+            policy.invoke_with_retry(model, messages()),
+            policy.invoke_with_retry(model, messages()),
+        )
+
+        assert model.ainvoke.await_count == 2
+
+
+@pytest.fixture
+def slow_graph_run(classification_state):
+    """Graph run that takes long enough for concurrent requests to overlap."""
+
+    async def run(_state):
+        await asyncio.sleep(0.01)
+        return classification_state()
+
+    return run
+
+
+class TestHSAgentCoalescing:
+    """Tests for request coalescing in HSAgent.classify."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_run_graph_once(self, agent, slow_graph_run):
+        """Test identical concurrent requests (any case) share one graph run."""
+        with patch.object(agent.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke:
+            mock_invoke.side_effect = slow_graph_run
+
+            first, second = await asyncio.gather(
+                agent.classify("Laptop computer"), agent.classify("laptop computer")
+            )
+
+        mock_invoke.assert_awaited_once()
+        assert first.final_code == second.final_code == "847130"
+        assert first.product_description == "Laptop computer"
+        assert second.product_description == "laptop computer"
+        assert second.cached is False
+
+    @pytest.mark.asyncio
+    async def test_coalesces_without_result_cache(self, agent, slow_graph_run):
+        """Test requests are coalesced even when result caching is off."""
+        with (
+            patch.object(settings, "enable_caching", False),
+            patch.object(agent.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke,
+        ):
+            mock_invoke.side_effect = slow_graph_run
+
+            await asyncio.gather(agent.classify("laptop"), agent.classify("laptop"))
+
+        mock_invoke.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_settings(self, agent, slow_graph_run):
+        """Test settings.enable_request_coalescing turns coalescing off."""
+        with (
+            patch.object(settings, "enable_caching", False),
+            patch.object(settings, "enable_request_coalescing", False),
+            patch.object(agent.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke,
+        ):
+            mock_invoke.side_effect = slow_graph_run
+
+            await asyncio.gather(agent.classify("laptop"), agent.classify("laptop"))
+
+        assert mock_invoke.await_count == 2
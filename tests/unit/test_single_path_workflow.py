@@ -2,8 +2,10 @@
 
 Tests cover:
 - Graph structure and node connections
-- Code filtering by parent (startswith logic)
+- Code filtering by parent (hierarchical index)
 - Finalize confidence calculation
+- National (HTS) levels below the subheading, single-child shortcut
+- Sharded (tournament) selection of oversized candidate lists
 - _select_code result handling (None, 000000, invalid, valid)
 """
 
@@ -11,6 +13,8 @@ from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from hs_agent.code_table import ROOT_CODE, HSCodeTable
+from hs_agent.data_loader import HSDataLoader
 from hs_agent.models import ClassificationLevel, ClassificationResult
 from hs_agent.workflows.single_path_workflow import SinglePathWorkflow
 
@@ -24,8 +28,8 @@ class MockHSCode:
 
 @pytest.fixture
 def mock_data_loader():
-    """Create a mock data loader with test HS codes."""
-    loader = Mock()
+    """Create a data loader with test HS codes and its hierarchical index."""
+    loader = HSDataLoader()
     loader.codes_2digit = {
         "84": MockHSCode("84", "Machinery"),
         "85": MockHSCode("85", "Electrical"),
@@ -40,9 +44,43 @@ def mock_data_loader():
         "847141": MockHSCode("847141", "Other data processing"),
         "847330": MockHSCode("847330", "Parts for 8471"),
     }
+    loader.build_index()
     return loader
 
 
+@pytest.fixture
+def national_data_loader():
+    """Create a data loader whose subheadings have HTS subdivisions."""
+    rows = [
+        ("84", "Machinery", 2, ROOT_CODE),
+        ("8471", "Data processing machines", 4, "84"),
+        ("847130", "Portable computers", 6, "8471"),
+        ("847141", "Other data processing", 6, "8471"),
+        ("84713001", "Portable computers", 8, "847130"),
+        ("8471300100", "Portable computers", 10, "84713001"),
+        ("84714101", "Other data processing machines", 8, "847141"),
+        ("8471410105", "Laptops", 10, "84714101"),
+        ("8471410150", "Other", 10, "84714101"),
+    ]
+    loader = HSDataLoader()
+    loader.set_table(HSCodeTable(*(list(column) for column in zip(*rows, strict=True))))
+    return loader
+
+
+def subheading_state(code):
+    """Build a state that has reached the given subheading."""
+    return {
+        "product_description": "laptop",
+        "subheading_result": ClassificationResult(
+            level=ClassificationLevel.SUBHEADING,
+            selected_code=code,
+            description="test",
+            confidence=0.9,
+            reasoning="test",
+        ),
+    }
+
+
 @pytest.fixture
 def mock_retry_policy():
     """Create a mock retry policy."""
@@ -114,6 +152,7 @@ class TestBuildGraph:
         assert "select_chapter" in node_names
         assert "select_heading" in node_names
         assert "select_subheading" in node_names
+        assert "select_national" in node_names
         assert "finalize" in node_names
 
     def test_graph_compiles_without_error(self, workflow):
@@ -184,7 +223,7 @@ class TestSelectHeading:
         self, workflow, mock_data_loader, mock_retry_policy
     ):
         """Test that headings from other chapters are excluded."""
-        # This tests the startswith filtering logic
+        # This tests the parent -> children index lookup
         # 8501 should be excluded when chapter is 84
 
         mock_retry_policy.invoke_with_retry.return_value = {
@@ -332,6 +371,82 @@ class TestFinalize:
         assert result["final_code"] == "847141"
 
 
+class TestSelectNational:
+    """Tests for the national (HTS) levels below the subheading."""
+
+    def test_route_skips_without_subdivisions(self, workflow):
+        """Test subheadings without national codes go straight to finalize."""
+        assert workflow._route_after_subheading(subheading_state("847130")) == "finalize"
+
+    def test_route_descends_with_subdivisions(
+        self, national_data_loader, mock_retry_policy, sample_configs
+    ):
+        """Test subheadings with national codes go to select_national."""
+        workflow = SinglePathWorkflow(
+            national_data_loader, "gemini-2.5-flash", sample_configs, mock_retry_policy
+        )
+
+        assert workflow._route_after_subheading(subheading_state("847130")) == "select_national"
+
+    @pytest.mark.asyncio
+    async def test_single_child_chain_skips_llm(
+        self, national_data_loader, mock_retry_policy, sample_configs
+    ):
+        """Test single subdivisions are selected without invoking the LLM."""
+        workflow = SinglePathWorkflow(
+            national_data_loader, "gemini-2.5-flash", sample_configs, mock_retry_policy
+        )
+
+        result = await workflow._select_national(subheading_state("847130"))
+
+        mock_retry_policy.invoke_with_retry.assert_not_called()
+        assert result["tariff_line_result"].selected_code == "84713001"
+        assert result["statistical_suffix_result"].selected_code == "8471300100"
+        assert result["national_code"] == "8471300100"
+
+    @pytest.mark.asyncio
+    async def test_llm_selects_among_suffixes(
+        self, national_data_loader, mock_retry_policy, sample_configs
+    ):
+        """Test the LLM is only asked where there is more than one subdivision."""
+        workflow = SinglePathWorkflow(
+            national_data_loader, "gemini-2.5-flash", sample_configs, mock_retry_policy
+        )
+        mock_retry_policy.invoke_with_retry.return_value = {
+            "selected_code": "8471410105",
+            "confidence": 0.8,
+            "reasoning": "Laptop",
+        }
+
+        with patch("hs_agent.workflows.single_path_workflow.ModelFactory") as factory:
+            result = await workflow._select_national(subheading_state("847141"))
+
+        mock_retry_policy.invoke_with_retry.assert_called_once()
+        assert factory.create_with_config.call_args.kwargs["enum_codes"] == (
+            "8471410105",
+            "8471410150",
+        )
+        assert result["tariff_line_result"].confidence == 1.0
+        assert result["statistical_suffix_result"].level == ClassificationLevel.STATISTICAL_SUFFIX
+        assert result["national_code"] == "8471410105"
+
+    @pytest.mark.asyncio
+    async def test_no_code_keeps_subheading(
+        self, national_data_loader, mock_retry_policy, sample_configs
+    ):
+        """Test an unusable national answer stops the descent at the last good level."""
+        workflow = SinglePathWorkflow(
+            national_data_loader, "gemini-2.5-flash", sample_configs, mock_retry_policy
+        )
+        mock_retry_policy.invoke_with_retry.return_value = None
+
+        with patch("hs_agent.workflows.single_path_workflow.ModelFactory"):
+            result = await workflow._select_national(subheading_state("847141"))
+
+        assert result["national_code"] == "84714101"
+        assert "statistical_suffix_result" not in result
+
+
 class TestSelectCode:
     """Tests for _select_code helper method."""
 
@@ -423,3 +538,68 @@ class TestSelectCode:
         assert result.reasoning == "Machinery chapter for computers"
         assert result.description == "Machinery"
         assert result.level == ClassificationLevel.CHAPTER
+
+
+def pick_highest_code(model, messages, step=None, fallback=None):
+    """Fake LLM: select the highest candidate code listed in the prompt."""
+    codes = [line.split(":")[0] for line in messages[1].content.splitlines() if line[:2].isdigit()]
+    return {"selected_code": max(codes), "confidence": 0.9, "reasoning": "highest"}
+
+
+class TestShardedSelection:
+    """Tests for tournament selection over oversized candidate lists."""
+
+    @pytest.fixture
+    def candidates(self):
+        """Provide five chapter candidates."""
+        return {f"0{i}": MockHSCode(f"0{i}", f"Chapter {i}") for i in range(1, 6)}
+
+    @pytest.fixture
+    def sharded_workflow(self, mock_data_loader, mock_retry_policy):
+        """Create a workflow whose chapter step shards lists above 2 candidates."""
+        configs = {"select_chapter_candidates": {"sharding": {"threshold": 2, "shard_size": 2}}}
+        return SinglePathWorkflow(mock_data_loader, "gemini-2.5-flash", configs, mock_retry_policy)
+
+    @pytest.mark.asyncio
+    async def test_shards_then_final_call(self, sharded_workflow, mock_retry_policy, candidates):
+        """Test each shard is scored and the winners are resolved by a final call."""
+        mock_retry_policy.invoke_with_retry.side_effect = pick_highest_code
+
+        with patch("hs_agent.workflows.single_path_workflow.ModelFactory") as factory:
+            result = await sharded_workflow._select_code(
+                "product", candidates, ClassificationLevel.CHAPTER
+            )
+
+        enum_codes = [
+            call.kwargs["enum_codes"] for call in factory.create_with_config.call_args_list
+        ]
+        assert enum_codes[:3] == [("01", "02"), ("03", "04"), ("05",)]
+        assert enum_codes[3] == ("02", "04", "05")
+        assert result.selected_code == "05"
+        assert result.description == "Chapter 5"
+
+    @pytest.mark.asyncio
+    async def test_no_shard_winner(self, sharded_workflow, mock_retry_policy, candidates):
+        """Test the no-code result is returned when no shard selects a code."""
+        mock_retry_policy.invoke_with_retry.return_value = None
+
+        with patch("hs_agent.workflows.single_path_workflow.ModelFactory"):
+            result = await sharded_workflow._select_code(
+                "product", candidates, ClassificationLevel.CHAPTER
+            )
+
+        assert result.selected_code == "000000"
+        assert mock_retry_policy.invoke_with_retry.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_small_list_single_call(self, sharded_workflow, mock_retry_policy, candidates):
+        """Test lists within the threshold use one call."""
+        mock_retry_policy.invoke_with_retry.side_effect = pick_highest_code
+
+        with patch("hs_agent.workflows.single_path_workflow.ModelFactory"):
+            result = await sharded_workflow._select_code(
+                "product", dict(list(candidates.items())[:2]), ClassificationLevel.CHAPTER
+            )
+
+        assert result.selected_code == "02"
+        assert mock_retry_policy.invoke_with_retry.call_count == 1
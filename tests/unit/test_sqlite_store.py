@@ -0,0 +1,172 @@
+"""Tests for the persistent SQLite result store.
+
+Tests cover:
+- Round trips through background writes, across reopened stores
+- WAL mode
+- TTL expiry and eviction of the least recently read entries (running row count)
+- Closing at exit registered once per store
+- Process-wide backend from settings
+- HSAgent read-through (store hits warm the in-memory cache)
+"""
+
+import sqlite3
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from hs_agent.cache import SQLiteResultStore
+from hs_agent.cache import backend as backend_module
+from hs_agent.config.settings import CacheBackendType
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Store in a temporary directory."""
+    store = SQLiteResultStore(tmp_path / "results.sqlite3", max_entries=100, ttl_seconds=60)
+    yield store
+    store.close()
+
+
+class TestSQLiteResultStore:
+    """Tests for SQLiteResultStore."""
+
+    def test_round_trip(self, store):
+        """Test a written payload is read back once the write is applied."""
+        store.set("k", b"payload")
+        store.flush()
+
+        assert store.get("k") == b"payload"
+        assert store.get("missing") is None
+
+    def test_survives_reopen(self, store, tmp_path):
+        """Test entries outlive the store instance (a restarted process starts warm)."""
+        store.set("k", b"payload")
+        store.close()
+
+        reopened = SQLiteResultStore(tmp_path / "results.sqlite3", max_entries=100, ttl_seconds=60)
+
+        assert reopened.get("k") == b"payload"
+        reopened.close()
+
+    def test_wal_mode(self, store, tmp_path):
+        """Test the database uses write-ahead logging."""
+        conn = sqlite3.connect(tmp_path / "results.sqlite3")
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            conn.close()
+
+    def test_ttl_expiry(self, tmp_path):
+        """Test expired entries are not returned."""
+        store = SQLiteResultStore(tmp_path / "results.sqlite3", max_entries=100, ttl_seconds=0.01)
+        store.set("k", b"payload")
+        store.flush()
+
+        time.sleep(0.02)
+
+        assert store.get("k") is None
+        store.close()
+
+    def test_evicts_least_recently_read(self, tmp_path):
+        """Test the least recently read entries are evicted beyond max_entries."""
+        store = SQLiteResultStore(tmp_path / "results.sqlite3", max_entries=2, ttl_seconds=60)
+        store.set("a", b"1")
+        store.set("b", b"2")
+        store.flush()
+        time.sleep(0.01)
+        store.get("a")
+        store.flush()
+
+        store.set("c", b"3")
+        store.flush()
+
+        assert len(store) == 2
+        assert store.get("a") == b"1"
+        assert store.get("b") is None
+        store.close()
+
+    def test_replacing_entry_keeps_bound(self, tmp_path):
+        """Test rewriting a key does not count as a new entry."""
+        store = SQLiteResultStore(tmp_path / "results.sqlite3", max_entries=2, ttl_seconds=60)
+        store.set("a", b"1")
+        store.set("b", b"2")
+        store.set("a", b"3")
+        store.flush()
+
+        assert len(store) == 2
+        assert store.get("a") == b"3"
+        assert store.get("b") == b"2"
+        store.close()
+
+    def test_clear(self, store):
+        """Test clear drops every entry, including queued ones."""
+        store.set("k", b"payload")
+
+        store.clear()
+
+        assert len(store) == 0
+
+    def test_bound_after_clear(self, tmp_path):
+        """Test entries written after a clear fill the whole bound."""
+        store = SQLiteResultStore(tmp_path / "results.sqlite3", max_entries=2, ttl_seconds=60)
+        store.set("a", b"1")
+        store.set("b", b"2")
+        store.clear()
+
+        store.set("c", b"3")
+        store.set("d", b"4")
+        store.flush()
+
+        assert len(store) == 2
+        store.close()
+
+    def test_close_registered_at_exit_once(self, tmp_path):
+        """Test restarting the writer does not register another exit handler."""
+        with patch("hs_agent.cache.sqlite_store.atexit.register") as register:
+            store = SQLiteResultStore(tmp_path / "results.sqlite3", ttl_seconds=60)
+            for key in ["a", "b"]:
+                store.set(key, b"payload")
+                store.close()
+
+        register.assert_called_once_with(store.close)
+
+    def test_process_wide_backend(self, tmp_path):
+        """Test the process-wide backend follows settings."""
+        with (
+            patch.object(backend_module, "_shared_backend", None),
+            patch("hs_agent.cache.backend.settings") as mock_settings,
+        ):
+            mock_settings.cache_backend = CacheBackendType.MEMORY
+            assert backend_module.get_shared_backend() is None
+
+            mock_settings.cache_backend = CacheBackendType.SQLITE
+            mock_settings.result_store_path = tmp_path / "store.sqlite3"
+            store = backend_module.get_shared_backend()
+
+            assert isinstance(store, SQLiteResultStore)
+            assert store.path == tmp_path / "store.sqlite3"
+            assert backend_module.get_shared_backend() is store
+            store.close()
+
+
+class TestHSAgentReadThrough:
+    """Tests for the persistent store behind HSAgent's result cache."""
+
+    @pytest.mark.asyncio
+    async def test_restarted_agent_starts_warm(self, store, make_agent, classification_state):
+        """Test a new agent (empty memory cache) is served from the store."""
+        first_agent = make_agent(shared_cache=store)
+        with patch.object(first_agent.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke:
+            mock_invoke.return_value = classification_state()
+            first = await first_agent.classify("laptop computer")
+        store.flush()
+
+        restarted = make_agent(shared_cache=store)
+        with patch.object(restarted.graph, "ainvoke", new_callable=AsyncMock) as mock_invoke:
+            second = await restarted.classify("Laptop computer")
+
+        mock_invoke.assert_not_called()
+        assert second.cached is True
+        assert second.original_processing_time_ms == first.processing_time_ms
+        assert len(restarted.result_cache) == 1